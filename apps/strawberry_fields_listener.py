@@ -22,62 +22,109 @@ import strawberryfields as sf
 import strawberryfields.ops as sfo
 
 from blackbird import BlackbirdListener, RegRefTransform, parse
+from blackbird.error import exit_on_error
+from blackbird.executor import Backend, ShotExecutor
 
 
-class StrawberryFieldsListener(BlackbirdListener):
-    """Listener to run a Blackbird program using Strawberry Fields"""
-    def __init__(self):
-        super().__init__()
-        self.eng = None
-        self.q = None
+class StrawberryFieldsBackend(Backend):
+    """Backend to run the shots of a Blackbird program using Strawberry Fields.
 
-        self.state = None
-        self.result = []
+    The backend is used by the :class:`~.ShotExecutor`, which splits
+    the shots of the program into chunks, and runs each chunk in a separate
+    worker process.
+    """
+
+    def compile(self, program):
+        """Construct a Strawberry Fields engine applying the program.
 
-    def run(self):
-        if self.target is None:
+        Args:
+            program (BlackbirdProgram): program to apply
+
+        Returns:
+            tuple[Engine, tuple[RegRef]]: the engine, and its registers
+        """
+        if program.target["name"] is None:
             raise ValueError("Blackbird program has no target backend")
 
-        self.eng, self.q = sf.Engine(
-            len(self.active_modes),
-            hbar=self.target['options'].get('hbar', 2)
+        eng, q = sf.Engine(
+            max(program.modes) + 1,
+            hbar=program.target["options"].get("hbar", 2)
         )
 
-        self.target['options'].pop('hbar', None)
-
-        with self.eng:
-            for statement in self.queue:
-                modes = statement['modes']
+        with eng:
+            for statement in program.operations:
+                modes = statement["modes"]
 
-                if 'args' in statement:
-                    args = statement['args']
-                    kwargs = statement['kwargs']
+                if "args" in statement:
+                    args = list(statement["args"])
+                    kwargs = statement["kwargs"]
 
                     for idx, a in enumerate(args):
                         if isinstance(a, RegRefTransform):
-                            regrefs = [self.q[i] for i in a.regrefs]
+                            regrefs = [q[i] for i in a.regrefs]
                             args[idx] = sf.engine.RegRefTransform(regrefs, a.func, a.func_str)
 
-                    op = getattr(sfo, statement['op'])(*args, **kwargs)
+                    op = getattr(sfo, statement["op"])(*args, **kwargs)
                 else:
-                    op = getattr(sfo, statement['op'])
+                    op = getattr(sfo, statement["op"])
 
-                op | [self.q[i] for i in modes] #pylint:disable=pointless-statement
+                op | [q[i] for i in modes] #pylint:disable=pointless-statement
 
-        shots = self.target['options'].get('shots', 1)
-        self.target['options'].pop('shots', None)
+        return eng, q
+
+    def run(self, program, shots, seed):
+        # Strawberry Fields draws its samples from the global NumPy random state
+        np.random.seed(seed.generate_state(1)[0])
+
+        eng, q = self.compile(program)
+        options = {
+            k: v for k, v in program.target["options"].items() if k not in ("hbar", "shots")
+        }
+
+        result = []
 
         for _ in range(shots):
-            self.eng.reset(keep_history=True)
-            self.state = self.eng.run(self.target['name'], **self.target['options'])
-            self.result.append([q.val for q in self.q])
+            eng.reset(keep_history=True)
+            eng.run(program.target["name"], **options)
+            result.append([np.nan if r.val is None else r.val for r in q])
+
+        return np.array(result)
+
+
+class StrawberryFieldsListener(BlackbirdListener):
+    """Listener to run a Blackbird program using Strawberry Fields"""
+    def __init__(self):
+        super().__init__()
+        self.eng = None
+        self.q = None
+
+        # the shots are executed by the engines of the worker processes,
+        # whose states are not returned
+        self.state = None
+        self.result = []
+
+    def run(self, workers=None):
+        """Run the parsed program, executing the shots in parallel across
+        worker processes using the :class:`~.StrawberryFieldsBackend`.
+
+        The engine applying the program, and its registers, are available
+        as the :attr:`eng` and :attr:`q` attributes.
+
+        Args:
+            workers (int): number of worker processes; defaults to the
+                number of available cores
+        """
+        backend = StrawberryFieldsBackend()
+        self.eng, self.q = backend.compile(self.program)
+
+        with ShotExecutor(backend, workers=workers) as executor:
+            self.result = executor.run(self.program).tolist()
 
     def print_results(self):
         """Print the results of the blackbird program execution"""
         print('Program')
         print('-------')
-        self.eng.print_applied()
-        print()
+        print(self.program.serialize())
 
         print('Results')
         print('-------')
@@ -85,19 +132,25 @@ class StrawberryFieldsListener(BlackbirdListener):
             print(row)
 
 
-def run(file):
-    """Parse and run a blackbird program using Strawberry Fields.
+def run(file, workers=None):
+    """Parse and run a blackbird program using Strawberry Fields,
+    executing the shots in parallel across worker processes.
 
     Args:
         file (str): location of the .xbb blackbird file to run
+        workers (int): number of worker processes; defaults to the
+            number of available cores
     Returns:
         list: list of size ``[shots, num_subsystems]``, representing
         the measured qumode values for each shot
     """
     simulation = parse(antlr4.FileStream(file), listener=StrawberryFieldsListener)
-    simulation.run()
+    simulation.run(workers=workers)
     simulation.print_results()
+    return simulation.result
 
 
 if __name__ == '__main__':
-    run(sys.argv[1])
+    # report syntax errors without a traceback
+    with exit_on_error():
+        run(sys.argv[1], *map(int, sys.argv[2:3]))
@@ -0,0 +1,65 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for the batched simulation of structurally identical programs"""
+import numpy as np
+
+from blackbird.batch import Batcher
+from blackbird.gaussian import sample
+
+from .bench_gaussian import gaussian_program
+
+
+def parametrized_programs(num_programs, num_modes):
+    """Programs with the structure of the Gaussian benchmark program,
+    and random squeezing parameters"""
+    rng = np.random.default_rng(42)
+    programs = []
+
+    for _ in range(num_programs):
+        program = gaussian_program(num_modes)
+
+        for op in program._operations[:num_modes]:
+            op["args"] = [rng.uniform(0, 1), 0.0]
+
+        for m in range(num_modes):
+            program._operations.append({"op": "MeasureX", "modes": [m]})
+
+        programs.append(program)
+
+    return programs
+
+
+class TimeBatchedSampling:
+    """Time sampling many programs with the same structure, separately
+    and as a single batch"""
+
+    params = ([10, 100, 1000], [4, 16])
+    param_names = ["programs", "modes"]
+
+    def setup(self, num_programs, num_modes):
+        self.programs = parametrized_programs(num_programs, num_modes)
+
+    def time_separately(self, num_programs, num_modes):
+        """Time sampling each program separately"""
+        for program in self.programs:
+            sample(program, shots=10, seed=42)
+
+    def time_batched(self, num_programs, num_modes):
+        """Time sampling all programs as a single batch"""
+        batcher = Batcher()
+
+        for program in self.programs:
+            batcher.submit(program)
+
+        batcher.sample(shots=10, seed=42)
@@ -0,0 +1,52 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for the closed-form coherent state sampling"""
+import numpy as np
+
+from blackbird.coherent import sample_coherent
+from blackbird.program import BlackbirdProgram
+
+
+def chip0_program(num_modes):
+    """A Chip0-style program: a coherent input, a random interferometer,
+    and intensity measurements on every mode"""
+    rng = np.random.default_rng(42)
+    U, _ = np.linalg.qr(rng.normal(size=(num_modes,) * 2) + 1j * rng.normal(size=(num_modes,) * 2))
+
+    program = BlackbirdProgram(name="bench")
+    program._target["name"] = "chip0"
+    program._operations.append({"op": "Coherent", "args": [2.0, 0.5], "kwargs": {}, "modes": [0]})
+    program._operations.append(
+        {"op": "Interferometer", "args": [U], "kwargs": {}, "modes": list(range(num_modes))}
+    )
+
+    for m in range(num_modes):
+        program._operations.append({"op": "MeasureIntensity", "modes": [m]})
+
+    program._modes = set(range(num_modes))
+    return program
+
+
+class TimeCoherentSampling:
+    """Time sampling Chip0-style programs"""
+
+    params = ([4, 64, 512], [1, 1000, 1000000])
+    param_names = ["modes", "shots"]
+
+    def setup(self, num_modes, shots):
+        self.program = chip0_program(num_modes)
+
+    def time_sample(self, num_modes, shots):
+        """Time sampling all shots in a single vectorized Poisson draw"""
+        sample_coherent(self.program, shots=shots, seed=42)
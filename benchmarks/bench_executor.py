@@ -0,0 +1,43 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for the shot-parallel executor"""
+from blackbird.executor import ShotExecutor
+
+from .bench_gaussian import gaussian_program
+
+
+class TimeShotExecutor:
+    """Time sampling a Gaussian program with an increasing number of worker
+    processes; the time per run should decrease linearly with the number of
+    workers, up to the number of available cores"""
+
+    params = ([1, 2, 4, 8], [100000, 1000000])
+    param_names = ["workers", "shots"]
+
+    def setup(self, workers, shots):
+        self.program = gaussian_program(16)
+
+        for m in range(16):
+            self.program._operations.append({"op": "MeasureX", "modes": [m]})
+
+        self.executor = ShotExecutor(workers=workers, chunks=8)
+        # start the worker processes before timing
+        self.executor.run(self.program, shots=8, seed=0)
+
+    def teardown(self, workers, shots):
+        self.executor.close()
+
+    def time_run(self, workers, shots):
+        """Time executing all shots, split into 8 chunks"""
+        self.executor.run(self.program, shots=shots, seed=42)
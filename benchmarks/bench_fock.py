@@ -0,0 +1,86 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for the Fock backend"""
+from blackbird.fock import FockBackend, fock_gate
+from blackbird.program import BlackbirdProgram
+
+
+def fock_program(num_modes, loss=False):
+    """A program preparing coherent states, followed by a chain of
+    beamsplitters and Kerr gates, and optionally loss on every mode"""
+    program = BlackbirdProgram(name="bench")
+    program._target["name"] = "fock"
+
+    for m in range(num_modes):
+        program._operations.append(
+            {"op": "Coherent", "args": [0.5, 0.1 * m], "kwargs": {}, "modes": [m]}
+        )
+
+    for m in range(num_modes - 1):
+        program._operations.append(
+            {"op": "BSgate", "args": [0.4, 0.1], "kwargs": {}, "modes": [m, m + 1]}
+        )
+        program._operations.append({"op": "Kgate", "args": [0.2], "kwargs": {}, "modes": [m]})
+
+    if loss:
+        for m in range(num_modes):
+            program._operations.append(
+                {"op": "LossChannel", "args": [0.9], "kwargs": {}, "modes": [m]}
+            )
+
+    program._modes = set(range(num_modes))
+    return program
+
+
+class TimePureFock:
+    """Time pure state simulations on a grid of modes and cutoff dimensions"""
+
+    params = ([1, 2, 4, 6], [5, 10, 15])
+    param_names = ["modes", "cutoff"]
+    timeout = 600
+
+    def setup(self, num_modes, cutoff):
+        self.program = fock_program(num_modes)
+
+        # compute the cached gate matrices outside of the timed region
+        fock_gate("BSgate", [0.4, 0.1], cutoff)
+        fock_gate("Kgate", [0.2], cutoff)
+
+        self.backend = FockBackend(num_modes, cutoff).run(self.program)
+        self.gate = fock_gate("BSgate", [0.4, 0.1], cutoff)
+
+    def time_run(self, num_modes, cutoff):
+        """Time the full program simulation"""
+        FockBackend(num_modes, cutoff).run(self.program)
+
+    def time_two_mode_gate(self, num_modes, cutoff):
+        """Time the contraction of a two-mode gate with the state"""
+        if num_modes > 1:
+            self.backend.apply(self.gate, [0, num_modes - 1])
+
+
+class TimeMixedFock:
+    """Time mixed state simulations on a grid of modes and cutoff dimensions"""
+
+    params = ([1, 2, 3], [5, 10, 15])
+    param_names = ["modes", "cutoff"]
+    timeout = 600
+
+    def setup(self, num_modes, cutoff):
+        self.program = fock_program(num_modes, loss=True)
+        FockBackend(num_modes, cutoff).run(self.program)
+
+    def time_run(self, num_modes, cutoff):
+        """Time the full program simulation, switching to the mixed representation"""
+        FockBackend(num_modes, cutoff).run(self.program)
@@ -0,0 +1,96 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for the Gaussian backend"""
+import numpy as np
+
+from blackbird.gaussian import GaussianBackend, sample
+from blackbird.program import BlackbirdProgram
+
+
+MODES = [4, 64, 512, 2048]
+
+
+def gaussian_program(num_modes):
+    """A program squeezing every mode, followed by a chain of beamsplitters"""
+    program = BlackbirdProgram(name="bench")
+    program._target["name"] = "gaussian"
+
+    for m in range(num_modes):
+        program._operations.append(
+            {"op": "Sgate", "args": [0.1, 0.0], "kwargs": {}, "modes": [m]}
+        )
+
+    for m in range(num_modes - 1):
+        program._operations.append(
+            {"op": "BSgate", "args": [np.pi / 4, 0.1], "kwargs": {}, "modes": [m, m + 1]}
+        )
+
+    program._operations.append(
+        {"op": "Dgate", "args": [0.5, 0.0], "kwargs": {}, "modes": [0]}
+    )
+    program._modes = set(range(num_modes))
+    return program
+
+
+class TimeGaussianGates:
+    """Time the application of individual gates to a state of N modes"""
+
+    params = MODES
+    param_names = ["modes"]
+
+    def setup(self, num_modes):
+        self.backend = GaussianBackend(num_modes)
+        self.backend.run(gaussian_program(num_modes))
+        self.sgate = {"op": "Sgate", "args": [0.1, 0.2], "kwargs": {}, "modes": [num_modes // 2]}
+        self.bsgate = {"op": "BSgate", "args": [0.3, 0.2], "kwargs": {}, "modes": [0, num_modes - 1]}
+
+    def time_single_mode_gate(self, num_modes):
+        """Time a single mode squeezing gate"""
+        self.backend.execute(self.sgate)
+
+    def time_two_mode_gate(self, num_modes):
+        """Time a beamsplitter between the first and last modes"""
+        self.backend.execute(self.bsgate)
+
+
+class TimeGaussianProgram:
+    """Time the simulation of a program with O(N) gates acting on N modes"""
+
+    params = MODES
+    param_names = ["modes"]
+    timeout = 600
+
+    def setup(self, num_modes):
+        self.program = gaussian_program(num_modes)
+
+    def time_run(self, num_modes):
+        """Time the full program simulation"""
+        GaussianBackend(num_modes).run(self.program)
+
+
+class TimeGaussianSampling:
+    """Time drawing homodyne samples of a program with 8 measured modes"""
+
+    params = [1, 1000, 1000000]
+    param_names = ["shots"]
+
+    def setup(self, shots):
+        self.program = gaussian_program(8)
+
+        for m in range(8):
+            self.program._operations.append({"op": "MeasureX", "modes": [m]})
+
+    def time_sample(self, shots):
+        """Time sampling all shots in a single vectorized call"""
+        sample(self.program, shots=shots, seed=42)
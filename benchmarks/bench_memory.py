@@ -0,0 +1,88 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for the memory used by loading Blackbird scripts"""
+import tracemalloc
+
+import blackbird
+from blackbird import generator
+
+from .bench_parse import array_script
+
+
+def peak_bytes(func, *args):
+    """Peak memory in bytes allocated by Python while calling a function,
+    as measured by tracemalloc"""
+    tracemalloc.start()
+
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TrackLoadMemory:
+    """Track the peak memory of loading scripts with an increasing number of statements"""
+
+    params = [10, 100, 1000, 5000]
+    param_names = ["statements"]
+    timeout = 300
+
+    def setup(self, num_statements):
+        self.script = generator.generate(
+            num_modes=8,
+            num_statements=num_statements,
+            num_variables=4,
+            array_size=4,
+            feedforward=0.05,
+            seed=42,
+        )
+
+    def track_peak(self, num_statements):
+        """Peak memory allocated while loading the script"""
+        return peak_bytes(blackbird.loads, self.script)
+
+    track_peak.unit = "bytes"
+
+    def track_program(self, num_statements):
+        """Memory held by the loaded program"""
+        return blackbird.loads(self.script).memory_report()["total"]
+
+    track_program.unit = "bytes"
+
+    def peakmem_loads(self, num_statements):
+        """Peak resident memory of the process while loading the script"""
+        blackbird.loads(self.script)
+
+
+class TrackArrayMemory:
+    """Track the peak memory of loading array literals of increasing size"""
+
+    params = [16, 64, 128]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.script = array_script(size)
+
+    def track_peak(self, size):
+        """Peak memory allocated while loading the script"""
+        return peak_bytes(blackbird.loads, self.script)
+
+    track_peak.unit = "bytes"
+
+    def track_program(self, size):
+        """Memory held by the loaded program"""
+        return blackbird.loads(self.script).memory_report()["total"]
+
+    track_program.unit = "bytes"
@@ -0,0 +1,206 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks for parsing, evaluating and serializing Blackbird scripts"""
+import os
+import tempfile
+
+import antlr4
+import numpy as np
+import sympy as sym
+
+import blackbird
+from blackbird import generator
+from blackbird.auxiliary import _expression
+from blackbird.blackbirdLexer import blackbirdLexer
+from blackbird.blackbirdParser import blackbirdParser
+from blackbird.listener import RegRefTransform
+from blackbird.program import numpy_to_blackbird
+
+
+HEADER = "name bench\nversion 1.0\ntarget gaussian (shots=10)\n\n"
+
+OPERATORS = ["({} + 1.5)", "({} * 0.5)", "sin({})", "({} - 0.25)"]
+
+REGREF_OPERATORS = ["({} + q1)", "({} * 0.5)", "({} - 0.25)"]
+
+
+def program_script(num_statements, num_modes=8):
+    """A script with a number of random one- and two-mode gate statements,
+    followed by a measurement of every mode"""
+    return generator.generate(
+        num_modes=num_modes,
+        num_statements=num_statements,
+        num_variables=1,
+        options={"shots": 10},
+        measurement="MeasureX",
+        seed=42,
+    )
+
+
+def array_script(size):
+    """A script declaring a complex array of size ``[size, size]``"""
+    rng = np.random.default_rng(42)
+    U = rng.normal(size=(size, size)) + 1j * rng.normal(size=(size, size))
+    modes = ", ".join(str(m) for m in range(size))
+    return HEADER + "\n".join(numpy_to_blackbird(U, "U")) + "\nInterferometer(U) | [{}]\n".format(modes)
+
+
+def expression(depth, leaf="0.5", operators=OPERATORS):
+    """A nested Blackbird expression of the given depth"""
+    expr = leaf
+
+    for i in range(depth):
+        expr = operators[i % len(operators)].format(expr)
+
+    return expr
+
+
+class TimeLoad:
+    """Time parsing scripts with an increasing number of statements"""
+
+    params = [10, 100, 1000, 5000]
+    param_names = ["statements"]
+    timeout = 120
+
+    def setup(self, num_statements):
+        self.script = program_script(num_statements)
+
+        fd, self.filename = tempfile.mkstemp(suffix=".xbb")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.script)
+
+    def teardown(self, num_statements):
+        os.remove(self.filename)
+
+    def time_loads(self, num_statements):
+        """Time parsing a script from a string"""
+        blackbird.loads(self.script)
+
+    def time_loads_lazy(self, num_statements):
+        """Time parsing a script from a string, without evaluating the arguments"""
+        blackbird.loads(self.script, lazy=True)
+
+    def time_load(self, num_statements):
+        """Time parsing a script from a file"""
+        blackbird.load(self.filename)
+
+
+class TimeSerialize:
+    """Time serializing programs with an increasing number of statements"""
+
+    params = [10, 100, 1000, 5000]
+    param_names = ["statements"]
+
+    def setup(self, num_statements):
+        self.program = blackbird.loads(program_script(num_statements))
+
+    def time_serialize(self, num_statements):
+        """Time serializing a program"""
+        self.program.serialize()
+
+    def time_dumps(self, num_statements):
+        """Time serializing a program using dumps"""
+        blackbird.dumps(self.program)
+
+
+class TimeWorkloads:
+    """Time parsing Gaussian boson sampling and time-domain scripts
+    with an increasing number of gates"""
+
+    params = ([100, 1000, 10000], ["gbs", "time_domain"])
+    param_names = ["gates", "workload"]
+    timeout = 120
+
+    def setup(self, num_gates, workload):
+        if workload == "gbs":
+            # a rectangular mesh on N modes contains roughly N^2 / 2 gates
+            self.script = generator.gbs(int(np.sqrt(2 * num_gates)), mesh=True, seed=42)
+        else:
+            self.script = generator.time_domain(num_gates // 4, num_delays=2, seed=42)
+
+    def time_loads(self, num_gates, workload):
+        """Time parsing a workload script"""
+        blackbird.loads(self.script)
+
+
+class TimeArrays:
+    """Time parsing and serializing array literals of increasing size"""
+
+    params = [4, 16, 64, 128]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.script = array_script(size)
+        self.program = blackbird.loads(self.script)
+
+    def time_loads(self, size):
+        """Time parsing a script declaring a complex array"""
+        blackbird.loads(self.script)
+
+    def time_loads_lazy(self, size):
+        """Time parsing a script declaring a complex array, without evaluating it"""
+        blackbird.loads(self.script, lazy=True)
+
+    def time_serialize(self, size):
+        """Time serializing a program containing a complex array"""
+        self.program.serialize()
+
+
+class TimeExpression:
+    """Time evaluating nested expressions of increasing depth"""
+
+    params = [1, 10, 50, 100]
+    param_names = ["depth"]
+
+    def setup(self, depth):
+        self.text = expression(depth)
+
+        lexer = blackbirdLexer(antlr4.InputStream(self.text))
+        parser = blackbirdParser(antlr4.CommonTokenStream(lexer))
+        self.ctx = parser.expression()
+
+    def time_evaluate(self, depth):
+        """Time evaluating a parsed expression"""
+        _expression(self.ctx)
+
+    def time_loads(self, depth):
+        """Time parsing and evaluating a variable declared by an expression"""
+        blackbird.loads(HEADER + "float x = {}\n".format(self.text))
+
+
+class TimeRegRefTransform:
+    """Time constructing register transforms of increasing depth"""
+
+    params = [1, 10, 50]
+    param_names = ["depth"]
+
+    def setup(self, depth):
+        q0, q1 = sym.symbols("q0 q1")
+        expr = q0
+
+        for i in range(depth):
+            expr = [expr + q1, expr * 0.5, expr - 0.25][i % 3]
+
+        self.expr = expr
+        self.script = HEADER + "MeasureX | 0\nMeasureX | 1\nXgate({}) | 2\n".format(
+            expression(depth, leaf="q0", operators=REGREF_OPERATORS)
+        )
+
+    def time_construct(self, depth):
+        """Time constructing a register transform from a SymPy expression"""
+        RegRefTransform(self.expr)
+
+    def time_loads(self, depth):
+        """Time parsing a statement whose argument is a register transform"""
+        blackbird.loads(self.script)
@@ -61,6 +61,54 @@ Modules
 
 * :mod:`blackbird.auxiliary`: auxiliary parsing functions.
 
+* :mod:`blackbird.compiler`: compilation passes that optimize
+  a Blackbird program.
+
+* :mod:`blackbird.symplectic`: symplectic representation of the
+  Gaussian operations defined in Blackbird.
+
+* :mod:`blackbird.validation`: validation of Blackbird programs
+  against the supported operations and target devices.
+
+* :mod:`blackbird.incremental`: incremental re-parsing of
+  Blackbird scripts after an edit.
+
+* :mod:`blackbird.gaussian`: reference NumPy simulator for
+  Gaussian Blackbird programs.
+
+* :mod:`blackbird.fock`: reference NumPy simulator for
+  Blackbird programs in the truncated Fock basis.
+
+* :mod:`blackbird.coherent`: closed-form sampling of coherent
+  state programs, such as Chip0 programs.
+
+* :mod:`blackbird.executor`: shot-parallel execution of Blackbird
+  programs across worker processes.
+
+* :mod:`blackbird.aio`: asynchronous parsing and execution of
+  Blackbird programs for :mod:`asyncio` applications.
+
+* :mod:`blackbird.batch`: batched simulation of Gaussian programs
+  with the same structure and different parameters.
+
+* :mod:`blackbird.generator`: synthetic Blackbird scripts for
+  benchmarking and stress testing.
+
+* :mod:`blackbird.tracing`: callbacks reporting the time spent loading,
+  compiling and executing Blackbird programs.
+
+* :mod:`blackbird.cli`: the ``blackbird`` command line interface, for
+  validating directory trees of Blackbird scripts.
+
+* :mod:`blackbird.cache`: in-memory and on-disk cache of compiled programs,
+  keyed by program fingerprint and target.
+
+* :mod:`blackbird.interning`: pool sharing equal read-only arrays
+  between loaded programs.
+
+* :mod:`blackbird.lazy`: containers evaluating variables and operation
+  arguments on first access.
+
 
 Serializing and deserializing Blackbird
 ---------------------------------------
@@ -84,6 +132,10 @@ The following functions are provided to easily
   the serialization of a :class:`~.BlackbirdProgram` object
   to a string.
 
+* :func:`~.aload` and :func:`~.aloads`: coroutines that deserialize
+  Blackbird scripts like :func:`~.load` and :func:`~.loads`, without
+  blocking the :mod:`asyncio` event loop.
+
 
 Main classes
 ------------
@@ -98,6 +150,9 @@ Main classes
   This class can be sub-classed, to create more advanced Blackbird listeners
   that perform actions (e.g., simulations) upon parsing the tree.
 
+* :class:`~.AsyncRunner`: executes Blackbird programs from an :mod:`asyncio`
+  event loop, with a concurrency limit, timeouts and cancellation.
+
 * :class:`~.RegRefTransform`: a class for representing classically processed
   measurement results as parameters for subsequent quantum operations.
 
@@ -129,36 +184,52 @@ Code details
 import antlr4
 
 from .listener import BlackbirdListener, RegRefTransform, parse
+from .tracing import traced
 from .program import BlackbirdProgram
+from .aio import AsyncRunner, aload, aloads
 from ._version import __version__
 
 
-def load(filename):
+@traced("load")
+def load(filename, collect_errors=False, array_pool=None, lazy=False):
     """Deserialize a blackbird program from a file to a
     :class:`BlackbirdProgram` object.
 
     Args:
         filename (str): file location of a valid Blackbird program
+        collect_errors (bool): whether to report all the errors of the
+            program at once, rather than only the first one
+        array_pool (ArrayPool or None): pool sharing the array variables of the
+            program with other programs loaded with the same pool; see :mod:`~blackbird.interning`
+        lazy (bool): whether to evaluate the variables and operation arguments
+            on first access, rather than while parsing; see :mod:`~blackbird.lazy`
 
     Returns:
         BlackbirdProgram: parsed representation of the program
     """
     data = antlr4.FileStream(filename)
-    return parse(data)
+    return parse(data, collect_errors=collect_errors, array_pool=array_pool, lazy=lazy)
 
 
-def loads(string):
+@traced("loads")
+def loads(string, collect_errors=False, array_pool=None, lazy=False):
     """Deserialize a blackbird program from a string to a
     :class:`BlackbirdProgram` object.
 
     Args:
         string (str): string containing a valid Blackbird program
+        collect_errors (bool): whether to report all the errors of the
+            program at once, rather than only the first one
+        array_pool (ArrayPool or None): pool sharing the array variables of the
+            program with other programs loaded with the same pool; see :mod:`~blackbird.interning`
+        lazy (bool): whether to evaluate the variables and operation arguments
+            on first access, rather than while parsing; see :mod:`~blackbird.lazy`
 
     Returns:
         BlackbirdProgram: parsed representation of the program
     """
     data = antlr4.InputStream(string)
-    return parse(data)
+    return parse(data, collect_errors=collect_errors, array_pool=array_pool, lazy=lazy)
 
 
 def dump(blackbird, f):
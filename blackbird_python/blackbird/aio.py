@@ -0,0 +1,231 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Asynchronous API
+================
+
+**Module name:** :mod:`blackbird.aio`
+
+.. currentmodule:: blackbird.aio
+
+This module contains an :mod:`asyncio` interface for parsing and executing
+Blackbird programs, for use in applications built around an event loop.
+
+Parsing and simulation are CPU-bound, and are therefore run in a bounded
+pool of worker threads, so that they never block the event loop. The
+variables of a Blackbird script are stored per thread while parsing, so
+that several scripts can be parsed concurrently.
+
+.. code-block:: python
+
+    async with AsyncRunner(max_concurrency=4, timeout=10) as runner:
+        program = await aloads(script)
+        samples = await runner.submit(program)
+
+Summary
+-------
+
+.. autosummary::
+    MAX_WORKERS
+    aload
+    aloads
+    AsyncRunner
+
+Code details
+~~~~~~~~~~~~
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import antlr4
+
+from .executor import ShotExecutor
+from .listener import parse
+from .program import BlackbirdProgram
+
+
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+"""int: number of worker threads of the default executor used by
+:func:`~.aload` and :func:`~.aloads`"""
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _default_executor():
+    """The thread pool shared by :func:`~.aload` and :func:`~.aloads`,
+    created on first use."""
+    global _EXECUTOR  # pylint: disable=global-statement
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="blackbird")
+
+    return _EXECUTOR
+
+
+def _loads(string):
+    """Parse a Blackbird script from a string."""
+    return parse(antlr4.InputStream(string))
+
+
+def _load(filename):
+    """Parse a Blackbird script from a file."""
+    return parse(antlr4.FileStream(filename))
+
+
+async def aloads(string, executor=None):
+    """Asynchronously deserialize a blackbird program from a string to a
+    :class:`BlackbirdProgram` object, without blocking the event loop.
+
+    Args:
+        string (str): string containing a valid Blackbird program
+        executor (concurrent.futures.Executor): executor used to parse the program.
+            If not provided, a shared pool of :data:`MAX_WORKERS` threads is used.
+
+    Returns:
+        BlackbirdProgram: parsed representation of the program
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or _default_executor(), _loads, string)
+
+
+async def aload(filename, executor=None):
+    """Asynchronously deserialize a blackbird program from a file to a
+    :class:`BlackbirdProgram` object, without blocking the event loop.
+
+    Args:
+        filename (str): file location of a valid Blackbird program
+        executor (concurrent.futures.Executor): executor used to parse the program.
+            If not provided, a shared pool of :data:`MAX_WORKERS` threads is used.
+
+    Returns:
+        BlackbirdProgram: parsed representation of the program
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or _default_executor(), _load, filename)
+
+
+class AsyncRunner:
+    """Runs Blackbird programs asynchronously, with a limit on the number
+    of programs executing concurrently.
+
+    Each submitted program is executed in a worker thread; programs submitted
+    while the concurrency limit is reached wait for a free slot. A slot is
+    only released once its program has finished executing, even if the
+    corresponding future was cancelled or timed out, as a program cannot be
+    interrupted once it has started.
+
+    The runner can be used as an asynchronous context manager, in which case
+    the worker threads are shut down on exit; otherwise, :meth:`close` should
+    be called once the runner is no longer needed.
+
+    Args:
+        func (callable): function executing a :class:`~.BlackbirdProgram`, and
+            returning its result. Defaults to sampling the program using the
+            :class:`~.LocalBackend`, with the number of shots of the program target.
+        max_concurrency (int): maximum number of programs executing concurrently
+        timeout (float): default timeout in seconds for each program, including the
+            time spent waiting for a free slot. ``None`` means no timeout.
+    """
+
+    def __init__(self, func=None, max_concurrency=MAX_WORKERS, timeout=None):
+        if max_concurrency < 1:
+            raise ValueError("The concurrency limit must be positive")
+
+        self.func = func if func is not None else ShotExecutor(workers=1).run
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self.running = 0
+        """int: number of programs currently executing"""
+
+        self._pool = ThreadPoolExecutor(max_concurrency, thread_name_prefix="blackbird-runner")
+        self._slots = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the worker threads, once the executing programs have finished."""
+        self._pool.shutdown(wait=False)
+
+    def submit(self, program, timeout=None):
+        """Submit a program for execution.
+
+        Must be called from a running event loop.
+
+        Args:
+            program (Union[BlackbirdProgram, str]): the program, or a string
+                containing a Blackbird script, which is parsed within the same slot
+            timeout (float): timeout in seconds, overriding the default timeout
+                of the runner
+
+        Returns:
+            asyncio.Future: future resolving to the result of the program. Cancelling
+            the future cancels the program if it is still waiting for a free slot. If the
+            timeout expires, the future raises :class:`asyncio.TimeoutError`.
+        """
+        if not isinstance(program, (BlackbirdProgram, str)):
+            raise TypeError(
+                "Expected a BlackbirdProgram or string, not {}".format(type(program).__name__)
+            )
+
+        if self._slots is None:
+            # created lazily, so that it is bound to the running event loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        timeout = self.timeout if timeout is None else timeout
+        return asyncio.ensure_future(asyncio.wait_for(self._run(program), timeout))
+
+    async def _run(self, program):
+        """Wait for a free slot, and execute the program in a worker thread."""
+        loop = asyncio.get_running_loop()
+        await self._slots.acquire()
+
+        try:
+            future = loop.run_in_executor(self._pool, self._execute, program)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        self.running += 1
+        future.add_done_callback(self._release)
+
+        # shield the worker thread's future, so that the slot is only released
+        # once the program has actually finished
+        return await asyncio.shield(future)
+
+    def _release(self, future):
+        """Release the slot of a finished program."""
+        self.running -= 1
+        self._slots.release()
+
+        if not future.cancelled():
+            # retrieve the exception of programs whose future was cancelled,
+            # so that it is not reported as unhandled
+            future.exception()
+
+    def _execute(self, program):
+        """Parse, if required, and execute a program in a worker thread."""
+        if isinstance(program, str):
+            program = _loads(program)
+
+        return self.func(program)
@@ -31,8 +31,11 @@ Summary
 
 .. autosummary::
     _expression
+    _compile_expression
     _func
+    _function
     _get_arguments
+    _compile_arguments
     _literal
     _number
     _VAR
@@ -40,14 +43,54 @@ Summary
 Code details
 ~~~~~~~~~~~~
 """
+import threading
+from collections.abc import MutableMapping
+
 import numpy as np
 from sympy import Symbol
 
 from .blackbirdParser import blackbirdParser
 from .error import BlackbirdSyntaxError
+from .lazy import LazyValue
+
+
+class _ThreadLocalDict(MutableMapping):
+    """Dictionary whose contents are local to the current thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def _data(self):
+        try:
+            return self._local.data
+        except AttributeError:
+            self._local.data = {}
+            return self._local.data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
 
+    def __delitem__(self, key):
+        del self._data[key]
 
-_VAR = {}
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def clear(self):
+        self._data.clear()
+
+
+_VAR = _ThreadLocalDict()
 """ dict[str->[int, float, complex, str, bool, numpy.ndarray]]: Mapping from the
 variable names in the Blackbird script, to their declared values.
 
@@ -56,6 +99,8 @@ This dictionary is populated when parsing
 :class:`blackbird.BlackbirdListener.exitExpressionvar`, and accessed when
 required by :func:`~._expression`.
 
+Its contents are local to each thread, so that Blackbird scripts
+can be parsed concurrently in separate threads.
 """
 
 
@@ -106,149 +151,256 @@ def _number(number):
     raise ValueError("Unknown number " + number.getText())
 
 
-def _func(function, arg):
-    """Apply a blackbird function to an Python argument.
+def _function(function):
+    """Convert a blackbird function to the equivalent NumPy function.
 
     Args:
         function (blackbirdParser.FunctionContext): function context
-        arg: expression
     Returns:
-        int or float or complex
+        numpy.ufunc
     """
     # exponential functions
     if function.EXP():
-        return np.exp(_expression(arg))
+        return np.exp
 
     if function.LOG():
-        return np.log(_expression(arg))
+        return np.log
 
     # trig functions
     if function.SIN():
-        return np.sin(_expression(arg))
+        return np.sin
 
     if function.COS():
-        return np.cos(_expression(arg))
+        return np.cos
 
     if function.TAN():
-        return np.tan(_expression(arg))
+        return np.tan
 
     # trig inverses
     if function.ARCSIN():
-        return np.arcsin(_expression(arg))
+        return np.arcsin
 
     if function.ARCCOS():
-        return np.arccos(_expression(arg))
+        return np.arccos
 
     if function.ARCTAN():
-        return np.arctan(_expression(arg))
+        return np.arctan
 
     # hyperbolic trig
     if function.SINH():
-        return np.sinh(_expression(arg))
+        return np.sinh
 
     if function.COSH():
-        return np.cosh(_expression(arg))
+        return np.cosh
 
     if function.TANH():
-        return np.tanh(_expression(arg))
+        return np.tanh
 
     # hyperbolic trig inverses
     if function.ARCSINH():
-        return np.arcsinh(_expression(arg))
+        return np.arcsinh
 
     if function.ARCCOSH():
-        return np.arccosh(_expression(arg))
+        return np.arccosh
 
     if function.ARCTANH():
-        return np.arctanh(_expression(arg))
+        return np.arctanh
 
     # other
     if function.SQRT():
-        return np.sqrt(_expression(arg))
+        return np.sqrt
 
     raise NameError("Unknown function " + function.getText())
 
 
+def _func(function, arg):
+    """Apply a blackbird function to an Python argument.
+
+    Args:
+        function (blackbirdParser.FunctionContext): function context
+        arg: expression
+    Returns:
+        int or float or complex
+    """
+    return _function(function)(_expression(arg))
+
+
+def _undefined(name, ctx):
+    """Error raised when a script refers to an undefined name.
+
+    Args:
+        name (str): the name
+        ctx: context referring to the name
+    Returns:
+        BlackbirdSyntaxError
+    """
+    token = ctx.start
+    return BlackbirdSyntaxError(
+        "Blackbird SyntaxError (line {}:{}): name '{}' is not defined".format(
+            token.line, token.column, name
+        )
+    )
+
+
 def _expression(expr):
     """Evaluate a blackbird expression.
 
-    This is a recursive function, that continually calls itself
-    until the full expression has been evaluated.
+    The expression is compiled using :func:`_compile_expression`,
+    and the resulting function is called immediately.
 
     Args:
         expr: expression
     Returns:
         int or float or complex or str or bool
     """
+    return _compile_expression(expr)()
+
+
+def _get_arguments(arguments):
+    """Parse blackbird positional and keyword arguments.
+
+    In blackbird, all arguments occur between brackets (),
+    and separated by commas. Positional arguments always come first,
+    followed by keyword arguments of the form ``name=value``.
+
+    Args:
+        arguments (blackbirdParser.ArgumentsContext): arguments
+    Returns:
+        tuple[list, dict]: tuple containing the list of positional
+        arguments, followed by the dictionary of keyword arguments
+    """
+    args = []
+    kwargs = {}
+
+    for arg in arguments.getChildren():
+        if isinstance(arg, blackbirdParser.ValContext):
+            if arg.expression():
+                args.append(_expression(arg.expression()))
+            elif arg.nonnumeric():
+                args.append(_literal(arg.nonnumeric()))
+            elif arg.NAME():
+                name = arg.NAME().getText()
+                if name in _VAR:
+                    args.append(_VAR[name])
+                else:
+                    raise _undefined(name, arg)
+
+        elif isinstance(arg, blackbirdParser.KwargContext):
+            name = arg.NAME().getText()
+            if arg.val().expression():
+                kwargs[name] = _expression(arg.val().expression())
+            elif arg.val().nonnumeric():
+                kwargs[name] = _literal(arg.val().nonnumeric())
+
+    return args, kwargs
+
+
+def _constant(value):
+    """Function with no arguments returning a constant value."""
+    return lambda: value
+
+
+def _variable(name, ctx):
+    """Function with no arguments returning the value of a declared variable,
+    evaluating it if it is a :class:`~.LazyValue`.
+
+    The variable is resolved immediately, so that the function returns the
+    value the name refers to at this point of the script.
+
+    Args:
+        name (str): variable name
+        ctx: context referring to the variable
+    Returns:
+        callable
+    """
+    if name not in _VAR:
+        raise _undefined(name, ctx)
+
+    value = _VAR[name]
+
+    if isinstance(value, LazyValue):
+        return lambda: value.value
+
+    return _constant(value)
+
+
+def _compile_expression(expr):
+    """Compile a blackbird expression into a function evaluating it.
+
+    This is a recursive function, that continually calls itself
+    until the full expression has been compiled. The names in the
+    expression are resolved when it is compiled, but the variables
+    they refer to are only evaluated when the returned function is called.
+
+    Args:
+        expr: expression
+    Returns:
+        callable: function with no arguments returning the value of the expression
+    """
     if isinstance(expr, blackbirdParser.NumberLabelContext):
-        return _number(expr.number())
+        return _constant(_number(expr.number()))
 
     if isinstance(expr, blackbirdParser.VariableLabelContext):
         if expr.REGREF():
-            return Symbol(expr.getText())
+            return _constant(Symbol(expr.getText()))
 
-        if expr.getText() not in _VAR:
-            token = expr.start
-            line = token.line
-            col = token.column
-            raise BlackbirdSyntaxError(
-                "Blackbird SyntaxError (line {}:{}): name '{}' is not defined".format(
-                    line, col, expr.getText()
-                )
-            )
-
-        return _VAR[expr.getText()]
+        return _variable(expr.getText(), expr)
 
     if isinstance(expr, blackbirdParser.BracketsLabelContext):
-        return _expression(expr.expression())
+        return _compile_expression(expr.expression())
 
     if isinstance(expr, blackbirdParser.SignLabelContext):
-        a = expr.expression()
+        a = _compile_expression(expr.expression())
         if expr.PLUS():
-            return _expression(a)
+            return a
         if expr.MINUS():
-            return -_expression(a)
+            return lambda: -a()
 
     if isinstance(expr, blackbirdParser.AddLabelContext):
-        a, b = expr.expression()
+        a, b = [_compile_expression(e) for e in expr.expression()]
         if expr.PLUS():
-            return np.sum([_expression(a), _expression(b)], axis=0)
+            return lambda: np.sum([a(), b()], axis=0)
         if expr.MINUS():
-            return np.sum([_expression(a), -_expression(b)], axis=0)
+            return lambda: np.sum([a(), -b()], axis=0)
 
     if isinstance(expr, blackbirdParser.MulLabelContext):
-        a, b = expr.expression()
+        a, b = [_compile_expression(e) for e in expr.expression()]
         if expr.TIMES():
-            return np.prod([_expression(a), _expression(b)], axis=0)
+            return lambda: np.prod([a(), b()], axis=0)
         if expr.DIVIDE():
-            a = _expression(a)
-            b = _expression(b)
 
-            if isinstance(b, int):
-                b = float(b)
+            def divide():
+                denominator = b()
+
+                if isinstance(denominator, int):
+                    denominator = float(denominator)
 
-            return np.prod([a, np.power(b, -1)], axis=0)
+                return np.prod([a(), np.power(denominator, -1)], axis=0)
+
+            return divide
 
     if isinstance(expr, blackbirdParser.PowerLabelContext):
-        a, b = expr.expression()
-        return np.power(_expression(a), _expression(b))
+        a, b = [_compile_expression(e) for e in expr.expression()]
+        return lambda: np.power(a(), b())
 
     if isinstance(expr, blackbirdParser.FunctionLabelContext):
-        return _func(expr.function(), expr.expression())
+        function = _function(expr.function())
+        a = _compile_expression(expr.expression())
+        return lambda: function(a())
 
+    raise ValueError("Unknown expression " + expr.getText())
 
-def _get_arguments(arguments):
-    """Parse blackbird positional and keyword arguments.
 
-    In blackbird, all arguments occur between brackets (),
-    and separated by commas. Positional arguments always come first,
-    followed by keyword arguments of the form ``name=value``.
+def _compile_arguments(arguments):
+    """Compile blackbird positional and keyword arguments into functions
+    evaluating them. See :func:`_get_arguments`.
 
     Args:
         arguments (blackbirdParser.ArgumentsContext): arguments
     Returns:
-        tuple[list, dict]: tuple containing the list of positional
-        arguments, followed by the dictionary of keyword arguments
+        tuple[list[callable], dict[str->callable]]: tuple containing the functions
+        evaluating the positional arguments, followed by the dictionary of
+        functions evaluating the keyword arguments
     """
     args = []
     kwargs = {}
@@ -256,28 +408,17 @@ def _get_arguments(arguments):
     for arg in arguments.getChildren():
         if isinstance(arg, blackbirdParser.ValContext):
             if arg.expression():
-                args.append(_expression(arg.expression()))
+                args.append(_compile_expression(arg.expression()))
             elif arg.nonnumeric():
-                args.append(_literal(arg.nonnumeric()))
+                args.append(_constant(_literal(arg.nonnumeric())))
             elif arg.NAME():
-                name = arg.NAME().getText()
-                if name in _VAR:
-                    args.append(_VAR[name])
-                else:
-                    token = arg.start
-                    line = token.line
-                    col = token.column
-                    raise BlackbirdSyntaxError(
-                        "Blackbird SyntaxError (line {}:{}): name '{}' is not defined".format(
-                            line, col, name
-                        )
-                    )
+                args.append(_variable(arg.NAME().getText(), arg))
 
         elif isinstance(arg, blackbirdParser.KwargContext):
             name = arg.NAME().getText()
             if arg.val().expression():
-                kwargs[name] = _expression(arg.val().expression())
+                kwargs[name] = _compile_expression(arg.val().expression())
             elif arg.val().nonnumeric():
-                kwargs[name] = _literal(arg.val().nonnumeric())
+                kwargs[name] = _constant(_literal(arg.val().nonnumeric()))
 
     return args, kwargs
@@ -0,0 +1,268 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Batched simulation
+==================
+
+**Module name:** :mod:`blackbird.batch`
+
+.. currentmodule:: blackbird.batch
+
+This module contains the class :class:`~.Batcher`, which simulates
+many Gaussian programs with the same circuit structure, but different
+parameters, at once.
+
+Queued programs are grouped by their :func:`structure_key`: the target,
+and the name, modes, and argument shapes of each operation, ignoring the
+argument values. The arguments of the programs in each group are stacked
+into arrays with a leading batch dimension by :func:`stack_programs`, and
+the group is executed by a single :class:`~.GaussianBackend` with a batched
+state, so that the Python overhead of executing each operation is paid once
+per group rather than once per program. The results are then split back
+into one result per program.
+
+Summary
+-------
+
+.. autosummary::
+    structure_key
+    stack_programs
+    Batcher
+
+Code details
+~~~~~~~~~~~~
+"""
+# pylint: disable=protected-access
+from collections import OrderedDict
+
+import numpy as np
+
+from .gaussian import GaussianBackend, _sample
+from .listener import RegRefTransform
+from .program import BlackbirdProgram
+
+
+def _signature(arg):
+    """Structural signature of an operation argument: the shape and kind of numeric
+    arguments, whose values may differ within a batch, or the value of any other argument."""
+    if isinstance(arg, (bool, str, RegRefTransform)):
+        return (type(arg).__name__, str(arg))
+
+    arg = np.asarray(arg)
+
+    if not np.issubdtype(arg.dtype, np.number):
+        return ("object", str(arg))
+
+    return (np.shape(arg), np.iscomplexobj(arg))
+
+
+def structure_key(program):
+    """Structure key of a program.
+
+    Programs with the same structure key only differ by the values of
+    the numeric arguments of their operations, and can be simulated together.
+
+    Args:
+        program (BlackbirdProgram): program
+
+    Returns:
+        tuple: hashable structure key
+    """
+    ops = tuple(
+        (
+            op["op"],
+            tuple(op["modes"]),
+            tuple(_signature(a) for a in op.get("args", [])),
+            tuple((k, _signature(v)) for k, v in sorted(op.get("kwargs", {}).items())),
+        )
+        for op in program.operations
+    )
+
+    target = program.target
+    options = tuple(sorted((k, str(v)) for k, v in target["options"].items()))
+    return (target["name"], options, ops)
+
+
+def _stack(values):
+    """Stack argument values along a new leading batch dimension,
+    unless they are all equal."""
+    first = values[0]
+
+    if all(np.array_equal(v, first) for v in values[1:]):
+        return first
+
+    return np.stack([np.asarray(v) for v in values])
+
+
+def stack_programs(programs):
+    """Combine programs with the same structure key into a single program, whose
+    numeric arguments are stacked along a new leading batch dimension.
+
+    Arguments with the same value in all programs are not stacked.
+
+    Args:
+        programs (list[BlackbirdProgram]): programs with the same structure key
+
+    Returns:
+        BlackbirdProgram: the stacked program
+    """
+    first = programs[0]
+    stacked = BlackbirdProgram(name=first.name, version=first.version)
+    stacked._target["name"] = first.target["name"]
+    stacked._target["options"] = dict(first.target["options"])
+    stacked._modes = set(first.modes)
+
+    for idx, op in enumerate(first.operations):
+        ops = [p.operations[idx] for p in programs]
+        new = {"op": op["op"], "modes": op["modes"]}
+
+        if "args" in op:
+            new["args"] = [_stack([o["args"][i] for o in ops]) for i in range(len(op["args"]))]
+
+        if "kwargs" in op:
+            new["kwargs"] = {k: _stack([o["kwargs"][k] for o in ops]) for k in op["kwargs"]}
+
+        stacked._operations.append(new)
+
+    return stacked
+
+
+class Batcher:
+    """Groups queued Gaussian programs by their structure, and simulates
+    each group as a single batched simulation.
+
+    .. code-block:: python
+
+        batcher = Batcher()
+
+        for r in np.linspace(0, 1, 1000):
+            batcher.submit(program_with_squeezing(r))
+
+        samples = batcher.sample(shots=100)
+
+    Args:
+        hbar (float): the value of :math:`\\hbar` in the commutation relation.
+            If not provided, the ``hbar`` option of the program targets is used,
+            defaulting to 2.
+    """
+
+    def __init__(self, hbar=None):
+        self.hbar = hbar
+        self._programs = []
+
+    def __len__(self):
+        return len(self._programs)
+
+    def submit(self, program):
+        """Add a program to the queue.
+
+        Args:
+            program (BlackbirdProgram): program to simulate
+
+        Returns:
+            int: index of the program's result in the list of results
+            returned by :meth:`simulate` or :meth:`sample`
+        """
+        if not isinstance(program, BlackbirdProgram):
+            raise TypeError("Expected a BlackbirdProgram, not {}".format(type(program).__name__))
+
+        self._programs.append(program)
+        return len(self._programs) - 1
+
+    def clear(self):
+        """Remove all programs from the queue."""
+        self._programs = []
+
+    def groups(self):
+        """Group the queued programs by their structure key.
+
+        Returns:
+            list[list[int]]: indices of the programs in each group, in order of submission
+        """
+        groups = OrderedDict()
+
+        for idx, program in enumerate(self._programs):
+            groups.setdefault(structure_key(program), []).append(idx)
+
+        return list(groups.values())
+
+    def _backends(self):
+        """Stack each group of programs, and create a batched backend for each group.
+
+        Yields:
+            tuple[list[int], BlackbirdProgram, GaussianBackend]: the indices of the
+            programs in the group, the stacked program, and a backend in the vacuum state
+        """
+        for group in self.groups():
+            program = stack_programs([self._programs[i] for i in group])
+
+            hbar = self.hbar
+            if hbar is None:
+                hbar = program.target["options"].get("hbar", 2)
+
+            num_modes = max(program.modes) + 1 if program.modes else 0
+            yield group, program, GaussianBackend(num_modes, hbar=hbar, batch_shape=(len(group),))
+
+    def simulate(self):
+        """Simulate all queued programs, and empty the queue.
+
+        Returns:
+            list[GaussianBackend]: the final state of each program, in order of submission
+        """
+        results = [None] * len(self._programs)
+
+        for group, program, backend in self._backends():
+            backend.run(program)
+
+            for b, idx in enumerate(group):
+                res = GaussianBackend(backend.num_modes, hbar=backend.hbar)
+                res._cov = backend.cov[b].copy()
+                res._means = backend.means[b].copy()
+                res.results = [
+                    (mode, float(np.broadcast_to(n, backend.batch_shape)[b]))
+                    for mode, n in backend.results
+                ]
+                results[idx] = res
+
+        self.clear()
+        return results
+
+    def sample(self, shots=None, seed=None):
+        """Sample the homodyne and heterodyne measurements of all queued
+        programs, and empty the queue.
+
+        As for :func:`~.gaussian.sample`, the programs must not contain feed-forward.
+
+        Args:
+            shots (int): number of samples of each program. If not provided, the
+                ``shots`` option of the program targets is used, defaulting to 1.
+            seed (int or numpy.random.Generator): seed or random number generator
+
+        Returns:
+            list[array]: the samples of each program, in order of submission, as
+            returned by :func:`~.gaussian.sample`
+        """
+        rng = np.random.default_rng(seed)
+        results = [None] * len(self._programs)
+
+        for group, program, backend in self._backends():
+            n = shots if shots is not None else program.target["options"].get("shots", 1)
+            samples = _sample(backend, program, n, rng)
+
+            for b, idx in enumerate(group):
+                results[idx] = samples[b]
+
+        self.clear()
+        return results
@@ -0,0 +1,373 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Compilation cache
+=================
+
+**Module name:** :mod:`blackbird.cache`
+
+.. currentmodule:: blackbird.cache
+
+This module contains the class :class:`~.CompileCache`, which memoizes the
+result of compiling a Blackbird program for a target, so that resubmitting
+the same program does not compile it again.
+
+Compiled artifacts are keyed by the :meth:`~.BlackbirdProgram.fingerprint`
+of the program, the name and options of the target, and the name of the
+compiling function:
+
+.. code-block:: python
+
+    cache = CompileCache(maxsize=256, directory="~/.cache/blackbird/compiled")
+    compiled, report = cache.compile(program, collapse_gaussian)
+
+Artifacts are stored in an in-memory least recently used (LRU) cache, and,
+if a directory is provided, on disk, so that they are shared between processes
+and persist across restarts. Artifacts found on disk are promoted to the
+in-memory cache. :meth:`~.CompileCache.stats` reports the hit rate of each tier.
+If the directory cannot be written to, artifacts are only cached in memory.
+
+Cached artifacts are returned without being copied, so that a hit is cheap;
+callers must therefore not modify them, or must copy them first.
+
+Artifacts are stored on disk using :mod:`pickle`. Register transforms, whose
+functions cannot be pickled, are stored as their expression, and recreated
+when the artifact is read. Artifacts that cannot be pickled are only cached
+in memory.
+
+.. warning::
+
+    Reading a pickled artifact can execute arbitrary code, so the directory of
+    the disk tier must be trusted: anyone who can write to it can run code in
+    the processes using the cache. The directory is created readable and
+    writable by its owner only, directories owned by another user are refused,
+    and files owned by another user are ignored.
+
+Summary
+-------
+
+.. autosummary::
+    compile_key
+    CompileCache
+
+Code details
+~~~~~~~~~~~~
+"""
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import sympy as sym
+
+from .listener import RegRefTransform
+from .program import BlackbirdProgram, _digest_value
+
+
+def compile_key(program, target=None, tag=""):
+    """Cache key of a compiled program.
+
+    Args:
+        program (BlackbirdProgram): the program
+        target (dict or None): the target the program is compiled for, as a dictionary
+            with keys ``'name'`` and ``'options'``. Defaults to the program target.
+        tag (str): identifies the compilation, for example the name of the compiling function
+
+    Returns:
+        str: hexadecimal SHA-256 digest
+    """
+    target = program.target if target is None else target
+
+    digest = hashlib.sha256()
+    digest.update(program.fingerprint().encode())
+    _digest_value(digest, target["name"])
+    _digest_value(digest, target.get("options", {}))
+    _digest_value(digest, tag)
+    return digest.hexdigest()
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler storing register transforms as their expression."""
+
+    def persistent_id(self, obj):  # pylint: disable=method-hidden
+        if isinstance(obj, RegRefTransform):
+            return ("RegRefTransform", obj.func_str)
+
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickler recreating the register transforms stored by :class:`_Pickler`."""
+
+    def persistent_load(self, pid):
+        kind, value = pid
+
+        if kind != "RegRefTransform":
+            raise pickle.UnpicklingError("Unsupported persistent object {}".format(kind))
+
+        return RegRefTransform(sym.sympify(value))
+
+
+def _owned(stat):
+    """Whether a file or directory is owned by the current user.
+
+    Ownership cannot be checked on platforms without user IDs, where it is assumed.
+
+    Args:
+        stat (os.stat_result): status of the file or directory
+
+    Returns:
+        bool: whether the current user owns it
+    """
+    getuid = getattr(os, "getuid", None)
+    return getuid is None or stat.st_uid == getuid()
+
+
+def _check_directory(directory):
+    """Create the directory of the disk tier, readable and writable by its owner
+    only, or check that the existing directory is owned by the current user.
+
+    Args:
+        directory (str): the directory
+
+    Raises:
+        ValueError: if the directory is owned by another user
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        stat = os.stat(directory)
+    except OSError:
+        # the disk tier is unavailable; artifacts are only kept in memory
+        return
+
+    if not _owned(stat):
+        raise ValueError("The cache directory {} is owned by another user".format(directory))
+
+
+class CompileCache:
+    """Cache of compiled Blackbird programs, with an in-memory LRU tier
+    and an optional disk tier.
+
+    The cache is thread-safe, and the disk tier may be shared between processes.
+
+    Artifacts are read from the disk tier with :mod:`pickle`, so the directory
+    must be trusted: only the current user should be able to write to it. It is
+    created with permissions ``0o700`` if it does not exist.
+
+    Args:
+        maxsize (int): maximum number of artifacts held in memory
+        directory (str or None): directory of the disk tier. If not provided,
+            artifacts are only cached in memory.
+
+    Raises:
+        ValueError: if the directory is owned by another user
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        if maxsize < 1:
+            raise ValueError("The maximum size of the cache must be positive")
+
+        self.maxsize = maxsize
+        self.directory = os.path.expanduser(directory) if directory is not None else None
+
+        if self.directory is not None:
+            _check_directory(self.directory)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(["memory_hits", "disk_hits", "misses", "evictions"], 0)
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __contains__(self, key):
+        return key in self._memory or (self._path(key) is not None and os.path.exists(self._path(key)))
+
+    def _path(self, key):
+        """Path of the file storing an artifact in the disk tier."""
+        if self.directory is None:
+            return None
+
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    def _remember(self, key, artifact):
+        """Store an artifact in the in-memory tier, evicting the least recently used."""
+        with self._lock:
+            self._memory[key] = artifact
+            self._memory.move_to_end(key)
+
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+                self._counts["evictions"] += 1
+
+    def _read(self, key):
+        """Read an artifact from the disk tier, or return ``None``."""
+        path = self._path(key)
+
+        if path is None:
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                if not _owned(os.fstat(f.fileno())):
+                    return None
+
+                return (_Unpickler(f).load(),)
+        except Exception:  # pylint: disable=broad-except
+            # missing, corrupt or incompatible entries are treated as misses
+            return None
+
+    def _write(self, key, artifact):
+        """Write an artifact to the disk tier, if it can be pickled."""
+        path = self._path(key)
+
+        if path is None:
+            return
+
+        buffer = io.BytesIO()
+
+        try:
+            _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(artifact)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+            # write atomically, so that other processes never read a partial file
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        except OSError:
+            # the disk tier is unavailable, for example if the directory is
+            # read-only or the disk is full; the artifact is only kept in memory
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(buffer.getvalue())
+
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get(self, key):
+        """Look up a compiled artifact.
+
+        Artifacts found in memory are returned as is, and are shared by all
+        the callers looking up the same key; they should not be modified.
+
+        Args:
+            key (str): cache key, as returned by :func:`compile_key`
+
+        Returns:
+            tuple or None: a tuple containing the artifact, or ``None`` if the key is not cached
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return (self._memory[key],)
+
+        found = self._read(key)
+
+        with self._lock:
+            self._counts["disk_hits" if found is not None else "misses"] += 1
+
+        if found is not None:
+            self._remember(key, found[0])
+
+        return found
+
+    def put(self, key, artifact):
+        """Store a compiled artifact.
+
+        Args:
+            key (str): cache key, as returned by :func:`compile_key`
+            artifact (any): the compiled artifact
+        """
+        self._remember(key, artifact)
+        self._write(key, artifact)
+
+    def compile(self, program, func, target=None, tag=None):
+        """Return the result of compiling a program, compiling it only
+        if the result is not cached.
+
+        Args:
+            program (BlackbirdProgram): the program to compile
+            func (callable): compiling function, called with the program as its only argument
+            target (dict or None): the target the program is compiled for, as a dictionary
+                with keys ``'name'`` and ``'options'``. Defaults to the program target.
+            tag (str or None): identifies the compilation in the cache key. Defaults to
+                the qualified name of ``func``.
+
+        Returns:
+            any: the compiled artifact, shared with the other callers compiling
+            the same program; it should not be modified
+        """
+        if not isinstance(program, BlackbirdProgram):
+            raise TypeError("Expected a BlackbirdProgram, not {}".format(type(program).__name__))
+
+        if tag is None:
+            tag = "{}.{}".format(func.__module__, getattr(func, "__qualname__", repr(func)))
+
+        key = compile_key(program, target=target, tag=tag)
+        found = self.get(key)
+
+        if found is not None:
+            return found[0]
+
+        artifact = func(program)
+        self.put(key, artifact)
+        return artifact
+
+    def clear(self, disk=False):
+        """Remove all artifacts from the in-memory tier, and reset the statistics.
+
+        Args:
+            disk (bool): whether to also remove all artifacts from the disk tier
+        """
+        with self._lock:
+            self._memory.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+
+        if disk and self.directory is not None and os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".pickle"):
+                        os.remove(os.path.join(root, name))
+
+    def stats(self):
+        """Hit rate metrics of the cache.
+
+        Returns:
+            dict[str->int or float]: the number of lookups found in memory (``'memory_hits'``)
+            and on disk (``'disk_hits'``), the total number of hits (``'hits'``) and
+            misses (``'misses'``), the fraction of lookups that were hits (``'hit_rate'``),
+            the number of artifacts evicted from memory (``'evictions'``), and the number
+            of artifacts held in memory (``'size'``)
+        """
+        with self._lock:
+            stats = dict(self._counts)
+            stats["size"] = len(self._memory)
+
+        stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,313 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Command line interface
+======================
+
+**Module name:** :mod:`blackbird.cli`
+
+.. currentmodule:: blackbird.cli
+
+This module contains the ``blackbird`` command line interface, installed
+as a console script, and also available as ``python -m blackbird``.
+
+The ``check`` command validates Blackbird scripts, and whole directory
+trees of ``.xbb`` files:
+
+.. code-block:: console
+
+    $ blackbird check examples/ --format json
+
+Each script is parsed in error recovery mode, so that all its syntax,
+type, undefined name and array shape errors are reported, and is then
+validated against its target device using :func:`~.validate`. The scripts
+are checked in parallel by a pool of worker processes, which import
+Blackbird only once.
+
+The result of each script is cached by the SHA-256 hash of its content,
+so that unchanged scripts are not checked again. The cache is keyed on the
+Blackbird version and the requested device, and stored in a JSON file,
+by default ``$XDG_CACHE_HOME/blackbird/check.json``.
+
+The command exits with status 0 if all scripts are valid, and 1 otherwise.
+
+Summary
+-------
+
+.. autosummary::
+    check_source
+    find_scripts
+    CheckCache
+    check
+    main
+
+Code details
+~~~~~~~~~~~~
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import antlr4
+
+from ._version import __version__
+from .error import BlackbirdSyntaxError
+from .listener import parse
+from .validation import validate
+
+
+def check_source(source, device=None):
+    """Check a Blackbird script for errors.
+
+    Args:
+        source (str): the Blackbird script
+        device (str): device to validate the program against. If not provided,
+            the program target is used.
+
+    Returns:
+        list[str]: error messages; an empty list indicates that the script is valid
+    """
+    try:
+        program = parse(antlr4.InputStream(source), collect_errors=True)
+    except BlackbirdSyntaxError as e:
+        return [str(err) for err in e.errors]
+    except Exception as e:  # pylint: disable=broad-except
+        return ["{}: {}".format(type(e).__name__, e)]
+
+    return validate(program, device=device)
+
+
+def _check_file(path, device):
+    """Check a Blackbird script file, in a worker process.
+
+    Returns:
+        list[str]: error messages
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return ["{}: {}".format(type(e).__name__, e)]
+
+    return check_source(source, device)
+
+
+def find_scripts(paths, extension=".xbb"):
+    """Find the Blackbird scripts in a list of files and directories.
+
+    Directories are searched recursively for files with the given extension.
+    Files are included regardless of their extension.
+
+    Args:
+        paths (list[str]): files and directories
+        extension (str): extension of the scripts in the directories
+
+    Returns:
+        list[str]: sorted paths of the scripts
+    """
+    scripts = set()
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                scripts.update(os.path.join(root, f) for f in files if f.endswith(extension))
+        else:
+            scripts.add(path)
+
+    return sorted(scripts)
+
+
+class CheckCache:
+    """Cache of the results of checking Blackbird scripts, keyed by the hash
+    of the script content, the Blackbird version, and the device.
+
+    Args:
+        filename (str or None): JSON file storing the cache. If ``None``,
+            results are not persisted.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self._results = {}
+        self._modified = False
+
+        if filename is not None and os.path.exists(filename):
+            try:
+                with open(filename, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                # a corrupt cache is discarded
+                data = {}
+
+            if data.get("version") == __version__:
+                self._results = data.get("results", {})
+
+    @staticmethod
+    def key(content, device=None):
+        """Cache key of a script.
+
+        Args:
+            content (bytes): the script
+            device (str): the device the script is validated against
+
+        Returns:
+            str: cache key
+        """
+        digest = hashlib.sha256(content)
+        digest.update(b"\0" + str(device).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """The cached errors of a script, or ``None`` if the script is not cached."""
+        return self._results.get(key)
+
+    def set(self, key, errors):
+        """Cache the errors of a script."""
+        self._results[key] = errors
+        self._modified = True
+
+    def save(self):
+        """Write the cache to its file, if it has been modified."""
+        if self.filename is None or not self._modified:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        os.makedirs(directory, exist_ok=True)
+
+        # write atomically, so that concurrent runs never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": __version__, "results": self._results}, f)
+
+        os.replace(tmp, self.filename)
+        self._modified = False
+
+
+def check(paths, device=None, workers=None, cache=None):
+    """Check Blackbird scripts in parallel.
+
+    Args:
+        paths (list[str]): script files, and directories to search for ``.xbb`` files
+        device (str): device to validate the programs against. If not provided,
+            the target of each program is used.
+        workers (int): number of worker processes. Defaults to the number of CPUs.
+            If 1, the scripts are checked in the current process.
+        cache (CheckCache): cache of results. If not provided, results are not cached.
+
+    Returns:
+        list[dict]: the result of each script, in order of path, with the keys ``'path'``,
+        ``'valid'``, ``'errors'`` (list of error messages), and ``'cached'``
+    """
+    cache = cache if cache is not None else CheckCache()
+    results = []
+    pending = []
+
+    for path in find_scripts(paths):
+        try:
+            with open(path, "rb") as f:
+                key = cache.key(f.read(), device)
+        except OSError:
+            key = None
+
+        errors = cache.get(key) if key is not None else None
+        results.append({"path": path, "errors": errors, "cached": errors is not None})
+
+        if errors is None:
+            pending.append((results[-1], key))
+
+    workers = workers or os.cpu_count() or 1
+    paths = [res["path"] for res, _ in pending]
+
+    if workers == 1 or len(pending) <= 1:
+        checked = [_check_file(p, device) for p in paths]
+    else:
+        with ProcessPoolExecutor(min(workers, len(pending))) as pool:
+            chunksize = max(1, len(paths) // (4 * workers))
+            checked = list(pool.map(_check_file, paths, [device] * len(paths), chunksize=chunksize))
+
+    for (res, key), errors in zip(pending, checked):
+        res["errors"] = errors
+
+        if key is not None:
+            cache.set(key, errors)
+
+    cache.save()
+
+    for res in results:
+        res["valid"] = not res["errors"]
+
+    return results
+
+
+def _default_cache():
+    """Default location of the cache file."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "blackbird", "check.json")
+
+
+def _parser():
+    """Argument parser of the command line interface."""
+    parser = argparse.ArgumentParser(prog="blackbird", description="Blackbird command line tools")
+    parser.add_argument("--version", action="version", version="%(prog)s " + __version__)
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    check_parser = commands.add_parser("check", help="validate Blackbird scripts")
+    check_parser.add_argument("paths", nargs="+", help="scripts, and directories to search for .xbb files")
+    check_parser.add_argument("--device", help="device to validate against, instead of the program targets")
+    check_parser.add_argument("-j", "--workers", type=int, help="number of worker processes")
+    check_parser.add_argument(
+        "--format", choices=["text", "json"], default="text", help="output format (default: text)"
+    )
+    check_parser.add_argument("--cache", default=_default_cache(), help="cache file")
+    check_parser.add_argument("--no-cache", action="store_true", help="do not read or write the cache")
+    return parser
+
+
+def main(argv=None):
+    """Run the command line interface.
+
+    Args:
+        argv (list[str]): command line arguments. Defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: exit status
+    """
+    args = _parser().parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        print("blackbird: error: the number of workers must be positive", file=sys.stderr)
+        return 2
+
+    cache = CheckCache(None if args.no_cache else args.cache)
+    results = check(args.paths, device=args.device, workers=args.workers, cache=cache)
+    invalid = [res for res in results if not res["valid"]]
+
+    if args.format == "json":
+        summary = {"checked": len(results), "invalid": len(invalid)}
+        json.dump({"results": results, "summary": summary}, sys.stdout, indent=2)
+        print()
+    else:
+        for res in invalid:
+            for error in res["errors"]:
+                print("{}: {}".format(res["path"], error))
+
+        print("{} scripts checked, {} invalid".format(len(results), len(invalid)))
+
+    return 1 if invalid else 0
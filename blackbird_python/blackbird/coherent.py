@@ -0,0 +1,164 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Coherent state sampling
+=======================
+
+**Module name:** :mod:`blackbird.coherent`
+
+.. currentmodule:: blackbird.coherent
+
+This module contains a closed-form fast path for programs that only
+prepare coherent states, apply passive linear optics, displacements and
+loss, and count photons, such as the Chip0 program ``examples/example_chip0.xbb``.
+
+Coherent states remain a product of coherent states under these operations;
+the input amplitudes :math:`\\alpha` are mapped to :math:`U\\alpha`, plus any
+displacements. The photon counting statistics of each mode are therefore
+independent and Poisson distributed with mean :math:`|(U\\alpha)_i|^2`, and all
+shots are sampled using a single vectorized Poisson, or threshold, draw.
+
+Summary
+-------
+
+.. autosummary::
+    COUNTING
+    coherent_amplitudes
+    sample_coherent
+
+Code details
+~~~~~~~~~~~~
+"""
+import numpy as np
+
+from .compiler import passive_unitary
+from .program import is_measurement
+from .symplectic import constant_args
+
+
+COUNTING = {"MeasureFock", "Measure", "MeasureIntensity", "MeasureThreshold"}
+"""set[str]: photon counting measurements supported by the fast path;
+``MeasureThreshold`` only distinguishes zero from one or more photons"""
+
+
+def coherent_amplitudes(program):
+    """Compute the output coherent state amplitudes of a program, if it
+    only consists of coherent state preparations, passive linear optics,
+    displacements, loss, and photon counting measurements.
+
+    Args:
+        program (BlackbirdProgram): program
+
+    Returns:
+        Union[tuple[array, dict[int->str]], None]: the coherent amplitude of each mode,
+        and a mapping from each measured mode to its measurement,
+        or ``None`` if the program is not of this form
+    """
+    num_modes = max(program.modes) + 1 if program.modes else 0
+    alpha = np.zeros(num_modes, dtype=np.complex128)
+    measured = {}
+
+    for op in program.operations:
+        name = op["op"]
+        modes = op["modes"]
+
+        if any(m in measured for m in modes):
+            # operation acting on a measured mode
+            return None
+
+        if is_measurement(op):
+            if name not in COUNTING:
+                return None
+
+            measured.update({m: name for m in modes})
+            continue
+
+        U = passive_unitary(op)
+        if U is not None:
+            alpha[modes] = U @ alpha[modes]
+            continue
+
+        args = constant_args(op)
+        if args is None or len(modes) != 1:
+            return None
+
+        try:
+            if name in ("Vacuum", "Vac") and not args:
+                alpha[modes] = 0
+            elif name == "Coherent":
+                alpha[modes] = _amplitude(*args)
+            elif name == "Dgate":
+                alpha[modes] += _amplitude(*args)
+            elif name == "LossChannel":
+                (T,) = args
+                alpha[modes] *= np.sqrt(T)
+            else:
+                return None
+        except (TypeError, ValueError):
+            # wrong number of arguments
+            return None
+
+    return alpha, measured
+
+
+def _amplitude(r, phi=0):
+    """Complex amplitude from its magnitude and phase."""
+    return r * np.exp(1j * phi)
+
+
+def sample_coherent(program, shots=None, seed=None):
+    """Sample the photon counting measurements of a coherent state program.
+
+    Args:
+        program (BlackbirdProgram): program, satisfying the conditions of
+            :func:`coherent_amplitudes`
+        shots (int): number of samples. If not provided, the ``shots`` option of the
+            program target is used, defaulting to 1.
+        seed (int or numpy.random.Generator): seed or random number generator
+
+    Returns:
+        array: array of size ``[shots, num_modes]``, containing the measured photon
+        number of each mode, or whether it detected photons for ``MeasureThreshold``,
+        and NaN for modes that are not measured
+
+    Raises:
+        ValueError: if the program is not a coherent state program
+    """
+    res = coherent_amplitudes(program)
+
+    if res is None:
+        raise ValueError(
+            "Program must only prepare coherent states, apply passive linear optics, "
+            "displacements and loss, and count photons"
+        )
+
+    if shots is None:
+        shots = program.target["options"].get("shots", 1)
+
+    alpha, measured = res
+    rng = np.random.default_rng(seed)
+    samples = np.full((shots, len(alpha)), np.nan)
+
+    counted = [m for m, name in measured.items() if name != "MeasureThreshold"]
+    threshold = [m for m, name in measured.items() if name == "MeasureThreshold"]
+
+    if counted:
+        samples[:, counted] = rng.poisson(np.abs(alpha[counted]) ** 2, size=(shots, len(counted)))
+
+    if threshold:
+        p_click = 1 - np.exp(-np.abs(alpha[threshold]) ** 2)
+        samples[:, threshold] = rng.random((shots, len(threshold))) < p_click
+
+    return samples
@@ -0,0 +1,649 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Compilation passes
+==================
+
+**Module name:** :mod:`blackbird.compiler`
+
+.. currentmodule:: blackbird.compiler
+
+This module contains compilation passes that transform a
+:class:`~.BlackbirdProgram` into an equivalent program
+containing fewer operations.
+
+Every pass accepts a :class:`~.BlackbirdProgram`, and returns a tuple
+containing a *new* :class:`~.BlackbirdProgram` and a dictionary reporting
+the changes made. The input program is never modified.
+
+Summary
+-------
+
+.. autosummary::
+    MERGE_RULES
+    merge_gates
+    passive_unitary
+    fuse_interferometers
+    collapse_gaussian
+
+Code details
+~~~~~~~~~~~~
+"""
+import numbers
+
+import numpy as np
+
+from .program import BlackbirdProgram, is_measurement
+from .symplectic import GAUSSIAN_STATES, constant_args, gate_symplectic, gaussian_state
+from .tracing import traced
+
+
+def _new_program(program, operations):
+    """Create a copy of a Blackbird program with a new list of operations.
+
+    Args:
+        program (BlackbirdProgram): the original program
+        operations (list[dict]): the operations of the new program
+
+    Returns:
+        BlackbirdProgram: the new program
+    """
+    new = BlackbirdProgram(name=program.name, version=program.version)
+    new._var.update(program._var)
+    new._target["name"] = program.target["name"]
+    new._target["options"] = dict(program.target["options"])
+    new._operations.extend(operations)
+    new._modes |= program.modes
+    return new
+
+
+def _numeric_args(op):
+    """Returns the positional arguments of an operation if they are all
+    numeric constants, and the operation has no keyword arguments.
+
+    Args:
+        op (dict): operation
+
+    Returns:
+        Union[list[int, float, complex], None]: the numeric arguments, or ``None``
+        if the operation cannot be merged
+    """
+    args = op.get("args")
+
+    if not args or op.get("kwargs"):
+        return None
+
+    for a in args:
+        if isinstance(a, bool) or not isinstance(a, numbers.Number):
+            return None
+
+    return args
+
+
+def _merge_additive(args1, args2):
+    """Merge two gates whose single parameters add."""
+    if len(args1) != 1 or len(args2) != 1:
+        return None
+    return [args1[0] + args2[0]]
+
+
+def _merge_magnitude(args1, args2):
+    """Merge two gates of the form ``G(r, phi)`` with equal phase,
+    whose magnitudes add. The phase defaults to zero."""
+    if len(args1) > 2 or len(args2) > 2:
+        return None
+
+    r1, phi1 = (list(args1) + [0])[:2]
+    r2, phi2 = (list(args2) + [0])[:2]
+
+    if np.iscomplexobj(r1) or np.iscomplexobj(r2) or not np.isclose(phi1, phi2):
+        return None
+
+    return [r1 + r2, phi1]
+
+
+def _displacement(args):
+    """Complex displacement of the arguments of a displacement gate."""
+    if len(args) == 1:
+        return complex(args[0])
+    if len(args) == 2 and not np.iscomplexobj(args[1]):
+        return complex(args[0] * np.exp(1j * args[1]))
+    return None
+
+
+def _merge_displacement(args1, args2):
+    """Merge two displacement gates, whose complex displacements add."""
+    alpha1 = _displacement(args1)
+    alpha2 = _displacement(args2)
+
+    if alpha1 is None or alpha2 is None:
+        return None
+
+    alpha = alpha1 + alpha2
+    return [float(np.abs(alpha)), float(np.angle(alpha))]
+
+
+def _merge_loss(args1, args2):
+    """Merge two loss channels, whose transmissivities multiply."""
+    if len(args1) != 1 or len(args2) != 1:
+        return None
+    return [args1[0] * args2[0]]
+
+
+MERGE_RULES = {
+    "Rgate": (_merge_additive, lambda args: args[0]),
+    "Xgate": (_merge_additive, lambda args: args[0]),
+    "Zgate": (_merge_additive, lambda args: args[0]),
+    "Pgate": (_merge_additive, lambda args: args[0]),
+    "Vgate": (_merge_additive, lambda args: args[0]),
+    "CXgate": (_merge_additive, lambda args: args[0]),
+    "CZgate": (_merge_additive, lambda args: args[0]),
+    "CKgate": (_merge_additive, lambda args: args[0]),
+    "Sgate": (_merge_magnitude, lambda args: args[0]),
+    "BSgate": (_merge_magnitude, lambda args: args[0]),
+    "S2gate": (_merge_magnitude, lambda args: args[0]),
+    "Dgate": (_merge_displacement, _displacement),
+    "LossChannel": (_merge_loss, lambda args: args[0] - 1),
+}
+"""dict[str->tuple[callable, callable]]: Mapping from the Blackbird gates that can be
+merged, to a tuple containing:
+
+* a function accepting the arguments of two consecutive gates, and returning the arguments
+  of the single equivalent gate (or ``None`` if the gates cannot be merged), and
+
+* a function accepting the gate arguments, and returning a number that is zero
+  if and only if the gate is the identity.
+"""
+
+
+def _is_identity(name, args, tol):
+    """Returns ``True`` if the gate with the given numeric arguments is the identity."""
+    _, param = MERGE_RULES[name]
+    value = param(args)
+    return value is not None and np.abs(value) < tol
+
+
+@traced("compile.merge_gates")
+def merge_gates(program, tol=1e-10):
+    """Peephole optimization merging consecutive gates, and removing identity gates.
+
+    Two gates are merged if they have the same name, act on the same modes
+    in the same order, no other operation acts on these modes between them, and
+    the gate family allows it (see :data:`MERGE_RULES`); for instance,
+    ``Rgate(a) | 0`` followed by ``Rgate(b) | 0`` becomes ``Rgate(a+b) | 0``.
+    Gates that reduce to the identity, such as zero-angle rotations or
+    a displacement followed by its inverse, are removed.
+
+    Only gates with constant numeric positional arguments are merged.
+    Measurements act as barriers; no gates are merged across a measurement.
+
+    Args:
+        program (BlackbirdProgram): the program to optimize
+        tol (float): absolute tolerance below which a gate parameter
+            is considered to be zero
+
+    Returns:
+        tuple[BlackbirdProgram, dict]: the optimized program, and a report dictionary
+        with keys ``'operations'`` (the original number of operations), ``'optimized'``
+        (the final number of operations), ``'merged'`` (the number of gates absorbed
+        into a preceding gate) and ``'removed'`` (the number of identity gates removed)
+    """
+    ops = []
+    merged = 0
+    removed = 0
+
+    # for each mode, the positions in ops of the gates that could
+    # still be merged with a subsequent gate on that mode
+    stacks = {}
+
+    for op in program.operations:
+        if is_measurement(op):
+            # measurements act as a barrier for all modes
+            stacks = {}
+            ops.append(op)
+            continue
+
+        args = _numeric_args(op) if op["op"] in MERGE_RULES else None
+
+        if args is None:
+            # operation cannot be merged, and blocks its modes
+            ops.append(op)
+            for m in op["modes"]:
+                stacks.setdefault(m, []).append(len(ops) - 1)
+            continue
+
+        if _is_identity(op["op"], args, tol):
+            removed += 1
+            continue
+
+        # find the previous operation on these modes
+        tops = {stacks[m][-1] if stacks.get(m) else None for m in op["modes"]}
+        prev_idx = tops.pop() if len(tops) == 1 else None
+
+        if prev_idx is not None:
+            prev = ops[prev_idx]
+
+            prev_args = _numeric_args(prev)
+            same_gate = prev["op"] == op["op"] and prev["modes"] == op["modes"]
+
+            if same_gate and prev_args is not None:
+                new_args = MERGE_RULES[op["op"]][0](prev_args, args)
+
+                if new_args is not None:
+                    merged += 1
+
+                    if _is_identity(op["op"], new_args, tol):
+                        removed += 1
+                        ops[prev_idx] = None
+                        for m in op["modes"]:
+                            stacks[m].pop()
+                    else:
+                        ops[prev_idx] = {
+                            "op": op["op"],
+                            "args": new_args,
+                            "kwargs": {},
+                            "modes": list(op["modes"]),
+                        }
+                    continue
+
+        ops.append(op)
+        for m in op["modes"]:
+            stacks.setdefault(m, []).append(len(ops) - 1)
+
+    ops = [op for op in ops if op is not None]
+
+    report = {
+        "operations": len(program),
+        "optimized": len(ops),
+        "merged": merged,
+        "removed": removed,
+    }
+
+    return _new_program(program, ops), report
+
+
+def _segments(operations, is_member):
+    """Split a list of operations into segments of member operations.
+
+    A segment is closed as soon as a non-member operation acts on any of
+    its modes. Non-member operations acting on other modes are placed
+    before the segment; since they act on disjoint modes, the program
+    is unchanged.
+
+    Args:
+        operations (list[dict]): operations
+        is_member (callable): function accepting an operation, and returning
+            ``True`` if the operation can be part of a segment
+
+    Returns:
+        list[dict or list[dict]]: list containing the non-member operations,
+        and lists of operations for each segment
+    """
+    items = []
+    segment = []
+    modes = set()
+
+    for op in operations:
+        if is_member(op):
+            segment.append(op)
+            modes |= set(op["modes"])
+            continue
+
+        if modes & set(op["modes"]):
+            items.append(segment)
+            segment = []
+            modes = set()
+
+        items.append(op)
+
+    if segment:
+        items.append(segment)
+
+    return items
+
+
+def passive_unitary(op):
+    """The unitary matrix of a passive linear optical operation.
+
+    The passive operations are ``Rgate``, ``BSgate`` and ``Interferometer``,
+    and the returned unitary acts on the mode creation operators,
+    following the Strawberry Fields conventions.
+
+    Args:
+        op (dict): operation
+
+    Returns:
+        Union[array, None]: the unitary matrix acting on the modes of the operation,
+        or ``None`` if the operation is not passive, or its arguments are not constant
+    """
+    if op["op"] == "Interferometer":
+        args = op.get("args", [])
+        if op.get("kwargs") or len(args) != 1 or not isinstance(args[0], np.ndarray):
+            return None
+
+        U = args[0]
+        if U.shape != (len(op["modes"]),) * 2 or not np.issubdtype(U.dtype, np.number):
+            return None
+
+        return U.astype(np.complex128)
+
+    if op["op"] not in ("Rgate", "BSgate"):
+        return None
+
+    # operations using their default arguments are passive
+    args = [] if not op.get("args") and not op.get("kwargs") else _numeric_args(op)
+    if args is None or np.iscomplexobj(args):
+        return None
+
+    if op["op"] == "Rgate" and len(args) == 1:
+        return np.array([[np.exp(1j * args[0])]])
+
+    if op["op"] == "BSgate" and len(args) <= 2:
+        theta, phi = list(args) + [np.pi / 4, 0][len(args) :]
+        t = np.cos(theta)
+        r = np.exp(1j * phi) * np.sin(theta)
+        return np.array([[t, -np.conj(r)], [r, t]])
+
+    return None
+
+
+@traced("compile.fuse_interferometers")
+def fuse_interferometers(program, check=True, tol=1e-8):
+    """Fuse segments of passive linear optical operations into single interferometers.
+
+    Contiguous ``Rgate``, ``BSgate`` and ``Interferometer`` operations with
+    constant arguments are replaced by a single ``Interferometer`` acting on the
+    union of their modes (in increasing order). The unitary is built by
+    updating only the rows of the modes each operation acts on.
+    Segments containing a single operation are left unchanged.
+
+    Args:
+        program (BlackbirdProgram): the program to optimize
+        check (bool): if ``True``, each fused unitary is checked to be unitary, and
+            to be numerically equal to the product of the full-size matrices of
+            the operations it replaces
+        tol (float): absolute tolerance of the numerical check
+
+    Returns:
+        tuple[BlackbirdProgram, dict]: the optimized program, and a report dictionary
+        with keys ``'operations'`` (the original number of operations), ``'optimized'``
+        (the final number of operations), ``'fused'`` (the number of operations replaced)
+        ``'interferometers'`` (the number of fused interferometers) and ``'max_error'``
+        (the largest deviation found by the numerical check, or ``None``)
+
+    Raises:
+        ValueError: if the numerical check fails
+    """
+    ops = []
+    fused = 0
+    interferometers = 0
+    max_error = 0.0 if check else None
+
+    for item in _segments(program.operations, lambda op: passive_unitary(op) is not None):
+        if isinstance(item, dict):
+            ops.append(item)
+            continue
+
+        if len(item) == 1:
+            ops.extend(item)
+            continue
+
+        modes = sorted(set(m for op in item for m in op["modes"]))
+        pos = {m: i for i, m in enumerate(modes)}
+        U = np.identity(len(modes), dtype=np.complex128)
+
+        for op in item:
+            # only the rows of the modes the operation acts on change
+            idx = [pos[m] for m in op["modes"]]
+            U[idx, :] = passive_unitary(op) @ U[idx, :]
+
+        if check:
+            error = _check_unitary(U, item, pos)
+            max_error = max(max_error, error)
+
+            if error > tol:
+                raise ValueError(
+                    "Fused interferometer on modes {} is not unitary, or does not match "
+                    "the operations it replaces (error {})".format(modes, error)
+                )
+
+        ops.append({"op": "Interferometer", "args": [U], "kwargs": {}, "modes": modes})
+        fused += len(item)
+        interferometers += 1
+
+    report = {
+        "operations": len(program),
+        "optimized": len(ops),
+        "fused": fused,
+        "interferometers": interferometers,
+        "max_error": max_error,
+    }
+
+    return _new_program(program, ops), report
+
+
+def _check_unitary(U, segment, pos):
+    """Numerical equivalence check of a fused interferometer.
+
+    Args:
+        U (array): the fused unitary
+        segment (list[dict]): the operations replaced by the unitary
+        pos (dict[int->int]): mapping from mode number to row of ``U``
+
+    Returns:
+        float: the maximum absolute deviation of ``U`` from the product of the
+        full-size unitaries of the operations, and from unitarity
+    """
+    n = len(pos)
+    expected = np.identity(n, dtype=np.complex128)
+
+    for op in segment:
+        idx = [pos[m] for m in op["modes"]]
+        full = np.identity(n, dtype=np.complex128)
+        full[np.ix_(idx, idx)] = passive_unitary(op)
+        expected = full @ expected
+
+    error = np.max(np.abs(U - expected))
+    unitarity = np.max(np.abs(U @ U.conj().T - np.identity(n)))
+    return float(max(error, unitarity))
+
+
+def _gaussian_state_args(op):
+    """Returns the constant arguments of a Gaussian state preparation, or ``None``."""
+    if op["op"] not in GAUSSIAN_STATES or len(op["modes"]) != 1:
+        return None
+
+    args = constant_args(op)
+    if args is None:
+        return None
+
+    try:
+        V, r = gaussian_state(op["op"], args)
+    except (TypeError, ValueError):
+        return None
+
+    if np.iscomplexobj(V) or np.iscomplexobj(r):
+        return None
+
+    return args
+
+
+def _collapse_state(segment, modes, hbar):
+    """Compute the Gaussian state prepared by a segment acting on the vacuum.
+
+    Args:
+        segment (list[dict]): Gaussian operations
+        modes (list[int]): the modes the segment acts on
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+
+    Returns:
+        tuple[array, array]: the covariance matrix and vector of means
+    """
+    n = len(modes)
+    pos = {m: i for i, m in enumerate(modes)}
+    cov = hbar / 2 * np.identity(2 * n)
+    means = np.zeros(2 * n)
+
+    for op in segment:
+        idx = [pos[m] for m in op["modes"]]
+        idx += [i + n for i in idx]
+
+        args = _gaussian_state_args(op)
+        if args is not None:
+            # state preparation; replaces the state of the mode
+            V, r = gaussian_state(op["op"], args, hbar=hbar)
+            cov[idx, :] = 0
+            cov[:, idx] = 0
+            cov[np.ix_(idx, idx)] = V
+            means[idx] = r
+            continue
+
+        # only the rows and columns of the modes the gate acts on change
+        S, d = gate_symplectic(op, hbar=hbar)
+        cov[idx, :] = S @ cov[idx, :]
+        cov[:, idx] = cov[:, idx] @ S.T
+        means[idx] = S @ means[idx] + d
+
+    return cov, means
+
+
+def _collapse_transform(segment, modes, hbar):
+    """Compute the symplectic transformation applied by a segment of Gaussian gates.
+
+    Args:
+        segment (list[dict]): Gaussian unitary operations
+        modes (list[int]): the modes the segment acts on
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+
+    Returns:
+        tuple[array, array]: the symplectic matrix and displacement vector
+    """
+    n = len(modes)
+    pos = {m: i for i, m in enumerate(modes)}
+    S_total = np.identity(2 * n)
+    d_total = np.zeros(2 * n)
+
+    for op in segment:
+        idx = [pos[m] for m in op["modes"]]
+        idx += [i + n for i in idx]
+
+        S, d = gate_symplectic(op, hbar=hbar)
+        S_total[idx, :] = S @ S_total[idx, :]
+        d_total[idx] = S @ d_total[idx] + d
+
+    return S_total, d_total
+
+
+@traced("compile.collapse_gaussian")
+def collapse_gaussian(program, hbar=None, tol=1e-10):
+    """Collapse segments of Gaussian operations into single dense operations.
+
+    Contiguous Gaussian gates (``Rgate``, ``Dgate``, ``Xgate``, ``Zgate``, ``Sgate``,
+    ``Pgate``, ``BSgate``, ``S2gate``, ``CXgate``, ``CZgate``, ``Interferometer`` and
+    ``GaussianTransform``) and single mode Gaussian state preparations
+    (``Vacuum``, ``Coherent``, ``Squeezed`` and ``Thermal``) with constant
+    arguments are replaced as follows:
+
+    * If no prior operation acts on the modes of the segment (i.e., the segment
+      acts on the vacuum), the segment is replaced by a single ``Gaussian(V, r)``
+      operation preparing the resulting state, where ``V`` is the covariance
+      matrix and ``r`` a single row array containing the vector of means.
+
+    * Otherwise, runs of Gaussian gates are replaced by a single ``GaussianTransform(S)``
+      operation, followed by a ``Dgate`` on each mode with a non-zero displacement.
+      State preparations are left in place.
+
+    Segments containing a single operation are left unchanged.
+
+    Args:
+        program (BlackbirdProgram): the program to optimize
+        hbar (float): the value of :math:`\\hbar` in the commutation relation.
+            If not provided, the ``hbar`` option of the program target is used,
+            with a default of 2.
+        tol (float): absolute tolerance below which a displacement is considered to be zero
+
+    Returns:
+        tuple[BlackbirdProgram, dict]: the optimized program, and a report dictionary
+        with keys ``'operations'`` (the original number of operations), ``'optimized'``
+        (the final number of operations), ``'collapsed'`` (the number of operations replaced)
+        and ``'segments'`` (the number of segments collapsed)
+    """
+    if hbar is None:
+        hbar = program.target["options"].get("hbar", 2)
+
+    def is_gate(op):
+        return gate_symplectic(op) is not None
+
+    def is_gaussian(op):
+        return is_gate(op) or _gaussian_state_args(op) is not None
+
+    ops = []
+    touched = set()
+    collapsed = 0
+    segments = 0
+
+    def add(new_ops, replaced):
+        nonlocal collapsed, segments
+        ops.extend(new_ops)
+        for op in new_ops:
+            touched.update(op["modes"])
+
+        if replaced is not None:
+            collapsed += len(replaced)
+            segments += 1
+
+    for item in _segments(program.operations, is_gaussian):
+        if isinstance(item, dict):
+            add([item], None)
+            continue
+
+        modes = sorted(set(m for op in item for m in op["modes"]))
+
+        if len(item) == 1:
+            add(item, None)
+
+        elif not touched & set(modes):
+            # segment acts on the vacuum
+            cov, means = _collapse_state(item, modes, hbar)
+            add([{"op": "Gaussian", "args": [cov, means[None, :]], "kwargs": {}, "modes": modes}], item)
+
+        else:
+            for sub in _segments(item, is_gate):
+                if isinstance(sub, dict) or len(sub) == 1:
+                    add(sub if isinstance(sub, list) else [sub], None)
+                    continue
+
+                sub_modes = sorted(set(m for op in sub for m in op["modes"]))
+                S, d = _collapse_transform(sub, sub_modes, hbar)
+                new_ops = [{"op": "GaussianTransform", "args": [S], "kwargs": {}, "modes": sub_modes}]
+
+                n = len(sub_modes)
+                for i, m in enumerate(sub_modes):
+                    alpha = (d[i] + 1j * d[i + n]) / np.sqrt(2 * hbar)
+
+                    if np.abs(alpha) > tol:
+                        args = [float(np.abs(alpha)), float(np.angle(alpha))]
+                        new_ops.append({"op": "Dgate", "args": args, "kwargs": {}, "modes": [m]})
+
+                add(new_ops, sub)
+
+    report = {
+        "operations": len(program),
+        "optimized": len(ops),
+        "collapsed": collapsed,
+        "segments": segments,
+    }
+
+    return _new_program(program, ops), report
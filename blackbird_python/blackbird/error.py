@@ -26,21 +26,34 @@ inherits the standard ANTLR4 error listener, and overrides the default
 
 This custom listener enables us to:
 
-1. Remove the extraneous Python traceback, which we generally do not
-   want users to see.
-
-2. Replace some common ANTLR error messages, which can be a bit obfuscating,
+1. Replace some common ANTLR error messages, which can be a bit obfuscating,
    with ones that are more informative.
 
+2. Optionally collect every syntax error of a script, rather than stopping
+   at the first one, by passing ``collect=True``.
+
 Note that we do not try and replace *all* error messages, just the more
 common ones that the user is likely to come across.
 
+Syntax errors are raised as :class:`~.BlackbirdSyntaxError` exceptions, which
+may be caught like any other exception. Command line applications that prefer
+to exit with the error message, without printing a Python traceback, may opt
+in by running their top level code in the :func:`exit_on_error` context:
+
+.. code-block:: python
+
+    with exit_on_error():
+        program = blackbird.load(filename)
+
+The exception class ``NoTraceBack`` is a deprecated alias of :class:`~.BlackbirdError`.
+
 Summary
 -------
 
 .. autosummary::
-   NoTraceBack
+   BlackbirdError
    BlackbirdSyntaxError
+   exit_on_error
    BlackbirdErrorListener
 
 
@@ -49,40 +62,113 @@ Code details
 """
 # pylint: disable=too-many-statements, protected-access
 import sys
+import warnings
+from contextlib import contextmanager
+
 import antlr4
 
 from .blackbirdParser import blackbirdParser
 
 
-class NoTraceBack(Exception):
-    """A generic exception with no traceback provided"""
+class BlackbirdError(Exception):
+    """Base class of the Blackbird exceptions, whose message is printed without
+    a traceback by :func:`exit_on_error`.
 
-    def __init__(self, msg):
-        """Method executed when the exception is called.
+    Args:
+        msg (str): error message
+    """
 
-        Args:
-            msg (str): message to be printed in the traceback
-        """
-        # pylint: disable=super-init-not-called,unused-argument
-        try:
-            _ = sys.exc_info()[-1].tb_lineno
-        except AttributeError:
-            pass
-        sys.exit(self)
 
+class BlackbirdSyntaxError(BlackbirdError):
+    """Blackbird syntax error exception.
+
+    Args:
+        msg (str): error message
+        errors (list[BlackbirdSyntaxError]): if provided, the individual errors
+            this exception reports, when several errors are collected in one pass
+    """
+
+    def __init__(self, msg, errors=None):
+        self.errors = [self] if errors is None else list(errors)
+        """list[BlackbirdSyntaxError]: the individual errors reported by the exception"""
+        super().__init__(msg)
+
+
+@contextmanager
+def exit_on_error():
+    """Context manager exiting the Python interpreter if a :class:`~.BlackbirdError`
+    is raised in its body, printing the error message without a traceback.
+
+    This is intended for the top level of command line applications; other
+    exceptions propagate unchanged.
 
-class BlackbirdSyntaxError(NoTraceBack):
-    """Blackbird syntax error exception"""
+    Raises:
+        SystemExit: if a :class:`~.BlackbirdError` is raised in the body
+    """
+    try:
+        yield
+    except BlackbirdError as e:
+        sys.exit(e)
 
-    pass
+
+def __getattr__(name):
+    """Return the deprecated aliases of the module's classes."""
+    if name == "NoTraceBack":
+        warnings.warn(
+            "NoTraceBack is deprecated, use BlackbirdError instead", DeprecationWarning, stacklevel=2
+        )
+        return BlackbirdError
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 
 class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
-    """Custom error listener for Blackbird"""
+    """Custom error listener for Blackbird.
+
+    By default, the first syntax error raises a :class:`~.BlackbirdSyntaxError`.
+    In error recovery mode, the errors are instead appended to :attr:`errors`,
+    and the parser recovers and continues, so that all the syntax errors of a
+    script are reported in one pass.
+
+    Args:
+        collect (bool): whether to collect all errors, rather than raising the first
+    """
+
+    def __init__(self, collect=False):
+        super().__init__()
+        self.collect = collect
+        self.errors = []
+        """list[BlackbirdSyntaxError]: the collected errors, in error recovery mode"""
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        error = BlackbirdSyntaxError(self.message(recognizer, offendingSymbol, line, column, msg, e))
+
+        if not self.collect:
+            raise error from None
+
+        self.errors.append(error)
 
     # At some point, it will be more scalable to introduce more parser rules
     # to explicitly match incorrect Blackbird code, to automate the exception handling.
-    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+    def message(self, recognizer, offendingSymbol, line, column, msg, e):
+        """Informative error message of a syntax error.
+
+        Args:
+            recognizer (antlr4.Parser): the parser
+            offendingSymbol (antlr4.Token): the token at which the error was detected
+            line (int): line number of the error
+            column (int): column of the error, starting from 0
+            msg (str): the ANTLR error message
+            e (antlr4.error.Errors.RecognitionException): the exception raised
+                by the parser, or ``None`` if the parser recovered inline
+
+        Returns:
+            str: error message
+        """
+        if offendingSymbol is None:
+            # errors reported by the lexer have no offending token
+            return "Blackbird SyntaxError (line {}:{}): {}".format(line, column + 1, msg)
+
         if e:
             ctx = e.ctx
         else:
@@ -93,9 +179,7 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
         if offendingSymbol.text in {";", "[", "]", "\\", "$", "@", "&", "%", "~", "`", "?"}:
             # inform the user of invalid symbol usage
             error_msg = "Blackbird SyntaxError (line {}:{}): {} is not a valid Blackbird symbol."
-            raise BlackbirdSyntaxError(
-                error_msg.format(line, column + 1, offendingSymbol.text)
-            ) from None
+            return error_msg.format(line, column + 1, offendingSymbol.text)
 
         if isinstance(ctx, blackbirdParser.ExpressionvarContext):
             # if we are in a variable declaration, inform the user which variable
@@ -106,21 +190,19 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
             if not ctx.ASSIGN():
                 # equal sign was not found
                 error_msg = "Blackbird SyntaxError (line {}:{}): variable {} missing an assignment."
-                raise BlackbirdSyntaxError(error_msg.format(line, column + 1, var_name)) from None
+                return error_msg.format(line, column + 1, var_name)
 
             if offendingSymbol.text == "\n":
                 # expression terminated midway by a new line
                 error_msg = "Blackbird SyntaxError (line {}:{}): variable {} has an incomplete value or expression"
-                raise BlackbirdSyntaxError(error_msg.format(line, column + 1, var_name)) from None
+                return error_msg.format(line, column + 1, var_name)
 
             # otherwise, return a more generic variable error
             syntax_msg = (
                 "Blackbird SyntaxError (line {}:{}): variable {} contains the "
                 "symbol {} which is not a valid {}."
             )
-            raise BlackbirdSyntaxError(
-                syntax_msg.format(line, column + 1, var_name, offendingSymbol.text, var_type)
-            ) from None
+            return syntax_msg.format(line, column + 1, var_name, offendingSymbol.text, var_type)
 
         if isinstance(ctx, blackbirdParser.ArrayvarContext):
             # if we are in an array variable declaration
@@ -132,7 +214,7 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
                     "Blackbird SyntaxError (line {}:{}): array declaration requires a new line after '=', "
                     "followed by the indented and comma-separated array values."
                 )
-                raise BlackbirdSyntaxError(error_msg.format(line, column + 1, var_name)) from None
+                return error_msg.format(line, column + 1, var_name)
 
         # iterate up through the tree, and determine if we are in an array declaration
         parent_ctx = ctx
@@ -145,9 +227,7 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
                 var_type = parent_ctx.vartype().getText()
                 var_name = parent_ctx.name().getText()
                 syntax_msg = "Blackbird SyntaxError (line {}:{}): - array {} contains the symbol {} is not a valid {}."
-                raise BlackbirdSyntaxError(
-                    syntax_msg.format(line, column + 1, var_name, offendingSymbol.text, var_type)
-                ) from None
+                return syntax_msg.format(line, column + 1, var_name, offendingSymbol.text, var_type)
 
         if isinstance(ctx, blackbirdParser.StatementContext):
             # we are in a statement context
@@ -159,7 +239,7 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
             if msg == "mismatched input '\\n' expecting {INT, '(', '['}":
                 # there are no modes provided, raise an error
                 error_msg = "Blackbird SyntaxError (line {}:{}): statement {} is missing modes."
-                raise BlackbirdSyntaxError(error_msg.format(line, column + 1, op_name)) from None
+                return error_msg.format(line, column + 1, op_name)
 
             if "expecting {NEWLINE, ')', ']'}" in msg:
                 # there are additional integer mode numbers provided, but they are not comma separated,
@@ -168,7 +248,7 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
                     "Blackbird SyntaxError (line {}:{}): multiple modes must be separated by commas, "
                     "and optionally enclosed in either square [] or round () brackets."
                 )
-                raise BlackbirdSyntaxError(error_msg.format(line, column + 1)) from None
+                return error_msg.format(line, column + 1)
 
         if isinstance(ctx, blackbirdParser.StartContext):
             if "expecting {NEWLINE, 'name'}" in msg:
@@ -176,7 +256,7 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
                 error_msg = (
                     "Blackbird SyntaxError (line {}:{}): blackbird 'name' statement is missing."
                 )
-                raise BlackbirdSyntaxError(error_msg.format(line, column + 1)) from None
+                return error_msg.format(line, column + 1)
 
         if isinstance(ctx, blackbirdParser.MetadatablockContext):
             if "expecting {NEWLINE, 'version'}" in msg:
@@ -184,8 +264,8 @@ class BlackbirdErrorListener(antlr4.error.ErrorListener.ErrorListener):
                 error_msg = (
                     "Blackbird SyntaxError (line {}:{}): blackbird 'version' statement is missing."
                 )
-                raise BlackbirdSyntaxError(error_msg.format(line, column + 1)) from None
+                return error_msg.format(line, column + 1)
 
         # otherwise, return a general syntax error, and pass through the original ANTLR4 error message.
         error_msg = "Blackbird SyntaxError (line {}:{}): {}"
-        raise BlackbirdSyntaxError(error_msg.format(line, column + 1, msg)) from None
+        return error_msg.format(line, column + 1, msg)
@@ -0,0 +1,298 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Shot-parallel execution
+=======================
+
+**Module name:** :mod:`blackbird.executor`
+
+.. currentmodule:: blackbird.executor
+
+This module contains the class :class:`~.ShotExecutor`, which runs the
+shots of a Blackbird program in parallel across a pool of worker processes.
+
+The shots are split into chunks, and each chunk is executed by a
+:class:`~.Backend` using its own random number stream, spawned from a single
+:class:`numpy.random.SeedSequence`. The streams are statistically independent,
+and the merged samples only depend on the seed and the number of chunks, not
+on the number of worker processes or the order in which the chunks complete.
+
+Since the chunks are independent, shot throughput scales with the number of
+worker processes, up to the number of available cores.
+
+Backends only need to implement :meth:`Backend.run`. The :class:`~.LocalBackend`
+is a NumPy stand-in simulator, which does not require Strawberry Fields to be
+installed; see ``apps/strawberry_fields_listener.py`` for a backend that runs
+each chunk using Strawberry Fields.
+
+Summary
+-------
+
+.. autosummary::
+    Backend
+    LocalBackend
+    ShotExecutor
+
+Code details
+~~~~~~~~~~~~
+"""
+# pylint: disable=protected-access
+import abc
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import sympy as sym
+
+from .coherent import coherent_amplitudes, sample_coherent
+from .gaussian import sample
+from .listener import RegRefTransform
+from .program import BlackbirdProgram
+from .tracing import traced
+
+
+class Backend(abc.ABC):
+    """Abstract base class for backends that can be used with the :class:`~.ShotExecutor`.
+
+    Backends are sent to the worker processes, and therefore must be picklable.
+    """
+
+    @abc.abstractmethod
+    def run(self, program, shots, seed):
+        """Execute a number of shots of a program.
+
+        Args:
+            program (BlackbirdProgram): program to execute
+            shots (int): number of shots
+            seed (numpy.random.SeedSequence): seed of the random number stream
+                to use for these shots
+
+        Returns:
+            array: array of size ``[shots, num_modes]``, containing
+            the measurement results of each shot
+        """
+
+
+class LocalBackend(Backend):
+    """Local NumPy simulator backend.
+
+    Programs that only prepare coherent states, apply passive linear optics,
+    and count photons are sampled using :func:`~.sample_coherent`; all other
+    programs are sampled as Gaussian programs using :func:`~.gaussian.sample`.
+
+    Args:
+        hbar (float): the value of :math:`\\hbar` used for homodyne and heterodyne
+            measurements. If not provided, the ``hbar`` option of the program
+            target is used, defaulting to 2.
+    """
+
+    def __init__(self, hbar=None):
+        self.hbar = hbar
+
+    @traced("backend.run")
+    def run(self, program, shots, seed):
+        if coherent_amplitudes(program) is not None:
+            return sample_coherent(program, shots=shots, seed=seed)
+
+        return sample(program, shots=shots, hbar=self.hbar, seed=seed)
+
+
+class _Expression(str):
+    """Expression of a register transform, sent to the worker processes in its place."""
+
+
+def _encode(values, decode=False):
+    """Replace the register transforms of a list or dictionary of operation
+    arguments by their expression, or recreate them from their expression.
+
+    Args:
+        values (list or dict): positional or keyword arguments
+        decode (bool): whether to recreate the register transforms
+
+    Returns:
+        list or dict: the converted arguments
+    """
+
+    def convert(value):
+        if decode and isinstance(value, _Expression):
+            return RegRefTransform(sym.sympify(str(value)))
+
+        if not decode and isinstance(value, RegRefTransform):
+            return _Expression(value.func_str)
+
+        return value
+
+    if isinstance(values, dict):
+        return {k: convert(v) for k, v in values.items()}
+
+    return [convert(v) for v in values]
+
+
+def _dumps(program):
+    """Pickle a program, to send it to the worker processes.
+
+    Register transforms hold functions generated by SymPy, which cannot be
+    pickled, and are stored as their expression. Unlike the serialized
+    Blackbird source code, the pickle preserves the exact argument values,
+    so that the workers execute the same operations as the current process.
+
+    Args:
+        program (BlackbirdProgram): the program
+
+    Returns:
+        bytes: the pickled program
+    """
+    operations = []
+
+    for op in program.operations:
+        op = dict(op)
+
+        for key in ("args", "kwargs"):
+            if key in op:
+                op[key] = _encode(op[key])
+
+        operations.append(op)
+
+    state = (program.name, program.version, program.target, dict(program._var), operations)
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+@lru_cache(maxsize=16)
+def _loads(data):
+    """Unpickle the program sent to a worker process, caching the result
+    so that chunks of the same program are only unpickled once per worker."""
+    name, version, target, variables, operations = pickle.loads(data)
+
+    program = BlackbirdProgram(name=name, version=version)
+    program._target = target
+    program._var.update(variables)
+
+    for op in operations:
+        for key in ("args", "kwargs"):
+            if key in op:
+                op[key] = _encode(op[key], decode=True)
+
+        program._operations.append(op)
+        program._modes.update(op["modes"])
+
+    return program
+
+
+def _run_chunk(backend, data, shots, seed):
+    """Execute a chunk of shots of a pickled program in a worker process."""
+    return np.asarray(backend.run(_loads(data), shots, seed))
+
+
+class ShotExecutor:
+    """Executes the shots of Blackbird programs in parallel.
+
+    The executor can be used as a context manager, in which case the
+    worker processes are shut down on exit; otherwise, :meth:`close` should
+    be called once the executor is no longer needed.
+
+    Args:
+        backend (Backend): backend used to execute each chunk of shots.
+            Defaults to the :class:`~.LocalBackend`.
+        workers (int): number of worker processes. Defaults to the number of
+            available cores. If 1, all chunks are executed in the current process.
+        chunks (int): number of chunks the shots are split into. Defaults to the
+            number of workers. Fix this value to obtain the same samples for a given
+            seed, independently of the number of workers.
+    """
+
+    def __init__(self, backend=None, workers=None, chunks=None):
+        self.backend = backend if backend is not None else LocalBackend()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunks = chunks or self.workers
+
+        if self.workers < 1 or self.chunks < 1:
+            raise ValueError("The number of workers and chunks must be positive")
+
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def split(self, shots):
+        """Split a number of shots into chunks of nearly equal size.
+
+        Args:
+            shots (int): number of shots
+
+        Returns:
+            list[int]: number of shots in each non-empty chunk
+        """
+        num, rem = divmod(shots, self.chunks)
+        sizes = [num + 1] * rem + [num] * (self.chunks - rem)
+        return [s for s in sizes if s]
+
+    @traced("executor.run")
+    def run(self, program, shots=None, seed=None):
+        """Execute the shots of a program, and merge the results.
+
+        Args:
+            program (BlackbirdProgram): program to execute
+            shots (int): number of shots. If not provided, the ``shots`` option of the
+                program target is used, defaulting to 1.
+            seed (int or numpy.random.SeedSequence): seed of the random number streams
+
+        Returns:
+            array: array of size ``[shots, num_modes]``, containing
+            the measurement results of each shot
+        """
+        if not isinstance(program, BlackbirdProgram):
+            raise TypeError("Expected a BlackbirdProgram, not {}".format(type(program).__name__))
+
+        if shots is None:
+            shots = program.target["options"].get("shots", 1)
+
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+
+        sizes = self.split(shots)
+        seeds = seed.spawn(len(sizes))
+
+        if self.workers == 1 or len(sizes) <= 1:
+            results = [
+                np.asarray(self.backend.run(program, n, s))
+                for n, s in zip(sizes, seeds)
+            ]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers)
+
+            data = _dumps(program)
+            futures = [
+                self._pool.submit(_run_chunk, self.backend, data, n, s)
+                for n, s in zip(sizes, seeds)
+            ]
+            results = [f.result() for f in futures]
+
+        if not results:
+            num_modes = max(program.modes) + 1 if program.modes else 0
+            return np.empty((0, num_modes))
+
+        return np.concatenate(results)
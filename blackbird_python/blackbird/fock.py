@@ -0,0 +1,670 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Fock backend
+============
+
+**Module name:** :mod:`blackbird.fock`
+
+.. currentmodule:: blackbird.fock
+
+This module contains a reference simulator in the truncated Fock basis,
+which executes a :class:`~.BlackbirdProgram` directly using NumPy,
+following the `Strawberry Fields conventions <https://strawberryfields.readthedocs.io/en/latest/conventions/gates.html>`_.
+
+The state of :math:`N` modes with cutoff dimension :math:`D` is stored either
+as a ket, with :math:`N` axes of size :math:`D`, or as a density matrix with
+:math:`2N` axes, the first :math:`N` corresponding to the ket and the last
+:math:`N` to the bra. The backend starts with a pure state, and only switches
+to the mixed representation when an operation requires it: a channel, a mixed
+state preparation, or a state preparation on a mode entangled with the others.
+
+Operations are applied as tensor contractions on the axes of the modes they act on,
+using :func:`numpy.einsum` with precomputed subscripts, rather than as matrices acting
+on the full Fock space. Multimode operations are decomposed into one- and two-mode
+operations: interferometers into two-mode rotations, and Gaussian transformations
+using the Bloch-Messiah decomposition.
+
+The matrix elements of passive two-mode gates are computed exactly, in each
+subspace of fixed total photon number. Those of the other gates are computed by
+exponentiating their generators in a Fock space with twice the cutoff
+dimension, before truncating, and are cached.
+
+Summary
+-------
+
+.. autosummary::
+    fock_gate
+    passive_gate
+    loss_superoperator
+    FockBackend
+    simulate
+
+Code details
+~~~~~~~~~~~~
+"""
+import functools
+import string
+
+import numpy as np
+
+from .program import is_measurement
+from .symplectic import bloch_messiah, constant_args, gaussian_gate, williamson
+
+
+_LETTERS = string.ascii_letters
+"""str: letters used in einsum subscripts"""
+
+
+_PATH = ["einsum_path", (0, 1)]
+"""list: einsum contraction path of a gate and a state, allowing einsum to dispatch to BLAS"""
+
+
+def _ladder(dim):
+    """Annihilation, creation, position and momentum operators, up to a factor of
+    :math:`\\sqrt{\\hbar/2}` for the quadratures, in a truncated Fock space"""
+    a = np.diag(np.sqrt(np.arange(1, dim)), 1).astype(np.complex128)
+    ad = a.T
+    return a, ad, a + ad, -1j * (a - ad)
+
+
+def _exp_hermitian(G):
+    """Compute :math:`e^{iG}` for a Hermitian matrix :math:`G`."""
+    w, v = np.linalg.eigh(G)
+    return (v * np.exp(1j * w)) @ v.conj().T
+
+
+def _generator(name, args, dim, hbar):
+    """Hermitian generator :math:`G` of a gate :math:`e^{iG}` in a truncated Fock space.
+
+    Args:
+        name (str): name of the gate
+        args (tuple): numeric arguments of the gate
+        dim (int): dimension of the truncated space of each mode
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+
+    Returns:
+        array: the generator
+    """
+    a, ad, x, p = _ladder(dim)
+    x = np.sqrt(hbar / 2) * x
+    p = np.sqrt(hbar / 2) * p
+
+    if name == "Dgate":
+        r, phi = (list(args) + [0])[:2]
+        alpha = r * np.exp(1j * phi)
+        return -1j * (alpha * ad - np.conj(alpha) * a)
+
+    if name == "Xgate":
+        return -args[0] * p / hbar
+
+    if name == "Zgate":
+        return args[0] * x / hbar
+
+    if name == "Sgate":
+        r, phi = (list(args) + [0])[:2]
+        return -0.5j * r * (np.exp(-1j * phi) * a @ a - np.exp(1j * phi) * ad @ ad)
+
+    if name == "Pgate":
+        return args[0] * x @ x / (2 * hbar)
+
+    if name == "Vgate":
+        return args[0] * x @ x @ x / (3 * hbar)
+
+    if name == "S2gate":
+        r, phi = (list(args) + [0])[:2]
+        z = r * np.exp(1j * phi)
+        return -1j * (z * np.kron(ad, ad) - np.conj(z) * np.kron(a, a))
+
+    if name == "CXgate":
+        s = args[0] if args else 1
+        return -s * np.kron(x, p) / hbar
+
+    if name == "CZgate":
+        s = args[0] if args else 1
+        return s * np.kron(x, x) / hbar
+
+    raise ValueError("Gate {} has no Fock representation".format(name))
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_gate(name, args, cutoff, hbar):
+    """Fock representation of a gate with hashable arguments; see :func:`fock_gate`."""
+    n = np.arange(cutoff)
+
+    if name == "Rgate":
+        return np.diag(np.exp(1j * args[0] * n))
+
+    if name == "Kgate":
+        return np.diag(np.exp(1j * args[0] * n ** 2))
+
+    if name == "CKgate":
+        phase = np.exp(1j * args[0] * np.outer(n, n)).ravel()
+        return np.diag(phase).reshape((cutoff,) * 4)
+
+    if name == "BSgate":
+        S, _ = gaussian_gate(name, args)
+        return passive_gate(S[:2, :2] + 1j * S[2:, :2], cutoff)
+
+    # exponentiate in a larger space to reduce truncation errors
+    dim = 2 * cutoff
+    U = _exp_hermitian(_generator(name, args, dim, hbar))
+
+    if U.shape == (dim, dim):
+        return U[:cutoff, :cutoff]
+
+    return U.reshape((dim,) * 4)[:cutoff, :cutoff, :cutoff, :cutoff]
+
+
+def fock_gate(name, args, cutoff, hbar=2):
+    """Fock representation of a one- or two-mode gate.
+
+    Args:
+        name (str): name of the gate
+        args (list): numeric arguments of the gate
+        cutoff (int): cutoff dimension of each mode
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+
+    Returns:
+        array: the matrix elements of the gate, with shape ``[D, D]`` for single
+        mode gates, and ``[D, D, D, D]`` for two-mode gates, where the output
+        indices precede the input indices
+
+    Raises:
+        ValueError: if the gate has no Fock representation
+    """
+    return _cached_gate(name, tuple(args), cutoff, hbar)
+
+
+def passive_gate(u, cutoff):
+    """Fock representation of a two-mode passive linear optical transformation.
+
+    The transformation maps the coherent state :math:`\\ket{\\alpha}` to
+    :math:`\\ket{u\\alpha}`. As it conserves the total photon number, it is
+    computed exactly, by exponentiating its generator separately in each
+    subspace of fixed total photon number.
+
+    Args:
+        u (array): :math:`2\\times 2` unitary matrix
+        cutoff (int): cutoff dimension of each mode
+
+    Returns:
+        array: the matrix elements of the transformation, with shape ``[D, D, D, D]``
+    """
+    # u is normal, so it is diagonalized by the eigenvectors of a generic
+    # Hermitian combination of its Hermitian and anti-Hermitian parts
+    K = (u + u.conj().T) / 2 + np.pi * (u - u.conj().T) / 2j
+    _, v = np.linalg.eigh(K)
+    w = np.diag(v.conj().T @ u @ v)
+    H = (v * np.angle(w)) @ v.conj().T
+
+    U = np.zeros((cutoff,) * 4, dtype=np.complex128)
+
+    for N in range(2 * cutoff - 1):
+        # generator sum_ij H_ij a_i^dagger a_j in the basis |n, N-n>
+        n = np.arange(N + 1)
+        G = np.diag(H[0, 0] * n + H[1, 1] * (N - n))
+        off = np.sqrt((n[:-1] + 1) * (N - n[:-1]))
+        G[n[1:], n[:-1]] = H[0, 1] * off
+        G[n[:-1], n[1:]] = H[1, 0] * off
+
+        # keep the states with both photon numbers below the cutoff
+        n = n[(n < cutoff) & (N - n < cutoff)]
+        U_N = _exp_hermitian(G)[np.ix_(n, n)]
+        U[n[:, None], N - n[:, None], n[None, :], N - n[None, :]] = U_N
+
+    return U
+
+
+@functools.lru_cache(maxsize=64)
+def loss_superoperator(T, nbar, cutoff):
+    """Superoperator of a single mode (thermal) loss channel.
+
+    The channel is computed by mixing the mode with a thermal environment
+    on a beamsplitter of transmissivity :math:`T`, and tracing out the environment.
+
+    Args:
+        T (float): transmissivity of the channel
+        nbar (float): mean photon number of the thermal environment
+        cutoff (int): cutoff dimension
+
+    Returns:
+        array: the superoperator, with shape ``[D, D, D, D]``, and indices
+        ordered as (output ket, output bra, input ket, input bra)
+    """
+    theta = np.arccos(np.sqrt(T))
+    B = _cached_gate("BSgate", (theta, 0.0), cutoff, 2)
+
+    n = np.arange(cutoff)
+    env = nbar ** n / (1 + nbar) ** (n + 1)
+
+    # indices: out mode, out env, in mode, in env
+    return np.einsum("ifke,jfle,e->ijkl", B, B.conj(), env)
+
+
+def _givens(U):
+    """Decompose a unitary matrix into two-mode rotations and phases.
+
+    Args:
+        U (array): unitary matrix
+
+    Returns:
+        tuple[array, list[tuple[int, int, array]]]: the phases applied to each mode,
+        followed by the two-mode rotations ``(i, j, u)``, in the order they are applied
+    """
+    U = np.array(U, dtype=np.complex128)
+    k = len(U)
+    rotations = []
+
+    # left-multiply by rotations on adjacent rows until U is diagonal
+    for c in range(k - 1):
+        for r in range(k - 1, c, -1):
+            a, b = U[r - 1, c], U[r, c]
+            norm = np.sqrt(abs(a) ** 2 + abs(b) ** 2)
+
+            if abs(b) < 1e-14:
+                continue
+
+            G = np.array([[np.conj(a), np.conj(b)], [-b, a]]) / norm
+            U[[r - 1, r], :] = G @ U[[r - 1, r], :]
+            rotations.append((r - 1, r, G.conj().T))
+
+    return np.angle(np.diag(U)), rotations[::-1]
+
+
+@functools.lru_cache(maxsize=64)
+def _subscripts(num_axes, axes):
+    """Einsum subscripts contracting a gate with the given axes of a state.
+
+    Args:
+        num_axes (int): number of axes of the state
+        axes (tuple[int]): axes the gate acts on
+
+    Returns:
+        str: einsum subscripts, with the gate as first operand
+    """
+    state = _LETTERS[:num_axes]
+    new = _LETTERS[num_axes : num_axes + len(axes)]
+    gate = new + "".join(state[i] for i in axes)
+
+    out = list(state)
+    for i, a in zip(axes, new):
+        out[i] = a
+
+    return "{},{}->{}".format(gate, state, "".join(out))
+
+
+class FockBackend:
+    """Reference simulator for Blackbird programs in the truncated Fock basis.
+
+    All modes are initialized in the vacuum state.
+
+    Args:
+        num_modes (int): number of modes
+        cutoff (int): cutoff dimension of each mode
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+        pure (bool): whether to start with the pure state representation. If ``True``,
+            the backend switches to the mixed representation when required.
+    """
+
+    def __init__(self, num_modes, cutoff, hbar=2, pure=True):
+        self.num_modes = num_modes
+        self.cutoff = cutoff
+        self.hbar = hbar
+        self._start_pure = pure
+
+        self.results = []
+        """list[tuple[int, float]]: the mode and mean photon number of each
+        ``MeasureIntensity`` statement executed"""
+
+        self.reset()
+
+    @property
+    def state(self):
+        """The state of the modes.
+
+        Returns:
+            array: the ket, with shape ``[D]*N``, or the density matrix,
+            with shape ``[D]*2N``
+        """
+        return self._state
+
+    @property
+    def is_pure(self):
+        """Whether the state is stored as a ket.
+
+        Returns:
+            bool: ``True`` for the pure representation
+        """
+        return self._pure
+
+    def reset(self):
+        """Reset all modes to the vacuum state."""
+        N = self.num_modes
+        D = self.cutoff
+
+        vacuum = np.zeros((D,) * N, dtype=np.complex128)
+        vacuum[(0,) * N] = 1
+
+        self._pure = True
+        self._state = vacuum
+
+        # pure states of the modes that are known to be in a product state with the rest
+        self._product = {m: np.identity(D)[0].astype(np.complex128) for m in range(N)}
+        self.results = []
+
+        if not self._start_pure:
+            self.to_mixed()
+
+    def to_mixed(self):
+        """Switch to the density matrix representation."""
+        if self._pure:
+            self._state = np.multiply.outer(self._state, self._state.conj())
+            self._pure = False
+            self._product = {}
+
+    def _contract(self, gate, axes):
+        """Contract a gate with axes of the state."""
+        subscripts = _subscripts(self._state.ndim, tuple(axes))
+        self._state = np.einsum(subscripts, gate, self._state, optimize=_PATH)
+
+    def apply(self, U, modes):
+        """Apply a unitary operation to modes.
+
+        Args:
+            U (array): matrix elements of the operation, with shape ``[D]*2k``
+                for an operation acting on :math:`k` modes
+            modes (Sequence[int]): modes the operation acts on
+        """
+        modes = list(modes)
+        self._contract(U, modes)
+
+        if not self._pure:
+            self._contract(U.conj(), [m + self.num_modes for m in modes])
+            return
+
+        if len(modes) == 1 and modes[0] in self._product:
+            self._product[modes[0]] = U @ self._product[modes[0]]
+        else:
+            for m in modes:
+                self._product.pop(m, None)
+
+    def channel(self, E, mode):
+        """Apply a single mode channel.
+
+        Args:
+            E (array): superoperator of the channel, with indices ordered as
+                (output ket, output bra, input ket, input bra)
+            mode (int): mode the channel acts on
+        """
+        self.to_mixed()
+        self._contract(E, [mode, mode + self.num_modes])
+
+    def prepare(self, state, mode):
+        """Replace the state of a mode.
+
+        Args:
+            state (array): ket with shape ``[D]``, or density matrix with shape ``[D, D]``
+            mode (int): mode to prepare
+        """
+        N = self.num_modes
+
+        if self._pure and state.ndim == 1 and mode in self._product:
+            # the mode is in a product state with the others; project it out
+            ket = self._product[mode]
+            rest = np.tensordot(ket.conj(), self._state, axes=(0, mode)) / np.vdot(ket, ket)
+            self._state = np.moveaxis(np.multiply.outer(rest, state), -1, mode)
+            self._product[mode] = state
+            return
+
+        self.to_mixed()
+
+        if state.ndim == 1:
+            state = np.outer(state, state.conj())
+
+        rest = np.trace(self._state, axis1=mode, axis2=mode + N)
+        self._state = np.moveaxis(np.multiply.outer(rest, state), [-2, -1], [mode, mode + N])
+
+    def reduced_dm(self, mode):
+        """The reduced density matrix of a mode.
+
+        Args:
+            mode (int): mode
+
+        Returns:
+            array: density matrix with shape ``[D, D]``
+        """
+        N = self.num_modes
+        others = [m for m in range(N) if m != mode]
+
+        if self._pure:
+            return np.tensordot(self._state, self._state.conj(), axes=(others, others))
+
+        ket = _LETTERS[:N]
+        bra = "".join(_LETTERS[N + m] if m == mode else ket[m] for m in range(N))
+        return np.einsum("{}{}->{}{}".format(ket, bra, ket[mode], bra[mode]), self._state)
+
+    def mean_photon(self, mode):
+        """The mean photon number of a mode.
+
+        Args:
+            mode (int): mode
+
+        Returns:
+            float: mean photon number
+        """
+        return np.real(np.arange(self.cutoff) @ np.diag(self.reduced_dm(mode)))
+
+    def quad_expectation(self, mode):
+        """The expectation values of the quadratures of a mode.
+
+        Args:
+            mode (int): mode
+
+        Returns:
+            tuple[float, float]: the means of the position and momentum quadratures
+        """
+        a, _, _, _ = _ladder(self.cutoff)
+        alpha = np.trace(self.reduced_dm(mode) @ a)
+        return np.sqrt(2 * self.hbar) * alpha.real, np.sqrt(2 * self.hbar) * alpha.imag
+
+    def probabilities(self):
+        """The photon number probabilities of all modes.
+
+        Returns:
+            array: probabilities with shape ``[D]*N``
+        """
+        if self._pure:
+            return np.abs(self._state) ** 2
+
+        ket = _LETTERS[: self.num_modes]
+        return np.einsum("{0}{0}->{0}".format(ket), self._state).real
+
+    def interferometer(self, U, modes):
+        """Apply a passive linear optical interferometer, as a sequence of
+        two-mode rotations and single mode phases.
+
+        Args:
+            U (array): unitary matrix acting on the modes
+            modes (Sequence[int]): modes the interferometer acts on
+        """
+        phases, rotations = _givens(U)
+
+        for m, phi in zip(modes, phases):
+            if abs(phi) > 1e-14:
+                self.apply(fock_gate("Rgate", [phi], self.cutoff), [m])
+
+        for i, j, u in rotations:
+            self.apply(passive_gate(u, self.cutoff), [modes[i], modes[j]])
+
+    def symplectic(self, S, modes):
+        """Apply a Gaussian transformation, using its Bloch-Messiah decomposition.
+
+        Args:
+            S (array): symplectic matrix acting on the modes, in the :math:`xxpp` ordering
+            modes (Sequence[int]): modes the transformation acts on
+        """
+        n = len(modes)
+        O1, r, O2 = bloch_messiah(np.asarray(S, dtype=np.float64))
+
+        self.interferometer(O2[:n, :n] + 1j * O2[n:, :n], modes)
+
+        for m, r_m in zip(modes, r):
+            if abs(r_m) > 1e-14:
+                self.apply(fock_gate("Sgate", [r_m], self.cutoff, self.hbar), [m])
+
+        self.interferometer(O1[:n, :n] + 1j * O1[n:, :n], modes)
+
+    def gaussian_state(self, cov, means, modes):
+        """Prepare a Gaussian state, from its Williamson decomposition.
+
+        Args:
+            cov (array): covariance matrix of the modes, in the :math:`xxpp` ordering
+            means (array): vector of means of the modes
+            modes (Sequence[int]): modes to prepare
+        """
+        n = len(modes)
+        nu, S = williamson(np.asarray(cov, dtype=np.float64))
+
+        for m, nu_m in zip(modes, nu):
+            nbar = max((nu_m / (self.hbar / 2) - 1) / 2, 0)
+            self.prepare(_thermal(nbar, self.cutoff), m)
+
+        self.symplectic(S, modes)
+
+        for m, x, p in zip(modes, means[:n], means[n:]):
+            alpha = (x + 1j * p) / np.sqrt(2 * self.hbar)
+            if abs(alpha) > 1e-14:
+                self.apply(fock_gate("Dgate", [abs(alpha), np.angle(alpha)], self.cutoff, self.hbar), [m])
+
+    def execute(self, op):
+        """Execute a Blackbird operation.
+
+        Args:
+            op (dict): operation
+
+        Raises:
+            ValueError: if the operation is not supported, or its arguments
+                are not numeric constants
+        """
+        name = op["op"]
+        modes = op["modes"]
+        args = constant_args(op)
+        D = self.cutoff
+
+        if args is None:
+            raise ValueError(
+                "Operation {} on modes {} does not have constant numeric arguments".format(
+                    name, modes
+                )
+            )
+
+        if name == "MeasureIntensity":
+            self.results.append((modes[0], self.mean_photon(modes[0])))
+        elif is_measurement(op):
+            raise ValueError("Measurement {} is not supported by the Fock backend".format(name))
+        elif name in ("Vacuum", "Vac"):
+            self.prepare(np.identity(D)[0].astype(np.complex128), modes[0])
+        elif name == "Fock":
+            self.prepare(np.identity(D)[args[0]].astype(np.complex128), modes[0])
+        elif name == "Coherent":
+            self.prepare(_coherent(*args, cutoff=D), modes[0])
+        elif name == "Catstate":
+            self.prepare(_catstate(*args, cutoff=D), modes[0])
+        elif name == "Squeezed":
+            self.prepare(fock_gate("Sgate", args, D, self.hbar)[:, 0], modes[0])
+        elif name == "Thermal":
+            self.prepare(_thermal(args[0], D), modes[0])
+        elif name == "LossChannel":
+            self.channel(loss_superoperator(args[0], 0.0, D), modes[0])
+        elif name == "ThermalLossChannel":
+            self.channel(loss_superoperator(args[0], args[1], D), modes[0])
+        elif name == "Interferometer":
+            self.interferometer(args[0], modes)
+        elif name == "GaussianTransform":
+            self.symplectic(args[0], modes)
+        elif name == "Gaussian":
+            cov = np.asarray(args[0])
+            means = np.zeros(len(cov)) if len(args) == 1 else np.ravel(args[1])
+            self.gaussian_state(cov, means, modes)
+        else:
+            self.apply(fock_gate(name, args, D, self.hbar), modes)
+
+    def run(self, program):
+        """Execute all operations of a Blackbird program.
+
+        Args:
+            program (BlackbirdProgram): program to execute; all its arguments must
+                be numeric constants
+
+        Returns:
+            FockBackend: the backend, in the final state of the program
+        """
+        for op in program.operations:
+            self.execute(op)
+
+        return self
+
+
+def _coherent(r, phi=0, cutoff=None):
+    """Ket of a coherent state."""
+    alpha = r * np.exp(1j * phi)
+    n = np.arange(cutoff)
+    fact = np.cumprod(np.concatenate([[1], np.sqrt(n[1:])]))
+    return np.exp(-abs(alpha) ** 2 / 2) * alpha ** n / fact
+
+
+def _catstate(alpha, p=0, cutoff=None):
+    """Normalized ket of a cat state :math:`\\ket{\\alpha}+e^{i\\pi p}\\ket{-\\alpha}`."""
+    ket = _coherent(abs(alpha), np.angle(alpha), cutoff=cutoff)
+    ket = ket + np.exp(1j * np.pi * p) * ket * (-1) ** np.arange(cutoff)
+    return ket / np.linalg.norm(ket)
+
+
+def _thermal(nbar, cutoff):
+    """Density matrix of a thermal state."""
+    n = np.arange(cutoff)
+    return np.diag(nbar ** n / (1 + nbar) ** (n + 1)).astype(np.complex128)
+
+
+def simulate(program, cutoff=None, hbar=None):
+    """Simulate a Blackbird program in the truncated Fock basis.
+
+    Args:
+        program (BlackbirdProgram): program to simulate
+        cutoff (int): cutoff dimension of each mode. If not provided, the
+            ``cutoff_dim`` option of the program target is used.
+        hbar (float): the value of :math:`\\hbar` in the commutation relation.
+            If not provided, the ``hbar`` option of the program target is used,
+            defaulting to 2.
+
+    Returns:
+        FockBackend: the backend, in the final state of the program
+
+    Raises:
+        ValueError: if no cutoff dimension is provided
+    """
+    options = program.target["options"]
+
+    if cutoff is None:
+        if "cutoff_dim" not in options:
+            raise ValueError("A cutoff dimension is required to simulate in the Fock basis")
+        cutoff = options["cutoff_dim"]
+
+    if hbar is None:
+        hbar = options.get("hbar", 2)
+
+    num_modes = max(program.modes) + 1 if program.modes else 0
+    return FockBackend(num_modes, cutoff, hbar=hbar).run(program)
@@ -0,0 +1,470 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Gaussian backend
+================
+
+**Module name:** :mod:`blackbird.gaussian`
+
+.. currentmodule:: blackbird.gaussian
+
+This module contains a reference Gaussian simulator, which executes a
+:class:`~.BlackbirdProgram` directly using NumPy. The state of the modes is
+represented by its covariance matrix and vector of quadrature means,
+using the :math:`xxpp` ordering and the conventions of :mod:`blackbird.symplectic`.
+
+An operation acting on :math:`k` modes only modifies the :math:`2k` rows and
+columns of the covariance matrix corresponding to those modes. Rather than
+expanding the symplectic matrix of the operation to the full :math:`2N\\times 2N`
+size, the backend updates these rows and columns in place,
+
+.. math::
+    V_{[\\mathrm{idx},:]} \\mapsto S V_{[\\mathrm{idx},:]}, \\qquad
+    V_{[:,\\mathrm{idx}]} \\mapsto V_{[:,\\mathrm{idx}]} S^T,
+
+so that each one- or two-mode gate costs :math:`\\mathcal{O}(N)` rather than
+:math:`\\mathcal{O}(N^3)`.
+
+For programs without feed-forward, :func:`sample` computes the state once,
+and draws the homodyne and heterodyne outcomes of all shots in a single
+vectorized multivariate normal draw.
+
+The backend can also simulate a batch of programs with the same structure
+at once, by providing a batch shape; the covariance matrix and vector of
+means then have leading batch dimensions, and the operations accept arguments
+stacked along these dimensions. This is used by :mod:`blackbird.batch`.
+
+Summary
+-------
+
+.. autosummary::
+    GaussianBackend
+    simulate
+    sample
+
+Code details
+~~~~~~~~~~~~
+"""
+import numpy as np
+
+from .program import is_measurement
+from .symplectic import (
+    GAUSSIAN_GATES,
+    GAUSSIAN_STATES,
+    constant_args,
+    gaussian_gate,
+    gaussian_state,
+)
+
+
+_DISPLACEMENTS = {"Dgate", "Xgate", "Zgate"}
+"""set[str]: Gaussian gates that only displace the vector of means"""
+
+
+_HOMODYNE = {"MeasureHomodyne": None, "MeasureX": 0.0, "MeasureP": np.pi / 2}
+"""dict[str->float]: homodyne measurements, and their fixed quadrature angle"""
+
+
+_HETERODYNE = {"MeasureHeterodyne", "MeasureHD"}
+"""set[str]: heterodyne measurements"""
+
+
+class GaussianBackend:
+    """Reference NumPy simulator for Gaussian Blackbird programs.
+
+    All modes are initialized in the vacuum state.
+
+    Args:
+        num_modes (int): number of modes
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+        batch_shape (tuple[int]): leading batch dimensions of the state, for
+            simulating a batch of programs with the same structure
+    """
+
+    def __init__(self, num_modes, hbar=2, batch_shape=()):
+        self.num_modes = num_modes
+        self.hbar = hbar
+        self.batch_shape = tuple(batch_shape)
+
+        self.results = []
+        """list[tuple[int, float]]: the mode and mean photon number of each
+        ``MeasureIntensity`` statement executed"""
+
+        self.reset()
+
+    @property
+    def cov(self):
+        """The covariance matrix of the modes, in the :math:`xxpp` ordering.
+
+        Returns:
+            array: covariance matrix of size :math:`[2N, 2N]`, with leading
+            batch dimensions
+        """
+        return self._cov
+
+    @property
+    def means(self):
+        """The vector of quadrature means of the modes, in the :math:`xxpp` ordering.
+
+        Returns:
+            array: vector of means of size :math:`[2N]`, with leading batch dimensions
+        """
+        return self._means
+
+    def _indices(self, modes):
+        """Rows of the covariance matrix corresponding to the provided modes"""
+        modes = np.asarray(modes, dtype=np.intp)
+        return np.concatenate([modes, modes + self.num_modes])
+
+    def reset(self, modes=None):
+        """Reset modes to the vacuum state.
+
+        Args:
+            modes (Sequence[int] or None): modes to reset. If not provided,
+                all modes are reset.
+        """
+        if modes is None:
+            n = 2 * self.num_modes
+            self._cov = np.zeros(self.batch_shape + (n, n))
+            self._cov[..., np.arange(n), np.arange(n)] = self.hbar / 2
+            self._means = np.zeros(self.batch_shape + (n,))
+            self.results = []
+            return
+
+        idx = self._indices(modes)
+        self._cov[..., idx, :] = 0
+        self._cov[..., :, idx] = 0
+        self._cov[..., idx, idx] = self.hbar / 2
+        self._means[..., idx] = 0
+
+    def prepare(self, cov, means, modes):
+        """Replace the state of modes by a Gaussian state.
+
+        Any correlations between the prepared modes and the remaining modes are removed.
+
+        Args:
+            cov (array): covariance matrix of the prepared modes
+            means (array): vector of means of the prepared modes
+            modes (Sequence[int]): modes to prepare
+        """
+        idx = self._indices(modes)
+        self._cov[..., idx, :] = 0
+        self._cov[..., :, idx] = 0
+        self._cov[..., idx[:, None], idx] = cov
+        self._means[..., idx] = means
+
+    def apply(self, S, d, modes):
+        """Apply a Gaussian unitary operation to modes.
+
+        Only the rows and columns of the covariance matrix corresponding to the
+        modes are updated.
+
+        Args:
+            S (array): local symplectic matrix of the operation
+            d (array): local displacement of the operation
+            modes (Sequence[int]): modes the operation acts on
+        """
+        idx = self._indices(modes)
+        self._cov[..., idx, :] = S @ self._cov[..., idx, :]
+        self._cov[..., :, idx] = self._cov[..., :, idx] @ np.swapaxes(S, -1, -2)
+        self._means[..., idx] = (S @ self._means[..., idx, None])[..., 0] + d
+
+    def displace(self, d, modes):
+        """Displace the quadrature means of modes.
+
+        Args:
+            d (array): local displacement
+            modes (Sequence[int]): modes to displace
+        """
+        self._means[..., self._indices(modes)] += d
+
+    def loss(self, T, mode, nbar=0):
+        """Apply a (thermal) loss channel to a mode.
+
+        Args:
+            T (float): transmissivity of the channel
+            mode (int): mode the channel acts on
+            nbar (float): mean photon number of the thermal environment
+        """
+        idx = self._indices([mode])
+        T = np.asarray(T)[..., None]
+        nbar = np.asarray(nbar)[..., None]
+
+        self._cov[..., idx, :] *= np.sqrt(T)[..., None]
+        self._cov[..., :, idx] *= np.sqrt(T)[..., None, :]
+        self._cov[..., idx, idx] += (1 - T) * (2 * nbar + 1) * self.hbar / 2
+        self._means[..., idx] *= np.sqrt(T)
+
+    def reduced_state(self, modes):
+        """The covariance matrix and vector of means of a subset of the modes.
+
+        Args:
+            modes (Sequence[int]): modes
+
+        Returns:
+            tuple[array, array]: the reduced covariance matrix and vector of means
+        """
+        idx = self._indices(modes)
+        return self._cov[..., idx[:, None], idx], self._means[..., idx]
+
+    def mean_photon(self, mode):
+        """The mean photon number of a mode.
+
+        Args:
+            mode (int): mode
+
+        Returns:
+            float: mean photon number
+        """
+        cov, means = self.reduced_state([mode])
+        return (np.trace(cov, axis1=-2, axis2=-1) + np.sum(means ** 2, axis=-1)) / (
+            2 * self.hbar
+        ) - 0.5
+
+    def sample(self, homodyne, heterodyne, shots, seed=None):
+        """Sample joint homodyne and heterodyne measurements of the current state.
+
+        All shots are drawn in a single vectorized call, from the multivariate
+        normal distribution of the measured quadratures.
+
+        Args:
+            homodyne (dict[int->float]): mapping from the modes measured using
+                homodyne detection to the measured quadrature angle; for batched
+                states, the angles may be arrays of the batch shape
+            heterodyne (Sequence[int]): modes measured using heterodyne detection
+            shots (int): number of samples
+            seed (int or numpy.random.Generator): seed or random number generator
+
+        Returns:
+            array: array of size ``[shots, num_modes]``, with leading batch dimensions,
+            containing the measured quadrature of each homodyne mode, the measured
+            complex amplitude of each heterodyne mode, and NaN for modes that are
+            not measured
+        """
+        rng = np.random.default_rng(seed)
+        batch = self.batch_shape
+
+        modes = list(homodyne) + list(heterodyne)
+        k = len(homodyne)
+        h = len(heterodyne)
+        n = len(modes)
+
+        phi = np.zeros(batch + (k,))
+        for i, angle in enumerate(homodyne.values()):
+            phi[..., i] = angle
+
+        # linear map from the quadratures of the measured modes to the sampled variables;
+        # a homodyne mode contributes one variable, a heterodyne mode two
+        M = np.zeros(batch + (k + 2 * h, 2 * n))
+        M[..., np.arange(k), np.arange(k)] = np.cos(phi)
+        M[..., np.arange(k), np.arange(k) + n] = np.sin(phi)
+        M[..., k + np.arange(h), k + np.arange(h)] = 1
+        M[..., k + h + np.arange(h), k + n + np.arange(h)] = 1
+
+        cov, means = self.reduced_state(modes)
+        cov = M @ cov @ np.swapaxes(M, -1, -2)
+        means = (M @ means[..., None])[..., 0]
+
+        # heterodyne detection adds a vacuum noise contribution
+        cov[..., k:, k:] += self.hbar / 2 * np.identity(2 * h)
+
+        L = np.swapaxes(np.linalg.cholesky(cov), -1, -2)
+        samples = means[..., None, :] + rng.standard_normal(batch + (shots, k + 2 * h)) @ L
+
+        dtype = np.complex128 if h else np.float64
+        res = np.full(batch + (shots, self.num_modes), np.nan, dtype=dtype)
+        res[..., list(homodyne)] = samples[..., :k]
+
+        if h:
+            alpha = samples[..., k : k + h] + 1j * samples[..., k + h :]
+            res[..., list(heterodyne)] = alpha / np.sqrt(2 * self.hbar)
+
+        return res
+
+    def execute(self, op):
+        """Execute a Blackbird operation.
+
+        Args:
+            op (dict): operation
+
+        Raises:
+            ValueError: if the operation is not Gaussian, or its arguments
+                are not numeric constants
+        """
+        name = op["op"]
+        modes = op["modes"]
+        args = constant_args(op)
+
+        if args is None:
+            raise ValueError(
+                "Operation {} on modes {} does not have constant numeric arguments".format(
+                    name, modes
+                )
+            )
+
+        if name == "MeasureIntensity":
+            self.results.append((modes[0], self.mean_photon(modes[0])))
+        elif is_measurement(op):
+            raise ValueError(
+                "Measurement {} is not supported by the Gaussian backend".format(name)
+            )
+        elif name in GAUSSIAN_STATES:
+            self.prepare(*gaussian_state(name, args, hbar=self.hbar), modes)
+        elif name == "Gaussian":
+            cov = np.asarray(args[0], dtype=np.float64)
+            means = np.zeros(cov.shape[-1]) if len(args) == 1 else np.asarray(args[1])
+
+            if means.ndim >= 2:
+                # Blackbird arrays are two-dimensional
+                means = means.reshape(means.shape[:-2] + (-1,))
+            self.prepare(cov, means, modes)
+        elif name == "LossChannel":
+            self.loss(args[0], modes[0])
+        elif name == "ThermalLossChannel":
+            self.loss(args[0], modes[0], nbar=args[1])
+        elif name in _DISPLACEMENTS:
+            self.displace(gaussian_gate(name, args, hbar=self.hbar)[1], modes)
+        elif name in GAUSSIAN_GATES:
+            self.apply(*gaussian_gate(name, args, hbar=self.hbar), modes)
+        else:
+            raise ValueError("Operation {} is not Gaussian".format(name))
+
+    def run(self, program):
+        """Execute all operations of a Blackbird program.
+
+        Args:
+            program (BlackbirdProgram): program to execute; all its arguments must
+                be numeric constants
+
+        Returns:
+            GaussianBackend: the backend, in the final state of the program
+        """
+        for op in program.operations:
+            self.execute(op)
+
+        return self
+
+
+def simulate(program, hbar=None):
+    """Simulate a Gaussian Blackbird program.
+
+    Args:
+        program (BlackbirdProgram): program to simulate
+        hbar (float): the value of :math:`\\hbar` in the commutation relation.
+            If not provided, the ``hbar`` option of the program target is used,
+            defaulting to 2.
+
+    Returns:
+        GaussianBackend: the backend, in the final state of the program
+    """
+    if hbar is None:
+        hbar = program.target["options"].get("hbar", 2)
+
+    num_modes = max(program.modes) + 1 if program.modes else 0
+    return GaussianBackend(num_modes, hbar=hbar).run(program)
+
+
+def sample(program, shots=None, hbar=None, seed=None):
+    """Sample the homodyne and heterodyne measurements of a Gaussian Blackbird program.
+
+    The state of the program is computed once, and the measurement outcomes
+    of all shots are drawn in a single vectorized call. This requires that
+    the program has no feed-forward; no operation may depend on a measurement
+    result, or act on a mode after it has been measured.
+
+    Args:
+        program (BlackbirdProgram): program to sample
+        shots (int): number of samples. If not provided, the ``shots`` option of the
+            program target is used, defaulting to 1.
+        hbar (float): the value of :math:`\\hbar` in the commutation relation.
+            If not provided, the ``hbar`` option of the program target is used,
+            defaulting to 2.
+        seed (int or numpy.random.Generator): seed or random number generator
+
+    Returns:
+        array: array of size ``[shots, num_modes]``, containing the measured
+        quadrature of each homodyne mode, the measured complex amplitude of
+        each heterodyne mode, and NaN for modes that are not measured
+
+    Raises:
+        ValueError: if the program contains feed-forward, measurements other than
+            homodyne or heterodyne detection, or non-Gaussian operations
+    """
+    if shots is None:
+        shots = program.target["options"].get("shots", 1)
+
+    if hbar is None:
+        hbar = program.target["options"].get("hbar", 2)
+
+    num_modes = max(program.modes) + 1 if program.modes else 0
+    return _sample(GaussianBackend(num_modes, hbar=hbar), program, shots, seed)
+
+
+def _sample(backend, program, shots, seed):
+    """Execute a program without feed-forward on a backend, and sample its
+    homodyne and heterodyne measurements.
+
+    Args:
+        backend (GaussianBackend): backend in the vacuum state
+        program (BlackbirdProgram): program to sample
+        shots (int): number of samples
+        seed (int or numpy.random.Generator): seed or random number generator
+
+    Returns:
+        array: the samples returned by :meth:`GaussianBackend.sample`
+    """
+    homodyne = {}
+    heterodyne = []
+
+    for op in program.operations:
+        name = op["op"]
+        measured = [m for m in op["modes"] if m in homodyne or m in heterodyne]
+
+        if measured:
+            raise ValueError(
+                "Operation {} acts on the previously measured modes {}".format(name, measured)
+            )
+
+        if name in _HOMODYNE:
+            phi = _HOMODYNE[name]
+
+            if phi is None:
+                args = op.get("args") or [op.get("kwargs", {}).get("phi", 0.0)]
+                phi = constant_args({"args": args})
+
+                if phi is None:
+                    raise ValueError(
+                        "The angle of {} on modes {} depends on a measurement result".format(
+                            name, op["modes"]
+                        )
+                    )
+
+                phi = phi[0]
+
+            homodyne.update({m: phi for m in op["modes"]})
+        elif name in _HETERODYNE:
+            heterodyne.extend(op["modes"])
+        elif is_measurement(op):
+            raise ValueError("Measurement {} cannot be sampled".format(name))
+        elif constant_args(op) is None:
+            raise ValueError(
+                "Operation {} on modes {} depends on a measurement result".format(
+                    name, op["modes"]
+                )
+            )
+        else:
+            backend.execute(op)
+
+    return backend.sample(homodyne, heterodyne, shots, seed=seed)
@@ -0,0 +1,354 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Synthetic programs
+==================
+
+**Module name:** :mod:`blackbird.generator`
+
+.. currentmodule:: blackbird.generator
+
+This module contains functions generating valid Blackbird scripts of
+arbitrary size, for benchmarking and stress testing.
+
+The generated scripts use the quantum operations of :data:`~.validation.GATES`,
+which mirror the gates of the C++ header ``BlackbirdProgram.h``, restricted to
+the operations supported by the target device. The scripts are deterministic,
+given a seed.
+
+:func:`generate` emits random programs, with a controllable number of modes,
+statements, variables, expression depth, array sizes and feed-forward density.
+:func:`gbs` and :func:`time_domain` emit programs with the structure of
+Gaussian boson sampling and time-domain experiments respectively.
+
+Summary
+-------
+
+.. autosummary::
+    vocabulary
+    generate
+    gbs
+    time_domain
+
+Code details
+~~~~~~~~~~~~
+"""
+import numpy as np
+
+from .program import numpy_to_blackbird
+from .validation import DEVICES, GATES, ParDomain
+
+
+_PREPARATIONS = {"Vacuum", "Coherent", "Squeezed", "Thermal", "Fock", "Catstate"}
+
+_BOUNDED = {
+    # operations whose parameters have a restricted domain, and are
+    # therefore always literals: name -> function generating the arguments
+    "LossChannel": lambda u: ["{:.6f}".format(u[0])],
+    "ThermalLossChannel": lambda u: ["{:.6f}".format(u[0]), "{:.6f}".format(u[1])],
+}
+
+_OPERATORS = ["+", "-", "*"]
+_FUNCTIONS = ["sin", "cos"]
+
+
+def vocabulary(target="gaussian"):
+    """The one- and two-mode gates and channels that may appear in the
+    body of a generated program.
+
+    Args:
+        target (str): target device; if it is not one of the devices in
+            :data:`~.validation.DEVICES`, all operations are allowed
+
+    Returns:
+        list[str]: sorted operation names
+    """
+    spec = DEVICES.get(target.lower()) if target else None
+    allowed = spec["operations"] if spec is not None else set(GATES)
+
+    return sorted(
+        name
+        for name, sig in GATES.items()
+        if name in allowed
+        and name not in _PREPARATIONS
+        and not name.startswith("Measure")
+        and sig.num_modes in (1, 2)
+        and sig.domain in (ParDomain.NONE, ParDomain.FLOAT)
+    )
+
+
+def _header(name, target, options):
+    """Metadata block of a generated script."""
+    lines = ["name {}".format(name), "version 1.0"]
+
+    if target is not None:
+        opts = ", ".join("{}={}".format(k, _literal(v)) for k, v in sorted((options or {}).items()))
+        lines.append("target {} ({})".format(target, opts) if opts else "target {}".format(target))
+
+    return "\n".join(lines) + "\n\n"
+
+
+def _literal(value):
+    """Blackbird literal of a target option value."""
+    if isinstance(value, bool):
+        return str(value)
+
+    if isinstance(value, str):
+        return '"{}"'.format(value)
+
+    return repr(value)
+
+
+def _expression(rng, depth, leaves, functions=True):
+    """A random Blackbird expression of the given depth.
+
+    Args:
+        rng (numpy.random.Generator): random number generator
+        depth (int): depth of the expression; 0 returns a single leaf
+        leaves (list[str]): names that may be used in the expression,
+            in addition to numeric literals
+        functions (bool): whether functions may be applied
+
+    Returns:
+        str: expression
+    """
+    if depth == 0:
+        if leaves and rng.random() < 0.5:
+            return leaves[rng.integers(len(leaves))]
+
+        return "{:.6f}".format(rng.random())
+
+    inner = _expression(rng, depth - 1, leaves, functions)
+
+    if functions and rng.random() < 0.25:
+        return "{}({})".format(_FUNCTIONS[rng.integers(len(_FUNCTIONS))], inner)
+
+    op = _OPERATORS[rng.integers(len(_OPERATORS))]
+    return "({} {} {:.6f})".format(inner, op, rng.random())
+
+
+def _unitary(rng, n):
+    """Haar random unitary matrix."""
+    Q, R = np.linalg.qr(rng.normal(size=(n, n)) + 1j * rng.normal(size=(n, n)))
+    return Q * (np.diag(R) / np.abs(np.diag(R)))
+
+
+def _modes(modes):
+    """Blackbird representation of the modes a statement acts on."""
+    if len(modes) == 1:
+        return str(modes[0])
+
+    return "[{}]".format(", ".join(str(m) for m in modes))
+
+
+def generate(
+    num_modes=4,
+    num_statements=100,
+    num_variables=0,
+    expression_depth=0,
+    array_size=None,
+    feedforward=0.0,
+    target="gaussian",
+    options=None,
+    measurement="MeasureFock",
+    seed=None,
+):
+    """Generate a random Blackbird script.
+
+    Args:
+        num_modes (int): number of modes; two-mode gates are only included
+            if there are at least two modes
+        num_statements (int): number of gate statements, not including the
+            measurements of feed-forward statements and the final measurements
+        num_variables (int): number of float variables declared before the statements,
+            which are used in the arguments of the statements
+        expression_depth (int): depth of the expressions declaring the variables,
+            and of the gate arguments; 0 gives numeric literals
+        array_size (int or None): if provided, a random unitary array of this size is
+            declared, and ``Interferometer`` statements acting on consecutive modes
+            are included in the statements
+        feedforward (float): probability that a statement is preceded by a homodyne
+            measurement of another mode, and uses the measurement result in its argument
+        target (str or None): target device; the statements use the operations of
+            :func:`vocabulary` for this device
+        options (dict or None): target options. Defaults to ``{'shots': 1}``.
+        measurement (str or None): measurement applied to every mode at the end of
+            the program, or ``None`` for no measurements
+        seed (int): seed of the random number generator
+
+    Returns:
+        str: Blackbird script
+    """
+    if array_size is not None and not 1 <= array_size <= num_modes:
+        raise ValueError("The array size must be between 1 and the number of modes")
+
+    if feedforward and num_modes < 2:
+        raise ValueError("Feed-forward requires at least two modes")
+
+    rng = np.random.default_rng(seed)
+    options = {"shots": 1} if options is None else options
+    lines = [_header("synthetic", target, options)]
+
+    # variables
+    names = []
+    for i in range(num_variables):
+        lines.append("float v{} = {}\n".format(i, _expression(rng, expression_depth, names)))
+        names.append("v{}".format(i))
+
+    gates = vocabulary(target)
+
+    if num_modes < 2:
+        gates = [name for name in gates if GATES[name].num_modes == 1]
+
+    if array_size is not None:
+        lines.append("\n".join(numpy_to_blackbird(_unitary(rng, array_size), "U")) + "\n")
+        gates.append("Interferometer")
+
+    if not gates:
+        raise ValueError("Target {} supports no operations that can be generated".format(target))
+
+    lines.append("\n")
+
+    # draw the structure of all statements at once
+    choice = rng.integers(len(gates), size=num_statements)
+    first = rng.integers(num_modes, size=num_statements)
+    offset = rng.integers(1, max(num_modes, 2), size=num_statements)
+    params = rng.random((num_statements, 2))
+    forward = rng.random(num_statements) < feedforward
+
+    for i in range(num_statements):
+        name = gates[choice[i]]
+        sig = GATES.get(name)
+
+        if name == "Interferometer":
+            start = first[i] % (num_modes - array_size + 1)
+            lines.append("Interferometer(U) | {}\n".format(_modes(range(start, start + array_size))))
+            continue
+
+        modes = [int(first[i])]
+        if sig.num_modes == 2:
+            modes.append(int((first[i] + offset[i]) % num_modes))
+
+        if name in _BOUNDED:
+            args = _BOUNDED[name](params[i])
+        elif sig.max_args == 0:
+            args = []
+        else:
+            args = [
+                _expression(rng, expression_depth, names)
+                if expression_depth
+                else (names[rng.integers(len(names))] if names else "{:.6f}".format(params[i, 0]))
+            ]
+
+        others = [m for m in range(num_modes) if m not in modes]
+
+        if forward[i] and args and others and name not in _BOUNDED:
+            # measure another mode, and use the result in the first argument
+            measured = others[rng.integers(len(others))]
+            lines.append("MeasureHomodyne({:.6f}) | {}\n".format(rng.random(), measured))
+            args[0] = "({} * q{})".format(args[0], measured)
+
+        lines.append("{}{} | {}\n".format(
+            name, "({})".format(", ".join(args)) if args else "", _modes(modes)
+        ))
+
+    if measurement is not None:
+        lines.append("\n")
+        lines.extend("{} | {}\n".format(measurement, m) for m in range(num_modes))
+
+    return "".join(lines)
+
+
+def gbs(num_modes, squeezing=1.0, mesh=False, target="gaussian", options=None, seed=None):
+    """Generate a Gaussian boson sampling script: single mode squeezed states,
+    a Haar random interferometer, and photon counting on every mode.
+
+    Args:
+        num_modes (int): number of modes
+        squeezing (float): squeezing parameter of each input mode
+        mesh (bool): whether to express the interferometer as a rectangular mesh of
+            beamsplitters and rotations, with random parameters, rather than as an
+            ``Interferometer`` statement; the mesh contains :math:`N(N-1)/2` beamsplitters
+        target (str or None): target device
+        options (dict or None): target options. Defaults to ``{'shots': 1}``.
+        seed (int): seed of the random number generator
+
+    Returns:
+        str: Blackbird script
+    """
+    rng = np.random.default_rng(seed)
+    options = {"shots": 1} if options is None else options
+    lines = [_header("gbs", target, options)]
+
+    if not mesh:
+        lines.append("\n".join(numpy_to_blackbird(_unitary(rng, num_modes), "U")) + "\n\n")
+
+    lines.extend("Squeezed({}) | {}\n".format(squeezing, m) for m in range(num_modes))
+
+    if mesh:
+        theta = np.pi / 2 * rng.random((num_modes, num_modes))
+        phi = 2 * np.pi * rng.random((num_modes, num_modes))
+
+        for layer in range(num_modes):
+            lines.extend(
+                "BSgate({:.6f}, {:.6f}) | [{}, {}]\n".format(theta[layer, m], phi[layer, m], m, m + 1)
+                for m in range(layer % 2, num_modes - 1, 2)
+            )
+
+        lines.extend(
+            "Rgate({:.6f}) | {}\n".format(phi, m) for m, phi in enumerate(2 * np.pi * rng.random(num_modes))
+        )
+    else:
+        lines.append("Interferometer(U) | {}\n".format(_modes(range(num_modes))))
+
+    lines.extend("MeasureFock | {}\n".format(m) for m in range(num_modes))
+    return "".join(lines)
+
+
+def time_domain(num_steps, num_delays=1, squeezing=1.0, target="gaussian", options=None, seed=None):
+    """Generate a time-domain script: at every time step, a squeezed state is
+    injected into a loop of delay lines, coupled to them by beamsplitters with
+    random parameters, and measured using homodyne detection.
+
+    Mode 0 is the mode injected and measured at each time step, and modes
+    :math:`1, \\dots, D` are the delay lines. Each time step contains
+    :math:`D+2` statements.
+
+    Args:
+        num_steps (int): number of time steps
+        num_delays (int): number of delay lines
+        squeezing (float): squeezing parameter of the injected states
+        target (str or None): target device
+        options (dict or None): target options. Defaults to ``{'shots': 1}``.
+        seed (int): seed of the random number generator
+
+    Returns:
+        str: Blackbird script
+    """
+    rng = np.random.default_rng(seed)
+    options = {"shots": 1} if options is None else options
+    lines = [_header("time_domain", target, options)]
+
+    theta = np.pi / 2 * rng.random((num_steps, num_delays))
+    phi = 2 * np.pi * rng.random(num_steps)
+
+    for t in range(num_steps):
+        lines.append("Squeezed({}) | 0\n".format(squeezing))
+        lines.extend(
+            "BSgate({:.6f}, 0) | [0, {}]\n".format(theta[t, d], d + 1) for d in range(num_delays)
+        )
+        lines.append("MeasureHomodyne({:.6f}) | 0\n".format(phi[t]))
+
+    return "".join(lines)
@@ -0,0 +1,788 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Incremental parsing
+===================
+
+**Module name:** :mod:`blackbird.incremental`
+
+.. currentmodule:: blackbird.incremental
+
+This module contains the class :class:`~.IncrementalParser`, which
+parses a Blackbird script and keeps the result of parsing each of its
+lines, so that it can be updated after an edit without re-parsing the
+entire script. This is useful for editor and notebook integrations,
+where the script is re-parsed after every keystroke.
+
+The script is split into groups of lines, each consisting of a line and
+the indented lines following it, such as the rows of an array. Since no
+declaration or statement spans two groups, each group is lexed and parsed
+on its own, and split into *units* at the boundaries of the parse tree:
+the metadata block, and each variable declaration, array declaration and
+quantum statement, even if several share a line. The parse tree of each
+unit is cached.
+
+After an edit, only the groups overlapping the edit are lexed and parsed
+again. Subsequent units are re-evaluated (without being re-parsed) only
+if they reference a variable whose value has changed. The operations of
+the edited and re-evaluated units are then spliced into the program, which
+is updated in place, so that the cost of an edit is proportional to the
+size of the edit and of its dependents rather than to the size of the
+script. Note that an edit to the metadata block results in a full re-parse.
+
+Summary
+-------
+
+.. autosummary::
+    IncrementalParser
+
+Code details
+~~~~~~~~~~~~
+"""
+# pylint: disable=protected-access
+import heapq
+import re
+from collections import Counter
+from fractions import Fraction
+
+import antlr4
+from antlr4.Token import Token
+
+import numpy as np
+
+from .blackbirdLexer import blackbirdLexer
+from .blackbirdParser import blackbirdParser
+from .error import BlackbirdErrorListener, BlackbirdSyntaxError
+from .auxiliary import _VAR
+from .listener import BlackbirdListener
+
+
+_HEADER = re.compile(r"\s*(name|version|target)\b")
+_BLANK = re.compile(r"\s*(#.*)?$")
+_INDENT = re.compile(r"[ \t]")
+_KINDS = {
+    blackbirdParser.ExpressionvarContext: "var",
+    blackbirdParser.ArrayvarContext: "array",
+    blackbirdParser.StatementContext: "statement",
+}
+_MISSING = object()
+
+
+class _Unit:
+    """A parsed unit of Blackbird source code.
+
+    Args:
+        text (str): the source code of the unit, up to the start of the next unit
+        kind (str): one of ``'header'``, ``'blank'``, ``'var'``, ``'array'``
+            or ``'statement'``
+    """
+
+    __slots__ = ["text", "kind", "ctx", "line", "column", "lead", "name", "refs", "value", "order"]
+
+    def __init__(self, text, kind):
+        self.text = text
+        self.kind = kind
+
+        self.ctx = None
+        """antlr4.ParserRuleContext: the parse tree of the unit, or ``None`` if not yet parsed"""
+
+        self.line = None
+        """int: line number of the unit in the script when it was parsed"""
+
+        self.column = 0
+        """int: column of the first character of the unit in its line"""
+
+        self.lead = False
+        """bool: whether the unit is the first unit of its group of lines"""
+
+        self.name = None
+        """str: the name of the declared variable, for variable declarations"""
+
+        self.refs = frozenset()
+        """frozenset[str]: the names referenced by the unit"""
+
+        self.value = None
+        """the declared variable value, or the operation dictionary for statements"""
+
+        self.order = None
+        """Fraction: key ordering the units by their position in the script"""
+
+
+def _groups(text, header=True):
+    """Split Blackbird source code into groups of lines that are parsed together.
+
+    Each group consists of a line and the indented lines following it, such as
+    the rows of an array, so that no declaration or statement spans two groups.
+    A line may contain several declarations and statements.
+
+    Args:
+        text (str): Blackbird source code
+        header (bool): whether the source code starts with the metadata block,
+            which then forms the first group
+
+    Returns:
+        list[str]: the source code of each group
+    """
+    groups = []
+    lines = []
+    in_header = header
+
+    for line in text.splitlines(keepends=True):
+        if in_header:
+            if _BLANK.match(line) or _HEADER.match(line) or _INDENT.match(line):
+                lines.append(line)
+                continue
+
+            in_header = False
+            groups.append("".join(lines))
+
+        if _INDENT.match(line) and groups:
+            groups[-1] += line
+        else:
+            groups.append(line)
+
+    if in_header:
+        groups.append("".join(lines))
+
+    return groups
+
+
+def _parser(text, line, column=0):
+    """Parser of a fragment of Blackbird source code.
+
+    Args:
+        text (str): the source code
+        line (int): line number of the start of the source code in the full script
+        column (int): column of the start of the source code in its line
+
+    Returns:
+        tuple[blackbirdParser, antlr4.CommonTokenStream]: the parser and its token stream
+    """
+    lexer = blackbirdLexer(antlr4.InputStream(text))
+    lexer.line = line
+    lexer.column = column
+    stream = antlr4.CommonTokenStream(lexer)
+
+    parser = blackbirdParser(stream)
+    parser.removeErrorListeners()
+    parser.addErrorListener(BlackbirdErrorListener())
+    return parser, stream
+
+
+def _check_consumed(parser, stream):
+    """Raise an error if a parser rule did not consume all the source code."""
+    stream.fill()
+
+    for token in stream.tokens[parser.getCurrentToken().tokenIndex :]:
+        if token.type not in (blackbirdLexer.NEWLINE, Token.EOF):
+            raise BlackbirdSyntaxError(
+                "Blackbird SyntaxError (line {}:{}): unexpected input {}".format(
+                    token.line, token.column + 1, token.text
+                )
+            )
+
+
+def _references(unit, tokens):
+    """Store the declared name and the names referenced by a parsed unit.
+
+    Args:
+        unit (_Unit): the parsed unit
+        tokens (list[antlr4.Token]): the tokens of the unit
+    """
+    refs = {t.text for t in tokens if t.type == blackbirdLexer.NAME}
+
+    if unit.kind in ("var", "array"):
+        unit.name = unit.ctx.name().getText()
+        refs.discard(unit.name)
+
+    unit.refs = frozenset(refs)
+
+
+def _parse_group(text, line, header=False):
+    """Lex and parse a group of lines, and split it into units at the
+    boundaries of its declarations and statements in the parse tree.
+
+    Args:
+        text (str): the source code of the group
+        line (int): line number of the first line of the group in the full script
+        header (bool): whether the group is the metadata block
+
+    Returns:
+        list[_Unit]: the parsed units of the group
+    """
+    if not header and text.count("\n") <= 1 and _BLANK.match(text):
+        # a single empty or comment line
+        unit = _Unit(text, "blank")
+        unit.lead = True
+        return [unit]
+
+    parser, stream = _parser(text, line)
+    ctx = parser.start() if header else parser.program()
+    _check_consumed(parser, stream)
+
+    items = [c for c in (ctx.program() if header else ctx).getChildren() if type(c) in _KINDS]
+    bounds = [c.start.start for c in items] + [len(text)]
+    units = []
+
+    if header:
+        units.append(_Unit(text[: bounds[0]], "header"))
+        units[0].ctx = ctx.metadatablock()
+        units[0].line = line
+    elif bounds[0] > 0:
+        units.append(_Unit(text[: bounds[0]], "blank"))
+
+    for item, start, end in zip(items, bounds, bounds[1:]):
+        unit = _Unit(text[start:end], _KINDS[type(item)])
+        unit.ctx = item
+        unit.line = item.start.line
+        unit.column = item.start.column
+        _references(unit, stream.tokens[item.start.tokenIndex : item.stop.tokenIndex + 1])
+        units.append(unit)
+
+    if not units:
+        units.append(_Unit(text, "blank"))
+
+    units[0].lead = True
+    return units
+
+
+def _parse(unit, line):
+    """Lex and parse a declaration or statement on its own, storing its parse tree.
+
+    Args:
+        unit (_Unit): the unit to parse
+        line (int): line number of the first line of the unit in the full script
+    """
+    parser, stream = _parser(unit.text, line, unit.column)
+
+    rules = {
+        "var": parser.expressionvar,
+        "array": parser.arrayvar,
+        "statement": parser.statement,
+    }
+    unit.ctx = rules[unit.kind]()
+    unit.line = line
+    _check_consumed(parser, stream)
+    _references(unit, stream.tokens)
+
+
+def _equal(a, b):
+    """Whether two variable values are equal, including their type"""
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return type(a) is type(b) and a.dtype == b.dtype and np.array_equal(a, b)
+    return type(a) is type(b) and a == b
+
+
+def _count_before(units, order):
+    """Number of units, in a list sorted by position, positioned before an order key.
+
+    Args:
+        units (list[_Unit]): units sorted by their ``order`` attribute
+        order (Fraction): order key
+
+    Returns:
+        int: number of units with an order key smaller than ``order``
+    """
+    lo, hi = 0, len(units)
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+
+        if units[mid].order < order:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return lo
+
+
+def _last_before(units, order):
+    """The last unit, in a list sorted by position, positioned before an order key.
+
+    Args:
+        units (list[_Unit]): units sorted by their ``order`` attribute
+        order (Fraction): order key
+
+    Returns:
+        _Unit or None: the unit, or ``None`` if there is none
+    """
+    idx = _count_before(units, order)
+    return units[idx - 1] if idx else None
+
+
+def _clone(unit):
+    """Copy of a parsed unit, to be placed at a new position."""
+    new = _Unit(unit.text, unit.kind)
+
+    for attr in ("ctx", "line", "column", "lead", "name", "refs", "value"):
+        setattr(new, attr, getattr(unit, attr))
+
+    return new
+
+
+class IncrementalParser:
+    """Parser that updates the parsed Blackbird program after an edit,
+    only re-parsing the parts of the script that have changed.
+
+    Each unit of the script has an order key, which only changes when the unit
+    is edited. The declarations of each variable, and the units referencing
+    each variable, are indexed by these keys, so that an edit only evaluates
+    the edited units and the units depending on a variable whose value changed.
+    The character offsets, line numbers and operation positions of the units
+    are stored in arrays, shifted after each edit using NumPy.
+
+    Args:
+        text (str): Blackbird source code
+    """
+
+    def __init__(self, text):
+        self.reparsed = 0
+        """int: number of units lexed and parsed by the last update"""
+
+        self.reevaluated = 0
+        """int: number of units evaluated by the last update"""
+
+        self._build(text)
+
+    @property
+    def text(self):
+        """The current Blackbird source code
+
+        Returns:
+            str: source code
+        """
+        return self._text
+
+    @property
+    def program(self):
+        """The program represented by the current source code.
+
+        Edits update the program in place, unless the metadata block is edited.
+
+        Returns:
+            BlackbirdProgram: parsed representation of the program
+        """
+        return self._program
+
+    @staticmethod
+    def _evaluate(unit, env):
+        """Evaluate a parsed unit in a variable environment.
+
+        Args:
+            unit (_Unit): parsed variable declaration or statement
+            env (dict[str->any]): values of the variables referenced by the unit
+
+        Returns:
+            the declared variable value, or the operation dictionary for statements
+        """
+        listener = BlackbirdListener()
+        _VAR.clear()
+        _VAR.update(env)
+
+        try:
+            if unit.kind == "var":
+                listener.exitExpressionvar(unit.ctx)
+                return _VAR[unit.name]
+
+            if unit.kind == "array":
+                listener.exitArrayvar(unit.ctx)
+                return _VAR[unit.name]
+
+            listener.exitStatement(unit.ctx)
+            return listener.program.operations[0]
+        finally:
+            _VAR.clear()
+
+    @classmethod
+    def _evaluate_at(cls, unit, env, line):
+        """Evaluate a parsed unit, reporting errors at its current line number.
+
+        Args:
+            unit (_Unit): parsed variable declaration or statement
+            env (dict[str->any]): values of the variables referenced by the unit
+            line (int): current line number of the unit in the script
+
+        Returns:
+            the declared variable value, or the operation dictionary for statements
+        """
+        try:
+            return cls._evaluate(unit, env)
+        except Exception:
+            if unit.line == line:
+                raise
+
+            # the unit has moved since it was parsed; parse it again
+            # so that the error refers to its current line number
+            _parse(unit, line)
+            cls._evaluate(unit, env)
+            raise
+
+    def _build(self, text):
+        """Parse and evaluate an entire script, replacing the program.
+
+        Args:
+            text (str): Blackbird source code
+        """
+        units = []
+        line = 1
+
+        for idx, group in enumerate(_groups(text)):
+            units.extend(_parse_group(group, line, header=idx == 0))
+            line += group.count("\n")
+
+        env = {}
+        decls = {}
+        refs = {}
+        modes = Counter()
+        ops = []
+        starts = [0]
+        lines = [1]
+        op_starts = [0]
+        program = None
+
+        for idx, unit in enumerate(units):
+            unit.order = Fraction(idx)
+
+            if unit.kind != "blank":
+                if unit.kind == "header":
+                    listener = BlackbirdListener()
+                    antlr4.ParseTreeWalker().walk(listener, unit.ctx)
+                    program = listener.program
+                else:
+                    unit.value = self._evaluate(unit, {n: env[n] for n in unit.refs if n in env})
+
+                for name in unit.refs:
+                    refs.setdefault(name, set()).add(unit)
+
+                if unit.name is not None:
+                    env[unit.name] = unit.value
+                    decls.setdefault(unit.name, []).append(unit)
+                elif unit.kind == "statement":
+                    ops.append(unit.value)
+                    modes.update(unit.value["modes"])
+
+            starts.append(starts[-1] + len(unit.text))
+            lines.append(lines[-1] + unit.text.count("\n"))
+            op_starts.append(len(ops))
+
+        program._operations.extend(ops)
+        program._modes |= set(modes)
+        program._var.update(env)
+
+        self._text = text
+        self._units = units
+        self._starts = np.array(starts, dtype=np.int64)
+        self._lines = np.array(lines, dtype=np.int64)
+        self._op_starts = np.array(op_starts, dtype=np.int64)
+        self._decls = decls
+        self._refs = refs
+        self._modes = modes
+        self._program = program
+        self.reparsed = self.reevaluated = sum(u.kind != "blank" for u in units)
+
+    def edit(self, start, end, text):
+        """Replace part of the source code, and update the parsed program.
+
+        The groups of lines overlapping the edit, together with their neighbours,
+        are split and parsed again; the remaining units are only re-evaluated if
+        they depend on a variable whose value has changed. If the edit results in an error,
+        the source code and program are left unchanged.
+
+        Args:
+            start (int): character offset of the start of the replaced text
+            end (int): character offset of the end of the replaced text
+            text (str): the replacement text
+
+        Returns:
+            BlackbirdProgram: the updated program
+        """
+        if not 0 <= start <= end <= len(self._text):
+            raise ValueError("Invalid edit range [{}, {})".format(start, end))
+
+        new_text = self._text[:start] + text + self._text[end:]
+        units = self._units
+        ends = self._starts[1:]
+
+        # find the units overlapping the edit
+        first = min(int(np.searchsorted(ends, start, side="right")), len(units) - 1)
+        last = max(first, min(int(np.searchsorted(ends, end, side="left")), len(units) - 1))
+
+        # extend the edit to whole groups of lines, including the
+        # neighbouring groups, as the edit may join or split them
+        first = self._group(first)
+
+        if first > 0 and self._group(first - 1) > 0:
+            first = self._group(first - 1)
+
+        last = self._group_end(last)
+
+        if last + 1 < len(units):
+            last = self._group_end(last + 1)
+
+        delta = len(new_text) - len(self._text)
+        region = new_text[self._starts[first] : self._starts[last + 1] + delta]
+
+        if first == 0 or _INDENT.match(region):
+            # the metadata block has been edited, or the edit has indented the
+            # first line of the region, joining it to the previous group
+            self._build(new_text)
+            return self._program
+
+        self._update(first, last, _groups(region, header=False))
+        self._text = new_text
+        return self._program
+
+    def _group(self, idx):
+        """Index of the first unit of the group of lines containing a unit."""
+        while not self._units[idx].lead:
+            idx -= 1
+
+        return idx
+
+    def _group_end(self, idx):
+        """Index of the last unit of the group of lines containing a unit."""
+        while idx + 1 < len(self._units) and not self._units[idx + 1].lead:
+            idx += 1
+
+        return idx
+
+    def _update(self, first, last, groups):
+        """Replace a range of units, parse the new groups of lines, re-evaluate
+        the units depending on a changed value, and update the program in place.
+
+        The parser state and the program are only modified once all the
+        units have been successfully evaluated.
+
+        Args:
+            first (int): index of the first replaced unit
+            last (int): index of the last replaced unit
+            groups (list[str]): the source code of the groups of lines replacing them
+        """
+        units = self._units
+        old_units = units[first : last + 1]
+
+        # reuse the parse results of unchanged groups
+        old_groups = []
+        for unit in old_units:
+            if unit.lead:
+                old_groups.append([])
+
+            old_groups[-1].append(unit)
+
+        cached = {}
+        for group in old_groups:
+            cached.setdefault("".join(u.text for u in group), []).append(group)
+
+        new_units = []
+        new_lines = []
+        origin = {}
+        reparsed = 0
+        line = int(self._lines[first])
+
+        for text in groups:
+            if cached.get(text):
+                group = []
+
+                for original in cached[text].pop(0):
+                    unit = _clone(original)
+                    origin[unit] = original
+                    group.append(unit)
+            else:
+                group = _parse_group(text, line)
+                reparsed += sum(u.kind != "blank" for u in group)
+
+            for unit in group:
+                new_lines.append(line)
+                line += unit.text.count("\n")
+
+            new_units.extend(group)
+
+        line_delta = line - int(self._lines[last + 1])
+
+        lo = units[first - 1].order
+        hi = units[last + 1].order if last + 1 < len(units) else lo + len(new_units) + 1
+
+        for idx, unit in enumerate(new_units):
+            unit.order = lo + (hi - lo) * Fraction(idx + 1, len(new_units) + 1)
+
+        # declarations of the variables declared by the replaced or new units
+        names = {u.name for u in old_units + new_units if u.name is not None}
+        removed = set(old_units)
+        decls = {}
+
+        for name in names:
+            kept = [u for u in self._decls.get(name, []) if u not in removed]
+            added = [u for u in new_units if u.name == name]
+            decls[name] = sorted(kept + added, key=lambda u: u.order)
+
+        values = {}
+
+        def value_before(name, order, new):
+            """The value of a variable visible at a position, before or after the edit"""
+            if new and name in decls:
+                decl = _last_before(decls[name], order)
+            else:
+                decl = _last_before(self._decls.get(name, []), order)
+
+            if decl is None:
+                return _MISSING
+
+            return values.get(decl, decl.value) if new else decl.value
+
+        def evaluate(unit, line):
+            env = {}
+
+            for name in unit.refs:
+                value = value_before(name, unit.order, new=True)
+
+                if value is not _MISSING:
+                    env[name] = value
+
+            values[unit] = self._evaluate_at(unit, env, line)
+
+        def stale(unit, old_order):
+            """Whether a variable referenced by a unit has changed value"""
+            return any(
+                not _equal(
+                    value_before(n, unit.order, new=True), value_before(n, old_order, new=False)
+                )
+                for n in unit.refs
+            )
+
+        # evaluate the new units in order
+        for unit, line in zip(new_units, new_lines):
+            if unit.kind == "blank":
+                continue
+
+            if unit not in origin or stale(unit, origin[unit].order):
+                evaluate(unit, line)
+
+        # evaluate the subsequent units depending on a changed value,
+        # in order, so that changes propagate through the declarations
+        pending = []
+        queued = set()
+
+        def queue(name, after):
+            for unit in self._refs.get(name, ()):
+                if unit.order > after and unit not in removed and unit not in queued:
+                    queued.add(unit)
+                    heapq.heappush(pending, (unit.order, id(unit), unit))
+
+        for name in names:
+            queue(name, lo)
+
+        while pending:
+            _, _, unit = heapq.heappop(pending)
+
+            if not stale(unit, unit.order):
+                continue
+
+            idx = _count_before(units, unit.order)
+            evaluate(unit, int(self._lines[idx]) + line_delta)
+
+            if unit.name is not None and not _equal(values[unit], unit.value):
+                queue(unit.name, unit.order)
+
+        self._commit(first, last, new_units, new_lines, line_delta, decls, values)
+        self.reparsed = reparsed
+        self.reevaluated = len(values)
+
+    def _commit(self, first, last, new_units, new_lines, line_delta, decls, values):
+        """Store the result of an update, and splice the changes into the program.
+
+        Args:
+            first (int): index of the first replaced unit
+            last (int): index of the last replaced unit
+            new_units (list[_Unit]): the units replacing them
+            new_lines (list[int]): line numbers of the new units
+            line_delta (int): change in the number of lines of the script
+            decls (dict[str->list[_Unit]]): updated declarations of the
+                variables declared by the replaced or new units
+            values (dict[_Unit->any]): values of the evaluated units
+        """
+        units = self._units
+        old_units = units[first : last + 1]
+        program = self._program
+
+        for unit, value in values.items():
+            unit.value = value
+
+        for unit in old_units:
+            for name in unit.refs:
+                self._refs[name].discard(unit)
+
+            if unit.kind == "statement":
+                self._modes.subtract(unit.value["modes"])
+
+        for unit in new_units:
+            for name in unit.refs:
+                self._refs.setdefault(name, set()).add(unit)
+
+            if unit.kind == "statement":
+                self._modes.update(unit.value["modes"])
+
+        self._decls.update(decls)
+
+        # splice the operations of the new units into the program
+        new_ops = [u.value for u in new_units if u.kind == "statement"]
+        op_first = int(self._op_starts[first])
+        op_last = int(self._op_starts[last + 1])
+        op_delta = len(new_ops) - (op_last - op_first)
+        program._operations[op_first:op_last] = new_ops
+
+        units[first : last + 1] = new_units
+        region_starts = np.cumsum([0] + [len(u.text) for u in new_units[:-1]])
+        text_delta = sum(len(u.text) for u in new_units) - sum(len(u.text) for u in old_units)
+
+        self._starts = np.concatenate(
+            [
+                self._starts[:first],
+                self._starts[first] + region_starts.astype(np.int64),
+                self._starts[last + 1 :] + text_delta,
+            ]
+        )
+        self._lines = np.concatenate(
+            [
+                self._lines[:first],
+                np.array(new_lines, dtype=np.int64),
+                self._lines[last + 1 :] + line_delta,
+            ]
+        )
+        self._op_starts = np.concatenate(
+            [
+                self._op_starts[:first],
+                op_first + np.cumsum([0] + [u.kind == "statement" for u in new_units[:-1]]),
+                self._op_starts[last + 1 :] + op_delta,
+            ]
+        ).astype(np.int64)
+
+        # replace the operations of the re-evaluated subsequent statements
+        region = set(new_units)
+
+        for unit in values:
+            if unit.kind == "statement" and unit not in region:
+                idx = _count_before(units, unit.order)
+                program._operations[int(self._op_starts[idx])] = unit.value
+
+        program._modes.clear()
+        program._modes |= {m for m, count in self._modes.items() if count > 0}
+
+        names = set(decls) | {u.name for u in values if u.name is not None}
+
+        for name in names:
+            if self._decls.get(name):
+                program._var[name] = self._decls[name][-1].value
+            else:
+                program._var.pop(name, None)
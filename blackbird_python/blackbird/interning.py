@@ -0,0 +1,145 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Array interning
+===============
+
+**Module name:** :mod:`blackbird.interning`
+
+.. currentmodule:: blackbird.interning
+
+This module contains the class :class:`~.ArrayPool`, which shares equal
+arrays between loaded Blackbird programs.
+
+By default, every array variable of a Blackbird script is a new NumPy array,
+even if many programs declare the same array, such as a calibrated
+interferometer unitary. When an array pool is passed to :func:`~blackbird.load`,
+:func:`~blackbird.loads` or :func:`~.parse`, each array variable is looked up
+in the pool by its data type, shape and content, and the programs share a
+single array:
+
+.. code-block:: python
+
+    from blackbird.interning import POOL
+
+    programs = [blackbird.load(f, array_pool=POOL) for f in filenames]
+
+Interned arrays are read-only, since modifying an array in one program would
+modify it in all the programs sharing it. The pool only holds weak references
+to its arrays, so that an array is freed once no program refers to it.
+
+Summary
+-------
+
+.. autosummary::
+    ArrayPool
+    POOL
+
+Code details
+~~~~~~~~~~~~
+"""
+import threading
+import weakref
+
+from .program import _array_key
+
+
+class ArrayPool:
+    """Pool of read-only arrays, shared by the programs loaded with the pool.
+
+    The pool is thread-safe.
+    """
+
+    def __init__(self):
+        self._arrays = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(["hits", "misses", "saved_bytes"], 0)
+
+    def __len__(self):
+        return len(self._arrays)
+
+    @staticmethod
+    def key(array):
+        """Pool key of an array.
+
+        Args:
+            array (array): the array
+
+        Returns:
+            tuple[str, tuple[int], str]: the data type, the shape, and the
+            hexadecimal SHA-256 digest of the content of the array
+        """
+        return _array_key(array)
+
+    def intern(self, array):
+        """Return the array of the pool equal to an array, adding the array
+        to the pool if there is none.
+
+        Arrays added to the pool are made read-only. Arrays of Python objects
+        cannot be hashed by content, and are returned unchanged.
+
+        Args:
+            array (array): the array
+
+        Returns:
+            array: a read-only array equal to ``array``
+        """
+        if array.dtype.hasobject:
+            return array
+
+        key = self.key(array)
+
+        with self._lock:
+            shared = self._arrays.get(key)
+
+            if shared is not None:
+                self._counts["hits"] += 1
+                self._counts["saved_bytes"] += array.nbytes
+                return shared
+
+            array.flags.writeable = False
+            self._arrays[key] = array
+            self._counts["misses"] += 1
+
+        return array
+
+    def clear(self):
+        """Remove all arrays from the pool, and reset the statistics.
+
+        Arrays already shared by loaded programs remain shared and read-only.
+        """
+        with self._lock:
+            self._arrays.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+
+    def stats(self):
+        """Statistics of the pool.
+
+        Returns:
+            dict[str->int]: the number of arrays found in the pool (``'hits'``)
+            and added to it (``'misses'``), the number of bytes of the arrays
+            discarded in favour of an equal array of the pool (``'saved_bytes'``),
+            and the number of arrays in the pool (``'size'``)
+        """
+        with self._lock:
+            stats = dict(self._counts)
+            stats["size"] = len(self._arrays)
+
+        return stats
+
+
+POOL = ArrayPool()
+"""ArrayPool: pool shared by all the callers that opt in to array interning
+without creating their own pool."""
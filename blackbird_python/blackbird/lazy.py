@@ -0,0 +1,197 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Lazy evaluation
+===============
+
+**Module name:** :mod:`blackbird.lazy`
+
+.. currentmodule:: blackbird.lazy
+
+This module contains the containers used by the lazy mode of the parser.
+
+By default, the variables of a Blackbird script and the arguments of its
+statements are evaluated while the script is parsed. When a script is loaded
+with ``lazy=True``, each variable and the arguments of each statement are
+instead compiled into a :class:`LazyValue`, which evaluates them, and the
+variables they depend on, the first time they are accessed:
+
+.. code-block:: python
+
+    bb = blackbird.loads(script, lazy=True)
+
+    # no arguments are evaluated
+    names = [op["op"] for op in bb.operations]
+
+    # the arguments of the first operation are evaluated, and memoized
+    args = bb.operations[0]["args"]
+
+Variables that are never accessed, directly or by an operation argument,
+are never evaluated. Undefined names are reported while parsing, but type
+and shape errors are only raised when the offending variable is evaluated.
+
+The variables of the program and its operations are stored in instances
+of :class:`LazyDict`, a dictionary that evaluates its lazy values when they
+are read, and otherwise behaves exactly like a Python dictionary.
+
+Summary
+-------
+
+.. autosummary::
+    LazyValue
+    LazyDict
+
+Code details
+~~~~~~~~~~~~
+"""
+
+
+class LazyValue:
+    """Value computed by a function the first time it is requested.
+
+    Args:
+        func (callable): function with no arguments computing the value
+    """
+
+    __slots__ = ("_func", "_value")
+
+    def __init__(self, func):
+        self._func = func
+        self._value = None
+
+    @property
+    def evaluated(self):
+        """Whether the value has been computed.
+
+        Returns:
+            bool: ``True`` if the value has been computed
+        """
+        return self._func is None
+
+    @property
+    def value(self):
+        """The value, computed on first access.
+
+        If the function raises an exception, it is called again
+        on the next access.
+
+        Returns:
+            any: the value
+        """
+        if self._func is not None:
+            self._value = self._func()
+            # release the function, and the values it depends on
+            self._func = None
+
+        return self._value
+
+    def __repr__(self):
+        if self.evaluated:
+            return "<LazyValue: {!r}>".format(self._value)
+
+        return "<LazyValue: not evaluated>"
+
+
+class LazyDict(dict):
+    """Dictionary whose :class:`LazyValue` values are evaluated when read.
+
+    Behaves exactly like a Python dictionary. Reading a lazy value, with any
+    method, evaluates it and replaces it by the result, while methods that
+    only involve the keys, such as ``in`` and ``len``, do not evaluate any value.
+    Methods reading all the values, such as :meth:`items`, comparisons and
+    :func:`repr`, evaluate all of them.
+
+    Args:
+        *args: positional arguments of :class:`dict`
+        **kwargs: keyword arguments of :class:`dict`
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+
+        if isinstance(value, LazyValue):
+            value = value.value
+            super().__setitem__(key, value)
+
+        return value
+
+    def _evaluate(self):
+        """Evaluate all the lazy values."""
+        for key, value in super().items():
+            if isinstance(value, LazyValue):
+                # replacing the value of an existing key does not change
+                # the size of the dictionary, and is safe while iterating
+                super().__setitem__(key, value.value)
+
+    # keys must be iterated through the Python method, so that
+    # dict(lazy) and {**lazy} read the values using __getitem__
+    def __iter__(self):
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            super().__setitem__(key, default)
+
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            self[key]  # pylint: disable=pointless-statement
+
+        return super().pop(key, *default)
+
+    def popitem(self):
+        self._evaluate()
+        return super().popitem()
+
+    def values(self):
+        self._evaluate()
+        return super().values()
+
+    def items(self):
+        self._evaluate()
+        return super().items()
+
+    def copy(self):
+        """Shallow copy of the dictionary. Lazy values are shared with the copy,
+        and are only evaluated once."""
+        return type(self)(super().items())
+
+    def __eq__(self, other):
+        self._evaluate()
+
+        if isinstance(other, LazyDict):
+            other._evaluate()  # pylint: disable=protected-access
+
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __or__(self, other):
+        self._evaluate()
+        return super().__or__(other)
+
+    def __repr__(self):
+        self._evaluate()
+        return super().__repr__()
@@ -36,13 +36,16 @@ Summary
     NUMPY_TYPES
     RegRefTransform
     BlackbirdListener
+    ParseStats
     parse
 
 Code details
 ~~~~~~~~~~~~
 """
 # pylint: disable=protected-access
+import time
 import warnings
+from contextlib import contextmanager, nullcontext
 
 import antlr4
 
@@ -54,8 +57,17 @@ from .blackbirdParser import blackbirdParser
 from .blackbirdListener import blackbirdListener
 
 from .error import BlackbirdErrorListener, BlackbirdSyntaxError
-from .auxiliary import _expression, _get_arguments, _literal, _VAR
+from .auxiliary import (
+    _compile_arguments,
+    _compile_expression,
+    _expression,
+    _get_arguments,
+    _literal,
+    _VAR,
+)
+from .lazy import LazyDict, LazyValue
 from .program import BlackbirdProgram
+from .tracing import span
 
 
 PYTHON_TYPES = {
@@ -81,6 +93,34 @@ NUMPY_TYPES = {
 to the equivalent NumPy data types."""
 
 
+def _declared_value(name, vartype, value):
+    """Convert the value of a variable to its declared type.
+
+    Args:
+        name (str): variable name
+        vartype (str): declared type
+        value (any): value of the variable
+
+    Returns:
+        any: the converted value
+
+    Raises:
+        TypeError: if the value cannot be converted to the declared type
+    """
+    try:
+        # assume all variables are scalar
+        return PYTHON_TYPES[vartype](value)
+    except:
+        try:
+            # maybe one of the variables was a NumPy array?
+            return NUMPY_TYPES[vartype](value)
+        except:
+            # nope
+            raise TypeError(
+                "Var {} = {} is not of declared type {}".format(name, value, vartype)
+            ) from None
+
+
 class RegRefTransform:
     """Class to represent a classical register transform.
 
@@ -130,6 +170,14 @@ class BlackbirdListener(blackbirdListener):
     via the :attr:`program` attribute.
     """
 
+    array_pool = None
+    """ArrayPool or None: pool interning the array variables of the program;
+    see :mod:`~blackbird.interning`"""
+
+    lazy = False
+    """bool: whether variables and operation arguments are evaluated on first
+    access rather than while parsing; see :mod:`~blackbird.lazy`"""
+
     def __init__(self):
         self._program = BlackbirdProgram()
 
@@ -138,6 +186,29 @@ class BlackbirdListener(blackbirdListener):
         """Returns the parsed blackbird program"""
         return self._program
 
+    def _arguments(self, ctx):
+        """Evaluate the positional and keyword arguments of a target or statement.
+
+        Args:
+            ctx: arguments context
+
+        Returns:
+            tuple[list, dict]: positional and keyword arguments
+        """
+        return _get_arguments(ctx)
+
+    def _regref_transform(self, expr):
+        """Convert a SymPy expression of measured register references into
+        a register transform.
+
+        Args:
+            expr (sympy.Expr): expression
+
+        Returns:
+            RegRefTransform: register transform
+        """
+        return RegRefTransform(expr)
+
     def exitDeclarename(self, ctx: blackbirdParser.DeclarenameContext):
         """Run after exiting program name metadata.
 
@@ -165,7 +236,7 @@ class BlackbirdListener(blackbirdListener):
         kwargs = {}
 
         if ctx.arguments():
-            args, kwargs = _get_arguments(ctx.arguments())
+            args, kwargs = self._arguments(ctx.arguments())
 
             if args:
                 warnings.warn(
@@ -204,25 +275,17 @@ class BlackbirdListener(blackbirdListener):
                     )
                 )
 
+        if ctx.expression() and self.lazy:
+            compiled = _compile_expression(ctx.expression())
+            _VAR[name] = LazyValue(lambda: _declared_value(name, vartype, compiled()))
+            return
+
         if ctx.expression():
             value = _expression(ctx.expression())
         elif ctx.nonnumeric():
             value = _literal(ctx.nonnumeric())
 
-        try:
-            # assume all variables are scalar
-            final_value = PYTHON_TYPES[vartype](value)
-        except:
-            try:
-                # maybe one of the variables was a NumPy array?
-                final_value = NUMPY_TYPES[vartype](value)
-            except:
-                # nope
-                raise TypeError(
-                    "Var {} = {} is not of declared type {}".format(name, value, vartype)
-                ) from None
-
-        _VAR[name] = final_value
+        _VAR[name] = _declared_value(name, vartype, value)
 
     def exitArrayvar(self, ctx: blackbirdParser.ArrayvarContext):
         """Run after exiting an array variable.
@@ -255,6 +318,8 @@ class BlackbirdListener(blackbirdListener):
         if ctx.shape():
             shape = tuple([int(i) for i in ctx.shape().getText().split(",")])
 
+        evaluate = _compile_expression if self.lazy else _expression
+
         value = []
         # loop through all children of the 'arrayval' branch
         for i in ctx.arrayval().getChildren():
@@ -265,30 +330,53 @@ class BlackbirdListener(blackbirdListener):
                 for j in i.getChildren():
                     # Check if the child is not the column delimiter ','
                     if j.getText() != ",":
-                        value[-1].append(_expression(j))
+                        value[-1].append(evaluate(j))
+
+        position = (ctx.start.line, ctx.start.column)
+
+        if self.lazy:
+            _VAR[name] = LazyValue(
+                lambda: self._array(
+                    name, vartype, shape, [[f() for f in row] for row in value], position
+                )
+            )
+        else:
+            _VAR[name] = self._array(name, vartype, shape, value, position)
 
+    def _array(self, name, vartype, shape, value, position):
+        """Convert the values of an array variable to an array.
+
+        Args:
+            name (str): variable name
+            vartype (str): declared type of the array
+            shape (tuple[int] or None): declared shape of the array
+            value (list[list]): values of the rows of the array
+            position (tuple[int, int]): line and column of the declaration
+
+        Returns:
+            array: the array
+        """
         try:
             final_value = np.array(value, dtype=NUMPY_TYPES[vartype])
         except:
-            line = ctx.start.line
-            col = ctx.start.column
             raise BlackbirdSyntaxError(
                 "Blackbird SyntaxError (line {}:{}): Array var {} is not of declared type {}".format(
-                    line, col, name, vartype
+                    *position, name, vartype
                 )
             )
 
         if shape is not None:
             actual_shape = final_value.shape
             if actual_shape != shape:
-                line = ctx.start.line
-                col = ctx.start.column
                 raise BlackbirdSyntaxError(
                     "Blackbird SyntaxError (line {}:{}): Array var {} has declared shape {} "
-                    "but actual shape {}".format(line, col, name, shape, actual_shape)
+                    "but actual shape {}".format(*position, name, shape, actual_shape)
                 )
 
-        _VAR[name] = final_value
+        if self.array_pool is not None:
+            final_value = self.array_pool.intern(final_value)
+
+        return final_value
 
     def exitStatement(self, ctx: blackbirdParser.StatementContext):
         """Run after exiting a quantum statement.
@@ -304,11 +392,13 @@ class BlackbirdListener(blackbirdListener):
         modes = [int(i) for i in ctx.modes().getText().split(",")]
         self._program._modes |= set(modes)
 
-        if ctx.arguments():
-            op_args, op_kwargs = _get_arguments(ctx.arguments())
+        if ctx.arguments() and self.lazy:
+            self._program._operations.append(self._lazy_operation(op, modes, ctx.arguments()))
+        elif ctx.arguments():
+            op_args, op_kwargs = self._arguments(ctx.arguments())
 
             # convert any sympy expressions into regref transforms
-            op_args = [RegRefTransform(i) if isinstance(i, sym.Expr) else i for i in op_args]
+            op_args = [self._regref_transform(i) if isinstance(i, sym.Expr) else i for i in op_args]
 
             self._program._operations.append(
                 {"op": op, "args": op_args, "kwargs": op_kwargs, "modes": modes}
@@ -316,17 +406,251 @@ class BlackbirdListener(blackbirdListener):
         else:
             self._program._operations.append({"op": op, "modes": modes})
 
+    def _lazy_operation(self, op, modes, arguments):
+        """Create an operation whose arguments are evaluated on first access.
+
+        Args:
+            op (str): operation name
+            modes (list[int]): modes the operation applies to
+            arguments: arguments context
+
+        Returns:
+            LazyDict: operation dictionary
+        """
+        args, kwargs = _compile_arguments(arguments)
+        regref_transform = self._regref_transform
+
+        def op_args():
+            values = [f() for f in args]
+            # convert any sympy expressions into regref transforms
+            return [regref_transform(i) if isinstance(i, sym.Expr) else i for i in values]
+
+        return LazyDict(
+            op=op,
+            args=LazyValue(op_args),
+            kwargs=LazyValue(lambda: {k: f() for k, f in kwargs.items()}),
+            modes=modes,
+        )
+
     def exitProgram(self, ctx: blackbirdParser.ProgramContext):
         """Run after exiting the program block.
 
         Args:
             ctx: program context
         """
+        if self.lazy:
+            self._program._var = LazyDict(self._program._var)
+
         self._program._var.update(_VAR)
         _VAR.clear()
 
 
-def parse(data, listener=BlackbirdListener):
+class ParseStats:
+    """Statistics of parsing a Blackbird script, returned by :func:`parse`
+    when called with ``stats=True``.
+
+    The wall time of each phase of parsing is stored in :attr:`times`:
+
+    * ``"lex"``: splitting the script into tokens
+    * ``"parse"``: ANTLR prediction and construction of the parse tree
+    * ``"walk"``: walking the parse tree with the listener, which includes the
+      three following phases
+    * ``"expressions"``: evaluating variable declarations and the arguments
+      of the target and statements
+    * ``"arrays"``: constructing arrays
+    * ``"regref"``: constructing :class:`RegRefTransform` instances, which
+      includes lambdifying their expressions
+
+    Attributes:
+        times (dict[str->float]): wall time in seconds of each phase
+        tokens (int): number of tokens, including the end of file token
+        nodes (int): number of nodes of the parse tree, including leaves
+        ll_fallbacks (int): number of predictions for which SLL prediction found a
+            conflict, and ANTLR fell back to full LL prediction
+        array_elements (int): total number of elements of the declared arrays,
+            excluding the arrays evaluated lazily
+        regref_transforms (int): number of register transforms constructed
+    """
+
+    PHASES = ("lex", "parse", "walk", "expressions", "arrays", "regref")
+    """tuple[str]: names of the phases of parsing"""
+
+    def __init__(self):
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+        self.tokens = 0
+        self.nodes = 0
+        self.ll_fallbacks = 0
+        self.array_elements = 0
+        self.regref_transforms = 0
+
+    @property
+    def total(self):
+        """float: total wall time in seconds of lexing, parsing and walking the tree"""
+        return self.times["lex"] + self.times["parse"] + self.times["walk"]
+
+    @contextmanager
+    def _timer(self, phase):
+        """Context manager adding the wall time of its body to a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[phase] += time.perf_counter() - start
+
+    def _timed(self, phase, func):
+        """Wrap a function, adding the wall time of each call to a phase."""
+
+        def wrapper(*args, **kwargs):
+            with self._timer(phase):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def _instrument(self, parser, listener):
+        """Instrument a parser and a listener instance to collect statistics.
+
+        Only the instances are modified, so that parsing without statistics
+        is unaffected.
+
+        Args:
+            parser (blackbirdParser): parser
+            listener (BlackbirdListener): listener
+        """
+        interp = parser._interp
+        full_context = interp.execATNWithFullContext
+
+        def fallback(*args):
+            self.ll_fallbacks += 1
+            return full_context(*args)
+
+        interp.execATNWithFullContext = fallback
+
+        exit_arrayvar = self._timed("arrays", listener.exitArrayvar)
+
+        def exitArrayvar(ctx):
+            exit_arrayvar(ctx)
+            value = _VAR[ctx.name().getText()]
+
+            if not isinstance(value, LazyValue):
+                self.array_elements += np.size(value)
+
+        regref_transform = self._timed("regref", listener._regref_transform)
+
+        def _regref_transform(expr):
+            self.regref_transforms += 1
+            return regref_transform(expr)
+
+        listener.exitArrayvar = exitArrayvar
+        listener._regref_transform = _regref_transform
+        listener.exitExpressionvar = self._timed("expressions", listener.exitExpressionvar)
+        listener._arguments = self._timed("expressions", listener._arguments)
+
+    def __repr__(self):
+        times = ", ".join("{}={:.3g}s".format(k, v) for k, v in self.times.items())
+        return (
+            "<ParseStats: {}, tokens={}, nodes={}, ll_fallbacks={}, "
+            "array_elements={}, regref_transforms={}>".format(
+                times,
+                self.tokens,
+                self.nodes,
+                self.ll_fallbacks,
+                self.array_elements,
+                self.regref_transforms,
+            )
+        )
+
+
+def _count_nodes(tree):
+    """Number of nodes of a parse tree, including leaves."""
+    count = 0
+    stack = [tree]
+
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(getattr(node, "children", None) or ())
+
+    return count
+
+
+class _CollectingWalker(antlr4.ParseTreeWalker):
+    """Parse tree walker that records the errors raised by the listener
+    for each rule, and continues walking the tree.
+
+    Args:
+        errors (BlackbirdErrorListener): error listener to record the errors in
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+
+    def exitRule(self, listener, r):
+        try:
+            super().exitRule(listener, r)
+        except BlackbirdSyntaxError as e:
+            self.errors.errors.append(e)
+        except (TypeError, ValueError) as e:
+            # semantic errors raised without a position
+            ctx = r.getRuleContext()
+            self.errors.errors.append(
+                BlackbirdSyntaxError(
+                    "Blackbird SyntaxError (line {}:{}): {}".format(
+                        ctx.start.line, ctx.start.column + 1, e
+                    )
+                )
+            )
+        except Exception:  # pylint: disable=broad-except
+            # rules containing syntax errors may be incomplete
+            if not self.errors.errors:
+                raise
+
+
+def _raise_collected(errors):
+    """Raise the errors collected in error recovery mode, if any.
+
+    Args:
+        errors (BlackbirdErrorListener): error listener in error recovery mode
+
+    Raises:
+        BlackbirdSyntaxError: the single collected error, or an error reporting
+        all the collected errors, available in its ``errors`` attribute
+    """
+    if not errors.errors:
+        return
+
+    if len(errors.errors) == 1:
+        raise errors.errors[0]
+
+    msg = "{} errors:\n{}".format(len(errors.errors), "\n".join(str(e) for e in errors.errors))
+    raise BlackbirdSyntaxError(msg, errors=errors.errors)
+
+
+def _parser(data, errors):
+    """Create a parser reading a Blackbird data stream.
+
+    Args:
+        data (antlr4.InputStream): ANTLR4 data stream of the Blackbird script
+        errors (BlackbirdErrorListener): error listener; in error recovery mode,
+            it also receives the errors of the lexer
+
+    Returns:
+        blackbirdParser: parser
+    """
+    lexer = blackbirdLexer(data)
+
+    if errors.collect:
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(errors)
+
+    parser = blackbirdParser(antlr4.CommonTokenStream(lexer))
+    parser.removeErrorListeners()
+    parser.addErrorListener(errors)
+    return parser
+
+
+def parse(
+    data, listener=BlackbirdListener, stats=False, collect_errors=False, array_pool=None, lazy=False
+):
     """Parse a blackbird data stream.
 
     Args:
@@ -334,21 +658,85 @@ def parse(data, listener=BlackbirdListener):
         Listener (BlackbirdListener): an Blackbird listener to use to walk the AST.
             By default, the basic :class:`~.BlackbirdListener` defined above
             is used.
+        stats (bool): whether to collect timing and size statistics of each phase
+            of parsing; see :class:`~.ParseStats`
+        collect_errors (bool): whether to report all the syntax and semantic
+            errors of the script at once, rather than only the first one
+        array_pool (ArrayPool or None): pool sharing the array variables of the
+            script with other programs loaded with the same pool; see :mod:`~blackbird.interning`
+        lazy (bool): whether to evaluate the variables and operation arguments
+            on first access, rather than while parsing; see :mod:`~blackbird.lazy`
 
     Returns:
-        BlackbirdProgram: returns an instance of the :class:`BlackbirdProgram` class after
-        parsing the abstract syntax tree
+        BlackbirdProgram or tuple[BlackbirdProgram, ParseStats]: returns an instance
+        of the :class:`BlackbirdProgram` class after parsing the abstract syntax tree,
+        as well as the parsing statistics if ``stats=True``
+
+    Raises:
+        BlackbirdSyntaxError: if the script contains an error. If ``collect_errors=True``
+        and the script contains several errors, the ``errors`` attribute of the exception
+        contains an exception for each error, syntax errors first.
     """
-    lexer = blackbirdLexer(data)
-    stream = antlr4.CommonTokenStream(lexer)
+    errors = BlackbirdErrorListener(collect=collect_errors)
 
-    parser = blackbirdParser(stream)
-    parser.removeErrorListeners()
-    parser.addErrorListener(BlackbirdErrorListener())
-    tree = parser.start()
+    if not stats:
+        return _parse(data, listener, errors, array_pool=array_pool, lazy=lazy)
+
+    stats = ParseStats()
+    return _parse(data, listener, errors, stats, array_pool, lazy), stats
 
+
+def _parse(data, listener, errors, stats=None, array_pool=None, lazy=False):
+    """Parse a blackbird data stream, optionally collecting parsing statistics.
+
+    Args:
+        data (antlr4.InputStream): ANTLR4 data stream of the Blackbird script
+        listener (BlackbirdListener): Blackbird listener class
+        errors (BlackbirdErrorListener): error listener
+        stats (ParseStats or None): statistics to record the parse in, if provided
+        array_pool (ArrayPool or None): pool interning the array variables
+        lazy (bool): whether to evaluate the variables and arguments on first access
+
+    Returns:
+        BlackbirdProgram: the parsed program
+    """
+    parser = _parser(data, errors)
     blackbird = listener()
-    walker = antlr4.ParseTreeWalker()
-    walker.walk(blackbird, tree)
 
+    if array_pool is not None:
+        blackbird.array_pool = array_pool
+
+    if lazy:
+        blackbird.lazy = True
+
+    def timer(phase):  # pylint: disable=unused-argument
+        return nullcontext()
+
+    if stats is not None:
+        stats._instrument(parser, blackbird)
+        timer = stats._timer
+
+    with span("parse.tree"):
+        if stats is not None:
+            # without statistics, the tokens are read lazily while parsing
+            with timer("lex"):
+                parser.getTokenStream().fill()
+
+        with timer("parse"):
+            tree = parser.start()
+
+    if stats is not None:
+        stats.tokens = len(parser.getTokenStream().tokens)
+        stats.nodes = _count_nodes(tree)
+
+    walker = _CollectingWalker(errors) if errors.collect else antlr4.ParseTreeWalker()
+
+    try:
+        with span("parse.walk"), timer("walk"):
+            walker.walk(blackbird, tree)
+    finally:
+        # do not leak the variables of a failed parse into the next one
+        _VAR.clear()
+
+    _raise_collected(errors)
     return blackbird.program
@@ -31,13 +31,20 @@ Summary
 
 .. autosummary::
     numpy_to_blackbird
+    is_measurement
+    OperationList
     BlackbirdProgram
 
 Code details
 ~~~~~~~~~~~~
 """
+import hashlib
+import sys
+
 import numpy as np
 
+from .tracing import traced
+
 
 def numpy_to_blackbird(A, var_name):
     """Converts a numpy array to a Blackbird script array type.
@@ -83,6 +90,320 @@ def numpy_to_blackbird(A, var_name):
     return script
 
 
+def _sizeof(value, seen):
+    """Number of bytes held by a value, not counting objects whose
+    ``id`` is in ``seen``; the ids of counted objects are added to ``seen``.
+
+    Args:
+        value (any): variable value or operation argument
+        seen (set[int]): ids of the objects already counted
+
+    Returns:
+        int: number of bytes
+    """
+    if id(value) in seen:
+        return 0
+
+    seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        # includes the data buffer only if the array owns it
+        size = sys.getsizeof(value)
+
+        if value.base is not None and isinstance(value.base, np.ndarray):
+            size += _sizeof(value.base, seen)
+
+        return size
+
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v, seen) for v in value)
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(v, seen) for v in value.values())
+
+    return sys.getsizeof(value)
+
+
+def _regref_sizeof(transform, seen):
+    """Number of bytes held by a :class:`~.RegRefTransform`, including the
+    function generated by SymPy, its code object, and its global namespace.
+
+    Args:
+        transform (RegRefTransform): register transform
+        seen (set[int]): ids of the objects already counted
+
+    Returns:
+        int: number of bytes
+    """
+    size = _sizeof(transform, seen) + _sizeof(vars(transform), seen)
+    func = transform.func
+
+    # the namespace only references modules and functions shared between
+    # all transforms, so only the dictionary itself is counted
+    for obj in (func, func.__code__, func.__code__.co_code, func.__globals__):
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            size += sys.getsizeof(obj)
+
+    return size
+
+
+_ARRAY_CHUNK = 1 << 20
+"""int: number of bytes of array data hashed at a time by :meth:`BlackbirdProgram.fingerprint`"""
+
+
+def _digest_array(digest, array):
+    """Update a hash with the data type, shape and content of an array.
+
+    The content of contiguous arrays is hashed from their buffer without
+    copying it; other arrays are copied to a contiguous array first. The
+    elements of arrays of Python objects are hashed with :func:`_digest_value`.
+
+    Args:
+        digest (hashlib._Hash): the hash to update
+        array (array): the array
+    """
+    header = "{}{}".format(array.dtype.str, array.shape).encode()
+    digest.update(b"a" + len(header).to_bytes(8, "little") + header)
+
+    if array.dtype.hasobject:
+        for v in array.flat:
+            _digest_value(digest, v)
+        return
+
+    data = memoryview(np.ascontiguousarray(array)).cast("B")
+
+    for start in range(0, len(data), _ARRAY_CHUNK):
+        digest.update(data[start : start + _ARRAY_CHUNK])
+
+
+def _array_key(array):
+    """Key identifying an array by its data type, shape and content.
+
+    Args:
+        array (array): the array
+
+    Returns:
+        tuple[str, tuple[int], str]: the data type, the shape, and the
+        hexadecimal SHA-256 digest of :func:`_digest_array`
+    """
+    digest = hashlib.sha256()
+    _digest_array(digest, array)
+    return array.dtype.str, array.shape, digest.hexdigest()
+
+
+def _digest_value(digest, value):
+    """Update a hash with a canonical, unambiguous encoding of a value.
+
+    Each value is encoded as a type tag followed by its length-prefixed
+    representation, so that values of different types, or sequences of
+    different lengths, never have the same encoding.
+
+    Args:
+        digest (hashlib._Hash): the hash to update
+        value (any): variable value, operation argument, or target option
+    """
+
+    def update(tag, data):
+        digest.update(tag + len(data).to_bytes(8, "little") + data)
+
+    if value is None:
+        update(b"n", b"")
+    elif isinstance(value, (bool, np.bool_)):
+        update(b"b", b"1" if value else b"0")
+    elif isinstance(value, (int, np.integer)):
+        update(b"i", str(int(value)).encode())
+    elif isinstance(value, (float, np.floating)):
+        update(b"f", repr(float(value)).encode())
+    elif isinstance(value, (complex, np.complexfloating)):
+        update(b"c", repr(complex(value)).encode())
+    elif isinstance(value, str):
+        update(b"s", value.encode())
+    elif isinstance(value, np.ndarray):
+        _digest_array(digest, value)
+    elif isinstance(value, (list, tuple)):
+        update(b"l", str(len(value)).encode())
+
+        for v in value:
+            _digest_value(digest, v)
+    elif isinstance(value, dict):
+        update(b"d", str(len(value)).encode())
+
+        for k in sorted(value):
+            _digest_value(digest, k)
+            _digest_value(digest, value[k])
+    elif hasattr(value, "func_str") and hasattr(value, "regrefs"):
+        # register transforms are identified by their expression
+        update(b"r", value.func_str.encode())
+    else:
+        update(type(value).__name__.encode(), repr(value).encode())
+
+
+def is_measurement(op):
+    """Returns ``True`` if the operation is a measurement.
+
+    Args:
+        op (dict): operation dictionary
+
+    Returns:
+        bool: whether the operation name is a Blackbird ``Measure*`` token
+    """
+    return op["op"].startswith("Measure")
+
+
+class OperationList(list):
+    """List of quantum operations that indexes its contents.
+
+    Behaves exactly like a Python list; in addition, it keeps track of
+    the number of times it has been mutated, and maintains indexes of the
+    contained operations by mode, by operation name, and by measurement.
+
+    The indexes are extended incrementally as operations are appended,
+    and are rebuilt from scratch after any other mutation of the list.
+    Note that the operation dictionaries themselves are not tracked; if
+    an operation dictionary is modified in place, :meth:`reindex` must
+    be called.
+
+    Args:
+        iterable (Iterable[dict]): initial operations
+    """
+
+    # class-level defaults, so that lists restored by pickle or copy
+    # (which may append items before the instance state is restored)
+    # remain consistent
+    _mutations = 0
+    _indexed = 0
+    _by_mode = None
+    _by_name = None
+    _measurements = None
+
+    @property
+    def mutations(self):
+        """Number of times the list has been mutated.
+
+        Returns:
+            int: mutation count
+        """
+        return self._mutations
+
+    def reindex(self):
+        """Discard the operation indexes, forcing them to be rebuilt
+        on the next query."""
+        self._mutations += 1
+        self._clear_index()
+
+    def _clear_index(self):
+        """Reset the operation indexes, without counting a mutation."""
+        self._indexed = 0
+        self._by_mode = {}
+        self._by_name = {}
+        self._measurements = []
+
+    def _update_index(self):
+        """Index all operations appended since the last query."""
+        if self._by_mode is None:
+            # querying the list does not mutate it
+            self._clear_index()
+
+        for idx in range(self._indexed, len(self)):
+            op = self[idx]
+
+            for m in op["modes"]:
+                self._by_mode.setdefault(m, []).append(idx)
+
+            self._by_name.setdefault(op["op"], []).append(idx)
+
+            if is_measurement(op):
+                self._measurements.append(idx)
+
+        self._indexed = len(self)
+
+    def indices_on_mode(self, mode):
+        """Positions of all operations acting on a mode.
+
+        Args:
+            mode (int): mode number
+
+        Returns:
+            list[int]: operation positions, in temporal order
+        """
+        self._update_index()
+        return list(self._by_mode.get(mode, []))
+
+    def indices_named(self, name):
+        """Positions of all operations with a given name.
+
+        Args:
+            name (str): operation name
+
+        Returns:
+            list[int]: operation positions, in temporal order
+        """
+        self._update_index()
+        return list(self._by_name.get(name, []))
+
+    def measurement_indices(self):
+        """Positions of all measurement operations.
+
+        Returns:
+            list[int]: operation positions, in temporal order
+        """
+        self._update_index()
+        return list(self._measurements)
+
+    # appending only requires the index to be extended
+    def append(self, op):
+        super().append(op)
+        self._mutations += 1
+
+    def extend(self, ops):
+        super().extend(ops)
+        self._mutations += 1
+
+    def __iadd__(self, ops):
+        self.extend(ops)
+        return self
+
+    # all other mutations invalidate the index
+    def insert(self, idx, op):
+        super().insert(idx, op)
+        self.reindex()
+
+    def pop(self, *args):
+        op = super().pop(*args)
+        self.reindex()
+        return op
+
+    def remove(self, op):
+        super().remove(op)
+        self.reindex()
+
+    def clear(self):
+        super().clear()
+        self.reindex()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.reindex()
+
+    def reverse(self):
+        super().reverse()
+        self.reindex()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.reindex()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.reindex()
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self.reindex()
+        return self
+
+
 class BlackbirdProgram:
     """Python representation of a Blackbird program."""
 
@@ -94,7 +415,42 @@ class BlackbirdProgram:
         self._name = name
         self._version = version
         self._target = {"name": None, "options": dict()}
-        self._operations = []
+        self._operations = OperationList()
+
+    def _cached(self, key, func):
+        """Return a value derived from the operations, computing
+        it only if the operations have changed since it was last computed.
+
+        Args:
+            key (str): cache key
+            func (callable): function with no arguments computing the value
+
+        Returns:
+            any: the cached value
+        """
+        mutations = self._operations.mutations
+        cached = self._cache.get(key)
+
+        if cached is None or cached[0] != mutations:
+            cached = (mutations, func())
+            self._cache[key] = cached
+
+        return cached[1]
+
+    @property
+    def _operations(self):
+        """OperationList: the list of operations, as stored internally"""
+        return self._operation_list
+
+    @_operations.setter
+    def _operations(self, operations):
+        """Replace the list of operations. Any iterable of operations is
+        converted to an :class:`OperationList`."""
+        if not isinstance(operations, OperationList):
+            operations = OperationList(operations)
+
+        self._operation_list = operations
+        self._cache = {}
 
     @property
     def name(self):
@@ -166,6 +522,240 @@ class BlackbirdProgram:
         """
         return len(self._operations)
 
+    def ops_on_mode(self, mode):
+        """All operations acting on a particular mode, in temporal order.
+
+        This is an index lookup, and does not scan the entire program.
+
+        Args:
+            mode (int): mode number
+
+        Returns:
+            list[dict]: operation information
+        """
+        return [self._operations[i] for i in self._operations.indices_on_mode(mode)]
+
+    def ops_named(self, name):
+        """All operations with a particular name, in temporal order.
+
+        This is an index lookup, and does not scan the entire program.
+
+        Args:
+            name (str): the name of the operation, for example ``"Interferometer"``
+
+        Returns:
+            list[dict]: operation information
+        """
+        return [self._operations[i] for i in self._operations.indices_named(name)]
+
+    def measurements(self):
+        """All measurement operations, in temporal order.
+
+        This is an index lookup, and does not scan the entire program.
+
+        Returns:
+            list[dict]: operation information
+        """
+        return [self._operations[i] for i in self._operations.measurement_indices()]
+
+    def _dependencies(self):
+        """Builds the dependency graph and layer decomposition of the
+        program in a single pass over the operations.
+
+        Returns:
+            tuple[dict[int->list[int]], list[list[int]]]: the dependency
+            graph and the layers
+        """
+        dag = {}
+        depth = []
+        layers = []
+
+        # the last operation applied to each mode
+        last_op = {}
+        # the last measurement of each mode
+        last_measurement = {}
+
+        for idx, op in enumerate(self._operations):
+            preds = {last_op[m] for m in op["modes"] if m in last_op}
+
+            # classical dependencies on earlier measurement results
+            args = list(op.get("args", [])) + list(op.get("kwargs", {}).values())
+            for arg in args:
+                for m in getattr(arg, "regrefs", []):
+                    if m in last_measurement:
+                        preds.add(last_measurement[m])
+
+            dag[idx] = sorted(preds)
+
+            layer = max((depth[p] + 1 for p in preds), default=0)
+            depth.append(layer)
+
+            if layer == len(layers):
+                layers.append([])
+
+            layers[layer].append(idx)
+
+            for m in op["modes"]:
+                last_op[m] = idx
+
+                if is_measurement(op):
+                    last_measurement[m] = idx
+
+        return dag, layers
+
+    def dag(self):
+        """The dependency graph of the program.
+
+        An operation depends on the previous operation applied to each of its
+        modes, and, if any of its arguments is a :class:`~.RegRefTransform`,
+        on the most recent measurement of each register it references.
+
+        The graph is cached, and only recomputed if the operations change.
+        A copy is returned, so that modifying it does not affect the cache.
+
+        Returns:
+            dict[int->list[int]]: mapping from the position of each operation
+            in :attr:`operations` to the positions of the operations it directly
+            depends on
+        """
+        dag = self._cached("dependencies", self._dependencies)[0]
+        return {idx: list(deps) for idx, deps in dag.items()}
+
+    def layers(self):
+        """Decomposition of the program into layers of operations
+        that act on disjoint modes, and may be applied in parallel.
+
+        Each operation is placed in the earliest layer consistent with
+        :meth:`dag`; the number of layers is therefore the circuit depth.
+        The layers are cached, and only recomputed if the operations change.
+        A copy is returned, so that modifying it does not affect the cache.
+
+        Returns:
+            list[list[int]]: positions of the operations in :attr:`operations`
+            belonging to each layer
+        """
+        return [list(layer) for layer in self._cached("dependencies", self._dependencies)[1]]
+
+    def _operations_digest(self):
+        """SHA-256 digest of the operations, as used by :meth:`fingerprint`.
+
+        Returns:
+            bytes: digest
+        """
+        digest = hashlib.sha256()
+        _digest_value(digest, len(self._operations))
+
+        for op in self._operations:
+            _digest_value(digest, op["op"])
+            _digest_value(digest, op["modes"])
+            _digest_value(digest, op.get("args", []))
+            _digest_value(digest, op.get("kwargs", {}))
+
+        return digest.digest()
+
+    def fingerprint(self):
+        """Stable hash of the canonical content of the program.
+
+        The fingerprint depends on the program name, version, target and
+        target options, and on the name, modes and resolved argument values
+        of each operation, including the bytes of array arguments. Programs
+        that only differ by comments, whitespace, variable names, or the
+        order of the target options, have the same fingerprint. It does not
+        depend on the Python session, so that it may be used as a persistent
+        cache key.
+
+        The hash of the operations is cached, and only recomputed if the
+        operations change. As for :meth:`dag`, operation dictionaries modified
+        in place are not tracked.
+
+        Returns:
+            str: hexadecimal SHA-256 digest
+        """
+        digest = hashlib.sha256()
+
+        _digest_value(digest, self.name)
+        _digest_value(digest, self.version)
+        _digest_value(digest, self.target["name"])
+        _digest_value(digest, self.target["options"])
+        digest.update(self._cached("fingerprint", self._operations_digest))
+
+        return digest.hexdigest()
+
+    def memory_report(self):
+        """Breakdown of the memory held by the program.
+
+        Objects referenced more than once, such as an array variable passed as
+        an operation argument, are only counted once, in the first category
+        they appear in.
+
+        The returned dictionary has the following keys:
+
+        * ``'variables'``: bytes held by the values of the variables, including arrays
+        * ``'arguments'``: bytes held by the values of operation arguments and
+          keyword arguments, excluding register transforms
+        * ``'operations'``: overhead of the operation list, and of the dictionaries,
+          lists and names describing each operation
+        * ``'regref_transforms'``: bytes held by :class:`~.RegRefTransform`
+          arguments, including the functions generated by SymPy and their
+          namespaces
+        * ``'duplicate_arrays'``: bytes held by arrays that are distinct objects
+          but equal to an array counted previously; these bytes are included
+          in the other categories, and could be saved by sharing the arrays
+        * ``'total'``: sum of all categories except ``'duplicate_arrays'``
+
+        Returns:
+            dict[str->int]: number of bytes in each category
+        """
+        seen = set()
+        report = dict.fromkeys(
+            ["variables", "arguments", "operations", "regref_transforms", "duplicate_arrays"], 0
+        )
+
+        # keys of the distinct arrays
+        arrays = set()
+
+        def count_array(value):
+            if not isinstance(value, np.ndarray) or id(value) in seen:
+                return
+
+            key = _array_key(value)
+
+            if key in arrays:
+                report["duplicate_arrays"] += value.nbytes
+            else:
+                arrays.add(key)
+
+        for value in self._var.values():
+            count_array(value)
+            report["variables"] += _sizeof(value, seen)
+
+        report["operations"] += sys.getsizeof(self._operations)
+
+        for op in self._operations:
+            report["operations"] += sys.getsizeof(op) + _sizeof(op["op"], seen)
+            report["operations"] += _sizeof(op["modes"], seen)
+
+            values = []
+
+            if "args" in op:
+                values.extend(op["args"])
+                report["operations"] += sys.getsizeof(op["args"])
+
+            if "kwargs" in op:
+                values.extend(op["kwargs"].values())
+                report["operations"] += sys.getsizeof(op["kwargs"])
+
+            for value in values:
+                if hasattr(value, "func") and hasattr(value, "regrefs"):
+                    report["regref_transforms"] += _regref_sizeof(value, seen)
+                else:
+                    count_array(value)
+                    report["arguments"] += _sizeof(value, seen)
+
+        report["total"] = sum(v for k, v in report.items() if k != "duplicate_arrays")
+        return report
+
+    @traced("serialize")
     def serialize(self):
         """Serializes the blackbird program, returning a valid Blackbird script
         as a string.
@@ -0,0 +1,411 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Symplectic representation
+=========================
+
+**Module name:** :mod:`blackbird.symplectic`
+
+.. currentmodule:: blackbird.symplectic
+
+This module contains functions returning the symplectic representation
+of the Gaussian operations defined in Blackbird, following the
+`Strawberry Fields conventions <https://strawberryfields.readthedocs.io/en/latest/conventions/gates.html>`_.
+
+All matrices and vectors use the :math:`xxpp` ordering; for an operation
+acting on :math:`k` modes, the first :math:`k` rows correspond to the position
+quadratures of the modes, in the order they are listed in the Blackbird statement,
+and the last :math:`k` rows to the momentum quadratures.
+
+Summary
+-------
+
+.. autosummary::
+    GAUSSIAN_GATES
+    GAUSSIAN_STATES
+    is_symplectic
+    interferometer
+    gaussian_gate
+    gaussian_state
+    constant_args
+    gate_symplectic
+    sympmat
+    williamson
+    bloch_messiah
+
+Code details
+~~~~~~~~~~~~
+"""
+import numbers
+
+import numpy as np
+
+
+GAUSSIAN_GATES = {
+    "Rgate",
+    "Dgate",
+    "Xgate",
+    "Zgate",
+    "Sgate",
+    "Pgate",
+    "BSgate",
+    "S2gate",
+    "CXgate",
+    "CZgate",
+    "Interferometer",
+    "GaussianTransform",
+}
+"""set[str]: Gaussian unitary operations, with a symplectic representation"""
+
+
+GAUSSIAN_STATES = {"Vacuum", "Vac", "Coherent", "Squeezed", "Thermal"}
+"""set[str]: Gaussian single mode state preparations"""
+
+
+def is_symplectic(S, tol=1e-8):
+    """Checks whether a matrix in the :math:`xxpp` ordering is symplectic.
+
+    Args:
+        S (array): square matrix of even dimension, or an array of
+            such matrices with leading batch dimensions
+        tol (float): absolute tolerance
+
+    Returns:
+        bool or array[bool]: whether each matrix is symplectic
+    """
+    S = np.asarray(S)
+    n = S.shape[-1] // 2
+
+    if S.shape[-1] != S.shape[-2] or S.shape[-1] != 2 * n:
+        return np.zeros(S.shape[:-2], dtype=bool)[()]
+
+    Omega = np.block([[np.zeros((n, n)), np.identity(n)], [-np.identity(n), np.zeros((n, n))]])
+    res = S @ Omega @ np.swapaxes(S, -1, -2) - Omega
+    return np.all(np.abs(res) < tol, axis=(-1, -2))[()]
+
+
+def interferometer(U):
+    """Symplectic matrix of a passive linear optical interferometer.
+
+    Args:
+        U (array): unitary matrix acting on the creation operators
+
+    Returns:
+        array: symplectic matrix
+    """
+    return np.block([[U.real, -U.imag], [U.imag, U.real]])
+
+
+def _pad(args, defaults):
+    """Pad a list of positional arguments with their default values."""
+    args = list(args)
+    return args + list(defaults[len(args) :])
+
+
+def _matrix(rows):
+    """Construct a matrix from nested lists of entries, which are either scalars,
+    or arrays with the same batch shape. Batch dimensions are leading."""
+    entries = [e for row in rows for e in row]
+
+    if all(np.ndim(e) == 0 for e in entries):
+        return np.array(rows)
+
+    entries = np.broadcast_arrays(*entries)
+    return np.stack(entries, axis=-1).reshape(entries[0].shape + (len(rows), len(rows[0])))
+
+
+def _vector(entries):
+    """Construct a vector from entries, which are either scalars, or arrays with
+    the same batch shape. Batch dimensions are leading."""
+    if all(np.ndim(e) == 0 for e in entries):
+        return np.array(entries)
+
+    return np.stack(np.broadcast_arrays(*entries), axis=-1)
+
+
+def gaussian_gate(name, args, hbar=2):
+    """Symplectic representation of a Gaussian unitary operation.
+
+    The operation maps the vector of quadrature means :math:`\\mathbf{r}` of the
+    modes it acts on to :math:`S\\mathbf{r}+\\mathbf{d}`.
+
+    The arguments may be arrays with leading batch dimensions, stacking the
+    arguments of several operations with the same name; the returned matrices
+    and vectors then have the same leading batch dimensions, or are broadcastable
+    to them.
+
+    Args:
+        name (str): name of the operation, one of :data:`GAUSSIAN_GATES`
+        args (list): numeric positional arguments of the operation
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+
+    Returns:
+        tuple[array, array]: the local symplectic matrix :math:`S` and displacement
+        :math:`\\mathbf{d}`
+
+    Raises:
+        ValueError: if the operation is not a Gaussian unitary
+    """
+    if name == "Rgate":
+        (phi,) = args
+        c, s = np.cos(phi), np.sin(phi)
+        return _matrix([[c, -s], [s, c]]), np.zeros(2)
+
+    if name == "Dgate":
+        a, phi = _pad(args, [None, 0])
+        alpha = a * np.exp(1j * phi)
+        return np.identity(2), np.sqrt(2 * hbar) * _vector([alpha.real, alpha.imag])
+
+    if name == "Xgate":
+        (x,) = args
+        return np.identity(2), _vector([x, 0.0])
+
+    if name == "Zgate":
+        (p,) = args
+        return np.identity(2), _vector([0.0, p])
+
+    if name == "Sgate":
+        r, phi = _pad(args, [None, 0])
+        c, s = np.cos(phi), np.sin(phi)
+        ch, sh = np.cosh(r), np.sinh(r)
+        return _matrix([[ch - c * sh, -s * sh], [-s * sh, ch + c * sh]]), np.zeros(2)
+
+    if name == "Pgate":
+        (s,) = args
+        return _matrix([[1.0, 0.0], [s, 1.0]]), np.zeros(2)
+
+    if name == "BSgate":
+        theta, phi = _pad(args, [np.pi / 4, 0])
+        t = np.cos(theta)
+        r = np.exp(1j * phi) * np.sin(theta)
+        return interferometer(_matrix([[t, -np.conj(r)], [r, t]])), np.zeros(4)
+
+    if name == "S2gate":
+        r, phi = _pad(args, [None, 0])
+        c, s = np.cos(phi), np.sin(phi)
+        ch, sh = np.cosh(r), np.sinh(r)
+        S = _matrix(
+            [
+                [ch, c * sh, 0, s * sh],
+                [c * sh, ch, s * sh, 0],
+                [0, s * sh, ch, -c * sh],
+                [s * sh, 0, -c * sh, ch],
+            ]
+        )
+        return S, np.zeros(4)
+
+    if name == "CXgate":
+        (s,) = _pad(args, [1])
+        S = _matrix([[1.0, 0, 0, 0], [s, 1, 0, 0], [0, 0, 1, -s], [0, 0, 0, 1]])
+        return S, np.zeros(4)
+
+    if name == "CZgate":
+        (s,) = _pad(args, [1])
+        S = _matrix([[1.0, 0, 0, 0], [0, 1, 0, 0], [0, s, 1, 0], [s, 0, 0, 1]])
+        return S, np.zeros(4)
+
+    if name == "Interferometer":
+        (U,) = args
+        U = np.asarray(U, dtype=np.complex128)
+        return interferometer(U), np.zeros(2 * U.shape[-1])
+
+    if name == "GaussianTransform":
+        (S,) = args
+        S = np.asarray(S, dtype=np.float64)
+        return S, np.zeros(S.shape[-1])
+
+    raise ValueError("Operation {} is not a Gaussian unitary".format(name))
+
+
+def gaussian_state(name, args, hbar=2):
+    """Covariance matrix and vector of means of a single mode Gaussian state preparation.
+
+    As for :func:`gaussian_gate`, the arguments may be arrays with leading batch dimensions.
+
+    Args:
+        name (str): name of the state preparation, one of :data:`GAUSSIAN_STATES`
+        args (list): numeric positional arguments of the state preparation
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+
+    Returns:
+        tuple[array, array]: the covariance matrix and vector of means
+
+    Raises:
+        ValueError: if the operation is not a Gaussian state preparation
+    """
+    vacuum = hbar / 2 * np.identity(2)
+
+    if name in ("Vacuum", "Vac"):
+        return vacuum, np.zeros(2)
+
+    if name == "Coherent":
+        a, phi = _pad(args, [None, 0])
+        alpha = a * np.exp(1j * phi)
+        return vacuum, np.sqrt(2 * hbar) * _vector([alpha.real, alpha.imag])
+
+    if name == "Squeezed":
+        r, phi = _pad(args, [None, 0])
+        S, _ = gaussian_gate("Sgate", [r, phi])
+        return S @ vacuum @ np.swapaxes(S, -1, -2), np.zeros(2)
+
+    if name == "Thermal":
+        (nbar,) = args
+        return (2 * np.asarray(nbar) + 1)[..., None, None] * vacuum, np.zeros(2)
+
+    raise ValueError("Operation {} is not a Gaussian state preparation".format(name))
+
+
+def constant_args(op):
+    """Returns the positional arguments of an operation if they are all
+    numeric constants or numeric arrays, and the operation has no keyword arguments.
+
+    Args:
+        op (dict): operation
+
+    Returns:
+        Union[list, None]: the positional arguments, or ``None`` if any are not constant
+    """
+    args = op.get("args", [])
+
+    if op.get("kwargs"):
+        return None
+
+    for a in args:
+        if isinstance(a, np.ndarray):
+            if not np.issubdtype(a.dtype, np.number):
+                return None
+        elif isinstance(a, bool) or not isinstance(a, numbers.Number):
+            return None
+
+    return args
+
+
+def gate_symplectic(op, hbar=2):
+    """Symplectic representation of a Blackbird operation.
+
+    Args:
+        op (dict): operation
+        hbar (float): the value of :math:`\\hbar` in the commutation relation
+
+    Returns:
+        Union[tuple[array, array], None]: the local symplectic matrix and displacement,
+        or ``None`` if the operation is not a Gaussian unitary with constant arguments
+    """
+    if op["op"] not in GAUSSIAN_GATES:
+        return None
+
+    args = constant_args(op)
+    if args is None:
+        return None
+
+    try:
+        S, d = gaussian_gate(op["op"], args, hbar=hbar)
+    except (TypeError, ValueError):
+        # wrong number of arguments
+        return None
+
+    if S.shape != (2 * len(op["modes"]),) * 2 or np.iscomplexobj(S) or np.iscomplexobj(d):
+        return None
+
+    return S, d
+
+
+def sympmat(n):
+    """The symplectic form :math:`\\Omega` in the :math:`xxpp` ordering.
+
+    Args:
+        n (int): number of modes
+
+    Returns:
+        array: the :math:`2n\\times 2n` symplectic form
+    """
+    I = np.identity(n)
+    O = np.zeros((n, n))
+    return np.block([[O, I], [-I, O]])
+
+
+def williamson(V):
+    """Williamson decomposition of a positive definite covariance matrix.
+
+    Args:
+        V (array): covariance matrix in the :math:`xxpp` ordering
+
+    Returns:
+        tuple[array, array]: the symplectic eigenvalues :math:`\\nu` of the modes,
+        and a symplectic matrix :math:`S` such that
+        :math:`V = S\\,\\text{diag}(\\nu,\\nu)\\,S^T`
+    """
+    n = len(V) // 2
+
+    w, v = np.linalg.eigh(V)
+    Vm12 = (v / np.sqrt(w)) @ v.T
+
+    # A is antisymmetric, so iA is Hermitian with eigenvalues +-lambda;
+    # the eigenvectors of the positive eigenvalues provide an orthogonal
+    # matrix K bringing A to its canonical form [[0, L], [-L, 0]]
+    A = Vm12 @ sympmat(n) @ Vm12
+    lam, vec = np.linalg.eigh(1j * A)
+    lam = lam[n:]
+    vec = np.sqrt(2) * vec[:, n:]
+    K = np.hstack([vec.imag, vec.real])
+
+    nu = 1 / lam
+    S = Vm12 @ K * np.sqrt(np.concatenate([nu, nu]))
+    return nu, np.linalg.inv(S).T
+
+
+def bloch_messiah(S, tol=1e-10):
+    """Bloch-Messiah decomposition of a symplectic matrix.
+
+    Args:
+        S (array): symplectic matrix in the :math:`xxpp` ordering
+        tol (float): tolerance used to identify degenerate singular values
+
+    Returns:
+        tuple[array, array, array]: orthogonal symplectic matrices :math:`O_1`
+        and :math:`O_2`, and squeezing parameters :math:`r_i\\geq 0`, such that
+        :math:`S = O_1\\,\\text{diag}(e^{-r}, e^{r})\\,O_2`
+    """
+    n = len(S) // 2
+    Omega = sympmat(n)
+
+    # polar decomposition S = O P
+    W, s, Vt = np.linalg.svd(S)
+    O = W @ Vt
+    P = (Vt.T * s) @ Vt
+
+    # For every eigenvector q of P with eigenvalue e^{-r}, Omega^T q is an
+    # eigenvector with eigenvalue e^{r}. Gram-Schmidt ensures that the chosen
+    # eigenvectors remain independent from their partners in degenerate subspaces.
+    w, v = np.linalg.eigh(P)
+    cols = []
+    vals = []
+
+    for val, q in zip(w, v.T):
+        for c in cols:
+            q = q - (c @ q) * c - ((Omega.T @ c) @ q) * (Omega.T @ c)
+
+        norm = np.linalg.norm(q)
+
+        if norm > tol:
+            cols.append(q / norm)
+            vals.append(val)
+
+        if len(cols) == n:
+            break
+
+    Q = np.column_stack(cols + [Omega.T @ c for c in cols])
+    r = -np.log(vals)
+    return O @ Q, r, Q.T
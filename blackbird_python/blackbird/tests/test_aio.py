@@ -0,0 +1,211 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the aio module"""
+# pylint: disable=no-self-use
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import numpy as np
+
+import blackbird
+from blackbird import AsyncRunner, aload, aloads, loads
+from blackbird.error import BlackbirdSyntaxError
+
+
+SCRIPT = """\
+name test
+version 1.0
+target gaussian (shots=10)
+
+float sq = {}
+Squeezed(sq) | 0
+MeasureX | 0
+"""
+
+
+def run(coro):
+    """Run a coroutine in a new event loop"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class TestAloads:
+    """Tests for the asynchronous parsing functions"""
+
+    def test_aloads(self):
+        """Test that aloads gives the same program as loads"""
+        bb = run(aloads(SCRIPT.format(0.5)))
+        assert bb.serialize() == loads(SCRIPT.format(0.5)).serialize()
+
+    def test_aload(self, tmpdir):
+        """Test that aload parses a file"""
+        filename = tmpdir.join("test.xbb")
+        filename.write(SCRIPT.format(0.5))
+
+        bb = run(aload(str(filename)))
+        assert bb.operations[0]["args"] == [0.5]
+
+    def test_top_level(self):
+        """Test that the asynchronous API is importable from the top level"""
+        assert blackbird.aloads is blackbird.aio.aloads
+        assert blackbird.AsyncRunner is blackbird.aio.AsyncRunner
+
+    def test_concurrent_parsing(self):
+        """Test that scripts parsed concurrently in different threads do not
+        share their variables"""
+        values = [0.01 * i for i in range(40)]
+
+        async def parse_all():
+            pool = ThreadPoolExecutor(8)
+            res = await asyncio.gather(*[aloads(SCRIPT.format(v), executor=pool) for v in values])
+            pool.shutdown()
+            return res
+
+        programs = run(parse_all())
+
+        assert [p.operations[0]["args"][0] for p in programs] == values
+        assert [p._var["sq"] for p in programs] == values  # pylint: disable=protected-access
+
+    def test_syntax_error(self):
+        """Test that syntax errors are propagated to the awaiting coroutine"""
+        with pytest.raises(BlackbirdSyntaxError, match="SyntaxError"):
+            run(aloads("name test\nversion 1.0\n\nSqueezed(0.5 | 0\n"))
+
+
+class TestAsyncRunner:
+    """Tests for the asynchronous program runner"""
+
+    def test_default(self):
+        """Test that by default, programs are sampled using the local backend"""
+
+        async def main():
+            async with AsyncRunner() as runner:
+                return await runner.submit(SCRIPT.format(0.5))
+
+        samples = run(main())
+        assert samples.shape == (10, 1)
+        assert not np.any(np.isnan(samples))
+
+    def test_concurrency_limit(self):
+        """Test that no more than the maximum number of programs execute
+        concurrently, and that all results are returned"""
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def func(program):
+            with lock:
+                active.append(program)
+                peak.append(len(active))
+
+            time.sleep(0.02)
+
+            with lock:
+                active.remove(program)
+
+            return program.operations[0]["args"][0]
+
+        async def main():
+            runner = AsyncRunner(func, max_concurrency=2)
+            programs = [loads(SCRIPT.format(i)) for i in range(8)]
+            res = await asyncio.gather(*[runner.submit(p) for p in programs])
+            runner.close()
+            return res
+
+        assert run(main()) == list(range(8))
+        assert max(peak) == 2
+
+    def test_timeout(self):
+        """Test that programs exceeding the timeout raise an exception, and that
+        their slot is released once they have finished"""
+        event = threading.Event()
+
+        async def main():
+            runner = AsyncRunner(lambda p: event.wait(), max_concurrency=1)
+
+            with pytest.raises(asyncio.TimeoutError):
+                await runner.submit(SCRIPT.format(0.5), timeout=0.05)
+
+            assert runner.running == 1
+            event.set()
+
+            # the next program runs once the timed out program finishes
+            res = await runner.submit(SCRIPT.format(0.5), timeout=5)
+            assert runner.running == 0
+            runner.close()
+            return res
+
+        assert run(main()) is True
+
+    def test_cancel_waiting(self):
+        """Test that cancelling a program waiting for a slot prevents it from executing"""
+        event = threading.Event()
+        executed = []
+
+        def func(program):
+            executed.append(program)
+            event.wait()
+            return len(executed)
+
+        async def main():
+            runner = AsyncRunner(func, max_concurrency=1)
+            first = runner.submit(loads(SCRIPT.format(0.1)))
+            second = runner.submit(loads(SCRIPT.format(0.2)))
+
+            await asyncio.sleep(0.05)
+            second.cancel()
+            event.set()
+
+            res = await first
+            await asyncio.sleep(0.05)
+
+            assert second.cancelled()
+            assert len(executed) == 1
+            runner.close()
+            return res
+
+        assert run(main()) == 1
+
+    def test_exception(self):
+        """Test that exceptions raised by a program are propagated"""
+
+        def func(program):
+            raise ValueError("failed")
+
+        async def main():
+            async with AsyncRunner(func) as runner:
+                await runner.submit(loads(SCRIPT.format(0.1)))
+
+        with pytest.raises(ValueError, match="failed"):
+            run(main())
+
+    def test_invalid(self):
+        """Test that invalid arguments raise an exception"""
+        with pytest.raises(ValueError, match="must be positive"):
+            AsyncRunner(max_concurrency=0)
+
+        async def main():
+            async with AsyncRunner() as runner:
+                runner.submit(5)
+
+        with pytest.raises(TypeError, match="Expected a BlackbirdProgram or string"):
+            run(main())
@@ -338,7 +338,7 @@ class TestExpression:
 
         with monkeypatch.context() as m:
             m.setattr(blackbird.auxiliary, "_VAR", {"var1": 5})
-            with pytest.raises(SystemExit, match="name 'var2' is not defined"):
+            with pytest.raises(BlackbirdSyntaxError, match="name 'var2' is not defined"):
                 _expression(expr)
 
     @pytest.mark.parametrize('n1', test_complex)
@@ -494,6 +494,14 @@ class TestExpression:
         assert isinstance(_expression(expr), sym.Symbol)
         assert str(_expression(expr)) == "q2"
 
+    def test_unknown_expression(self, parser, ctx):
+        """Test that an error is raised if the expression is not recognized"""
+        expr = blackbirdParser.ExpressionContext(parser, ctx)
+        expr.getText = lambda: "?"
+
+        with pytest.raises(ValueError, match=r"Unknown expression \?"):
+            _expression(expr)
+
 
 class TestExpressionArray:
     """Tests for the _expression function involving arrays"""
@@ -661,7 +669,7 @@ class TestArguments:
         arg1.start = start()
         args.getChildren = lambda: [arg1]
 
-        with pytest.raises(SystemExit, match="name 'U' is not defined"):
+        with pytest.raises(BlackbirdSyntaxError, match="name 'U' is not defined"):
             _get_arguments(args)
 
     def test_keyword_expression(self, parser, ctx, num):
@@ -0,0 +1,225 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the batch module"""
+# pylint: disable=no-self-use
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.batch import Batcher, stack_programs, structure_key
+from blackbird.gaussian import simulate
+from blackbird.symplectic import gaussian_gate, gaussian_state
+
+
+def program_from_statements(statements):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget gaussian (shots=10)\n\n"
+    return loads(header + dedent(statements))
+
+
+CIRCUIT = """\
+Squeezed({0}, 0.1) | 0
+Coherent({1}) | 1
+Thermal(0.2) | 2
+Sgate({1}, {0}) | 2
+BSgate({0}, {1}) | [0, 1]
+Rgate({1}) | 2
+S2gate({0}) | [1, 2]
+Dgate({0}, {1}) | 0
+Xgate({1}) | 1
+Zgate({0}) | 2
+Pgate({1}) | 0
+CXgate({0}) | [2, 0]
+CZgate({1}) | [0, 1]
+LossChannel({1}) | 1
+ThermalLossChannel(0.5, {0}) | 2
+MeasureIntensity | 0
+"""
+
+
+class TestBatchedGates:
+    """Tests for Gaussian operations with batched arguments"""
+
+    @pytest.mark.parametrize(
+        "name, args",
+        [
+            ("Rgate", [0.3]),
+            ("Dgate", [0.3, 0.2]),
+            ("Xgate", [0.3]),
+            ("Zgate", [0.3]),
+            ("Sgate", [0.3, 0.2]),
+            ("Pgate", [0.3]),
+            ("BSgate", [0.3, 0.2]),
+            ("S2gate", [0.3, 0.2]),
+            ("CXgate", [0.3]),
+            ("CZgate", [0.3]),
+        ],
+    )
+    def test_gate(self, name, args):
+        """Test that stacked arguments give stacked symplectic matrices and displacements"""
+        values = [np.array(args) * (1 + 0.5 * b) for b in range(3)]
+        S, d = gaussian_gate(name, list(np.array(values).T))
+
+        for b, v in enumerate(values):
+            S_b, d_b = gaussian_gate(name, list(v))
+            assert np.allclose(np.broadcast_to(S, (3,) + S_b.shape)[b], S_b)
+            assert np.allclose(np.broadcast_to(d, (3,) + d_b.shape)[b], d_b)
+
+    def test_matrix_gates(self):
+        """Test stacked interferometers and Gaussian transforms"""
+        rng = np.random.default_rng(1)
+        U = np.stack([np.linalg.qr(rng.normal(size=(3, 3)))[0] for _ in range(2)])
+
+        S, d = gaussian_gate("Interferometer", [U])
+        assert S.shape == (2, 6, 6)
+        assert d.shape == (6,)
+        assert np.allclose(S[1], gaussian_gate("Interferometer", [U[1]])[0])
+
+        S2, _ = gaussian_gate("GaussianTransform", [S])
+        assert np.allclose(S2, S)
+
+    @pytest.mark.parametrize("name", ["Coherent", "Squeezed", "Thermal"])
+    def test_state(self, name):
+        """Test that stacked arguments give stacked Gaussian states"""
+        values = [0.1, 0.4, 0.7]
+        cov, means = gaussian_state(name, [np.array(values)])
+
+        for b, v in enumerate(values):
+            cov_b, means_b = gaussian_state(name, [v])
+            assert np.allclose(np.broadcast_to(cov, (3, 2, 2))[b], cov_b)
+            assert np.allclose(np.broadcast_to(means, (3, 2))[b], means_b)
+
+
+class TestStructureKey:
+    """Tests for grouping programs by structure"""
+
+    def test_same_structure(self):
+        """Test that programs that only differ by argument values have the same key"""
+        bb1 = program_from_statements(CIRCUIT.format(0.1, 0.2))
+        bb2 = program_from_statements(CIRCUIT.format(0.3, 1))
+        assert structure_key(bb1) == structure_key(bb2)
+
+    @pytest.mark.parametrize(
+        "statements",
+        [
+            "Sgate(0.1) | 1\n",
+            "Rgate(0.1) | 0\n",
+            "Sgate(0.1, 0.2) | 0\n",
+            "Sgate(0.1+0.2j) | 0\n",
+            "Sgate(q0) | 0\n",
+        ],
+    )
+    def test_different_structure(self, statements):
+        """Test that programs with different operations, modes,
+        or argument shapes and kinds, have different keys"""
+        bb = program_from_statements("Sgate(0.1) | 0\n")
+        assert structure_key(bb) != structure_key(program_from_statements(statements))
+
+    def test_target(self):
+        """Test that the target is part of the structure key"""
+        bb1 = program_from_statements("Sgate(0.1) | 0\n")
+        bb2 = loads("name test\nversion 1.0\ntarget gaussian (shots=5)\n\nSgate(0.1) | 0\n")
+        assert structure_key(bb1) != structure_key(bb2)
+
+    def test_stack_programs(self):
+        """Test that only differing arguments are stacked"""
+        programs = [program_from_statements("Sgate({}, 0.2) | 0\n".format(r)) for r in range(3)]
+        stacked = stack_programs(programs)
+
+        assert np.array_equal(stacked.operations[0]["args"][0], [0, 1, 2])
+        assert stacked.operations[0]["args"][1] == 0.2
+        assert stacked.target == programs[0].target
+
+
+class TestBatcher:
+    """Tests for the batched simulation of queued programs"""
+
+    def test_simulate(self):
+        """Test that batched simulation agrees with simulating each program,
+        for interleaved programs of different structures"""
+        params = [(0.1, 0.2), (0.3, 0.9), (0.5, 0.5), (0.2, 0.1)]
+        programs = []
+
+        for p in params:
+            programs.append(program_from_statements(CIRCUIT.format(*p)))
+            programs.append(program_from_statements("Squeezed({}) | 1\nRgate(0.2) | 1\n".format(p[0])))
+
+        batcher = Batcher()
+        indices = [batcher.submit(p) for p in programs]
+
+        assert indices == list(range(8))
+        assert batcher.groups() == [[0, 2, 4, 6], [1, 3, 5, 7]]
+
+        results = batcher.simulate()
+        assert len(batcher) == 0
+
+        for program, res in zip(programs, results):
+            expected = simulate(program)
+            assert np.allclose(res.cov, expected.cov)
+            assert np.allclose(res.means, expected.means)
+            assert res.results == pytest.approx(expected.results)
+
+    def test_sample(self):
+        """Test that batched sampling splits the samples of each program,
+        with the statistics of each program"""
+        batcher = Batcher()
+
+        for r in [0.0, 0.5, 1.0]:
+            batcher.submit(program_from_statements("Squeezed({}) | 0\nMeasureX | 0\n".format(r)))
+
+        batcher.submit(program_from_statements("Coherent(1.0) | 1\nMeasureHD | 1\n"))
+        samples = batcher.sample(shots=100000, seed=3)
+
+        for r, res in zip([0.0, 0.5, 1.0], samples):
+            assert res.shape == (100000, 1)
+            assert res.var() == pytest.approx(np.exp(-2 * r), rel=0.02)
+
+        assert samples[3].shape == (100000, 2)
+        assert np.all(np.isnan(samples[3][:, 0]))
+        assert samples[3][:, 1].mean() == pytest.approx(1.0, abs=0.01)
+
+    def test_homodyne_angles(self):
+        """Test that homodyne angles can differ between the programs of a batch"""
+        batcher = Batcher()
+
+        for phi in [0, np.pi / 2]:
+            batcher.submit(
+                program_from_statements("Squeezed(1.0) | 0\nMeasureHomodyne({}) | 0\n".format(phi))
+            )
+
+        x, p = batcher.sample(shots=100000, seed=1)
+        assert x.var() == pytest.approx(np.exp(-2), rel=0.02)
+        assert p.var() == pytest.approx(np.exp(2), rel=0.02)
+
+    def test_shots_from_target(self):
+        """Test that the number of shots is read from the target options"""
+        batcher = Batcher()
+        batcher.submit(program_from_statements("Squeezed(1.0) | 0\nMeasureX | 0\n"))
+        assert batcher.sample()[0].shape == (10, 1)
+
+    def test_invalid(self):
+        """Test that invalid programs raise an exception"""
+        batcher = Batcher()
+
+        with pytest.raises(TypeError, match="Expected a BlackbirdProgram"):
+            batcher.submit("Sgate(0.1) | 0")
+
+        batcher.submit(program_from_statements("Squeezed(1.0) | 0\nMeasureX | 0\nXgate(q0) | 1\n"))
+
+        with pytest.raises(ValueError, match="depends on a measurement result"):
+            batcher.sample()
@@ -0,0 +1,227 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the cache module"""
+# pylint: disable=no-self-use
+import os
+import threading
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.cache import CompileCache, compile_key
+from blackbird.compiler import collapse_gaussian, merge_gates
+
+
+def program_from_statements(statements, shots=10):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget gaussian (shots={})\n\n".format(shots)
+    return loads(header + dedent(statements))
+
+
+CIRCUIT = """\
+complex array U =
+    1, 0
+    0, 1j
+
+Squeezed(0.5) | 0
+Rgate(0.1) | 0
+Rgate(0.2) | 0
+Interferometer(U) | [0, 1]
+MeasureX | 0
+Xgate(2*q0) | 1
+"""
+
+
+class Counter:
+    """Compiling function counting its calls"""
+
+    def __init__(self, func=merge_gates):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, program):
+        self.calls += 1
+        return self.func(program)
+
+
+class TestCompileKey:
+    """Tests for the cache keys"""
+
+    def test_target(self):
+        """Test that keys depend on the target and its options"""
+        bb = program_from_statements(CIRCUIT)
+
+        assert compile_key(bb) == compile_key(program_from_statements(CIRCUIT))
+        assert compile_key(bb) != compile_key(program_from_statements(CIRCUIT, shots=5))
+        assert compile_key(bb) != compile_key(bb, target={"name": "fock", "options": {}})
+
+    def test_tag(self):
+        """Test that keys depend on the compilation tag"""
+        bb = program_from_statements(CIRCUIT)
+        assert compile_key(bb, tag="a") != compile_key(bb, tag="b")
+
+
+class TestCompileCache:
+    """Tests for the compilation cache"""
+
+    def test_memory(self):
+        """Test that programs are only compiled once per content and function"""
+        cache = CompileCache()
+        func = Counter()
+
+        first, _ = cache.compile(program_from_statements(CIRCUIT), func)
+        second, _ = cache.compile(program_from_statements(CIRCUIT), func)
+
+        assert func.calls == 1
+        assert second is first
+        assert len(first) == 5
+
+        cache.compile(program_from_statements(CIRCUIT), Counter(collapse_gaussian))
+        cache.compile(program_from_statements(CIRCUIT, shots=5), func)
+        assert func.calls == 2
+
+        stats = cache.stats()
+        assert stats["hits"] == stats["memory_hits"] == 1
+        assert stats["misses"] == 3
+        assert stats["hit_rate"] == 0.25
+        assert stats["size"] == 3
+
+    def test_lru(self):
+        """Test that the least recently used artifacts are evicted"""
+        cache = CompileCache(maxsize=2)
+
+        for key in ["a", "b", "a", "c"]:
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+        assert cache.get("a") == ("a",)
+        assert cache.get("b") is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_disk(self, tmpdir):
+        """Test that artifacts are shared through the disk tier, including
+        programs containing register transforms"""
+        directory = str(tmpdir.join("cache"))
+        func = Counter()
+
+        first, report = CompileCache(directory=directory).compile(program_from_statements(CIRCUIT), func)
+
+        cache = CompileCache(directory=directory)
+        second, report2 = cache.compile(program_from_statements(CIRCUIT), func)
+
+        assert func.calls == 1
+        assert report2 == report
+        assert second.serialize() == first.serialize()
+        assert second.operations[-1]["args"][0].func(2) == 4
+        assert np.array_equal(second.operations[1]["args"][0], first.operations[1]["args"][0])
+
+        # disk hits are promoted to memory
+        cache.compile(program_from_statements(CIRCUIT), func)
+        stats = cache.stats()
+        assert stats["disk_hits"] == stats["memory_hits"] == 1
+
+    def test_unpicklable(self, tmpdir):
+        """Test that artifacts that cannot be pickled are only cached in memory"""
+        cache = CompileCache(directory=str(tmpdir))
+        cache.put("key", threading.Lock())
+
+        assert cache.get("key") is not None
+        assert CompileCache(directory=str(tmpdir)).get("key") is None
+
+    def test_corrupt(self, tmpdir):
+        """Test that corrupt disk entries are treated as misses"""
+        cache = CompileCache(directory=str(tmpdir))
+        cache.put("key", 5)
+
+        with open(cache._path("key"), "wb") as f:  # pylint: disable=protected-access
+            f.write(b"corrupt")
+
+        assert CompileCache(directory=str(tmpdir)).get("key") is None
+
+    def test_unwritable_directory(self, tmpdir):
+        """Test that artifacts are cached in memory if the directory cannot be created"""
+        tmpdir.join("file").write("")
+        cache = CompileCache(directory=str(tmpdir.join("file")))
+        cache.put("key", 5)
+
+        assert cache.get("key") == (5,)
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="requires user IDs")
+    def test_directory_permissions(self, tmpdir):
+        """Test that the directories of the disk tier are private to their owner"""
+        directory = str(tmpdir.join("cache"))
+        cache = CompileCache(directory=directory)
+        cache.put("key", 5)
+        path = cache._path("key")  # pylint: disable=protected-access
+
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+        assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="requires user IDs")
+    def test_untrusted_directory(self, tmpdir, monkeypatch):
+        """Test that directories owned by another user are refused"""
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(str(tmpdir)).st_uid + 1)
+
+        with pytest.raises(ValueError, match="owned by another user"):
+            CompileCache(directory=str(tmpdir))
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="requires user IDs")
+    def test_untrusted_file(self, tmpdir, monkeypatch):
+        """Test that disk entries owned by another user are treated as misses"""
+        cache = CompileCache(directory=str(tmpdir))
+        cache.put("key", 5)
+        cache.clear()
+
+        uid = os.stat(cache._path("key")).st_uid  # pylint: disable=protected-access
+        monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+        assert cache.get("key") is None
+
+    def test_failed_write(self, tmpdir, monkeypatch):
+        """Test that the temporary file is removed if an artifact cannot be written"""
+
+        def replace(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", replace)
+        cache = CompileCache(directory=str(tmpdir))
+        cache.put("key", 5)
+
+        assert cache.get("key") == (5,)
+        assert not any(files for _, _, files in os.walk(str(tmpdir)))
+
+    def test_clear(self, tmpdir):
+        """Test clearing the cache"""
+        cache = CompileCache(directory=str(tmpdir))
+        cache.put("key", 5)
+        cache.clear()
+
+        assert len(cache) == 0
+        assert "key" in cache
+        assert cache.stats()["misses"] == 0
+
+        cache.clear(disk=True)
+        assert "key" not in cache
+        assert not any(f.endswith(".pickle") for _, _, files in os.walk(str(tmpdir)) for f in files)
+
+    def test_invalid(self):
+        """Test that invalid arguments raise an exception"""
+        with pytest.raises(ValueError, match="must be positive"):
+            CompileCache(maxsize=0)
+
+        with pytest.raises(TypeError, match="Expected a BlackbirdProgram"):
+            CompileCache().compile(CIRCUIT, merge_gates)
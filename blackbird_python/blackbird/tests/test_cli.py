@@ -0,0 +1,175 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the cli module"""
+# pylint: disable=no-self-use,redefined-outer-name
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import blackbird
+from blackbird.cli import CheckCache, check, check_source, find_scripts, main
+
+
+VALID = """\
+name valid
+version 1.0
+target gaussian (shots=10)
+
+float alpha = 0.5
+Squeezed(alpha) | 0
+MeasureX | 0
+"""
+
+INVALID = """\
+name invalid
+version 1.0
+target gaussian (shots=10)
+
+int n = 0.5j
+Sgate(beta) | 0
+Vgate(0.1) | 1
+"""
+
+
+@pytest.fixture
+def scripts(tmpdir):
+    """A directory tree containing valid and invalid scripts"""
+    tmpdir.join("valid.xbb").write(VALID)
+    tmpdir.mkdir("sub").join("invalid.xbb").write(INVALID)
+    tmpdir.join("notes.txt").write("not a script")
+    return tmpdir
+
+
+class TestCheckSource:
+    """Tests for checking a single script"""
+
+    def test_valid(self):
+        """Test that valid scripts have no errors"""
+        assert check_source(VALID) == []
+
+    def test_all_errors(self):
+        """Test that type and undefined name errors are reported together"""
+        errors = check_source(INVALID)
+        assert len(errors) == 2
+        assert "not of declared type int" in errors[0]
+        assert "name 'beta' is not defined" in errors[1]
+
+    def test_device(self):
+        """Test that programs are validated against their target or the given device"""
+        script = INVALID.replace("int n = 0.5j\nSgate(beta) | 0\n", "")
+        assert check_source(script) == ["Operation 0 (Vgate): not supported by device gaussian"]
+        assert check_source(script, device="fock") == []
+
+    def test_syntax_error(self):
+        """Test that syntax errors are reported"""
+        assert "expecting '|'" in check_source("name test\nversion 1.0\n\nSgate(0.1)\n")[0]
+
+
+class TestCheck:
+    """Tests for checking directory trees"""
+
+    def test_find_scripts(self, scripts):
+        """Test that directories are searched recursively for scripts"""
+        found = find_scripts([str(scripts)])
+        assert [os.path.basename(p) for p in found] == ["invalid.xbb", "valid.xbb"]
+
+        notes = str(scripts.join("notes.txt"))
+        assert find_scripts([notes, str(scripts.join("valid.xbb"))])[0] == notes
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_check(self, scripts, workers):
+        """Test the results of checking a directory, sequentially or in parallel"""
+        results = check([str(scripts)], workers=workers)
+
+        assert [r["valid"] for r in results] == [False, True]
+        assert len(results[0]["errors"]) == 2
+        assert not any(r["cached"] for r in results)
+
+    def test_cache(self, scripts, tmpdir):
+        """Test that unchanged scripts are read from the cache"""
+        filename = str(tmpdir.join("cache", "check.json"))
+        first = check([str(scripts)], cache=CheckCache(filename))
+        second = check([str(scripts)], cache=CheckCache(filename))
+
+        assert [r["cached"] for r in second] == [True, True]
+        assert [r["errors"] for r in second] == [r["errors"] for r in first]
+
+        scripts.join("valid.xbb").write(VALID.replace("0.5", "0.6"))
+        third = check([str(scripts)], cache=CheckCache(filename))
+        assert [r["cached"] for r in third] == [True, False]
+
+        # the cache is keyed on the device
+        fourth = check([str(scripts)], device="fock", cache=CheckCache(filename))
+        assert not any(r["cached"] for r in fourth)
+
+    def test_cache_version(self, tmpdir, monkeypatch):
+        """Test that caches written by another version are discarded"""
+        filename = str(tmpdir.join("check.json"))
+        cache = CheckCache(filename)
+        cache.set("key", [])
+        cache.save()
+
+        assert CheckCache(filename).get("key") == []
+
+        monkeypatch.setattr(blackbird.cli, "__version__", "0.0.0")
+        assert CheckCache(filename).get("key") is None
+
+    def test_corrupt_cache(self, tmpdir):
+        """Test that a corrupt cache is discarded"""
+        filename = tmpdir.join("check.json")
+        filename.write("{")
+        assert CheckCache(str(filename)).get("key") is None
+
+
+class TestMain:
+    """Tests for the command line interface"""
+
+    def test_text(self, scripts, capsys):
+        """Test the text output and exit status"""
+        status = main(["check", str(scripts), "--no-cache", "-j", "1"])
+        out = capsys.readouterr().out.splitlines()
+
+        assert status == 1
+        assert len(out) == 3
+        assert out[0].startswith(str(scripts.join("sub", "invalid.xbb")))
+        assert out[-1] == "2 scripts checked, 1 invalid"
+
+    def test_json(self, scripts, capsys):
+        """Test the machine-readable output"""
+        status = main(["check", str(scripts.join("valid.xbb")), "--no-cache", "--format", "json"])
+        out = json.loads(capsys.readouterr().out)
+
+        assert status == 0
+        assert out["summary"] == {"checked": 1, "invalid": 0}
+        assert out["results"][0]["valid"]
+
+    def test_invalid_workers(self, scripts, capsys):
+        """Test that a non-positive number of workers is rejected"""
+        assert main(["check", str(scripts), "-j", "0"]) == 2
+        assert "must be positive" in capsys.readouterr().err
+
+    def test_module(self, scripts, tmpdir):
+        """Test running the command line interface as a module"""
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(blackbird.__file__)))
+        cache = str(tmpdir.join("check.json"))
+        cmd = [sys.executable, "-m", "blackbird", "check", str(scripts), "--cache", cache]
+
+        res = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, check=False)
+        assert res.returncode == 1
+        assert res.stdout.decode().endswith("2 scripts checked, 1 invalid\n")
+        assert os.path.exists(cache)
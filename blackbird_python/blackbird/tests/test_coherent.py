@@ -0,0 +1,159 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the coherent module"""
+# pylint: disable=no-self-use
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.coherent import coherent_amplitudes, sample_coherent
+from blackbird.gaussian import simulate
+
+
+CHIP0 = """\
+name example_chip0
+version 1.0
+target chip0 (shots=10)
+
+float alpha = 1.543
+
+complex array U4[4, 4] =
+    -0.374559877614+0.1109693347j,   0.105835208525+0.395338593151j, -0.192128677443-0.326320923534j,  0.663459991938-0.310353146438j
+    -0.380767811218+0.17264101141j,  0.420783417348-0.061064767156j, -0.492833372973+0.169005421785j, -0.049425295018+0.608714168654j
+    -0.004575175084+0.710803957997j, 0.141905920779+0.230227449191j,  0.508526433013-0.297100053719j, -0.186799328386+0.19958273542j
+    -0.390091516639-0.123154657531j, 0.220739102992-0.727908644677j,  0.235216128652-0.427737604015j, -0.002154245945-0.125674446672j
+
+Coherent(alpha, sqrt(pi)) | 0
+Interferometer(U4) | [0, 1, 2, 3]
+MeasureIntensity | 0
+MeasureIntensity | 1
+MeasureIntensity | 2
+MeasureIntensity | 3
+"""
+
+
+def program_from_statements(statements):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget gaussian (shots=10)\n\n"
+    return loads(header + dedent(statements))
+
+
+class TestCoherentAmplitudes:
+    """Tests for detecting coherent state programs"""
+
+    def test_chip0(self):
+        """Test that the output amplitudes of the Chip0 example agree with the
+        mean photon numbers of the Gaussian simulation"""
+        bb = loads(CHIP0)
+        alpha, measured = coherent_amplitudes(bb)
+
+        assert measured == {m: "MeasureIntensity" for m in range(4)}
+
+        backend = simulate(bb)
+        mean_photon = [n for _, n in backend.results]
+        assert np.allclose(np.abs(alpha) ** 2, mean_photon)
+
+    def test_random_program(self):
+        """Test a larger program of passive operations, displacements and loss
+        against the Gaussian simulation"""
+        rng = np.random.default_rng(1)
+        num_modes = 12
+        U, _ = np.linalg.qr(rng.normal(size=(8, 8)) + 1j * rng.normal(size=(8, 8)))
+
+        ops = [{"op": "Coherent", "args": [0.5, 0.1 * m], "kwargs": {}, "modes": [m]} for m in range(num_modes)]
+        ops += [
+            {"op": "Interferometer", "args": [U], "kwargs": {}, "modes": [3, 1, 4, 0, 11, 9, 2, 5]},
+            {"op": "BSgate", "args": [0.3, 0.2], "kwargs": {}, "modes": [10, 6]},
+            {"op": "Rgate", "args": [0.4], "kwargs": {}, "modes": [7]},
+            {"op": "Dgate", "args": [0.2, 0.5], "kwargs": {}, "modes": [8]},
+            {"op": "LossChannel", "args": [0.6], "kwargs": {}, "modes": [1]},
+            {"op": "Vacuum", "args": [], "kwargs": {}, "modes": [2]},
+        ]
+        ops += [{"op": "MeasureFock", "args": [], "kwargs": {}, "modes": [m]} for m in range(num_modes)]
+
+        bb = program_from_statements("")
+        bb._operations = ops
+        bb._modes = set(range(num_modes))
+
+        alpha, _ = coherent_amplitudes(bb)
+
+        bb._operations = ops[:-num_modes]
+        backend = simulate(bb)
+
+        assert np.allclose(np.abs(alpha) ** 2, [backend.mean_photon(m) for m in range(num_modes)])
+        assert np.allclose(alpha.real, backend.means[:num_modes] / 2)
+
+    @pytest.mark.parametrize(
+        "statements",
+        [
+            "Squeezed(0.1) | 0\nMeasureFock() | 0\n",
+            "Coherent(0.1) | 0\nMeasureHomodyne(0) | 0\n",
+            "Coherent(0.1) | 0\nMeasureFock() | 0\nDgate(q0) | 1\n",
+            "Coherent(0.1) | 0\nMeasureFock() | 0\nRgate(0.2) | 0\n",
+            "Coherent(0.1) | 0\nS2gate(0.1) | [0, 1]\n",
+        ],
+    )
+    def test_not_coherent(self, statements):
+        """Test that programs outside of the coherent state class are detected"""
+        assert coherent_amplitudes(program_from_statements(statements)) is None
+
+
+class TestSampleCoherent:
+    """Tests for the vectorized coherent state sampling"""
+
+    def test_poisson_statistics(self):
+        """Test that the photon counts are Poisson distributed around the
+        mean photon numbers"""
+        bb = loads(CHIP0)
+        alpha, _ = coherent_amplitudes(bb)
+        samples = sample_coherent(bb, shots=200000, seed=42)
+
+        assert samples.shape == (200000, 4)
+        assert np.allclose(samples.mean(axis=0), np.abs(alpha) ** 2, rtol=0.02)
+        assert np.allclose(samples.var(axis=0), np.abs(alpha) ** 2, rtol=0.05)
+        assert np.all(samples == np.round(samples))
+
+    def test_shots_from_target(self):
+        """Test that the number of shots is read from the target options"""
+        samples = sample_coherent(loads(CHIP0), seed=1)
+        assert samples.shape == (10, 4)
+
+    def test_threshold_and_unmeasured(self):
+        """Test threshold detection, and NaN for modes that are not measured"""
+        bb = program_from_statements(
+            """\
+            Coherent(1.0) | 0
+            BSgate() | [0, 1]
+            MeasureThreshold | 0
+            """
+        )
+        samples = sample_coherent(bb, shots=100000, seed=3)
+
+        assert set(np.unique(samples[:, 0])) == {0, 1}
+        assert samples[:, 0].mean() == pytest.approx(1 - np.exp(-0.5), abs=0.01)
+        assert np.all(np.isnan(samples[:, 1]))
+
+    def test_seed(self):
+        """Test that a seed makes the samples reproducible"""
+        bb = loads(CHIP0)
+        assert np.array_equal(sample_coherent(bb, seed=5), sample_coherent(bb, seed=5))
+
+    def test_invalid_program(self):
+        """Test that an exception is raised for other programs"""
+        with pytest.raises(ValueError, match="only prepare coherent states"):
+            sample_coherent(program_from_statements("Squeezed(0.1) | 0\nMeasureFock() | 0\n"))
@@ -0,0 +1,384 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the compiler module"""
+# pylint: disable=no-self-use
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.compiler import collapse_gaussian, fuse_interferometers, merge_gates, passive_unitary
+from blackbird.symplectic import gaussian_gate, is_symplectic
+
+
+def program_from_statements(statements):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget gaussian (shots=10)\n\n"
+    return loads(header + dedent(statements))
+
+
+class TestMergeGates:
+    """Tests for the peephole gate merging pass"""
+
+    def test_merge_rotations(self):
+        """Test that consecutive rotations on the same mode are merged"""
+        bb = program_from_statements(
+            """\
+            Rgate(0.1) | 0
+            Rgate(0.2) | 0
+            Rgate(0.3) | 1
+            """
+        )
+        res, report = merge_gates(bb)
+
+        assert len(res) == 2
+        assert res.operations[0]["op"] == "Rgate"
+        assert np.allclose(res.operations[0]["args"], [0.3])
+        assert res.operations[1] == bb.operations[2]
+        assert report == {"operations": 3, "optimized": 2, "merged": 1, "removed": 0}
+
+    def test_metadata_preserved(self):
+        """Test that the program metadata is preserved, and the input program unmodified"""
+        bb = program_from_statements("Rgate(0.1) | 0\nRgate(0.2) | 0\n")
+        res, _ = merge_gates(bb)
+
+        assert res.name == bb.name
+        assert res.version == bb.version
+        assert res.target == bb.target
+        assert res.modes == bb.modes
+        assert len(bb) == 2
+
+    def test_displacement_cancellation(self):
+        """Test that a displacement followed by its inverse is removed, and
+        that surrounding gates can then be merged"""
+        bb = program_from_statements(
+            """\
+            Rgate(0.1) | 0
+            Dgate(0.5, 0.2) | 0
+            Dgate(0.5, 0.2+pi) | 0
+            Rgate(0.2) | 0
+            """
+        )
+        res, report = merge_gates(bb)
+
+        assert len(res) == 1
+        assert np.allclose(res.operations[0]["args"], [0.3])
+        assert report == {"operations": 4, "optimized": 1, "merged": 2, "removed": 1}
+
+    def test_merge_displacement(self):
+        """Test that displacements in different forms are merged"""
+        bb = program_from_statements("Dgate(0.5+0.5j) | 0\nDgate(1.0, pi/2) | 0\n")
+        res, _ = merge_gates(bb)
+
+        r, phi = res.operations[0]["args"]
+        assert np.allclose(r * np.exp(1j * phi), 0.5 + 1.5j)
+
+    @pytest.mark.parametrize("gate", ["Rgate(0)", "Sgate(0.0, 0.4)", "Xgate(0)", "LossChannel(1)"])
+    def test_identity_removed(self, gate):
+        """Test that identity gates are removed"""
+        bb = program_from_statements("{} | 0\nMeasureX | 0\n".format(gate))
+        res, report = merge_gates(bb)
+
+        assert [op["op"] for op in res.operations] == ["MeasureX"]
+        assert report["removed"] == 1
+
+    def test_squeezing_phase(self):
+        """Test that squeezing gates are only merged if their phases match"""
+        bb = program_from_statements(
+            """\
+            Sgate(0.1, 0.5) | 0
+            Sgate(0.2, 0.5) | 0
+            Sgate(0.2, 0.1) | 0
+            """
+        )
+        res, _ = merge_gates(bb)
+
+        assert len(res) == 2
+        assert np.allclose(res.operations[0]["args"], [0.3, 0.5])
+
+    def test_two_mode_gates(self):
+        """Test that two mode gates are only merged if applied to the same modes
+        in the same order"""
+        bb = program_from_statements(
+            """\
+            BSgate(0.1, 0) | [0, 1]
+            BSgate(0.2, 0) | [0, 1]
+            BSgate(0.2, 0) | [1, 0]
+            """
+        )
+        res, _ = merge_gates(bb)
+
+        assert len(res) == 2
+        assert np.allclose(res.operations[0]["args"], [0.3, 0])
+        assert res.operations[1]["modes"] == [1, 0]
+
+    def test_intervening_gate(self):
+        """Test that gates are not merged if another operation acts on their modes"""
+        bb = program_from_statements(
+            """\
+            Rgate(0.1) | 0
+            BSgate(0.2, 0) | [0, 1]
+            Rgate(0.2) | 0
+            Rgate(0.2) | 2
+            """
+        )
+        res, _ = merge_gates(bb)
+        assert len(res) == 4
+
+    def test_measurement_barrier(self):
+        """Test that gates are not merged across measurements"""
+        bb = program_from_statements(
+            """\
+            Rgate(0.1) | 0
+            MeasureX | 1
+            Rgate(0.2) | 0
+            """
+        )
+        res, _ = merge_gates(bb)
+        assert len(res) == 3
+
+    def test_regref_not_merged(self):
+        """Test that gates with register transform arguments are not merged"""
+        bb = program_from_statements(
+            """\
+            MeasureX | 1
+            Xgate(q1) | 0
+            Xgate(0.2) | 0
+            Xgate(q1) | 0
+            """
+        )
+        res, _ = merge_gates(bb)
+        assert len(res) == 4
+
+
+class TestFuseInterferometers:
+    """Tests for the interferometer fusion pass"""
+
+    def test_passive_unitary(self):
+        """Test the unitaries of passive operations"""
+        bb = program_from_statements(
+            """\
+            Rgate(0.3) | 0
+            BSgate(0.4, 0.2) | [0, 1]
+            Sgate(0.1) | 0
+            Rgate(q0) | 0
+            """
+        )
+        ops = bb.operations
+
+        assert np.allclose(passive_unitary(ops[0]), [[np.exp(0.3j)]])
+
+        U = passive_unitary(ops[1])
+        assert U.shape == (2, 2)
+        assert np.allclose(U @ U.conj().T, np.identity(2))
+        assert np.allclose(np.abs(U[1, 0]), np.sin(0.4))
+
+        assert passive_unitary(ops[2]) is None
+        assert passive_unitary(ops[3]) is None
+
+    def test_passive_unitary_defaults(self):
+        """Test that the default beamsplitter is a 50:50 beamsplitter"""
+        op = {"op": "BSgate", "args": [], "kwargs": {}, "modes": [0, 1]}
+        assert np.allclose(passive_unitary(op), np.array([[1, -1], [1, 1]]) / np.sqrt(2))
+
+    def test_fusion(self):
+        """Test that a passive segment is fused into a single interferometer"""
+        bb = program_from_statements(
+            """\
+            complex array U[2, 2] =
+                0, 1
+                1, 0
+
+            Coherent(0.5) | 0
+            Interferometer(U) | [1, 2]
+            BSgate(0.4, 0.2) | [0, 1]
+            Rgate(0.3) | 2
+            MeasureIntensity | 0
+            """
+        )
+        res, report = fuse_interferometers(bb)
+
+        assert [op["op"] for op in res.operations] == ["Coherent", "Interferometer", "MeasureIntensity"]
+        assert res.operations[1]["modes"] == [0, 1, 2]
+
+        perm = np.array([[1, 0, 0], [0, 0, 1], [0, 1, 0]])
+        bs = np.identity(3, dtype=complex)
+        bs[:2, :2] = passive_unitary(bb.operations[2])
+        rot = np.diag([1, 1, np.exp(0.3j)])
+        assert np.allclose(res.operations[1]["args"][0], rot @ bs @ perm)
+
+        assert report["fused"] == 3
+        assert report["interferometers"] == 1
+        assert report["optimized"] == 3
+        assert report["max_error"] < 1e-12
+
+    def test_segment_closed_by_active_operation(self):
+        """Test that non-passive operations on the segment modes close the segment,
+        while operations on other modes do not"""
+        bb = program_from_statements(
+            """\
+            BSgate(0.4, 0.2) | [0, 1]
+            Sgate(0.1) | 2
+            Rgate(0.3) | 1
+            Sgate(0.1) | 1
+            BSgate(0.4, 0.2) | [0, 1]
+            """
+        )
+        res, report = fuse_interferometers(bb)
+
+        assert [op["op"] for op in res.operations] == ["Sgate", "Interferometer", "Sgate", "BSgate"]
+        assert res.operations[1]["modes"] == [0, 1]
+        assert report["fused"] == 2
+
+    def test_numerical_check(self):
+        """Test that a non-unitary interferometer fails the numerical check"""
+        bb = program_from_statements(
+            """\
+            complex array U[2, 2] =
+                1, 1
+                1, 0
+
+            Interferometer(U) | [0, 1]
+            Rgate(0.3) | 1
+            """
+        )
+        with pytest.raises(ValueError, match="is not unitary"):
+            fuse_interferometers(bb)
+
+        res, report = fuse_interferometers(bb, check=False)
+        assert len(res) == 1
+        assert report["max_error"] is None
+
+
+def expand(S, modes, n):
+    """Expand a local xxpp symplectic matrix to act on n modes"""
+    idx = list(modes) + [m + n for m in modes]
+    full = np.identity(2 * n)
+    full[np.ix_(idx, idx)] = S
+    return full
+
+
+class TestCollapseGaussian:
+    """Tests for the Gaussian collapse pass"""
+
+    def test_state_segment(self):
+        """Test that a Gaussian segment acting on the vacuum is collapsed into
+        a Gaussian state preparation"""
+        bb = program_from_statements(
+            """\
+            Squeezed(0.5, 0.1) | 0
+            Coherent(0.3, 0.2) | 1
+            BSgate(0.4, 0.2) | [0, 1]
+            Dgate(0.2) | 1
+            S2gate(0.3) | [1, 2]
+            MeasureHomodyne(0.0) | 0
+            """
+        )
+        res, report = collapse_gaussian(bb)
+
+        assert [op["op"] for op in res.operations] == ["Gaussian", "MeasureHomodyne"]
+        assert res.operations[0]["modes"] == [0, 1, 2]
+        assert report == {"operations": 6, "optimized": 2, "collapsed": 5, "segments": 1}
+
+        cov, means = res.operations[0]["args"]
+        assert means.shape == (1, 6)
+
+        # compute the expected state using full size matrices
+        hbar = 2
+        S_sq, _ = gaussian_gate("Sgate", [0.5, 0.1])
+        V = hbar / 2 * np.identity(6)
+        V = expand(S_sq, [0], 3) @ V @ expand(S_sq, [0], 3).T
+        r = np.zeros(6)
+        r[[1, 4]] = np.sqrt(2 * hbar) * np.array([0.3 * np.cos(0.2), 0.3 * np.sin(0.2)])
+
+        for name, args, modes in [("BSgate", [0.4, 0.2], [0, 1]), ("Dgate", [0.2], [1]), ("S2gate", [0.3], [1, 2])]:
+            S, d = gaussian_gate(name, args)
+            full = expand(S, modes, 3)
+            V = full @ V @ full.T
+            r = full @ r
+            r[modes + [m + 3 for m in modes]] += d
+
+        assert np.allclose(cov, V)
+        assert np.allclose(means[0], r)
+
+    def test_transform_segment(self):
+        """Test that a Gaussian segment acting after a non-Gaussian operation is
+        collapsed into a Gaussian transformation and displacements"""
+        bb = program_from_statements(
+            """\
+            Fock(1) | 0
+            Fock(1) | 1
+            Sgate(0.5, 0.1) | 0
+            BSgate(0.4, 0.2) | [0, 1]
+            Xgate(0.2) | 1
+            Rgate(0.3) | 0
+            """
+        )
+        res, report = collapse_gaussian(bb)
+
+        assert [op["op"] for op in res.operations] == ["Fock", "Fock", "GaussianTransform", "Dgate"]
+        assert res.operations[3]["modes"] == [1]
+        assert report["collapsed"] == 4
+
+        S = res.operations[2]["args"][0]
+        assert is_symplectic(S)
+
+        expected = np.identity(4)
+        for name, args, modes in [("Sgate", [0.5, 0.1], [0]), ("BSgate", [0.4, 0.2], [0, 1]), ("Rgate", [0.3], [0])]:
+            expected = expand(gaussian_gate(name, args)[0], modes, 2) @ expected
+
+        assert np.allclose(S, expected)
+
+        r, phi = res.operations[3]["args"]
+        assert np.allclose(r * np.exp(1j * phi), 0.2 / 2)
+
+    def test_state_preparation_after_non_gaussian(self):
+        """Test that state preparations on modes that have previously been acted on
+        are left in place"""
+        bb = program_from_statements(
+            """\
+            Fock(1) | 0
+            Coherent(0.3) | 0
+            Rgate(0.3) | 0
+            Sgate(0.3) | 0
+            """
+        )
+        res, _ = collapse_gaussian(bb)
+        assert [op["op"] for op in res.operations] == ["Fock", "Coherent", "GaussianTransform"]
+
+    def test_single_and_non_constant(self):
+        """Test that single Gaussian operations, and operations with register
+        transform arguments, are left unchanged"""
+        bb = program_from_statements(
+            """\
+            Sgate(0.3) | 0
+            MeasureX | 0
+            Xgate(q0) | 1
+            """
+        )
+        res, report = collapse_gaussian(bb)
+        assert res.operations == bb.operations
+        assert report["segments"] == 0
+
+    def test_serialization(self):
+        """Test that collapsed programs can be serialized and parsed"""
+        bb = program_from_statements("Squeezed(0.5) | 0\nBSgate(0.4, 0.2) | [0, 1]\n")
+        res, _ = collapse_gaussian(bb)
+        res2 = loads(res.serialize())
+
+        assert res2.operations[0]["op"] == "Gaussian"
+        assert np.allclose(res2.operations[0]["args"][0], res.operations[0]["args"][0])
@@ -0,0 +1,186 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the executor module"""
+# pylint: disable=no-self-use
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.executor import Backend, LocalBackend, ShotExecutor
+
+
+def program_from_statements(statements):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget gaussian (shots=10)\n\n"
+    return loads(header + dedent(statements))
+
+
+COHERENT = """\
+Coherent(1.0) | 0
+BSgate() | [0, 1]
+MeasureFock() | 0
+MeasureFock() | 1
+"""
+
+
+SQUEEZED = """\
+Squeezed(0.5) | 0
+MeasureX | 0
+"""
+
+
+class CountingBackend(Backend):
+    """Backend returning a number drawn from the random stream of each chunk,
+    and the number of operations of the program"""
+
+    def run(self, program, shots, seed):
+        rng = np.random.default_rng(seed)
+        return np.column_stack([rng.random(shots), np.full(shots, len(program))])
+
+
+class TestBackend:
+    """Tests for the backend base class"""
+
+    def test_abstract(self):
+        """Test that backends must implement the run method"""
+
+        class IncompleteBackend(Backend):
+            """Backend without a run method"""
+
+        with pytest.raises(TypeError, match="abstract"):
+            IncompleteBackend()
+
+
+class TestLocalBackend:
+    """Tests for the local stand-in backend"""
+
+    def test_coherent(self):
+        """Test that coherent state programs use the photon counting fast path"""
+        samples = LocalBackend().run(program_from_statements(COHERENT), 100000, 1)
+
+        assert samples.shape == (100000, 2)
+        assert np.allclose(samples.mean(axis=0), 0.5, rtol=0.02)
+
+    def test_gaussian(self):
+        """Test that other programs are sampled as Gaussian programs"""
+        samples = LocalBackend(hbar=1).run(program_from_statements(SQUEEZED), 100000, 1)
+
+        assert samples.shape == (100000, 1)
+        assert samples.var() == pytest.approx(np.exp(-1) / 2, rel=0.02)
+
+
+class TestShotExecutor:
+    """Tests for the shot-parallel executor"""
+
+    @pytest.mark.parametrize("shots, chunks", [(10, 3), (2, 4), (0, 2), (7, 1)])
+    def test_split(self, shots, chunks):
+        """Test that shots are split into nearly equal non-empty chunks"""
+        sizes = ShotExecutor(workers=1, chunks=chunks).split(shots)
+
+        assert sum(sizes) == shots
+        assert len(sizes) == min(shots, chunks)
+        assert max(sizes, default=0) - min(sizes, default=0) <= 1
+
+    def test_shots_from_target(self):
+        """Test that the number of shots is read from the target options"""
+        samples = ShotExecutor(workers=1).run(program_from_statements(COHERENT), seed=1)
+        assert samples.shape == (10, 2)
+
+    def test_independent_streams(self):
+        """Test that each chunk uses a different random stream"""
+        samples = ShotExecutor(CountingBackend(), workers=1, chunks=4).run(
+            program_from_statements(COHERENT), shots=8, seed=2
+        )
+
+        assert samples.shape == (8, 2)
+        assert len(np.unique(samples[:, 0])) == 8
+        assert np.all(samples[:, 1] == 4)
+
+    def test_seed(self):
+        """Test that the samples only depend on the seed and the number of chunks"""
+        bb = program_from_statements(SQUEEZED)
+
+        res1 = ShotExecutor(workers=1, chunks=3).run(bb, shots=100, seed=5)
+        res2 = ShotExecutor(workers=1, chunks=3).run(bb, shots=100, seed=5)
+        res3 = ShotExecutor(workers=1, chunks=3).run(bb, shots=100, seed=6)
+
+        assert np.array_equal(res1, res2)
+        assert not np.array_equal(res1, res3)
+
+    def test_process_pool(self):
+        """Test that executing the chunks in worker processes gives the
+        same samples as executing them in the current process"""
+        bb = program_from_statements(COHERENT)
+        expected = ShotExecutor(workers=1, chunks=3).run(bb, shots=1000, seed=7)
+
+        with ShotExecutor(workers=2, chunks=3) as executor:
+            res = executor.run(bb, shots=1000, seed=7)
+            assert executor._pool is not None  # pylint: disable=protected-access
+
+        assert np.array_equal(res, expected)
+
+    def test_process_pool_exact_arguments(self):
+        """Test that the worker processes execute the exact operation arguments,
+        including arguments that cannot be serialized as Blackbird source code,
+        so that the samples do not depend on the number of workers"""
+        bb = program_from_statements(
+            """\
+            float array V =
+                2, 0, 0, 0
+                0, 1, 0, 0
+                0, 0, 2, 0
+                0, 0, 0, 1
+
+            Gaussian(V, V) | [0, 1]
+            MeasureX | 0
+            MeasureX | 1
+            """
+        )
+        # a vector of means, with the precision of a computed value
+        bb.operations[0]["args"][1] = np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32) / 3
+        expected = ShotExecutor(workers=1, chunks=2).run(bb, shots=100, seed=4)
+
+        with ShotExecutor(workers=2, chunks=2) as executor:
+            res = executor.run(bb, shots=100, seed=4)
+
+        assert np.array_equal(res, expected)
+
+    def test_process_pool_custom_backend(self):
+        """Test that programs with classical register transforms, and user-defined
+        backends, can be sent to the worker processes"""
+        bb = program_from_statements(
+            """\
+            Squeezed(0.5) | 0
+            MeasureX | 0
+            Xgate(sqrt(2)*q0) | 1
+            """
+        )
+
+        with ShotExecutor(CountingBackend(), workers=2) as executor:
+            res = executor.run(bb, shots=6, seed=1)
+
+        assert res.shape == (6, 2)
+        assert np.all(res[:, 1] == 3)
+
+    def test_invalid(self):
+        """Test that invalid arguments raise an exception"""
+        with pytest.raises(ValueError, match="must be positive"):
+            ShotExecutor(workers=-1)
+
+        with pytest.raises(TypeError, match="Expected a BlackbirdProgram"):
+            ShotExecutor(workers=1).run("Squeezed(0.5) | 0")
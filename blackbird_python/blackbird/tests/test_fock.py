@@ -0,0 +1,238 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the fock module"""
+# pylint: disable=no-self-use
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.fock import FockBackend, fock_gate, loss_superoperator, passive_gate, simulate
+from blackbird.gaussian import GaussianBackend
+from blackbird.symplectic import gaussian_gate
+
+
+GATES = [
+    ("Rgate", [0.3], [2]),
+    ("Dgate", [0.3, 0.1], [0]),
+    ("Xgate", [0.3], [1]),
+    ("Zgate", [0.3], [2]),
+    ("Sgate", [0.2, 0.1], [1]),
+    ("Pgate", [0.3], [2]),
+    ("BSgate", [0.3, 0.1], [2, 0]),
+    ("S2gate", [0.2, 0.1], [1, 2]),
+    ("CXgate", [0.3], [0, 2]),
+    ("CZgate", [0.3], [2, 1]),
+]
+
+
+def op(name, args, modes):
+    """Create an operation dictionary"""
+    return {"op": name, "args": args, "kwargs": {}, "modes": modes}
+
+
+def program_from_statements(statements, options="cutoff_dim=8"):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget fock ({})\n\n".format(options)
+    return loads(header + dedent(statements))
+
+
+def assert_matches_gaussian(ops, num_modes, cutoff=12, atol=1e-4):
+    """Assert that the Fock backend agrees with the Gaussian backend
+    on the quadrature means and mean photon numbers"""
+    fock = FockBackend(num_modes, cutoff)
+    gaussian = GaussianBackend(num_modes)
+
+    for o in ops:
+        fock.execute(o)
+        gaussian.execute(o)
+
+    for m in range(num_modes):
+        means = gaussian.means[[m, m + num_modes]]
+        assert np.allclose(fock.quad_expectation(m), means, atol=atol)
+        assert fock.mean_photon(m) == pytest.approx(gaussian.mean_photon(m), abs=atol)
+
+    return fock
+
+
+COHERENT = [
+    op("Coherent", [0.5, 0.3], [0]),
+    op("Coherent", [0.4, -0.6], [1]),
+    op("Coherent", [0.3, 1.0], [2]),
+]
+
+
+class TestFockGates:
+    """Tests for the Fock representation of gates"""
+
+    @pytest.mark.parametrize("name, args, modes", GATES)
+    def test_unitary(self, name, args, modes):
+        """Test that gates are unitary on the low photon number states"""
+        D = 8
+        U = fock_gate(name, args, D).reshape(D ** len(modes), D ** len(modes))
+        assert np.allclose((U.conj().T @ U)[0, 0], 1)
+
+    def test_passive_gate_is_exact(self):
+        """Test that passive gates conserve the norm of states below the cutoff"""
+        D = 5
+        u = np.array([[0.6, -0.8j], [-0.8j, 0.6]])
+        U = passive_gate(u, D).reshape(D ** 2, D ** 2)
+
+        # states with a total photon number below the cutoff
+        low = [i * D + j for i in range(D) for j in range(D) if i + j < D]
+        assert np.allclose(U[np.ix_(low, low)].conj().T @ U[np.ix_(low, low)], np.identity(len(low)))
+
+    def test_loss_superoperator_trace_preserving(self):
+        """Test that the loss channel preserves the trace"""
+        E = loss_superoperator(0.6, 0.0, 6)
+        rho = np.diag([0.5, 0.3, 0.2, 0, 0, 0])
+        out = np.einsum("ijkl,kl->ij", E, rho)
+        assert np.trace(out) == pytest.approx(1)
+        assert np.real(np.arange(6) @ np.diag(out)) == pytest.approx(0.6 * 0.7)
+
+    def test_no_fock_representation(self):
+        """Test that an exception is raised for unknown gates"""
+        with pytest.raises(ValueError, match="no Fock representation"):
+            fock_gate("Foogate", [0.1], 5)
+
+
+class TestFockBackend:
+    """Tests for the Fock backend"""
+
+    @pytest.mark.parametrize("name, args, modes", GATES)
+    def test_gaussian_gates(self, name, args, modes):
+        """Test that Gaussian gates agree with the Gaussian backend"""
+        fock = assert_matches_gaussian(COHERENT + [op(name, args, modes)], 3)
+        assert fock.is_pure
+
+    def test_interferometer_and_channels(self):
+        """Test that interferometers and loss channels agree with the Gaussian backend"""
+        rng = np.random.default_rng(42)
+        U, _ = np.linalg.qr(rng.normal(size=(3, 3)) + 1j * rng.normal(size=(3, 3)))
+        ops = [
+            op("Coherent", [0.5, 0.3], [0]),
+            op("Squeezed", [0.2, 0.3], [1]),
+            op("Interferometer", [U], [2, 0, 1]),
+            op("LossChannel", [0.7], [0]),
+            op("ThermalLossChannel", [0.7, 0.2], [1]),
+        ]
+        fock = assert_matches_gaussian(ops, 3, cutoff=8)
+        assert not fock.is_pure
+
+    def test_gaussian_transform_and_state(self):
+        """Test that Gaussian transformations and states agree with the Gaussian backend"""
+        S = np.identity(4)
+        for name, args, modes in [("Sgate", [0.3, 0.2], [0]), ("S2gate", [0.1, 0.5], [0, 1])]:
+            S_local, _ = gaussian_gate(name, args)
+            idx = modes + [m + 2 for m in modes]
+            S_full = np.identity(4)
+            S_full[np.ix_(idx, idx)] = S_local
+            S = S_full @ S
+
+        V = S @ np.diag([1.3, 1.1, 1.3, 1.1]) @ S.T
+        means = np.array([[0.2, -0.1, 0.3, 0.05]])
+
+        assert_matches_gaussian([COHERENT[0], op("GaussianTransform", [S], [2, 0])], 3, cutoff=14)
+        assert_matches_gaussian([op("Gaussian", [V, means], [1, 0])], 2, cutoff=14)
+
+    def test_non_gaussian_states(self):
+        """Test the Fock and cat state preparations"""
+        fock = FockBackend(2, 10)
+        fock.execute(op("Catstate", [1.0], [0]))
+        fock.execute(op("Fock", [3], [1]))
+
+        probs = fock.probabilities()
+        assert fock.is_pure
+        assert np.allclose(probs[1::2], 0)
+        assert np.allclose(probs[:, 3].sum(), 1)
+        assert fock.mean_photon(1) == pytest.approx(3)
+
+        # odd cat state
+        fock.execute(op("Catstate", [1.0, 1], [0]))
+        assert np.allclose(fock.probabilities()[::2], 0)
+
+    def test_non_gaussian_gates(self):
+        """Test the Kerr, cross-Kerr and cubic phase gates"""
+        fock = FockBackend(2, 8)
+        fock.execute(op("Fock", [2], [0]))
+        fock.execute(op("Fock", [1], [1]))
+        fock.execute(op("Kgate", [0.3], [0]))
+        fock.execute(op("CKgate", [0.2], [0, 1]))
+        assert fock.state[2, 1] == pytest.approx(np.exp(1j * (0.3 * 4 + 0.2 * 2)))
+
+        fock.execute(op("Vgate", [0.1], [1]))
+        assert np.linalg.norm(fock.state) == pytest.approx(1, abs=1e-3)
+        assert fock.mean_photon(0) == pytest.approx(2, abs=1e-3)
+
+    def test_pure_preparation_on_product_mode(self):
+        """Test that preparing a mode in a product state keeps the state pure"""
+        fock = FockBackend(2, 6)
+        fock.execute(op("Coherent", [0.5], [0]))
+        fock.execute(op("Sgate", [0.2], [0]))
+        fock.execute(op("Fock", [1], [0]))
+
+        assert fock.is_pure
+        assert np.allclose(fock.probabilities()[1, 0], 1)
+
+    def test_preparation_on_entangled_mode(self):
+        """Test that preparing an entangled mode switches to the mixed representation"""
+        fock = FockBackend(2, 8)
+        fock.execute(op("S2gate", [0.3], [0, 1]))
+        fock.execute(op("Vacuum", [], [0]))
+
+        assert not fock.is_pure
+        assert fock.mean_photon(0) == pytest.approx(0)
+        assert fock.mean_photon(1) == pytest.approx(np.sinh(0.3) ** 2, abs=1e-4)
+
+    def test_mixed_from_start(self):
+        """Test that the mixed representation gives the same results as the pure one"""
+        pure = FockBackend(2, 8)
+        mixed = FockBackend(2, 8, pure=False)
+
+        for backend in (pure, mixed):
+            backend.run(program_from_statements("Coherent(0.5) | 0\nBSgate(0.4, 0.1) | [0, 1]\n"))
+
+        assert not mixed.is_pure
+        assert np.allclose(mixed.probabilities(), pure.probabilities())
+
+    def test_simulate(self):
+        """Test simulating a program with the cutoff dimension of the target"""
+        bb = program_from_statements(
+            """\
+            Fock(1) | 0
+            BSgate() | [0, 1]
+            MeasureIntensity | 0
+            """
+        )
+        backend = simulate(bb)
+
+        assert backend.cutoff == 8
+        assert backend.results == [(0, pytest.approx(0.5))]
+
+    def test_missing_cutoff(self):
+        """Test that simulating without a cutoff raises an exception"""
+        bb = program_from_statements("Fock(1) | 0\n", options="shots=1")
+
+        with pytest.raises(ValueError, match="cutoff dimension is required"):
+            simulate(bb)
+
+    def test_unsupported_measurement(self):
+        """Test that sampled measurements raise an exception"""
+        bb = program_from_statements("MeasureFock() | 0\n")
+
+        with pytest.raises(ValueError, match="not supported"):
+            simulate(bb)
@@ -0,0 +1,251 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the gaussian module"""
+# pylint: disable=no-self-use
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.gaussian import GaussianBackend, sample, simulate
+from blackbird.symplectic import gaussian_gate
+
+
+GATES = [
+    ("Rgate", [0.3], [2]),
+    ("Dgate", [0.3, 0.1], [0]),
+    ("Xgate", [0.3], [1]),
+    ("Zgate", [0.3], [3]),
+    ("Sgate", [0.3, 0.1], [1]),
+    ("Pgate", [0.3], [2]),
+    ("BSgate", [0.3, 0.1], [3, 0]),
+    ("S2gate", [0.3, 0.1], [1, 2]),
+    ("CXgate", [0.3], [0, 2]),
+    ("CZgate", [0.3], [2, 1]),
+]
+
+
+def program_from_statements(statements):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget gaussian (shots=10)\n\n"
+    return loads(header + dedent(statements))
+
+
+def expand(S, modes, num_modes):
+    """Expand a local symplectic matrix to the full system"""
+    idx = list(modes) + [m + num_modes for m in modes]
+    S_full = np.identity(2 * num_modes)
+    S_full[np.ix_(idx, idx)] = S
+    return S_full
+
+
+class TestGaussianBackend:
+    """Tests for the Gaussian backend"""
+
+    def test_vacuum(self):
+        """Test that the backend is initialized in the vacuum state"""
+        backend = GaussianBackend(3, hbar=1)
+        assert np.allclose(backend.cov, np.identity(6) / 2)
+        assert np.allclose(backend.means, 0)
+        assert backend.mean_photon(1) == pytest.approx(0)
+
+    def test_gates_match_full_symplectic(self):
+        """Test that the local updates agree with multiplying the
+        expanded symplectic matrices of each gate"""
+        num_modes = 4
+        backend = GaussianBackend(num_modes)
+
+        # start in a correlated, displaced state
+        backend.apply(*gaussian_gate("S2gate", [0.5, 0.2]), [0, 3])
+        backend.apply(*gaussian_gate("Dgate", [0.4, 0.1]), [2])
+
+        cov = backend.cov.copy()
+        means = backend.means.copy()
+
+        for name, args, modes in GATES:
+            backend.execute({"op": name, "args": args, "kwargs": {}, "modes": modes})
+
+            S, d = gaussian_gate(name, args)
+            S_full = expand(S, modes, num_modes)
+            cov = S_full @ cov @ S_full.T
+            means = S_full @ means
+            means[modes + [m + num_modes for m in modes]] += d
+
+        assert np.allclose(backend.cov, cov)
+        assert np.allclose(backend.means, means)
+
+    def test_interferometer(self):
+        """Test that interferometers act on the listed modes"""
+        U = np.array([[0, 1], [1j, 0]])
+        backend = GaussianBackend(3)
+        backend.execute({"op": "Coherent", "args": [1.0], "kwargs": {}, "modes": [0]})
+        backend.execute({"op": "Interferometer", "args": [U], "kwargs": {}, "modes": [2, 0]})
+
+        assert backend.mean_photon(0) == pytest.approx(0)
+        assert backend.mean_photon(2) == pytest.approx(1)
+
+    def test_state_preparation_removes_correlations(self):
+        """Test that state preparations replace the state of a mode"""
+        backend = GaussianBackend(2)
+        backend.apply(*gaussian_gate("S2gate", [0.5, 0]), [0, 1])
+        backend.execute({"op": "Thermal", "args": [0.5], "kwargs": {}, "modes": [1]})
+
+        cov, means = backend.reduced_state([1])
+        assert np.allclose(cov, 2 * np.identity(2))
+        assert np.allclose(means, 0)
+        assert np.allclose(backend.cov[[0, 2]][:, [1, 3]], 0)
+
+        # the reduced state of mode 0 is unchanged
+        cov, _ = backend.reduced_state([0])
+        assert np.allclose(cov, np.cosh(1.0) * np.identity(2))
+
+    def test_loss(self):
+        """Test that loss channels reduce the mean photon number"""
+        bb = program_from_statements(
+            """\
+            Coherent(1.0, 0.3) | 0
+            Squeezed(0.2) | 1
+            LossChannel(0.5) | 0
+            ThermalLossChannel(0.5, 1.0) | 1
+            MeasureIntensity | 0
+            MeasureIntensity | 1
+            """
+        )
+        backend = simulate(bb)
+        squeezed = np.sinh(0.2) ** 2
+
+        assert backend.results[0] == (0, pytest.approx(0.5))
+        assert backend.results[1] == (1, pytest.approx(0.5 * squeezed + 0.5))
+
+    def test_gaussian_state(self):
+        """Test that the Gaussian operation prepares the state of the listed modes"""
+        V = np.diag([1.0, 2.0, 4.0, 1.0])
+        r = np.array([[0.1, 0.2, 0.3, 0.4]])
+        backend = GaussianBackend(3)
+        backend.execute({"op": "Gaussian", "args": [V, r], "kwargs": {}, "modes": [2, 0]})
+
+        cov, means = backend.reduced_state([2, 0])
+        assert np.allclose(cov, V)
+        assert np.allclose(means, r[0])
+
+    def test_hbar_from_target(self):
+        """Test that the value of hbar is read from the target options"""
+        bb = loads("name test\nversion 1.0\ntarget gaussian (hbar=1)\n\nCoherent(1.0) | 0\n")
+        backend = simulate(bb)
+
+        assert backend.hbar == 1
+        assert np.allclose(backend.means, [np.sqrt(2), 0])
+        assert backend.mean_photon(0) == pytest.approx(1)
+
+    def test_non_gaussian(self):
+        """Test that non-Gaussian operations raise an exception"""
+        bb = program_from_statements("Kgate(0.1) | 0\n")
+
+        with pytest.raises(ValueError, match="Kgate is not Gaussian"):
+            simulate(bb)
+
+    def test_sampled_measurement(self):
+        """Test that sampled measurements raise an exception"""
+        bb = program_from_statements("MeasureHomodyne(0) | 0\n")
+
+        with pytest.raises(ValueError, match="not supported"):
+            simulate(bb)
+
+    def test_feed_forward(self):
+        """Test that operations with measurement dependent arguments raise an exception"""
+        bb = program_from_statements("MeasureIntensity | 0\nXgate(q0) | 1\n")
+
+        with pytest.raises(ValueError, match="constant numeric arguments"):
+            simulate(bb)
+
+
+class TestSample:
+    """Tests for shot-vectorized sampling"""
+
+    def test_shape_and_unmeasured_modes(self):
+        """Test that samples have one row per shot and one column per mode,
+        with NaN for unmeasured modes"""
+        bb = program_from_statements(
+            """\
+            Coherent(1.0) | 0
+            Sgate(0.2) | 2
+            MeasureX | 0
+            MeasureHomodyne(0.3) | 2
+            """
+        )
+        res = sample(bb, seed=42)
+
+        assert res.shape == (10, 3)
+        assert res.dtype == np.float64
+        assert np.all(np.isnan(res[:, 1]))
+        assert not np.any(np.isnan(res[:, [0, 2]]))
+
+    def test_homodyne_statistics(self):
+        """Test the mean and covariance of correlated homodyne samples"""
+        bb = program_from_statements(
+            """\
+            Coherent(0.5, 0.2) | 0
+            S2gate(0.5) | [0, 1]
+            MeasureX | 0
+            MeasureP | 1
+            """
+        )
+        shots = 200000
+        res = sample(bb, shots=shots, seed=1)
+        backend = simulate(program_from_statements("Coherent(0.5, 0.2) | 0\nS2gate(0.5) | [0, 1]\n"))
+
+        idx = [0, 3]
+        assert np.allclose(res.mean(axis=0), backend.means[idx], atol=0.02)
+        assert np.allclose(np.cov(res.T), backend.cov[np.ix_(idx, idx)], atol=0.05)
+
+    def test_heterodyne(self):
+        """Test that heterodyne samples are complex amplitudes, with
+        the vacuum noise contribution"""
+        bb = program_from_statements("Coherent(1.0, 0.5) | 0\nMeasureHeterodyne() | 0\n")
+        res = sample(bb, shots=200000, seed=3)
+
+        assert res.dtype == np.complex128
+        assert np.mean(res[:, 0]) == pytest.approx(np.exp(0.5j), abs=0.01)
+        # each quadrature has variance hbar / 2 + hbar / 2, i.e. 1/2 for alpha
+        assert np.var(res[:, 0].real) == pytest.approx(0.5, abs=0.01)
+
+    def test_seed(self):
+        """Test that a seed makes the samples reproducible"""
+        bb = program_from_statements("Squeezed(0.3) | 0\nMeasureX | 0\n")
+        assert np.array_equal(sample(bb, seed=7), sample(bb, seed=7))
+        assert not np.array_equal(sample(bb, seed=7), sample(bb, seed=8))
+
+    def test_feed_forward(self):
+        """Test that programs with feed-forward cannot be sampled"""
+        bb = program_from_statements("MeasureX | 0\nXgate(q0) | 1\n")
+
+        with pytest.raises(ValueError, match="depends on a measurement result"):
+            sample(bb)
+
+    def test_operation_after_measurement(self):
+        """Test that programs acting on measured modes cannot be sampled"""
+        bb = program_from_statements("MeasureX | 0\nBSgate() | [0, 1]\n")
+
+        with pytest.raises(ValueError, match="previously measured modes"):
+            sample(bb)
+
+    def test_fock_measurement(self):
+        """Test that photon counting measurements cannot be sampled"""
+        bb = program_from_statements("MeasureFock() | 0\n")
+
+        with pytest.raises(ValueError, match="MeasureFock cannot be sampled"):
+            sample(bb)
@@ -0,0 +1,159 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the generator module"""
+# pylint: disable=no-self-use
+import pytest
+
+from blackbird import loads
+from blackbird.generator import gbs, generate, time_domain, vocabulary
+from blackbird.listener import RegRefTransform
+from blackbird.validation import DEVICES, validate
+
+
+class TestVocabulary:
+    """Tests for the operations used in generated programs"""
+
+    @pytest.mark.parametrize("target", ["gaussian", "fock"])
+    def test_device_operations(self, target):
+        """Test that only operations supported by the device are used"""
+        gates = vocabulary(target)
+        assert gates
+        assert set(gates) <= DEVICES[target]["operations"]
+        assert not any(g.startswith("Measure") for g in gates)
+
+    def test_unknown_target(self):
+        """Test that all gates are used for targets without a device specification"""
+        assert set(vocabulary("gaussian")) < set(vocabulary("other"))
+        assert "Vgate" in vocabulary("other")
+
+
+class TestGenerate:
+    """Tests for random program generation"""
+
+    @pytest.mark.parametrize("target", ["gaussian", "fock"])
+    def test_valid(self, target):
+        """Test that generated programs parse and are valid for their target"""
+        script = generate(
+            num_modes=5,
+            num_statements=200,
+            num_variables=4,
+            expression_depth=3,
+            array_size=3,
+            feedforward=0.2,
+            target=target,
+            seed=1,
+        )
+        bb = loads(script)
+
+        assert bb.target["name"] == target
+        assert bb.modes == set(range(5))
+        assert validate(bb) == []
+
+    def test_deterministic(self):
+        """Test that programs are determined by the seed"""
+        assert generate(seed=3, feedforward=0.5) == generate(seed=3, feedforward=0.5)
+        assert generate(seed=3) != generate(seed=4)
+
+    def test_statement_count(self):
+        """Test the number of statements of a program without feed-forward"""
+        bb = loads(generate(num_modes=3, num_statements=50, seed=2))
+        assert len(bb.operations) == 53
+        assert [op["op"] for op in bb.operations[-3:]] == ["MeasureFock"] * 3
+
+        bb = loads(generate(num_modes=3, num_statements=50, measurement=None, seed=2))
+        assert len(bb.operations) == 50
+
+    def test_single_mode(self):
+        """Test that single-mode programs contain no two-mode gates"""
+        bb = loads(generate(num_modes=1, num_statements=100, array_size=1, seed=5))
+
+        assert bb.modes == {0}
+        assert all(op["modes"] == [0] for op in bb.operations)
+        assert validate(bb) == []
+
+    def test_variables(self):
+        """Test that variables are declared and used"""
+        script = generate(num_variables=3, num_statements=100, seed=0)
+        bb = loads(script)
+
+        assert set(bb._var) == {"v0", "v1", "v2"}  # pylint: disable=protected-access
+        assert "(v2)" in script
+
+    def test_feedforward(self):
+        """Test that feed-forward statements depend on a previously measured mode"""
+        bb = loads(generate(num_statements=100, feedforward=1.0, seed=4))
+        measured = set()
+        dependent = 0
+
+        for op in bb.operations:
+            if op["op"] == "MeasureHomodyne":
+                measured |= set(op["modes"])
+
+            for arg in op.get("args", []):
+                if isinstance(arg, RegRefTransform):
+                    assert set(arg.regrefs) <= measured
+                    assert not set(arg.regrefs) & set(op["modes"])
+                    dependent += 1
+
+        assert dependent > 50
+
+    def test_target_options(self):
+        """Test that target options are included in the program"""
+        bb = loads(generate(target="fock", options={"cutoff_dim": 5, "shots": 10}, seed=0))
+        assert bb.target["options"] == {"cutoff_dim": 5, "shots": 10}
+
+    def test_invalid(self):
+        """Test that invalid arguments raise an exception"""
+        with pytest.raises(ValueError, match="array size"):
+            generate(num_modes=2, array_size=3)
+
+        with pytest.raises(ValueError, match="at least two modes"):
+            generate(num_modes=1, feedforward=0.5)
+
+        with pytest.raises(ValueError, match="supports no operations"):
+            generate(target="chip0")
+
+
+class TestWorkloads:
+    """Tests for the structured workloads"""
+
+    @pytest.mark.parametrize("mesh", [False, True])
+    def test_gbs(self, mesh):
+        """Test Gaussian boson sampling programs"""
+        bb = loads(gbs(6, mesh=mesh, seed=0))
+        names = [op["op"] for op in bb.operations]
+
+        assert validate(bb) == []
+        assert names[:6] == ["Squeezed"] * 6
+        assert names[-6:] == ["MeasureFock"] * 6
+
+        if mesh:
+            assert names.count("BSgate") == 15
+        else:
+            assert names.count("Interferometer") == 1
+
+    def test_time_domain(self):
+        """Test time-domain programs"""
+        bb = loads(time_domain(10, num_delays=2, seed=0))
+
+        assert validate(bb) == []
+        assert len(bb.operations) == 40
+        assert bb.modes == {0, 1, 2}
+        assert [op["op"] for op in bb.operations[:4]] == ["Squeezed", "BSgate", "BSgate", "MeasureHomodyne"]
+
+    def test_deterministic(self):
+        """Test that workloads are determined by the seed"""
+        assert gbs(4, mesh=True, seed=1) == gbs(4, mesh=True, seed=1)
+        assert time_domain(5, seed=1) != time_domain(5, seed=2)
@@ -0,0 +1,240 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the incremental module"""
+# pylint: disable=no-self-use
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.error import BlackbirdSyntaxError
+from blackbird.incremental import IncrementalParser
+
+
+SCRIPT = """\
+name test
+version 1.0
+target gaussian (shots=10)
+
+float alpha = 0.5
+float beta = 0.1
+float array U =
+    1, 2
+    3, 4
+
+# a comment
+Coherent(alpha) | 0
+Sgate(beta, 0.1) | 1
+Rgate(0.3) | 2
+MeasureFock() | [0, 1, 2]
+"""
+
+
+def assert_same(program, text):
+    """Assert that a program is equal to the result of parsing the text from scratch"""
+    expected = loads(text)
+    assert program.name == expected.name
+    assert program.version == expected.version
+    assert program.target == expected.target
+    assert program.modes == expected.modes
+    assert program.operations == expected.operations
+    assert program._var.keys() == expected._var.keys()
+    for name, value in expected._var.items():
+        assert np.all(program._var[name] == value)
+
+
+def replace(parser, old, new):
+    """Replace the first occurrence of a substring in the parser text"""
+    start = parser.text.index(old)
+    return parser.edit(start, start + len(old), new)
+
+
+class TestIncrementalParser:
+    """Tests for the incremental parser"""
+
+    def test_initial_parse(self):
+        """Test that the initial program matches the non-incremental parser"""
+        parser = IncrementalParser(SCRIPT)
+        assert parser.text == SCRIPT
+        assert_same(parser.program, SCRIPT)
+
+    def test_edit_statement(self):
+        """Test that editing a statement only re-parses that statement"""
+        parser = IncrementalParser(SCRIPT)
+        program = replace(parser, "Rgate(0.3)", "Rgate(0.7)")
+
+        assert program.operations[2]["args"] == [0.7]
+        assert parser.reparsed == 1
+        assert parser.reevaluated == 1
+        assert_same(program, parser.text)
+
+    def test_edit_variable_propagates(self):
+        """Test that editing a variable re-evaluates the statements using it,
+        without re-parsing them"""
+        parser = IncrementalParser(SCRIPT)
+        program = replace(parser, "0.5", "0.9")
+
+        assert program.operations[0]["args"] == [0.9]
+        assert parser.reparsed == 1
+        assert parser.reevaluated == 2
+        assert_same(program, parser.text)
+
+    def test_unchanged_value_does_not_propagate(self):
+        """Test that a variable edit that does not change its value
+        does not re-evaluate its dependents"""
+        parser = IncrementalParser(SCRIPT)
+        replace(parser, "0.5", "0.50")
+
+        assert parser.reparsed == 1
+        assert parser.reevaluated == 1
+
+    def test_program_updated_in_place(self):
+        """Test that an edit updates the program in place, keeping the
+        operations of the units that were not re-evaluated"""
+        parser = IncrementalParser(SCRIPT)
+        program = parser.program
+        ops = list(program.operations)
+
+        assert replace(parser, "Rgate(0.3)", "Rgate(0.7)") is program
+        assert all(program.operations[i] is ops[i] for i in (0, 1, 3))
+
+        replace(parser, "0.1\n", "0.2\n")
+        assert program.operations[0] is ops[0]
+        assert program.operations[1] is not ops[1]
+        assert program.operations[1]["args"] == [0.2, 0.1]
+        assert_same(program, parser.text)
+
+    def test_insert_and_delete_lines(self):
+        """Test inserting and deleting statements"""
+        parser = IncrementalParser(SCRIPT)
+
+        start = parser.text.index("Rgate")
+        program = parser.edit(start, start, "BSgate(0.1, 0.2) | [1, 3]\n")
+        assert [op["op"] for op in program.operations][2] == "BSgate"
+        assert program.modes == {0, 1, 2, 3}
+        assert_same(program, parser.text)
+
+        program = replace(parser, "BSgate(0.1, 0.2) | [1, 3]\n", "")
+        assert program.modes == {0, 1, 2}
+        assert_same(program, parser.text)
+
+    def test_edit_array_row(self):
+        """Test that editing an array row re-parses the array declaration"""
+        parser = IncrementalParser(SCRIPT)
+        program = replace(parser, "3, 4", "3, 9")
+
+        assert np.all(program._var["U"] == np.array([[1, 2], [3, 9]]))
+        assert_same(program, parser.text)
+
+    def test_new_variable(self):
+        """Test that a newly declared variable is visible to later statements"""
+        parser = IncrementalParser(SCRIPT)
+        start = parser.text.index("float beta")
+        parser.edit(start, start, "float gamma = 0.2\n")
+        program = replace(parser, "Rgate(0.3)", "Rgate(gamma)")
+
+        assert program.operations[2]["args"] == [0.2]
+        assert_same(program, parser.text)
+
+    def test_edit_metadata(self):
+        """Test that editing the metadata block updates the program"""
+        parser = IncrementalParser(SCRIPT)
+        program = replace(parser, "shots=10", "shots=20")
+
+        assert program.target["options"] == {"shots": 20}
+        assert_same(program, parser.text)
+
+    def test_removed_variable_error(self):
+        """Test that an edit removing a variable that is still referenced
+        raises an error, and leaves the parser unchanged"""
+        parser = IncrementalParser(SCRIPT)
+        program = parser.program
+
+        with pytest.raises(BlackbirdSyntaxError, match=r"line 11:9\): name 'alpha' is not defined"):
+            replace(parser, "float alpha = 0.5\n", "")
+
+        assert parser.text == SCRIPT
+        assert parser.program is program
+
+        # the parser remains usable after the error
+        program = replace(parser, "0.5", "0.6")
+        assert program.operations[0]["args"] == [0.6]
+        assert_same(program, parser.text)
+
+    def test_syntax_error(self):
+        """Test that syntax errors report the line in the full script"""
+        parser = IncrementalParser(SCRIPT)
+
+        with pytest.raises(BlackbirdSyntaxError, match=r"line 14:16\): unexpected input 3"):
+            replace(parser, "Rgate(0.3) | 2", "Rgate(0.3) | 2 3")
+
+        assert parser.text == SCRIPT
+
+    @pytest.mark.parametrize(
+        "old, new",
+        [
+            ("MeasureFock() | [0, 1, 2]\n", "MeasureFock() | [0, 1]int n = 7\n"),
+            ("Rgate(0.3) | 2\n", "Rgate(0.3) | 2 float gamma = 0.2 Rgate(gamma) | 3\n"),
+            ("float beta = 0.1\n", "float beta = 0.1 Xgate(beta) | 0\n"),
+            ("Rgate(0.3) | 2\n", "Rgate(0.3) | 2\n        Xgate(alpha) | 1\n"),
+            ("    3, 4\n", "    3, 4\n    5, 6\n"),
+        ],
+    )
+    def test_same_language(self, old, new):
+        """Test that the incremental parser accepts the same scripts as the
+        parser, including several declarations and statements on one line"""
+        parser = IncrementalParser(SCRIPT)
+        replace(parser, old, new)
+        assert_same(parser.program, parser.text)
+
+        # edit a unit sharing a line with another one
+        replace(parser, "2\n", "1\n")
+        assert_same(parser.program, parser.text)
+        assert_same(IncrementalParser(parser.text).program, parser.text)
+
+    def test_same_errors(self):
+        """Test that the incremental parser rejects the scripts rejected by the parser"""
+        parser = IncrementalParser(SCRIPT)
+
+        edits = [
+            ("Rgate(0.3) | 2\n", "Rgate(0.3) | 2\n    Xgate(0.1) | 1\n"),
+            ("3, 4\n", "3, 4 Rgate(0.1) | 0\n"),
+        ]
+
+        for old, new in edits:
+            text = parser.text.replace(old, new, 1)
+
+            with pytest.raises(BlackbirdSyntaxError):
+                loads(text)
+
+            with pytest.raises(BlackbirdSyntaxError):
+                replace(parser, old, new)
+
+            assert parser.text == SCRIPT
+
+    def test_invalid_range(self):
+        """Test that an invalid edit range raises an exception"""
+        parser = IncrementalParser(SCRIPT)
+
+        with pytest.raises(ValueError, match="Invalid edit range"):
+            parser.edit(10, 5, "")
+
+    def test_edit_at_end(self):
+        """Test appending to the end of the script"""
+        parser = IncrementalParser(SCRIPT)
+        program = parser.edit(len(SCRIPT), len(SCRIPT), "Xgate(beta) | 3\n")
+
+        assert program.operations[-1] == {"op": "Xgate", "args": [0.1], "kwargs": {}, "modes": [3]}
+        assert_same(program, parser.text)
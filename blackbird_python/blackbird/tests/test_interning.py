@@ -0,0 +1,131 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the interning module"""
+# pylint: disable=no-self-use,protected-access
+import gc
+
+import pytest
+
+import antlr4
+import numpy as np
+
+from blackbird import loads
+from blackbird.compiler import fuse_interferometers
+from blackbird.interning import ArrayPool
+from blackbird.listener import parse
+
+
+SCRIPT = """\
+name test
+version 1.0
+
+complex array U =
+    1, 0
+    0, 1j
+
+complex array V =
+    1, 0
+    0, 1j
+
+float array W =
+    1, 0
+    0, 1
+
+Interferometer(U) | [0, 1]
+Interferometer(V) | [0, 1]
+"""
+
+
+class TestArrayPool:
+    """Tests for the array pool"""
+
+    def test_intern(self):
+        """Test that equal arrays are shared and read-only"""
+        pool = ArrayPool()
+        a = pool.intern(np.arange(4.0))
+        b = pool.intern(np.arange(4.0))
+
+        c = pool.intern(np.arange(4))
+        d = pool.intern(np.arange(4.0).reshape(2, 2))
+
+        assert b is a
+        assert not a.flags.writeable
+        assert c is not a and d is not a
+
+        with pytest.raises(ValueError, match="read-only"):
+            a[0] = 1
+
+        assert pool.stats() == {"hits": 1, "misses": 3, "saved_bytes": 32, "size": 3}
+
+    def test_object_arrays(self):
+        """Test that arrays of objects are not interned"""
+        pool = ArrayPool()
+        a = np.array([1, "a"], dtype=object)
+
+        assert pool.intern(a) is a
+        assert a.flags.writeable
+        assert len(pool) == 0
+
+    def test_weak_references(self):
+        """Test that the pool does not keep unused arrays alive"""
+        pool = ArrayPool()
+        a = pool.intern(np.arange(4.0))
+        assert len(pool) == 1
+
+        del a
+        gc.collect()
+        assert len(pool) == 0
+
+    def test_clear(self):
+        """Test clearing the pool"""
+        pool = ArrayPool()
+        a = pool.intern(np.arange(4.0))
+        pool.clear()
+
+        assert pool.stats() == {"hits": 0, "misses": 0, "saved_bytes": 0, "size": 0}
+        assert pool.intern(np.arange(4.0)) is not a
+
+
+class TestLoadInterned:
+    """Tests for loading programs with an array pool"""
+
+    def test_programs_share_arrays(self):
+        """Test that the programs loaded with a pool share equal arrays"""
+        pool = ArrayPool()
+        bb1 = loads(SCRIPT, array_pool=pool)
+        bb2 = parse(antlr4.InputStream(SCRIPT), array_pool=pool)
+
+        assert bb1._var["U"] is bb1._var["V"]
+        assert bb2._var["U"] is bb1._var["U"]
+        assert bb2.operations[1]["args"][0] is bb1._var["U"]
+        assert bb2._var["W"] is not bb1._var["U"]
+        assert pool.stats()["size"] == 2
+
+        compiled, report = fuse_interferometers(bb1)
+        assert report["fused"] == 2
+        assert np.allclose(compiled.operations[0]["args"][0], np.diag([1, -1]))
+
+    def test_stats(self):
+        """Test that arrays are interned when collecting parsing statistics"""
+        pool = ArrayPool()
+        bb1 = loads(SCRIPT, array_pool=pool)
+        bb2, _ = parse(antlr4.InputStream(SCRIPT), stats=True, array_pool=pool)
+        assert bb2._var["U"] is bb1._var["U"]
+
+    def test_opt_in(self):
+        """Test that arrays are not interned by default"""
+        bb = loads(SCRIPT)
+        assert bb._var["U"] is not bb._var["V"]
+        assert bb._var["U"].flags.writeable
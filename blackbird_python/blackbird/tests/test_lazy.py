@@ -0,0 +1,280 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the lazy module"""
+# pylint: disable=no-self-use,protected-access
+import copy
+import pickle
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.error import BlackbirdSyntaxError
+from blackbird.interning import ArrayPool
+from blackbird.lazy import LazyDict, LazyValue
+from blackbird.listener import RegRefTransform
+
+
+SCRIPT = """\
+name test
+version 1.0
+target gaussian (shots=10)
+
+float alpha = 0.5
+float beta = 2 * alpha + sin(pi / 2)
+int unused = 1j
+
+complex array U =
+    1, 0
+    0, exp(1j * pi * alpha)
+
+float array big[2, 3] =
+    1, 2, 3
+    4, 5, 6
+
+Sgate(beta, phi=alpha / 2) | 0
+Interferometer(U) | [0, 1]
+MeasureX | 0
+Xgate(2 * q0 + beta) | 1
+Vacuum | 1
+"""
+
+
+def raw(mapping, key):
+    """The value stored in a dictionary, without evaluating it"""
+    return dict.__getitem__(mapping, key)
+
+
+class Counter:
+    """Function counting its calls"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestLazyValue:
+    """Tests for lazy values"""
+
+    def test_memoized(self):
+        """Test that the value is computed once, on first access"""
+        func = Counter([1, 2])
+        value = LazyValue(func)
+
+        assert not value.evaluated
+        assert func.calls == 0
+        assert value.value is value.value
+        assert value.evaluated
+        assert func.calls == 1
+
+    def test_exception(self):
+        """Test that a failed evaluation is retried on the next access"""
+        values = iter([ValueError("failed"), 5])
+
+        def func():
+            value = next(values)
+            if isinstance(value, Exception):
+                raise value
+            return value
+
+        value = LazyValue(func)
+
+        with pytest.raises(ValueError, match="failed"):
+            value.value
+
+        assert not value.evaluated
+        assert value.value == 5
+
+
+class TestLazyDict:
+    """Tests for lazy dictionaries"""
+
+    def lazy_dict(self):
+        """A lazy dictionary with one evaluated and one lazy value"""
+        func = Counter([1, 2])
+        return LazyDict(a=0, b=LazyValue(func)), func
+
+    def test_keys(self):
+        """Test that methods involving only the keys do not evaluate the values"""
+        d, func = self.lazy_dict()
+
+        assert "b" in d
+        assert len(d) == 2
+        assert list(d) == list(d.keys()) == ["a", "b"]
+        assert d["a"] == 0
+        assert func.calls == 0
+
+    def test_getitem(self):
+        """Test that reading a value evaluates and replaces it"""
+        d, func = self.lazy_dict()
+
+        assert d["b"] == [1, 2]
+        assert d.get("b") is d["b"]
+        assert raw(d, "b") == [1, 2]
+        assert d.get("c", 3) == 3
+        assert func.calls == 1
+
+    @pytest.mark.parametrize(
+        "convert",
+        [
+            dict,
+            lambda d: {**d},
+            lambda d: dict(d.items()),
+            lambda d: dict(zip(d.keys(), d.values())),
+            copy.copy,
+            copy.deepcopy,
+            lambda d: pickle.loads(pickle.dumps(d)),
+            lambda d: {} | d,
+            lambda d: d | {},
+        ],
+    )
+    def test_conversions(self, convert):
+        """Test that converting or copying the dictionary evaluates its values"""
+        d, _ = self.lazy_dict()
+        converted = convert(d)
+
+        assert converted == {"a": 0, "b": [1, 2]}
+        assert not any(isinstance(v, LazyValue) for v in dict.values(converted))
+
+    def test_copy(self):
+        """Test that shallow copies share their lazy values"""
+        d, func = self.lazy_dict()
+        c = d.copy()
+
+        assert isinstance(c, LazyDict)
+        assert c["b"] == d["b"] == [1, 2]
+        assert func.calls == 1
+
+    def test_equality(self):
+        """Test comparing lazy dictionaries"""
+        d, _ = self.lazy_dict()
+        e, _ = self.lazy_dict()
+
+        assert d == e
+        assert {"a": 0, "b": [1, 2]} == d
+        assert d != {"a": 0}
+        assert repr(d) == "{'a': 0, 'b': [1, 2]}"
+
+    def test_mutation(self):
+        """Test the mutating methods"""
+        d, func = self.lazy_dict()
+
+        assert d.setdefault("b") == [1, 2]
+        assert d.pop("b") == [1, 2]
+        assert d.popitem() == ("a", 0)
+        assert func.calls == 1
+
+
+class TestLazyLoad:
+    """Tests for loading programs in lazy mode"""
+
+    def test_equivalent(self):
+        """Test that lazy and eager programs have the same values"""
+        eager = loads(SCRIPT.replace("int unused = 1j\n", ""))
+        bb = loads(SCRIPT.replace("int unused = 1j\n", ""), lazy=True)
+
+        assert bb.serialize() == eager.serialize()
+        assert bb.fingerprint() == eager.fingerprint()
+        assert bb._var["beta"] == eager._var["beta"] == 2.0
+        assert np.array_equal(bb._var["U"], eager._var["U"])
+
+    def test_operations_not_evaluated(self):
+        """Test that inspecting the operation names and modes does not evaluate
+        the arguments or the variables"""
+        bb = loads(SCRIPT, lazy=True)
+
+        assert [op["op"] for op in bb.operations] == [
+            "Sgate",
+            "Interferometer",
+            "MeasureX",
+            "Xgate",
+            "Vacuum",
+        ]
+        assert bb.operations.indices_on_mode(1) == [1, 3, 4]
+        assert bb.modes == {0, 1}
+
+        assert not raw(bb.operations[0], "args").evaluated
+        assert all(not v.evaluated for v in dict.values(bb._var) if isinstance(v, LazyValue))
+
+    def test_dependencies(self):
+        """Test that evaluating an argument evaluates the variables it depends on,
+        and only those"""
+        bb = loads(SCRIPT, lazy=True)
+
+        assert bb.operations[0]["args"] == [2.0]
+        assert bb.operations[0]["kwargs"] == {"phi": 0.25}
+        assert raw(bb._var, "beta").evaluated
+        assert not raw(bb._var, "U").evaluated
+        assert not raw(bb._var, "big").evaluated
+        assert bb._var["beta"] == 2.0
+
+        U = bb.operations[1]["args"][0]
+        assert U is bb._var["U"]
+        assert np.allclose(U, np.diag([1, 1j]))
+
+    def test_regref_transform(self):
+        """Test that register references in lazy arguments are converted
+        to register transforms"""
+        bb = loads(SCRIPT, lazy=True)
+        transform = bb.operations[3]["args"][0]
+
+        assert isinstance(transform, RegRefTransform)
+        assert transform.regrefs == [0]
+        assert transform.func(1) == 4
+
+    def test_no_arguments(self):
+        """Test that operations without arguments are unchanged"""
+        bb = loads(SCRIPT, lazy=True)
+        assert bb.operations[4] == {"op": "Vacuum", "modes": [1]}
+
+    def test_redeclared(self):
+        """Test that arguments use the value of a variable at the statement,
+        even if it is declared again later"""
+        bb = loads(
+            "name test\nversion 1.0\n\nfloat a = 1\nSgate(a) | 0\nfloat a = 2\nSgate(a) | 0\n",
+            lazy=True,
+        )
+        assert [op["args"] for op in bb.operations] == [[1.0], [2.0]]
+
+    def test_deferred_errors(self):
+        """Test that undefined names are reported while parsing, and type and
+        shape errors on first access"""
+        with pytest.raises(BlackbirdSyntaxError, match="name 'gamma' is not defined"):
+            loads("name test\nversion 1.0\n\nfloat a = 2 * gamma\n", lazy=True)
+
+        bb = loads(SCRIPT, lazy=True)
+
+        with pytest.raises(TypeError, match="Var unused = 1j is not of declared type int"):
+            bb._var["unused"]
+
+        bb = loads(SCRIPT.replace("big[2, 3]", "big[3, 2]"), lazy=True)
+
+        with pytest.raises(BlackbirdSyntaxError, match="declared shape"):
+            bb._var["big"]
+
+    def test_array_pool(self):
+        """Test that lazy arrays are interned when evaluated"""
+        script = SCRIPT.replace("int unused = 1j\n", "")
+        pool = ArrayPool()
+        bb1 = loads(script, lazy=True, array_pool=pool)
+        bb2 = loads(script, array_pool=pool)
+
+        assert len(pool) == 2
+        assert bb1._var["U"] is bb2._var["U"]
@@ -25,7 +25,9 @@ import antlr4
 
 from blackbird.blackbirdLexer import blackbirdLexer
 from blackbird.blackbirdParser import blackbirdParser
-from blackbird.listener import BlackbirdListener, RegRefTransform, parse
+from blackbird import error
+from blackbird.error import BlackbirdError, BlackbirdSyntaxError, exit_on_error
+from blackbird.listener import BlackbirdListener, ParseStats, RegRefTransform, parse
 
 
 test_file = """
@@ -87,30 +89,30 @@ class TestParsingVariables:
 
     def test_invalid_regref(self, parse_input_mocked_metadata):
         """Test that a variable using the reserved name for regrefs returns an exception"""
-        with pytest.raises(SystemExit, match="reserved for register references"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved for register references"):
             parse_input_mocked_metadata("float q0 = 5")
 
-        with pytest.raises(SystemExit, match="reserved for register references"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved for register references"):
             parse_input_mocked_metadata("float array q4 =\n\t-0.1, 0.2")
 
     def test_invalid_variable_name(self, parse_input_mocked_metadata):
         """Test that a variable using the reserved name for a blackbird keyword returns an exception"""
-        with pytest.raises(SystemExit, match="reserved Blackbird keyword"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved Blackbird keyword"):
             parse_input_mocked_metadata("float name = 5")
 
-        with pytest.raises(SystemExit, match="reserved Blackbird keyword"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved Blackbird keyword"):
             parse_input_mocked_metadata("float target = 5")
 
-        with pytest.raises(SystemExit, match="reserved Blackbird keyword"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved Blackbird keyword"):
             parse_input_mocked_metadata("float version = 5")
 
-        with pytest.raises(SystemExit, match="reserved Blackbird keyword"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved Blackbird keyword"):
             parse_input_mocked_metadata("float array name =\n\t-0.1, 0.2")
 
-        with pytest.raises(SystemExit, match="reserved Blackbird keyword"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved Blackbird keyword"):
             parse_input_mocked_metadata("float array target =\n\t-0.1, 0.2")
 
-        with pytest.raises(SystemExit, match="reserved Blackbird keyword"):
+        with pytest.raises(BlackbirdSyntaxError, match="reserved Blackbird keyword"):
             parse_input_mocked_metadata("float array version =\n\t-0.1, 0.2")
 
     def test_integer_variable(self, parse_input_mocked_metadata):
@@ -183,7 +185,7 @@ class TestParsingVariables:
 
     def test_invalid_array_type(self, parse_input_mocked_metadata):
         """Test exception is raised if the array variable type is incorrect"""
-        with pytest.raises(SystemExit, match=r"not of declared type float"):
+        with pytest.raises(BlackbirdSyntaxError, match=r"not of declared type float"):
             parse_input_mocked_metadata(
                 "float array A =\n\t-1.0+1.0j, 2.7e5+0.2e-5j\n\t-0.1-2j, 0.2-0.1j"
             )
@@ -191,7 +193,7 @@ class TestParsingVariables:
     def test_invalid_array_shape(self, parse_input_mocked_metadata):
         """Test exception is raised if the array variable shape is incorrect"""
         with pytest.raises(
-            SystemExit, match=r"has declared shape \(1, 2\) but actual shape \(2, 2\)"
+            BlackbirdSyntaxError, match=r"has declared shape \(1, 2\) but actual shape \(2, 2\)"
         ):
             parse_input_mocked_metadata(
                 "complex array A[1, 2] =\n\t-1.0+1.0j, 2.7e5+0.2e-5j\n\t-0.1-2j, 0.2-0.1j"
@@ -401,3 +403,155 @@ class TestParseFunction:
         ]
 
         assert bb.operations == expected
+
+
+stats_file = """
+name test_name
+version 1.0
+target gaussian (shots=10)
+
+float alpha = 0.3423
+complex array U[2, 2] =
+    1, 0
+    0, 1j
+
+Coherent(alpha) | 0
+Interferometer(U) | [0, 1]
+MeasureX | 0
+Xgate(2*q0) | 1
+Zgate(q0 + 1) | 1
+"""
+
+
+class TestParseStats:
+    """Tests for the parsing statistics"""
+
+    def test_disabled(self):
+        """Test that only the program is returned by default"""
+        bb = parse(antlr4.InputStream(stats_file))
+        assert len(bb.operations) == 5
+
+    def test_program(self):
+        """Test that collecting statistics does not change the parsed program"""
+        bb, _ = parse(antlr4.InputStream(stats_file), stats=True)
+        assert bb.serialize() == parse(antlr4.InputStream(stats_file)).serialize()
+
+    def test_counts(self):
+        """Test the token, node, array element and register transform counts"""
+        _, stats = parse(antlr4.InputStream(stats_file), stats=True)
+
+        lexer = blackbirdLexer(antlr4.InputStream(stats_file))
+        assert stats.tokens == len(lexer.getAllTokens()) + 1
+        assert stats.nodes > stats.tokens
+        assert stats.array_elements == 4
+        assert stats.regref_transforms == 2
+        assert stats.ll_fallbacks == 7
+
+    @pytest.mark.parametrize("n", [0, 1, 5])
+    def test_ll_fallbacks(self, n):
+        """Test that the SLL conflicts of the program loop are counted"""
+        script = "name test_name\nversion 1.0\n\n" + "Vac | 0\n" * n
+        _, stats = parse(antlr4.InputStream(script), stats=True)
+        assert stats.ll_fallbacks == n + 1
+
+    def test_times(self):
+        """Test that the time of every phase is recorded"""
+        _, stats = parse(antlr4.InputStream(stats_file), stats=True)
+
+        assert set(stats.times) == set(ParseStats.PHASES)
+        assert all(stats.times[p] > 0 for p in ParseStats.PHASES)
+        assert stats.times["walk"] >= stats.times["arrays"] + stats.times["regref"]
+        assert stats.total == pytest.approx(
+            stats.times["lex"] + stats.times["parse"] + stats.times["walk"]
+        )
+        assert "tokens={}".format(stats.tokens) in repr(stats)
+
+    def test_listener_unchanged(self):
+        """Test that collecting statistics does not modify the listener class"""
+        methods = dict(vars(BlackbirdListener))
+        parse(antlr4.InputStream(stats_file), stats=True)
+        assert dict(vars(BlackbirdListener)) == methods
+
+
+errors_file = """
+name test_name
+version 1.0
+
+float alpha = 0.5
+float q1 = 2
+int n = 1.5j
+float beta = gamma + 1
+Sgate(alpha | 0
+Rgate(0.1) | 1
+"""
+
+
+class TestErrors:
+    """Tests for reporting syntax and semantic errors"""
+
+    def test_exception(self):
+        """Test that syntax errors are ordinary exceptions by default"""
+        with pytest.raises(BlackbirdSyntaxError, match=r"line 9:13\): no viable alternative") as exc:
+            parse(antlr4.InputStream(errors_file))
+
+        assert not isinstance(exc.value, SystemExit)
+        assert exc.value.errors == [exc.value]
+
+    def test_collect_errors_does_not_exit(self):
+        """Test that collecting errors creates every error without exiting"""
+        with pytest.raises(BlackbirdSyntaxError) as exc:
+            parse(antlr4.InputStream(errors_file), collect_errors=True)
+
+        assert not any(isinstance(e, SystemExit) for e in exc.value.errors)
+
+    def test_exit_on_error(self):
+        """Test that the opt-in context exits with the error message"""
+        with pytest.raises(SystemExit) as exc:
+            with exit_on_error():
+                parse(antlr4.InputStream(errors_file))
+
+        assert isinstance(exc.value.code, BlackbirdSyntaxError)
+        assert "line 9:13" in str(exc.value.code)
+
+        with pytest.raises(ValueError, match="other"):
+            with exit_on_error():
+                raise ValueError("other")
+
+    def test_no_traceback_deprecated(self):
+        """Test that NoTraceBack is a deprecated alias of BlackbirdError"""
+        with pytest.warns(DeprecationWarning, match="use BlackbirdError"):
+            assert error.NoTraceBack is BlackbirdError
+
+        assert issubclass(BlackbirdSyntaxError, BlackbirdError)
+
+    def test_variables_cleared(self):
+        """Test that the variables of a failed parse are not visible to the next parse"""
+        with pytest.raises(BlackbirdSyntaxError):
+            parse(antlr4.InputStream(errors_file.replace("Sgate(alpha |", "Sgate(alpha) |")))
+
+        with pytest.raises(BlackbirdSyntaxError, match="name 'alpha' is not defined"):
+            parse(antlr4.InputStream("name test\nversion 1.0\n\nSgate(alpha) | 0\n"))
+
+    def test_collect_errors(self):
+        """Test that all syntax and semantic errors are reported in one pass"""
+        with pytest.raises(BlackbirdSyntaxError, match="^4 errors") as exc:
+            parse(antlr4.InputStream(errors_file), collect_errors=True)
+
+        messages = [str(e) for e in exc.value.errors]
+        assert len(messages) == 4
+        assert "line 9:13" in messages[0]
+        assert "reserved for register references" in messages[1]
+        assert "line 7:1): Var n = 1.5j is not of declared type int" in messages[2]
+        assert "name 'gamma' is not defined" in messages[3]
+
+    def test_collect_single_error(self):
+        """Test that a single collected error is raised as is"""
+        with pytest.raises(BlackbirdSyntaxError, match="expecting '\|'") as exc:
+            parse(antlr4.InputStream("name test\nversion 1.0\n\nSgate(0.1)\n"), collect_errors=True)
+
+        assert len(exc.value.errors) == 1
+
+    def test_collect_valid(self):
+        """Test that valid programs are unaffected by error recovery mode"""
+        bb = parse(antlr4.InputStream(test_file), collect_errors=True)
+        assert bb.serialize() == parse(antlr4.InputStream(test_file)).serialize()
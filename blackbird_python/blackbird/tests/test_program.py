@@ -13,14 +13,20 @@
 # limitations under the License.
 
 """Tests for the program module"""
+import copy
+import pickle
 from textwrap import dedent
 from collections import OrderedDict
 
 import pytest
 
 import numpy as np
+import sympy as sym
 
-from blackbird.program import BlackbirdProgram, numpy_to_blackbird
+from blackbird import loads
+from blackbird.listener import RegRefTransform
+from blackbird.interning import ArrayPool
+from blackbird.program import BlackbirdProgram, OperationList, _array_key, numpy_to_blackbird
 
 
 class TestNumPyToBlackbird:
@@ -336,3 +342,414 @@ class TestBlackbirdProgram:
             """
         )
         assert res == expected
+
+
+class TestOperationIndexes:
+    """Tests for the operation indexes of the program class"""
+
+    @pytest.fixture
+    def program(self):
+        """A program with a mixture of operations"""
+        bb = BlackbirdProgram(name="prog", version=1.0)
+        bb._operations.extend(
+            [
+                {"op": "Coherent", "modes": [0], "args": [0.5], "kwargs": {}},
+                {"op": "BSgate", "modes": [0, 1], "args": [0.5, 0.1], "kwargs": {}},
+                {"op": "MeasureX", "modes": [0]},
+                {"op": "Rgate", "modes": [1], "args": [0.2], "kwargs": {}},
+                {"op": "MeasureFock", "modes": [1], "args": [], "kwargs": {}},
+            ]
+        )
+        return bb
+
+    def test_operations_list_type(self, program):
+        """Test that the operations are stored in an indexed list, that still
+        compares equal to a standard list"""
+        assert isinstance(program.operations, OperationList)
+        assert program.operations == list(program.operations)
+
+        program._operations = [{"op": "Vac", "modes": [0]}]
+        assert isinstance(program.operations, OperationList)
+        assert program.ops_named("Vac") == [{"op": "Vac", "modes": [0]}]
+
+    def test_ops_on_mode(self, program):
+        """Test operations are correctly indexed by mode"""
+        ops = program.operations
+        assert program.ops_on_mode(0) == [ops[0], ops[1], ops[2]]
+        assert program.ops_on_mode(1) == [ops[1], ops[3], ops[4]]
+        assert program.ops_on_mode(2) == []
+
+    def test_ops_named(self, program):
+        """Test operations are correctly indexed by name"""
+        assert program.ops_named("BSgate") == [program.operations[1]]
+        assert program.ops_named("Interferometer") == []
+
+    def test_measurements(self, program):
+        """Test measurements are correctly indexed"""
+        ops = program.operations
+        assert program.measurements() == [ops[2], ops[4]]
+
+    def test_append_extends_index(self, program):
+        """Test that appending operations incrementally updates the index"""
+        assert len(program.ops_on_mode(0)) == 3
+        assert program.operations._indexed == 5
+
+        op = {"op": "MeasureHomodyne", "modes": [0], "args": [0.1], "kwargs": {}}
+        program._operations.append(op)
+
+        assert program.ops_on_mode(0)[-1] is op
+        assert program.measurements()[-1] is op
+        assert program.operations._indexed == 6
+
+    def test_query_does_not_mutate(self, program):
+        """Test that querying the indexes does not count as a mutation,
+        so that values cached on the operations remain valid"""
+        mutations = program.operations.mutations
+
+        program.ops_on_mode(0)
+        program.ops_named("BSgate")
+        program.measurements()
+
+        assert program.operations.mutations == mutations
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda ops: ops.insert(0, {"op": "Vac", "modes": [2]}),
+            lambda ops: ops.pop(0),
+            lambda ops: ops.__delitem__(slice(0, 2)),
+            lambda ops: ops.__setitem__(1, {"op": "Vac", "modes": [2]}),
+            lambda ops: ops.reverse(),
+            lambda ops: ops.clear(),
+        ],
+    )
+    def test_mutation_invalidates_index(self, program, mutate):
+        """Test that any other mutation of the operation list results in
+        an index consistent with a full scan of the program"""
+        program.ops_on_mode(0)
+        mutations = program.operations.mutations
+        mutate(program._operations)
+        assert program.operations.mutations > mutations
+
+        ops = program.operations
+        for mode in range(3):
+            expected = [op for op in ops if mode in op["modes"]]
+            assert program.ops_on_mode(mode) == expected
+
+        assert program.ops_named("Vac") == [op for op in ops if op["op"] == "Vac"]
+        assert program.measurements() == [op for op in ops if op["op"].startswith("Measure")]
+
+    def test_reindex(self, program):
+        """Test that reindexing picks up in-place changes to operations"""
+        program.ops_on_mode(0)
+        program.operations[3]["modes"] = [2]
+        program.operations.reindex()
+        assert program.ops_on_mode(2) == [program.operations[3]]
+
+    def test_copy_and_pickle(self, program):
+        """Test that copied and pickled programs have consistent indexes"""
+        program.ops_on_mode(0)
+
+        for new in (copy.deepcopy(program), pickle.loads(pickle.dumps(program))):
+            assert new.ops_on_mode(1) == program.ops_on_mode(1)
+            assert new.measurements() == program.measurements()
+
+
+class TestDependencies:
+    """Tests for the dependency graph and layer decomposition"""
+
+    @pytest.fixture
+    def program(self):
+        """A state teleportation program"""
+        bb = BlackbirdProgram(name="prog", version=1.0)
+        bb._operations.extend(
+            [
+                {"op": "Coherent", "modes": [0], "args": [0.5], "kwargs": {}},
+                {"op": "Squeezed", "modes": [1], "args": [-4], "kwargs": {}},
+                {"op": "Squeezed", "modes": [2], "args": [4], "kwargs": {}},
+                {"op": "BSgate", "modes": [1, 2], "args": [0.7, 0], "kwargs": {}},
+                {"op": "BSgate", "modes": [0, 1], "args": [0.7, 0], "kwargs": {}},
+                {"op": "MeasureX", "modes": [0]},
+                {"op": "MeasureP", "modes": [1]},
+                {"op": "Xgate", "modes": [2], "args": [RegRefTransform(sym.Symbol("q0"))], "kwargs": {}},
+                {"op": "Zgate", "modes": [2], "args": [RegRefTransform(sym.Symbol("q1"))], "kwargs": {}},
+            ]
+        )
+        return bb
+
+    def test_dag(self, program):
+        """Test the dependency graph contains quantum and classical edges"""
+        expected = {0: [], 1: [], 2: [], 3: [1, 2], 4: [0, 3], 5: [4], 6: [4], 7: [3, 5], 8: [6, 7]}
+        assert program.dag() == expected
+
+    def test_layers(self, program):
+        """Test the layer decomposition"""
+        layers = program.layers()
+        assert layers == [[0, 1, 2], [3], [4], [5, 6], [7], [8]]
+
+        for layer in layers:
+            modes = [m for idx in layer for m in program.operations[idx]["modes"]]
+            assert len(modes) == len(set(modes))
+
+    def test_empty_program(self):
+        """Test the dependency graph of an empty program"""
+        bb = BlackbirdProgram()
+        assert bb.dag() == {}
+        assert bb.layers() == []
+
+    def test_caching(self, program):
+        """Test that the dependency graph is cached until the operations are mutated"""
+        program.dag()
+        cached = program._cache["dependencies"]
+        program.layers()
+        program.ops_on_mode(0)
+        program.dag()
+        assert program._cache["dependencies"] is cached
+
+        program._operations.append({"op": "Rgate", "modes": [0], "args": [0.1], "kwargs": {}})
+        program.dag()
+        assert program._cache["dependencies"] is not cached
+        assert program.dag()[9] == [5]
+        assert program.layers()[4] == [7, 9]
+
+        program._operations = []
+        assert program.dag() == {}
+
+    def test_results_are_copies(self, program):
+        """Test that modifying the returned graph and layers does not affect the cache"""
+        program.dag().clear()
+        program.dag()[3].append(0)
+        program.layers().append("x")
+        program.layers()[0].clear()
+
+        assert program.dag()[3] == [1, 2]
+        assert len(program.dag()) == 9
+        assert program.layers() == [[0, 1, 2], [3], [4], [5, 6], [7], [8]]
+
+
+class TestMemoryReport:
+    """Tests for the memory accounting report"""
+
+    def test_empty_program(self):
+        """Test the report of an empty program"""
+        report = BlackbirdProgram().memory_report()
+
+        assert report["variables"] == report["arguments"] == report["regref_transforms"] == 0
+        assert report["duplicate_arrays"] == 0
+        assert report["total"] == report["operations"] > 0
+
+    def test_arrays(self):
+        """Test that arrays are counted once, and that equal copies are reported"""
+        U = np.identity(16)
+
+        bb = BlackbirdProgram()
+        bb._var["U"] = U
+        bb._operations.append({"op": "Interferometer", "modes": [0], "args": [U], "kwargs": {}})
+        report = bb.memory_report()
+
+        assert report["variables"] >= U.nbytes
+        assert report["arguments"] < U.nbytes
+        assert report["duplicate_arrays"] == 0
+
+        bb._operations.append({"op": "Interferometer", "modes": [0], "args": [U.copy()], "kwargs": {}})
+        report = bb.memory_report()
+
+        assert report["arguments"] >= U.nbytes
+        assert report["duplicate_arrays"] == U.nbytes
+
+    def test_duplicate_views(self):
+        """Test that equal arrays are reported as duplicates, independently
+        of their memory layout"""
+        U = np.arange(16.0).reshape(4, 4)
+
+        bb = BlackbirdProgram()
+        bb._var["U"] = U.T.copy()
+        bb._var["V"] = np.asfortranarray(U).T
+        bb._var["W"] = np.array([1, "a"], dtype=object)
+        bb._var["X"] = np.array([1, "a"], dtype=object)
+
+        assert bb.memory_report()["duplicate_arrays"] == U.nbytes + bb._var["X"].nbytes
+
+    def test_kwargs(self):
+        """Test that keyword argument values are counted"""
+        bb = BlackbirdProgram()
+        bb._operations.append({"op": "Gaussian", "modes": [0], "args": [], "kwargs": {"V": np.zeros(1000)}})
+        assert bb.memory_report()["arguments"] >= 8000
+
+    def test_regref_transforms(self):
+        """Test that register transforms are counted separately"""
+        bb = BlackbirdProgram()
+        bb._operations.append({"op": "MeasureX", "modes": [0]})
+        bb._operations.append(
+            {"op": "Xgate", "modes": [1], "args": [RegRefTransform(2 * sym.Symbol("q0"))], "kwargs": {}}
+        )
+        report = bb.memory_report()
+
+        assert report["regref_transforms"] > 0
+        assert report["arguments"] == 0
+        assert report["total"] == sum(
+            report[k] for k in ["variables", "arguments", "operations", "regref_transforms"]
+        )
+
+    def test_operations(self):
+        """Test that the operation overhead grows with the number of operations"""
+        bb = BlackbirdProgram()
+        bb._operations.append({"op": "Rgate", "modes": [0], "args": [0.1], "kwargs": {}})
+        single = bb.memory_report()["operations"]
+
+        bb._operations.extend({"op": "Rgate", "modes": [0], "args": [0.1], "kwargs": {}} for _ in range(9))
+        assert bb.memory_report()["operations"] > 5 * single
+
+
+class TestArrayKey:
+    """Tests for the keys identifying arrays by content"""
+
+    def test_layout(self):
+        """Test that the key does not depend on the memory layout of the array"""
+        U = np.arange(12.0).reshape(3, 4)
+        key = _array_key(U)
+
+        assert _array_key(np.asfortranarray(U)) == key
+        assert _array_key(np.arange(24.0).reshape(3, 8)[:, ::2] / 2) == key
+        assert ArrayPool.key(U.T.copy().T) == key
+
+    def test_dtype_and_shape(self):
+        """Test that arrays with the same bytes but different dtypes or shapes differ"""
+        U = np.arange(4, dtype=np.int64)
+        keys = {_array_key(U), _array_key(U.reshape(2, 2)), _array_key(U.view(np.float64))}
+        assert len(keys) == 3
+
+    def test_object_arrays(self):
+        """Test that arrays of Python objects are hashed by the value of their elements"""
+        a = np.array([1, "a"], dtype=object)
+        assert _array_key(a) == _array_key(np.array([1, "a"], dtype=object))
+        assert _array_key(a) != _array_key(np.array([1, "b"], dtype=object))
+
+
+class TestFingerprint:
+    """Tests for the canonical program fingerprint"""
+
+    @pytest.fixture
+    def program(self):
+        """A program with scalar, complex, array and register transform arguments"""
+        bb = BlackbirdProgram(name="prog", version=1.0)
+        bb._target["name"] = "gaussian"
+        bb._target["options"] = {"shots": 10, "hbar": 2}
+        bb._operations.extend(
+            [
+                {"op": "Sgate", "modes": [0], "args": [0.5, 0.1j], "kwargs": {}},
+                {"op": "Interferometer", "modes": [0, 1], "args": [np.identity(2)], "kwargs": {}},
+                {"op": "MeasureX", "modes": [0]},
+                {"op": "Xgate", "modes": [1], "args": [RegRefTransform(2 * sym.Symbol("q0"))], "kwargs": {}},
+            ]
+        )
+        return bb
+
+    def test_stable(self, program):
+        """Test that equal programs have equal fingerprints, independent of
+        variables and of the order of the target options"""
+        other = copy.deepcopy(program)
+        other._var["unused"] = 5
+        other._target["options"] = {"hbar": 2, "shots": 10}
+
+        assert len(program.fingerprint()) == 64
+        assert other.fingerprint() == program.fingerprint()
+
+    def test_source_formatting(self):
+        """Test that scripts differing by comments, whitespace and variable
+        names have the same fingerprint"""
+        script1 = dedent(
+            """\
+            name prog
+            version 1.0
+            target gaussian (shots=10)
+
+            # squeeze and measure
+            float alpha = 0.5
+            Sgate(alpha) | 0
+            MeasureX | 0
+            """
+        )
+        script2 = dedent(
+            """\
+            name prog
+            version 1.0
+            target gaussian (shots=10)
+            float   r0 = 0.5
+
+            Sgate(r0)|0
+            MeasureX | 0
+            """
+        )
+        assert loads(script1).fingerprint() == loads(script2).fingerprint()
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda bb: setattr(bb, "_name", "other"),
+            lambda bb: setattr(bb, "_version", "2.0"),
+            lambda bb: bb._target.update(name="fock"),
+            lambda bb: bb._target["options"].update(shots=11),
+            lambda bb: bb._operations.__setitem__(0, {"op": "Sgate", "modes": [0], "args": [0.5, 0.2j], "kwargs": {}}),
+            lambda bb: bb._operations.__setitem__(0, {"op": "Sgate", "modes": [1], "args": [0.5, 0.1j], "kwargs": {}}),
+            lambda bb: bb._operations.__setitem__(0, {"op": "Sgate", "modes": [0], "args": [0.5], "kwargs": {}}),
+            lambda bb: bb._operations.__setitem__(1, {"op": "Interferometer", "modes": [0, 1], "args": [np.identity(2) * 1j], "kwargs": {}}),
+            lambda bb: bb._operations.append({"op": "MeasureX", "modes": [1]}),
+            lambda bb: bb._operations.__setitem__(
+                3, {"op": "Xgate", "modes": [1], "args": [RegRefTransform(3 * sym.Symbol("q0"))], "kwargs": {}}
+            ),
+        ],
+    )
+    def test_changes(self, program, change):
+        """Test that any change to the program content changes the fingerprint"""
+        before = program.fingerprint()
+        change(program)
+        assert program.fingerprint() != before
+
+    def test_types(self):
+        """Test that values of different types have different fingerprints"""
+        fingerprints = set()
+
+        for arg in [1, 1.0, 1 + 0j, True, "1", [1], np.array([1]), np.array([1.0])]:
+            bb = BlackbirdProgram()
+            bb._operations.append({"op": "Rgate", "modes": [0], "args": [arg], "kwargs": {}})
+            fingerprints.add(bb.fingerprint())
+
+        assert len(fingerprints) == 8
+
+    def test_large_arrays(self, monkeypatch):
+        """Test that arrays larger than a chunk are hashed in full"""
+        monkeypatch.setattr("blackbird.program._ARRAY_CHUNK", 64)
+        U = np.arange(100.0).reshape(10, 10)
+
+        bb = BlackbirdProgram()
+        bb._operations.append({"op": "GaussianTransform", "modes": [0], "args": [U], "kwargs": {}})
+        before = bb.fingerprint()
+
+        V = U.copy()
+        V[-1, -1] = 0
+        bb._operations[0] = {"op": "GaussianTransform", "modes": [0], "args": [V], "kwargs": {}}
+        assert bb.fingerprint() != before
+
+        # non-contiguous arrays are hashed by value
+        bb._operations[0] = {"op": "GaussianTransform", "modes": [0], "args": [U.T.copy().T], "kwargs": {}}
+        assert bb.fingerprint() == before
+
+    def test_caching(self, program, monkeypatch):
+        """Test that the operations are only hashed again after a mutation"""
+        calls = []
+        digest = program._operations_digest
+
+        def counting():
+            calls.append(1)
+            return digest()
+
+        monkeypatch.setattr(program, "_operations_digest", counting)
+
+        first = program.fingerprint()
+        assert program.fingerprint() == first
+        assert len(calls) == 1
+
+        program._operations.append({"op": "MeasureX", "modes": [1]})
+        assert program.fingerprint() != first
+        assert len(calls) == 2
@@ -0,0 +1,210 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the symplectic module"""
+# pylint: disable=no-self-use
+import pytest
+
+import numpy as np
+
+from blackbird.symplectic import (
+    bloch_messiah,
+    constant_args,
+    gate_symplectic,
+    gaussian_gate,
+    gaussian_state,
+    interferometer,
+    is_symplectic,
+    sympmat,
+    williamson,
+)
+
+
+GATES = [
+    ("Rgate", [0.3], 1),
+    ("Dgate", [0.3, 0.1], 1),
+    ("Xgate", [0.3], 1),
+    ("Zgate", [0.3], 1),
+    ("Sgate", [0.3, 0.1], 1),
+    ("Pgate", [0.3], 1),
+    ("BSgate", [0.3, 0.1], 2),
+    ("S2gate", [0.3, 0.1], 2),
+    ("CXgate", [0.3], 2),
+    ("CZgate", [0.3], 2),
+]
+
+
+class TestGaussianGates:
+    """Tests for the Gaussian gate representations"""
+
+    @pytest.mark.parametrize("name, args, num_modes", GATES)
+    def test_symplectic(self, name, args, num_modes):
+        """Test that all Gaussian gates are symplectic, with the correct shape"""
+        S, d = gaussian_gate(name, args)
+        assert S.shape == (2 * num_modes, 2 * num_modes)
+        assert d.shape == (2 * num_modes,)
+        assert is_symplectic(S)
+
+    def test_not_symplectic(self):
+        """Test that non-symplectic matrices are detected, including batches"""
+        S = np.stack([np.identity(4), 2 * np.identity(4)])
+        assert not is_symplectic(S[1])
+        assert is_symplectic(S).tolist() == [True, False]
+        assert not is_symplectic(np.identity(3))
+
+    def test_displacement(self):
+        """Test the displacement gate, with hbar=2"""
+        _, d = gaussian_gate("Dgate", [0.5j])
+        assert np.allclose(d, [0, 1])
+
+        _, d = gaussian_gate("Dgate", [0.5, np.pi], hbar=0.5)
+        assert np.allclose(d, [-0.5, 0])
+
+    def test_interferometer(self):
+        """Test the interferometer representation agrees with the beamsplitter"""
+        theta, phi = 0.4, 0.3
+        U = np.array(
+            [
+                [np.cos(theta), -np.exp(-1j * phi) * np.sin(theta)],
+                [np.exp(1j * phi) * np.sin(theta), np.cos(theta)],
+            ]
+        )
+        S, _ = gaussian_gate("BSgate", [theta, phi])
+        assert np.allclose(interferometer(U), S)
+        assert np.allclose(gaussian_gate("Interferometer", [U])[0], S)
+
+    def test_unknown_gate(self):
+        """Test that an exception is raised for non-Gaussian gates"""
+        with pytest.raises(ValueError, match="not a Gaussian unitary"):
+            gaussian_gate("Kgate", [0.1])
+
+
+class TestGaussianStates:
+    """Tests for the Gaussian state preparations"""
+
+    def test_vacuum(self):
+        """Test the vacuum state"""
+        cov, means = gaussian_state("Vacuum", [], hbar=2)
+        assert np.allclose(cov, np.identity(2))
+        assert np.allclose(means, 0)
+
+    def test_squeezed(self):
+        """Test the squeezed state"""
+        cov, _ = gaussian_state("Squeezed", [0.5], hbar=2)
+        assert np.allclose(cov, np.diag([np.exp(-1), np.exp(1)]))
+
+    def test_thermal(self):
+        """Test the thermal state"""
+        cov, _ = gaussian_state("Thermal", [1.0], hbar=1)
+        assert np.allclose(cov, 1.5 * np.identity(2))
+
+    def test_coherent(self):
+        """Test the coherent state"""
+        _, means = gaussian_state("Coherent", [1 + 0.5j], hbar=2)
+        assert np.allclose(means, [2, 1])
+
+
+class TestGateSymplectic:
+    """Tests for extracting the symplectic representation of operations"""
+
+    def test_constant_args(self):
+        """Test detection of constant arguments"""
+        assert constant_args({"op": "Rgate", "args": [0.1], "kwargs": {}, "modes": [0]}) == [0.1]
+        assert constant_args({"op": "Rgate", "args": ["a"], "kwargs": {}, "modes": [0]}) is None
+        assert constant_args({"op": "Rgate", "args": [0.1], "kwargs": {"a": 1}, "modes": [0]}) is None
+
+    def test_gate_symplectic(self):
+        """Test the symplectic representation of an operation"""
+        op = {"op": "Sgate", "args": [0.1], "kwargs": {}, "modes": [0]}
+        S, _ = gate_symplectic(op)
+        assert np.allclose(S, np.diag([np.exp(-0.1), np.exp(0.1)]))
+
+    @pytest.mark.parametrize(
+        "op",
+        [
+            {"op": "Kgate", "args": [0.1], "kwargs": {}, "modes": [0]},
+            {"op": "Rgate", "args": [0.1, 0.2], "kwargs": {}, "modes": [0]},
+            {"op": "Rgate", "args": [0.1j], "kwargs": {}, "modes": [0]},
+            {"op": "BSgate", "args": [0.1], "kwargs": {}, "modes": [0]},
+            {"op": "MeasureX", "modes": [0]},
+        ],
+    )
+    def test_invalid(self, op):
+        """Test that operations without a valid symplectic representation return None"""
+        assert gate_symplectic(op) is None
+
+
+def random_symplectic(n, seed):
+    """A random symplectic matrix, built from random two-mode gates"""
+    rng = np.random.default_rng(seed)
+    S = np.identity(2 * n)
+
+    for _ in range(5 * n):
+        i, j = rng.choice(n, 2, replace=False)
+        for name in ["Sgate", "BSgate", "S2gate"]:
+            modes = [i] if name == "Sgate" else [i, j]
+            idx = modes + [m + n for m in modes]
+            S_local, _ = gaussian_gate(name, 0.3 * rng.random(2))
+            S_full = np.identity(2 * n)
+            S_full[np.ix_(idx, idx)] = S_local
+            S = S_full @ S
+
+    return S
+
+
+class TestDecompositions:
+    """Tests for the Williamson and Bloch-Messiah decompositions"""
+
+    def test_sympmat(self):
+        """Test the symplectic form"""
+        assert np.allclose(sympmat(1), [[0, 1], [-1, 0]])
+        assert is_symplectic(sympmat(3))
+
+    @pytest.mark.parametrize("n", [2, 3, 4])
+    def test_williamson(self, n):
+        """Test that the Williamson decomposition reconstructs the covariance matrix"""
+        S = random_symplectic(n, seed=n)
+        nu = 1 + np.arange(n) / 2
+        V = S @ np.diag(np.concatenate([nu, nu])) @ S.T
+
+        nu_res, S_res = williamson(V)
+
+        assert np.allclose(np.sort(nu_res), nu)
+        assert is_symplectic(S_res)
+        assert np.allclose(S_res @ np.diag(np.concatenate([nu_res, nu_res])) @ S_res.T, V)
+
+    @pytest.mark.parametrize("n", [2, 3, 4])
+    def test_bloch_messiah(self, n):
+        """Test that the Bloch-Messiah decomposition reconstructs the symplectic matrix"""
+        S = random_symplectic(n, seed=n)
+        O1, r, O2 = bloch_messiah(S)
+
+        assert np.all(r >= -1e-10)
+        for O in (O1, O2):
+            assert is_symplectic(O)
+            assert np.allclose(O @ O.T, np.identity(2 * n))
+
+        assert np.allclose(O1 @ np.diag(np.concatenate([np.exp(-r), np.exp(r)])) @ O2, S)
+
+    def test_bloch_messiah_degenerate(self):
+        """Test the Bloch-Messiah decomposition when only some modes are squeezed"""
+        S = np.identity(6)
+        S_local, _ = gaussian_gate("Sgate", [0.5, 0.3])
+        S[np.ix_([1, 4], [1, 4])] = S_local
+
+        O1, r, O2 = bloch_messiah(S)
+
+        assert np.allclose(np.sort(r), [0, 0, 0.5])
+        assert is_symplectic(O1)
+        assert np.allclose(O1 @ np.diag(np.concatenate([np.exp(-r), np.exp(r)])) @ O2, S)
@@ -0,0 +1,181 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the tracing module"""
+# pylint: disable=no-self-use,redefined-outer-name
+import threading
+
+import pytest
+
+import antlr4
+
+from blackbird import load, loads, tracing
+from blackbird.compiler import merge_gates
+from blackbird.executor import ShotExecutor
+from blackbird.listener import parse
+
+
+SCRIPT = """\
+name traced
+version 1.0
+target gaussian (shots=10)
+
+Squeezed(0.5) | 0
+Rgate(0.1) | 0
+Rgate(0.2) | 0
+MeasureX | 0
+"""
+
+
+@pytest.fixture
+def spans():
+    """Register a callback collecting all finished spans"""
+    collected = []
+    tracing.register(collected.append)
+    yield collected
+    tracing.unregister()
+
+
+class TestRegistration:
+    """Tests for registering callbacks"""
+
+    def test_no_hooks(self):
+        """Test that a shared null span is returned if no callback is registered"""
+        assert tracing.span("a") is tracing.span("b")
+
+        with tracing.span("a") as s:
+            s.set(x=1)
+
+    def test_register_unregister(self):
+        """Test that callbacks are only called while registered"""
+        calls = []
+        hook = tracing.register(calls.append)
+
+        with tracing.span("a"):
+            pass
+
+        tracing.register(hook)
+        tracing.unregister(hook)
+
+        with tracing.span("b"):
+            pass
+
+        assert [s.name for s in calls] == ["a"]
+
+    def test_invalid(self):
+        """Test that non-callable callbacks raise an exception"""
+        with pytest.raises(TypeError, match="must be callable"):
+            tracing.register(5)
+
+    def test_failing_hook(self):
+        """Test that exceptions raised by a callback are reported as warnings"""
+
+        def hook(s):
+            raise ValueError("broken")
+
+        tracing.register(hook)
+
+        try:
+            with pytest.warns(RuntimeWarning, match="broken"):
+                assert len(loads(SCRIPT).operations) == 4
+        finally:
+            tracing.unregister(hook)
+
+
+class TestSpans:
+    """Tests for the reported spans"""
+
+    def test_attributes(self, spans):
+        """Test that spans have a duration, attributes and a parent"""
+        with tracing.span("outer", a=1) as outer:
+            with tracing.span("inner") as inner:
+                inner.set(b=2)
+
+        assert [s.name for s in spans] == ["inner", "outer"]
+        assert inner.parent is outer
+        assert outer.parent is None
+        assert inner.attributes == {"b": 2}
+        assert outer.attributes == {"a": 1}
+        assert outer.duration >= inner.duration >= 0
+        assert outer.start <= inner.start
+
+    def test_error(self, spans):
+        """Test that exceptions are recorded and propagated"""
+        with pytest.raises(ValueError):
+            with tracing.span("fail"):
+                raise ValueError
+
+        assert spans[0].attributes["error"] == "ValueError"
+
+    def test_loads(self, spans):
+        """Test the spans reported when parsing a script"""
+        loads(SCRIPT)
+
+        assert [s.name for s in spans] == ["parse.tree", "parse.walk", "loads"]
+        assert spans[0].parent is spans[2]
+        assert spans[2].attributes == {"program": "traced", "operations": 4, "target": "gaussian"}
+
+    def test_parse_with_stats(self, spans):
+        """Test that parsing with statistics reports the same spans"""
+        parse(antlr4.InputStream(SCRIPT), stats=True)
+        assert [s.name for s in spans] == ["parse.tree", "parse.walk"]
+
+    def test_load(self, spans, tmpdir):
+        """Test that loading a file is reported"""
+        filename = tmpdir.join("test.xbb")
+        filename.write(SCRIPT)
+        load(str(filename))
+        assert spans[-1].name == "load"
+
+    def test_serialize_and_compile(self, spans):
+        """Test that serialization and compilation passes are reported"""
+        bb = loads(SCRIPT)
+        del spans[:]
+
+        bb.serialize()
+        merge_gates(bb)
+
+        assert [s.name for s in spans] == ["serialize", "compile.merge_gates"]
+        assert spans[1].attributes["operations"] == 3
+
+    def test_execute(self, spans):
+        """Test that backend runs are nested within executor runs"""
+        bb = loads(SCRIPT)
+        del spans[:]
+
+        ShotExecutor(workers=1).run(bb, shots=5, seed=1)
+        names = [s.name for s in spans]
+
+        assert names[-2:] == ["backend.run", "executor.run"]
+        assert spans[-2].parent is spans[-1]
+        assert spans[-1].attributes["program"] == "traced"
+
+    def test_threads(self, spans):
+        """Test that spans of different threads have independent parents"""
+        barrier = threading.Barrier(2)
+
+        def work(name):
+            with tracing.span(name):
+                barrier.wait()
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in ["a", "b"]]
+
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
+
+        assert sorted(s.name for s in spans) == ["a", "b"]
+        assert all(s.parent is None for s in spans)
@@ -0,0 +1,184 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the validation module"""
+# pylint: disable=no-self-use
+from textwrap import dedent
+
+import pytest
+
+import numpy as np
+
+from blackbird import loads
+from blackbird.validation import GATES, DEVICES, validate
+
+
+U4 = np.array(
+    [
+        [-0.374559877614 + 0.1109693347j, 0.105835208525 + 0.395338593151j, -0.192128677443 - 0.326320923534j, 0.663459991938 - 0.310353146438j],
+        [-0.380767811218 + 0.17264101141j, 0.420783417348 - 0.061064767156j, -0.492833372973 + 0.169005421785j, -0.049425295018 + 0.608714168654j],
+        [-0.004575175084 + 0.710803957997j, 0.141905920779 + 0.230227449191j, 0.508526433013 - 0.297100053719j, -0.186799328386 + 0.19958273542j],
+        [-0.390091516639 - 0.123154657531j, 0.220739102992 - 0.727908644677j, 0.235216128652 - 0.427737604015j, -0.002154245945 - 0.125674446672j],
+    ]
+)
+
+
+def program(statements, target="gaussian", arrays=None):
+    """Create a program containing the provided Blackbird statements"""
+    header = "name test\nversion 1.0\ntarget {} (shots=10)\n\n".format(target)
+    bb = loads(header + dedent(statements))
+
+    # substitute array arguments
+    for op in bb.operations:
+        op["args"] = [arrays[a] if isinstance(a, str) and a in (arrays or {}) else a for a in op.get("args", [])]
+
+    return bb
+
+
+class TestRegistry:
+    """Tests for the gate and device registry"""
+
+    def test_gate_enum(self):
+        """Test that the registry contains the operations of the C++ Gate enum"""
+        assert len(GATES) == 27
+
+    def test_device_operations(self):
+        """Test that device operations are registered gates"""
+        for spec in DEVICES.values():
+            assert spec["operations"] <= set(GATES)
+
+
+class TestValidate:
+    """Tests for the validate function"""
+
+    def test_valid_chip0(self):
+        """Test that a valid chip0 program passes validation"""
+        bb = program(
+            """\
+            Coherent(0.5, 0.1) | 0
+            Coherent(0.5) | 2
+            Interferometer("U") | [0, 1, 2, 3]
+            MeasureIntensity | 0
+            MeasureIntensity | 1
+            """,
+            target="Chip0",
+            arrays={"U": U4},
+        )
+        assert validate(bb) == []
+
+    def test_chip0_constraints(self):
+        """Test the chip0 device constraints"""
+        bb = program(
+            """\
+            Squeezed(0.5) | 0
+            Interferometer("U") | [0, 1, 2, 3]
+            MeasureIntensity | 4
+            """,
+            target="chip0",
+            arrays={"U": U4},
+        )
+        errors = validate(bb)
+        assert errors == [
+            "Operation 0 (Squeezed): not supported by device chip0",
+            "Device chip0 has 4 modes, but the program acts on mode 4",
+        ]
+
+        bb = program(
+            """\
+            Interferometer("U") | [0, 1, 2, 3]
+            Coherent(0.5) | 0
+            """,
+            target="chip0",
+            arrays={"U": U4},
+        )
+        assert validate(bb) == [
+            "Operation 1 (Coherent): Chip0 state preparations must precede "
+            "the interferometer and measurements"
+        ]
+
+    def test_device_override(self):
+        """Test that the device can be provided explicitly"""
+        bb = program("Vgate(0.1) | 0\n")
+        assert validate(bb, device="fock") == []
+        assert validate(bb) == ["Operation 0 (Vgate): not supported by device gaussian"]
+
+    def test_signature_errors(self):
+        """Test that all operation signature errors are reported"""
+        bb = program(
+            """\
+            Rgate(0.1, 0.2) | 0
+            BSgate(0.1) | 0
+            Fock(0.5) | 1
+            Sgate(0.1j) | 2
+            Dgate(0.1j) | 2
+            Kgate(0.1) | 2
+            MeasureX | 0
+            Xgate(q0) | 1
+            """,
+            target="fock",
+        )
+        errors = validate(bb)
+        assert errors == [
+            "Operation 0 (Rgate): expected 1 positional arguments, got 2",
+            "Operation 1 (BSgate): acts on 2 modes, got 1",
+            "Operation 2 (Fock): argument 0 must be an integer, got 0.5",
+            "Operation 3 (Sgate): argument 0 must be real, got 0.1j",
+            "Operation 5 (Kgate): unknown operation",
+        ]
+
+    def test_repeated_modes(self):
+        """Test that operations acting on the same mode more than once are rejected"""
+        bb = program(
+            """\
+            CZgate(0.1) | [0, 0]
+            BSgate(0.1, 0.2) | [1, 1]
+            Interferometer("U") | [0, 1, 2, 2]
+            S2gate(0.1) | [0, 1]
+            """,
+            arrays={"U": U4},
+        )
+        errors = validate(bb)
+        assert errors == [
+            "Operation 0 (CZgate): modes must be distinct, got [0, 0]",
+            "Operation 1 (BSgate): modes must be distinct, got [1, 1]",
+            "Operation 2 (Interferometer): modes must be distinct, got [0, 1, 2, 2]",
+        ]
+
+    def test_array_checks(self):
+        """Test the batched unitarity and symplecticity checks"""
+        S = np.identity(4)
+        bb = program(
+            """\
+            Interferometer("U") | [0, 1, 2, 3]
+            Interferometer("V") | [0, 1, 2, 3]
+            Interferometer("U") | [0, 1]
+            GaussianTransform("S") | [0, 1]
+            GaussianTransform("T") | [0, 1]
+            GaussianTransform("S") | [0]
+            """,
+            arrays={"U": U4, "V": 2 * U4, "S": S, "T": 2 * S},
+        )
+        errors = validate(bb)
+        assert errors == [
+            "Operation 1 (Interferometer): matrix is not unitary",
+            "Operation 2 (Interferometer): unitary must have shape (2, 2), got (4, 4)",
+            "Operation 4 (GaussianTransform): matrix is not symplectic",
+            "Operation 5 (GaussianTransform): argument 0 must have shape (2, 2), got (4, 4)",
+        ]
+
+    @pytest.mark.parametrize("shots", ["0", "-1", "1.5", "True"])
+    def test_shots(self, shots):
+        """Test that the number of shots must be a positive integer"""
+        bb = loads("name test\nversion 1.0\ntarget gaussian (shots={})\n\nRgate(0.1) | 0\n".format(shots))
+        assert validate(bb) == ["Target option shots must be a positive integer, got {}".format(shots)]
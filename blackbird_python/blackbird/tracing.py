@@ -0,0 +1,286 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Tracing
+=======
+
+**Module name:** :mod:`blackbird.tracing`
+
+.. currentmodule:: blackbird.tracing
+
+This module contains a small instrumentation layer, which reports the
+time spent loading, parsing, serializing, compiling and executing
+Blackbird programs to user-provided callbacks.
+
+A callback registered using :func:`register` is called with a :class:`Span`
+every time an instrumented operation finishes:
+
+.. code-block:: python
+
+    from blackbird import tracing
+
+    def hook(span):
+        print(span.name, span.duration, span.attributes)
+
+    tracing.register(hook)
+    bb = blackbird.loads(script)
+
+The following spans are reported:
+
+=============================== ===================================================
+Name                            Operation
+=============================== ===================================================
+``load``, ``loads``             :func:`~blackbird.load`, :func:`~blackbird.loads`
+``parse.tree``                  constructing the parse tree in :func:`~.parse`
+``parse.walk``                  walking the parse tree with the listener
+``serialize``                   :meth:`.BlackbirdProgram.serialize`
+``compile.<pass>``              the passes of the :mod:`~blackbird.compiler` module
+``executor.run``                :meth:`.ShotExecutor.run`
+``backend.run``                 :meth:`.LocalBackend.run`
+=============================== ===================================================
+
+Spans acting on a :class:`~.BlackbirdProgram` have the attributes ``program``,
+``operations`` and ``target``, containing the program name, its number of
+operations, and the target name.
+
+When no callback is registered, instrumented functions only check whether
+the list of callbacks is empty before running as usual.
+
+Summary
+-------
+
+.. autosummary::
+    Span
+    register
+    unregister
+    span
+    traced
+
+Code details
+~~~~~~~~~~~~
+"""
+import functools
+import threading
+import time
+import warnings
+
+
+_HOOKS = ()
+"""tuple[callable]: registered callbacks. The tuple is replaced, rather than
+modified, when callbacks are registered, so that it can be iterated over
+while other threads register callbacks."""
+
+_LOCK = threading.Lock()
+
+_STACK = threading.local()
+
+
+class Span:
+    """A timed operation, passed to the registered callbacks once it has finished.
+
+    Args:
+        name (str): name of the operation
+        attributes (dict): attributes of the operation
+
+    Attributes:
+        name (str): name of the operation
+        attributes (dict): attributes of the operation, such as the program
+            name, number of operations and target. If the operation raised an
+            exception, the attribute ``error`` contains the name of the exception class.
+        parent (Span or None): the span enclosing this span in the same thread, if any
+        start (float): wall clock time at the start of the operation, in seconds since the epoch
+        duration (float): duration of the operation in seconds
+    """
+
+    __slots__ = ("name", "attributes", "parent", "start", "duration", "_counter")
+
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = None
+        self.start = None
+        self.duration = None
+        self._counter = None
+
+    def set(self, **attributes):
+        """Add attributes to the span."""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+
+        self.start = time.time()
+        self._counter = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._counter
+        _stack().pop()
+
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+
+        _emit(self)
+
+    def __repr__(self):
+        return "<Span: {}, duration={:.3g}s, attributes={}>".format(
+            self.name, self.duration or 0.0, self.attributes
+        )
+
+
+class _NullSpan:
+    """Span returned by :func:`span` when no callback is registered."""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        """Ignore the attributes."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _stack():
+    """The spans currently open in this thread."""
+    try:
+        return _STACK.spans
+    except AttributeError:
+        _STACK.spans = []
+        return _STACK.spans
+
+
+def _emit(finished):
+    """Pass a finished span to all registered callbacks.
+
+    Exceptions raised by callbacks are reported as warnings, so that
+    tracing never interrupts the traced operation.
+    """
+    for hook in _HOOKS:
+        try:
+            hook(finished)
+        except Exception as e:  # pylint: disable=broad-except
+            warnings.warn("Tracing callback {!r} raised {!r}".format(hook, e), RuntimeWarning)
+
+
+def register(hook):
+    """Register a callback, called with every finished :class:`Span`.
+
+    Args:
+        hook (callable): callback accepting a single :class:`Span` argument
+
+    Returns:
+        callable: the callback, so that this function may be used as a decorator
+    """
+    global _HOOKS  # pylint: disable=global-statement
+
+    if not callable(hook):
+        raise TypeError("Tracing callbacks must be callable")
+
+    with _LOCK:
+        if hook not in _HOOKS:
+            _HOOKS = _HOOKS + (hook,)
+
+    return hook
+
+
+def unregister(hook=None):
+    """Unregister a callback.
+
+    Args:
+        hook (callable or None): the callback to remove. If not provided,
+            all callbacks are removed.
+    """
+    global _HOOKS  # pylint: disable=global-statement
+
+    with _LOCK:
+        if hook is None:
+            _HOOKS = ()
+        else:
+            _HOOKS = tuple(h for h in _HOOKS if h is not hook)
+
+
+def span(name, **attributes):
+    """Context manager timing the enclosed block as a span.
+
+    If no callback is registered, a shared span that ignores its
+    attributes is returned, and nothing is timed.
+
+    Args:
+        name (str): name of the span
+        **attributes: attributes of the span
+
+    Returns:
+        Span: the span
+    """
+    if not _HOOKS:
+        return _NULL_SPAN
+
+    return Span(name, attributes)
+
+
+def _program_attributes(*candidates):
+    """Attributes describing the first Blackbird program among the candidates."""
+    from .program import BlackbirdProgram  # pylint: disable=import-outside-toplevel
+
+    for obj in candidates:
+        if isinstance(obj, tuple) and obj:
+            # compilation passes return the program and a report
+            obj = obj[0]
+
+        if isinstance(obj, BlackbirdProgram):
+            return {
+                "program": obj.name,
+                "operations": len(obj.operations),
+                "target": obj.target["name"],
+            }
+
+    return {}
+
+
+def traced(name):
+    """Decorator reporting every call of a function as a span.
+
+    If the function returns a :class:`~.BlackbirdProgram`, or accepts one as a
+    positional argument, the span has the attributes of this program.
+
+    Args:
+        name (str): name of the span
+
+    Returns:
+        callable: decorator
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _HOOKS:
+                return func(*args, **kwargs)
+
+            with Span(name) as s:
+                result = func(*args, **kwargs)
+                s.set(**_program_attributes(result, *args))
+                return result
+
+        return wrapper
+
+    return decorator
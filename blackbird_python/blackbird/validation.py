@@ -0,0 +1,397 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=too-many-return-statements,too-many-branches,too-many-instance-attributes
+"""
+Program validation
+==================
+
+**Module name:** :mod:`blackbird.validation`
+
+.. currentmodule:: blackbird.validation
+
+This module contains a registry of the quantum operations and devices
+defined by Blackbird, mirroring the ``Gate``, ``ParDomain`` and ``Device``
+definitions of the C++ header ``BlackbirdProgram.h``, as well as a function
+for validating a :class:`~.BlackbirdProgram` against it.
+
+Validation is performed in a single pass over the operations. Array arguments
+are grouped by shape, and the unitarity and symplecticity checks are performed
+on each group at once.
+
+Summary
+-------
+
+.. autosummary::
+    ParDomain
+    GateSignature
+    GATES
+    ALIASES
+    DEVICES
+    validate
+
+Code details
+~~~~~~~~~~~~
+"""
+from collections import namedtuple
+import enum
+import numbers
+
+import numpy as np
+
+from .symplectic import GAUSSIAN_GATES, GAUSSIAN_STATES, is_symplectic
+
+
+class ParDomain(enum.Enum):
+    """The allowed domains of the Blackbird quantum operation parameters"""
+
+    #: operation accepts no parameters
+    NONE = 0
+    #: integer parameters
+    INT = 1
+    #: float parameters
+    FLOAT = 2
+    #: complex parameters
+    COMPLEX = 3
+    #: string parameters
+    STRING = 4
+    #: boolean parameters
+    BOOL = 5
+    #: a real array parameter
+    ARRAY_FLOAT = 6
+    #: a complex array parameter
+    ARRAY_COMPLEX = 7
+
+
+GateSignature = namedtuple("GateSignature", ["min_args", "max_args", "domain", "num_modes", "complex_args"])
+GateSignature.__doc__ = """Signature of a Blackbird quantum operation.
+
+Args:
+    min_args (int): minimum number of positional arguments
+    max_args (int): maximum number of positional arguments
+    domain (ParDomain): the domain of the arguments
+    num_modes (int): number of modes the operation acts on, or 0 if it
+        acts on an arbitrary number of modes
+    complex_args (frozenset[int]): positions of arguments that may be complex,
+        for operations with a ``ParDomain.FLOAT`` domain
+"""
+
+
+def _sig(min_args, max_args, domain, num_modes, complex_args=()):
+    """Shorthand for defining a gate signature"""
+    return GateSignature(min_args, max_args, domain, num_modes, frozenset(complex_args))
+
+
+GATES = {
+    # state preparations
+    "Vacuum": _sig(0, 0, ParDomain.NONE, 1),
+    "Coherent": _sig(1, 2, ParDomain.FLOAT, 1, complex_args=[0]),
+    "Squeezed": _sig(1, 2, ParDomain.FLOAT, 1),
+    "Thermal": _sig(1, 1, ParDomain.FLOAT, 1),
+    "Fock": _sig(1, 1, ParDomain.INT, 1),
+    "Catstate": _sig(1, 2, ParDomain.FLOAT, 1, complex_args=[0]),
+    # one mode gates
+    "Rgate": _sig(1, 1, ParDomain.FLOAT, 1),
+    "Dgate": _sig(1, 2, ParDomain.FLOAT, 1, complex_args=[0]),
+    "Xgate": _sig(1, 1, ParDomain.FLOAT, 1),
+    "Zgate": _sig(1, 1, ParDomain.FLOAT, 1),
+    "Sgate": _sig(1, 2, ParDomain.FLOAT, 1),
+    "Pgate": _sig(1, 1, ParDomain.FLOAT, 1),
+    "Vgate": _sig(1, 1, ParDomain.FLOAT, 1),
+    # two mode gates
+    "BSgate": _sig(0, 2, ParDomain.FLOAT, 2),
+    "S2gate": _sig(1, 2, ParDomain.FLOAT, 2),
+    "CXgate": _sig(0, 1, ParDomain.FLOAT, 2),
+    "CZgate": _sig(0, 1, ParDomain.FLOAT, 2),
+    "CKgate": _sig(1, 1, ParDomain.FLOAT, 2),
+    # channels
+    "LossChannel": _sig(1, 1, ParDomain.FLOAT, 1),
+    "ThermalLossChannel": _sig(2, 2, ParDomain.FLOAT, 1),
+    # decompositions
+    "Interferometer": _sig(1, 1, ParDomain.ARRAY_COMPLEX, 0),
+    "GaussianTransform": _sig(1, 1, ParDomain.ARRAY_FLOAT, 0),
+    "Gaussian": _sig(1, 2, ParDomain.ARRAY_FLOAT, 0),
+    # measurements
+    "MeasureFock": _sig(0, 0, ParDomain.NONE, 1),
+    "MeasureHomodyne": _sig(0, 1, ParDomain.FLOAT, 1),
+    "MeasureHeterodyne": _sig(0, 0, ParDomain.NONE, 1),
+    "MeasureIntensity": _sig(0, 0, ParDomain.NONE, 1),
+}
+"""dict[str->GateSignature]: Signatures of the quantum operations of the
+Blackbird ``Gate`` enum. Parameters that the C++ parser stores as a magnitude
+and a phase may be provided as a single complex number."""
+
+
+ALIASES = {
+    "Vac": "Vacuum",
+    "Measure": "MeasureFock",
+    "MeasureX": "MeasureHomodyne",
+    "MeasureP": "MeasureHomodyne",
+    "MeasureHD": "MeasureHeterodyne",
+}
+"""dict[str->str]: Alternative names of quantum operations, and the operation
+in :data:`GATES` they correspond to."""
+
+
+_GAUSSIAN_MEASUREMENTS = {"MeasureHomodyne", "MeasureHeterodyne", "MeasureIntensity", "MeasureFock"}
+
+
+def _check_chip0(program):
+    """Structural constraints of the Chip0 device.
+
+    The chip consists of coherent state inputs, a 4x4 interferometer applied
+    to all modes, and an intensity measurement of each mode.
+
+    Args:
+        program (BlackbirdProgram): the program to check
+
+    Returns:
+        list[str]: error messages
+    """
+    errors = []
+    stage = 0
+
+    for idx, op in enumerate(program.operations):
+        name = ALIASES.get(op["op"], op["op"])
+
+        if name == "Interferometer":
+            if stage != 0:
+                errors.append("Operation {} (Interferometer): Chip0 supports only one interferometer".format(idx))
+            if op["modes"] != [0, 1, 2, 3]:
+                errors.append(
+                    "Operation {} (Interferometer): Chip0 interferometer must be "
+                    "applied to modes [0, 1, 2, 3]".format(idx)
+                )
+            stage = 1
+        elif name == "MeasureIntensity":
+            stage = 2
+        elif stage > 0:
+            errors.append(
+                "Operation {} ({}): Chip0 state preparations must precede "
+                "the interferometer and measurements".format(idx, op["op"])
+            )
+
+    if stage == 0:
+        errors.append("Chip0 programs must contain an interferometer")
+
+    return errors
+
+
+DEVICES = {
+    "chip0": {
+        "operations": {"Coherent", "Interferometer", "MeasureIntensity"},
+        "num_modes": 4,
+        "check": _check_chip0,
+    },
+    "gaussian": {
+        "operations": GAUSSIAN_GATES
+        | {ALIASES.get(n, n) for n in GAUSSIAN_STATES}
+        | {"Gaussian", "LossChannel", "ThermalLossChannel"}
+        | _GAUSSIAN_MEASUREMENTS,
+        "num_modes": None,
+        "check": None,
+    },
+    "fock": {"operations": set(GATES), "num_modes": None, "check": None},
+}
+"""dict[str->dict]: Constraints of the Blackbird devices (``Chip0``, ``Gaussian``
+and ``Fock``), keyed by the lowercase device name. Each device is described by
+a dictionary with keys:
+
+* ``'operations'`` (set[str]): the operations supported by the device
+* ``'num_modes'`` (int or None): the number of modes of the device, or ``None`` if arbitrary
+* ``'check'`` (callable or None): a function accepting a :class:`~.BlackbirdProgram`,
+  and returning a list of error messages for any additional structural constraints
+"""
+
+
+def _is_real(x):
+    """Whether a value is a real number (booleans excluded)"""
+    return isinstance(x, numbers.Real) and not isinstance(x, bool)
+
+
+def _check_args(idx, op, sig, arrays):
+    """Check the arguments of an operation against its signature.
+
+    Array arguments requiring a unitarity or symplecticity check are
+    appended to ``arrays`` instead of being checked immediately.
+
+    Args:
+        idx (int): position of the operation in the program
+        op (dict): the operation
+        sig (GateSignature): the signature of the operation
+        arrays (dict[tuple->list]): mapping from the check type and array
+            shape to a list of ``(idx, op_name, array)`` tuples
+
+    Returns:
+        list[str]: error messages
+    """
+    prefix = "Operation {} ({})".format(idx, op["op"])
+    args = op.get("args", [])
+
+    if not sig.min_args <= len(args) <= sig.max_args:
+        if sig.min_args == sig.max_args:
+            expected = str(sig.min_args)
+        else:
+            expected = "{} to {}".format(sig.min_args, sig.max_args)
+        return ["{}: expected {} positional arguments, got {}".format(prefix, expected, len(args))]
+
+    if sig.num_modes and len(op["modes"]) != sig.num_modes:
+        return ["{}: acts on {} modes, got {}".format(prefix, sig.num_modes, len(op["modes"]))]
+
+    if len(set(op["modes"])) != len(op["modes"]):
+        return ["{}: modes must be distinct, got {}".format(prefix, op["modes"])]
+
+    errors = []
+
+    for pos, a in enumerate(args):
+        if hasattr(a, "regrefs"):
+            # measurement dependent parameter; evaluated at runtime
+            continue
+
+        if sig.domain == ParDomain.FLOAT:
+            if _is_real(a) or (pos in sig.complex_args and isinstance(a, numbers.Complex)):
+                continue
+            errors.append("{}: argument {} must be real, got {!r}".format(prefix, pos, a))
+
+        elif sig.domain == ParDomain.INT:
+            if not isinstance(a, numbers.Integral) or isinstance(a, bool):
+                errors.append("{}: argument {} must be an integer, got {!r}".format(prefix, pos, a))
+
+        elif sig.domain in (ParDomain.ARRAY_FLOAT, ParDomain.ARRAY_COMPLEX):
+            if not isinstance(a, np.ndarray) or not np.issubdtype(a.dtype, np.number):
+                errors.append("{}: argument {} must be a numeric array".format(prefix, pos))
+                continue
+
+            if sig.domain == ParDomain.ARRAY_FLOAT and np.iscomplexobj(a):
+                errors.append("{}: argument {} must be a real array".format(prefix, pos))
+                continue
+
+            k = len(op["modes"])
+            name = ALIASES.get(op["op"], op["op"])
+
+            if name == "Interferometer":
+                if a.shape != (k, k):
+                    errors.append("{}: unitary must have shape {}, got {}".format(prefix, (k, k), a.shape))
+                else:
+                    arrays.setdefault(("unitary", a.shape), []).append((idx, op["op"], a))
+
+            elif name == "GaussianTransform" or (name == "Gaussian" and pos == 0):
+                if a.shape != (2 * k, 2 * k):
+                    errors.append(
+                        "{}: argument {} must have shape {}, got {}".format(prefix, pos, (2 * k, 2 * k), a.shape)
+                    )
+                elif name == "GaussianTransform":
+                    arrays.setdefault(("symplectic", a.shape), []).append((idx, op["op"], a))
+
+            elif name == "Gaussian" and a.size != 2 * k:
+                errors.append("{}: vector of means must have {} elements".format(prefix, 2 * k))
+
+    return errors
+
+
+def _check_arrays(arrays, tol):
+    """Perform batched unitarity and symplecticity checks.
+
+    Args:
+        arrays (dict[tuple->list]): mapping from the check type and array
+            shape to a list of ``(idx, op_name, array)`` tuples
+        tol (float): absolute tolerance
+
+    Returns:
+        list[tuple[int, str]]: tuples containing the operation position and error message
+    """
+    errors = []
+
+    for (check, shape), group in arrays.items():
+        stack = np.stack([a for _, _, a in group])
+
+        if check == "unitary":
+            prod = np.einsum("bij,bkj->bik", stack, stack.conj())
+            valid = np.all(np.abs(prod - np.identity(shape[0])) < tol, axis=(1, 2))
+        else:
+            valid = np.atleast_1d(is_symplectic(stack, tol=tol))
+
+        for (idx, name, _), ok in zip(group, valid):
+            if not ok:
+                errors.append((idx, "Operation {} ({}): matrix is not {}".format(idx, name, check)))
+
+    return errors
+
+
+def validate(program, device=None, tol=1e-6):
+    """Validate a Blackbird program.
+
+    The program is checked against the operation signatures in :data:`GATES`,
+    and against the constraints of the target device in :data:`DEVICES`.
+    Interferometer unitaries are checked to be unitary, and Gaussian
+    transformations to be symplectic.
+
+    Args:
+        program (BlackbirdProgram): the program to validate
+        device (str): the device to validate against. If not provided,
+            the program target is used. Programs without a target, or
+            targets not listed in :data:`DEVICES`, are only checked
+            against the operation signatures.
+        tol (float): absolute tolerance for the unitarity and symplecticity checks
+
+    Returns:
+        list[str]: error messages, in program order; an empty list
+        indicates that the program is valid
+    """
+    if device is None:
+        device = program.target["name"]
+
+    spec = DEVICES.get(device.lower()) if device is not None else None
+
+    errors = []
+    arrays = {}
+
+    for idx, op in enumerate(program.operations):
+        name = ALIASES.get(op["op"], op["op"])
+        sig = GATES.get(name)
+
+        if sig is None:
+            errors.append((idx, "Operation {} ({}): unknown operation".format(idx, op["op"])))
+            continue
+
+        if spec is not None and name not in spec["operations"]:
+            errors.append((idx, "Operation {} ({}): not supported by device {}".format(idx, op["op"], device)))
+            continue
+
+        if op.get("kwargs") and sig.max_args == 0:
+            errors.append((idx, "Operation {} ({}): does not accept keyword arguments".format(idx, op["op"])))
+
+        errors.extend((idx, e) for e in _check_args(idx, op, sig, arrays))
+
+    errors.extend(_check_arrays(arrays, tol))
+    messages = [e for _, e in sorted(errors, key=lambda e: e[0])]
+
+    if spec is not None:
+        if spec["num_modes"] is not None and program.modes:
+            if max(program.modes) >= spec["num_modes"]:
+                messages.append(
+                    "Device {} has {} modes, but the program acts on mode {}".format(
+                        device, spec["num_modes"], max(program.modes)
+                    )
+                )
+
+        if spec["check"] is not None and not messages:
+            # structural constraints are only checked for programs
+            # consisting of supported operations
+            messages.extend(spec["check"](program))
+
+    shots = program.target["options"].get("shots", 1)
+    if not isinstance(shots, numbers.Integral) or isinstance(shots, bool) or shots < 1:
+        messages.append("Target option shots must be a positive integer, got {!r}".format(shots))
+
+    return messages
@@ -22,7 +22,7 @@ with open("blackbird_python/blackbird/_version.py") as f:
 	version = f.readlines()[-1].split()[-1].strip("\"'")
 
 requirements = [
-    "numpy>=1.16",
+    "numpy>=1.17",
     "sympy",
     "antlr4-python3-runtime>=4.7.1"
 ]
@@ -42,6 +42,9 @@ info = {
     'long_description': open('README.rst').read(),
     'provides': ["blackbird"],
     'install_requires': requirements,
+    'entry_points': {
+        'console_scripts': ['blackbird=blackbird.cli:main']
+    },
     # 'extras_require': extra_requirements,
     'command_options': {
         'build_sphinx': {